@@ -6,22 +6,36 @@ Seguindo o princípio de Inversão de Dependência.
 """
 
 from abc import ABC, abstractmethod
-from typing import BinaryIO
-from app.domain.entities import OMRResult
-from app.domain.value_objects import OMROptions, ImageMetadata
+from typing import (
+    Any, BinaryIO, ContextManager, Dict, List, Optional, Sequence, Tuple
+)
+from app.domain.entities import (
+    OMRResult, AnswerKey, ExamCorrection, ClassSummary, QuestionStatistics,
+    DistractorAnalysis
+)
+from app.domain.item_analysis import ResponseMatrix
+from app.domain.value_objects import (
+    OMROptions, ImageMetadata, ImageQuality, FrameAssessment, MarkThresholds
+)
 
 
 class IOMREngine(ABC):
     """Interface para o motor de processamento OMR"""
 
     @abstractmethod
-    def process_image(self, image_data: bytes, options: OMROptions) -> OMRResult:
+    def process_image(
+        self,
+        image_data: bytes,
+        options: OMROptions,
+        digest: Optional[str] = None
+    ) -> OMRResult:
         """
         Processa uma imagem e retorna as respostas detectadas.
 
         Args:
             image_data: Bytes da imagem
             options: Configurações de processamento
+            digest: Resumo dos bytes (ImageMetadata.digest), se já calculado
 
         Returns:
             OMRResult com respostas detectadas
@@ -32,6 +46,89 @@ class IOMREngine(ABC):
         """
         pass
 
+    @abstractmethod
+    def prepare_image(self, image_data: bytes) -> Dict[str, Any]:
+        """
+        Decodifica e pré-processa a imagem uma única vez.
+
+        Returns:
+            Estado opaco para process_prepared e render_preview
+
+        Raises:
+            ValueError: Se a imagem for inválida
+        """
+        pass
+
+    @abstractmethod
+    def process_prepared(
+        self, prepared: Dict[str, Any], options: OMROptions
+    ) -> OMRResult:
+        """Lê as respostas de uma imagem preparada (ver prepare_image)"""
+        pass
+
+    @abstractmethod
+    def render_preview(
+        self, prepared: Dict[str, Any], max_side: int
+    ) -> Tuple[bytes, float]:
+        """JPEG reduzido da imagem preparada e a escala (prévia / original)"""
+        pass
+
+    def process_unique(
+        self,
+        image_data: bytes,
+        options: OMROptions,
+        sheet_index: "ISheetIndex",
+        label: str
+    ) -> OMRResult:
+        """
+        Lê a folha, salvo se ela for uma cópia de outra já lida no lote.
+
+        A comparação acontece antes das etapas caras da leitura; a folha
+        lida entra no índice com o rótulo (e sai se a leitura falhar).
+        Uma folha quase idêntica sem matrícula que confirme a cópia é lida
+        e volta com OMRResult.duplicate_of.
+
+        Args:
+            image_data: Bytes da imagem
+            options: Configurações de processamento
+            sheet_index: Folhas já lidas no lote
+            label: Rótulo da folha no índice (ex: nome do arquivo)
+
+        Raises:
+            DuplicateSheetError: Se a folha é uma cópia de outra do lote
+            ValueError: Se a imagem for inválida
+            RuntimeError: Se houver erro no processamento
+        """
+        return self.process_image(image_data, options)  # Sem detecção
+
+    def cached_result(
+        self,
+        image_data: bytes,
+        options: OMROptions,
+        digest: Optional[str] = None
+    ) -> Optional[OMRResult]:
+        """
+        Resultado já guardado para a imagem e as opções, sem ler a imagem.
+
+        Returns:
+            Cópia do resultado, ou None se a imagem precisa ser lida (motor
+            sem cache de resultados: sempre None)
+        """
+        return None
+
+    def classify_batch(
+        self, results: Sequence[OMRResult]
+    ) -> Tuple[List[OMRResult], Optional[MarkThresholds]]:
+        """
+        Reclassifica as respostas de um lote de folhas lidas com as mesmas
+        opções, com limiares ajustados às densidades do lote inteiro.
+
+        Returns:
+            (resultados na ordem recebida, limiares usados ou None se as
+            decisões de cada folha foram mantidas)
+        """
+        return list(results), None
+
 
 class IImageValidator(ABC):
     """Interface para validação de imagens"""
@@ -48,7 +145,169 @@ class IImageValidator(ABC):
 
     @abstractmethod
     def get_metadata(self, image_data: bytes) -> ImageMetadata:
-        """Extrai metadados da imagem"""
+        """Extrai metadados da imagem, com o resumo dos bytes (chave de cache)"""
+        pass
+
+
+class IImageQualityGate(ABC):
+    """Interface para verificação rápida de qualidade antes do OMR"""
+
+    @abstractmethod
+    def assess(self, image_data: bytes, digest: Optional[str] = None) -> ImageQuality:
+        """
+        Mede a qualidade da imagem em uma miniatura.
+
+        Args:
+            image_data: Bytes da imagem
+            digest: Resumo dos bytes (ImageMetadata.digest), se já calculado
+
+        Returns:
+            ImageQuality com os indicadores e o motivo de rejeição (se houver)
+
+        Raises:
+            ValueError: Se a imagem não puder ser decodificada
+        """
+        pass
+
+
+class IAdmissionControl(ABC):
+    """Interface para limitar a memória das leituras simultâneas"""
+
+    @abstractmethod
+    def admit(self, metadata: ImageMetadata) -> ContextManager[None]:
+        """
+        Reserva, enquanto o bloco executa, a memória estimada para ler a
+        imagem (a partir das dimensões do cabeçalho, antes de decodificar).
+
+        Raises:
+            CapacityExceededError: Se não houver memória disponível a tempo
+        """
+        pass
+
+
+class ISheetTracker(ABC):
+    """Interface para acompanhar a folha nos quadros da câmera (leitura ao vivo)"""
+
+    @abstractmethod
+    def assess(self, frame_data: bytes) -> FrameAssessment:
+        """
+        Avalia um quadro de baixa resolução: presença e enquadramento da
+        folha, nitidez e estabilidade em relação aos quadros anteriores.
+
+        Raises:
+            ValueError: Se o quadro não puder ser decodificado
+        """
+        pass
+
+    @abstractmethod
+    def reset(self):
+        """Esquece a folha acompanhada (ex: após uma captura)"""
+        pass
+
+
+class ISheetIndex(ABC):
+    """Interface para o índice de folhas já lidas em um lote (duplicatas)"""
+
+    @abstractmethod
+    def find(self, sheet_hash: Any) -> Optional[str]:
+        """Rótulo de uma folha indexada quase idêntica, ou None"""
+        pass
+
+    @abstractmethod
+    def add(self, sheet_hash: Any, label: str):
+        """Indexa uma folha lida"""
+        pass
+
+    @abstractmethod
+    def release(self, label: str):
+        """Esquece a folha indexada com o rótulo (a leitura dela falhou)"""
+        pass
+
+    @abstractmethod
+    def clear(self):
+        """Esquece as folhas indexadas (início de um novo lote)"""
+        pass
+
+    def claim(self, sheet_hash: Any, label: str) -> Optional[str]:
+        """
+        Rótulo de uma folha indexada quase idêntica; sem ela, indexa esta.
+
+        Índices usados por leituras simultâneas do mesmo lote fazem as
+        duas coisas em uma única operação: duas cópias da mesma folha em
+        leitura ao mesmo tempo não passam as duas.
+        """
+        original = self.find(sheet_hash)
+        if original is None:
+            self.add(sheet_hash, label)
+        return original
+
+
+class IAnswerKeyRepository(ABC):
+    """Interface para o cadastro de gabaritos no servidor"""
+
+    @abstractmethod
+    def get(self, key_id: str) -> Optional[AnswerKey]:
+        """Busca um gabarito pelo id (None se não existir)"""
+        pass
+
+    @abstractmethod
+    def list_all(self) -> List[AnswerKey]:
+        """Lista todos os gabaritos cadastrados"""
+        pass
+
+    @abstractmethod
+    def save(self, answer_key: AnswerKey) -> bool:
+        """
+        Cria ou substitui um gabarito.
+
+        Returns:
+            True se o gabarito foi criado, False se foi substituído
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key_id: str) -> bool:
+        """Remove um gabarito; retorna False se ele não existia"""
+        pass
+
+
+class IResultRepository(ABC):
+    """Interface para o histórico de correções e suas estatísticas"""
+
+    @abstractmethod
+    def save_many(
+        self, corrections: Sequence[Tuple[ExamCorrection, AnswerKey]]
+    ) -> List[int]:
+        """
+        Registra correções (com o gabarito usado) em uma única transação.
+
+        Returns:
+            Id de cada correção registrada
+        """
+        pass
+
+    def save(self, correction: ExamCorrection, answer_key: AnswerKey) -> int:
+        """Registra uma correção"""
+        return self.save_many([(correction, answer_key)])[0]
+
+    @abstractmethod
+    def class_summary(self, answer_key_id: str) -> ClassSummary:
+        """Médias e aprovação da turma no gabarito"""
+        pass
+
+    @abstractmethod
+    def question_statistics(self, answer_key_id: str) -> List[QuestionStatistics]:
+        """Acertos, erros, brancos e dificuldade de cada questão"""
+        pass
+
+    @abstractmethod
+    def distractor_analysis(self, answer_key_id: str) -> List[DistractorAnalysis]:
+        """Escolha de cada alternativa por questão"""
+        pass
+
+    @abstractmethod
+    def response_matrix(self, answer_key_id: str) -> ResponseMatrix:
+        """Matriz N × Q com as marcações de todas as provas do gabarito"""
         pass
 
 
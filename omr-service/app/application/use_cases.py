@@ -5,10 +5,30 @@ Orquestram a lógica de negócio usando as entidades de domínio
 e as interfaces de infraestrutura.
 """
 
-from typing import BinaryIO
-from app.domain.entities import OMRResult, AnswerKey, ExamCorrection, Answer
-from app.domain.value_objects import OMROptions
-from app.application.interfaces import IOMREngine, IImageValidator, IDebugStorage
+import io
+import secrets
+from contextlib import nullcontext
+from typing import (
+    Any, BinaryIO, ContextManager, Dict, List, MutableMapping, Optional, Tuple
+)
+from app.domain.entities import (
+    OMRResult, AnswerKey, ExamCorrection, Answer, BatchCorrection, BatchItem,
+    ClassSummary, QuestionStatistics, DistractorAnalysis, ReviewSession
+)
+from app.domain.item_analysis import ItemAnalysis, analyze_items
+from app.domain.value_objects import (
+    OMROptions, SheetLayout, StudentIdField, VersionField, ImageMetadata,
+    FrameAssessment, UploadFormat
+)
+from app.domain.exceptions import (
+    ImageQualityError, AnswerKeyNotFoundError, AnswerKeyExistsError,
+    ReviewSessionNotFoundError, DuplicateSheetError
+)
+from app.application.interfaces import (
+    IOMREngine, IImageValidator, IDebugStorage, IImageQualityGate,
+    IAdmissionControl, IAnswerKeyRepository, IResultRepository, ISheetTracker,
+    ISheetIndex
+)
 
 
 class ReadAnswersUseCase:
@@ -17,6 +37,9 @@ class ReadAnswersUseCase:
 
     Responsabilidades:
     - Validar a imagem de entrada
+    - Rejeitar cedo fotos inadequadas (verificação rápida de qualidade)
+    - Limitar a memória das leituras simultâneas (controle de admissão)
+    - Aceitar direto envios já no formato compacto (validação em um passo)
     - Processar a imagem com o motor OMR
     - Salvar imagens de debug se solicitado
     - Retornar resultado estruturado
@@ -26,17 +49,29 @@ class ReadAnswersUseCase:
         self,
         omr_engine: IOMREngine,
         image_validator: IImageValidator,
-        debug_storage: IDebugStorage
+        debug_storage: IDebugStorage,
+        quality_gate: Optional[IImageQualityGate] = None,
+        admission: Optional[IAdmissionControl] = None,
+        upload_format: Optional[UploadFormat] = None
     ):
+        """
+        Args:
+            upload_format: Formato compacto publicado aos clientes; envios
+                nesse formato dispensam a verificação completa do arquivo
+        """
         self.omr_engine = omr_engine
         self.image_validator = image_validator
         self.debug_storage = debug_storage
+        self.quality_gate = quality_gate
+        self.admission = admission
+        self.upload_format = upload_format
 
     def execute(
         self,
         image_file: BinaryIO,
         filename: str,
-        options: OMROptions
+        options: OMROptions,
+        sheet_index: Optional[ISheetIndex] = None
     ) -> OMRResult:
         """
         Executa a leitura de respostas.
@@ -45,47 +80,117 @@ class ReadAnswersUseCase:
             image_file: Arquivo de imagem
             filename: Nome do arquivo
             options: Opções de processamento OMR
+            sheet_index: Folhas já lidas no lote; com ele, uma duplicata é
+                recusada antes das etapas caras da leitura
 
         Returns:
             OMRResult com respostas detectadas
 
         Raises:
+            ImageQualityError: Se a foto for rejeitada pela verificação rápida
+            DuplicateSheetError: Se a folha já foi lida no lote
             ValueError: Se a imagem for inválida
+            CapacityExceededError: Se não houver memória para a leitura a tempo
             RuntimeError: Se houver erro no processamento
         """
-        # 1. Validar tipo de arquivo
-        if not self.image_validator.validate_file_type(image_file, filename):
-            raise ValueError(
-                "Tipo de arquivo inválido. Use JPG, PNG ou WEBP."
+        # 1-4. Validar arquivo e dimensões
+        image_data, metadata = self.load_image(image_file, filename)
+
+        # 5. Verificação rápida de qualidade (antes do pipeline completo)
+        quality = None
+        if self.quality_gate:
+            quality = self.quality_gate.assess(image_data, metadata.digest)
+            if not quality.is_acceptable:
+                raise ImageQualityError(quality)
+
+        # 6. Resultado já guardado (mesma foto, mesmas opções): não há
+        # decodificação, e nada é reservado no orçamento
+        result = None
+        if sheet_index is None:
+            result = self.omr_engine.cached_result(
+                image_data, options, metadata.digest
             )
 
-        # 2. Validar tamanho
+        # 7. Processar com OMR engine, dentro do orçamento de memória
+        if result is None:
+            with self.admit(metadata):
+                if sheet_index is None:
+                    result = self.omr_engine.process_image(
+                        image_data, options, metadata.digest
+                    )
+                else:
+                    result = self.omr_engine.process_unique(
+                        image_data, options, sheet_index, filename
+                    )
+        result.quality = quality
+
+        # 8. Salvar imagens de debug se solicitado
+        if options.debug and result.debug_images:
+            # As imagens já foram salvas pelo engine, apenas fazer cleanup
+            self.debug_storage.cleanup_old_files(max_age_hours=24)
+
+        return result
+
+    def admit(self, metadata: ImageMetadata) -> ContextManager[None]:
+        """Reserva a memória da leitura (sem controle de admissão: livre)"""
+        if self.admission is None:
+            return nullcontext()
+        return self.admission.admit(metadata)
+
+    def load_image(
+        self, image_file: BinaryIO, filename: str
+    ) -> Tuple[bytes, ImageMetadata]:
+        """
+        Valida tipo, tamanho e dimensões e retorna os bytes e os metadados.
+
+        Envios no formato compacto (marcados pelo nome de arquivo) já
+        chegam reduzidos pelo cliente: o cabeçalho lido para os metadados
+        comprova o tipo e as dimensões, e a verificação completa do
+        conteúdo é dispensada. O cabeçalho é lido uma única vez.
+
+        Raises:
+            ValueError: Se a imagem for inválida
+        """
+        # 1. Validar tamanho
         if not self.image_validator.validate_file_size(image_file):
             raise ValueError(
                 "Arquivo muito grande. Tamanho máximo: 5MB."
             )
 
-        # 3. Ler bytes da imagem
+        # 2. Ler bytes da imagem
         image_file.seek(0)
         image_data = image_file.read()
 
-        # 4. Validar metadados
-        metadata = self.image_validator.get_metadata(image_data)
+        # 3. Ler metadados (um único parse do cabeçalho)
+        try:
+            metadata = self.image_validator.get_metadata(image_data)
+        except ValueError:
+            metadata = None  # A validação do tipo explica o erro
+
+        # 4. Formato compacto: o cabeçalho basta
+        if (
+            metadata is not None
+            and self.upload_format is not None
+            and self.upload_format.matches(metadata, filename)
+        ):
+            return image_data, metadata
+
+        # 5. Validar tipo de arquivo
+        if not self.image_validator.validate_file_type(image_file, filename):
+            raise ValueError(
+                "Tipo de arquivo inválido. Use JPG, PNG ou WEBP."
+            )
+
+        # 6. Validar metadados
+        if metadata is None:
+            metadata = self.image_validator.get_metadata(image_data)
         if not metadata.is_valid_dimensions():
             raise ValueError(
                 f"Dimensões insuficientes: {metadata.width}x{metadata.height}. "
                 "Mínimo recomendado: 800x600."
             )
 
-        # 5. Processar com OMR engine
-        result = self.omr_engine.process_image(image_data, options)
-
-        # 6. Salvar imagens de debug se solicitado
-        if options.debug and result.debug_images:
-            # As imagens já foram salvas pelo engine, apenas fazer cleanup
-            self.debug_storage.cleanup_old_files(max_age_hours=24)
-
-        return result
+        return image_data, metadata
 
 
 class CorrectExamUseCase:
@@ -97,17 +202,25 @@ class CorrectExamUseCase:
     - Comparar com o gabarito oficial
     - Calcular pontuação e percentual
     - Identificar questões que precisam revisão
+    - Registrar a correção no histórico, se houver
     - Retornar resultado completo da correção
     """
 
-    def __init__(self, read_answers_use_case: ReadAnswersUseCase):
+    def __init__(
+        self,
+        read_answers_use_case: ReadAnswersUseCase,
+        result_repository: Optional[IResultRepository] = None
+    ):
         self.read_answers_use_case = read_answers_use_case
+        self.result_repository = result_repository
 
     def execute(
         self,
         image_file: BinaryIO,
         filename: str,
-        answer_key: AnswerKey
+        answer_key: AnswerKey,
+        layout: Optional[SheetLayout] = None,
+        student_id_field: Optional[StudentIdField] = None
     ) -> ExamCorrection:
         """
         Executa a correção completa da prova.
@@ -116,6 +229,8 @@ class CorrectExamUseCase:
             image_file: Arquivo de imagem da prova
             filename: Nome do arquivo
             answer_key: Gabarito oficial
+            layout: Layout da folha (padrão: tabela única)
+            student_id_field: Bloco de matrícula do aluno, se houver
 
         Returns:
             ExamCorrection com resultado completo
@@ -129,7 +244,9 @@ class CorrectExamUseCase:
             num_questions=len(answer_key.questions),
             choices=["A", "B", "C", "D", "E"],  # Padrão
             template="AUTO",
-            debug=False
+            debug=False,
+            layout=layout,
+            student_id_field=student_id_field
         )
 
         # 2. Ler respostas da imagem
@@ -138,6 +255,25 @@ class CorrectExamUseCase:
         )
 
         # 3. Comparar com gabarito e calcular resultados
+        correction = self.grade(omr_result, answer_key)
+
+        # 4. Registrar no histórico
+        if self.result_repository:
+            self.result_repository.save(correction, answer_key)
+
+        return correction
+
+    def grade(self, omr_result: OMRResult, answer_key: AnswerKey) -> ExamCorrection:
+        """
+        Compara as respostas lidas com o gabarito.
+
+        Args:
+            omr_result: Resultado da leitura OMR
+            answer_key: Gabarito oficial
+
+        Returns:
+            ExamCorrection com resultado completo
+        """
         detected_answers = omr_result.get_answers_dict()
         flags = omr_result.get_flags()
 
@@ -175,12 +311,12 @@ class CorrectExamUseCase:
                         "correta": question.correct_answer
                     })
 
-        # 4. Calcular percentual e aprovação
+        # Calcular percentual e aprovação
         total_points = answer_key.total_points
         percentage = (score / total_points * 100) if total_points > 0 else 0.0
         passed = percentage >= answer_key.passing_score
 
-        # 5. Criar resultado
+        # Criar resultado
         return ExamCorrection(
             answer_key_id=answer_key.id,
             detected_answers=detected_answers,
@@ -191,7 +327,10 @@ class CorrectExamUseCase:
             score=score,
             percentage=round(percentage, 2),
             passed=passed,
-            review_needed=review_needed
+            review_needed=review_needed,
+            student_id=omr_result.student_id,
+            student_id_confidence=omr_result.student_id_confidence,
+            exam_version=omr_result.exam_version
         )
 
     def _get_review_reason(self, answer: Answer) -> str:
@@ -206,3 +345,490 @@ class CorrectExamUseCase:
             return "baixa_confianca"
         else:
             return "desconhecido"
+
+
+class CorrectExamBatchUseCase:
+    """
+    Use Case: Corrigir um lote de provas com várias versões (tipos de prova).
+
+    Responsabilidades:
+    - Ler cada folha uma única vez, incluindo a marcação do tipo de prova
+    - Pular folhas enviadas em dobro, antes das etapas caras da leitura
+    - Decidir as marcações com limiares ajustados ao lote inteiro
+    - Encaminhar cada folha ao gabarito da sua versão
+    - Registrar falhas por folha sem interromper o lote
+    - Registrar as correções no histórico em uma única transação
+    - Corrigir folhas uma a uma, em leituras simultâneas (envio em .zip)
+    """
+
+    def __init__(
+        self,
+        correct_exam_use_case: CorrectExamUseCase,
+        sheet_index: Optional[ISheetIndex] = None
+    ):
+        """
+        Args:
+            correct_exam_use_case: Leitura e correção de cada folha
+            sheet_index: Índice das folhas lidas, para achar duplicatas
+                (sem ele, todas as folhas são corrigidas)
+        """
+        self.correct_exam_use_case = correct_exam_use_case
+        self.sheet_index = sheet_index
+        self.read_answers_use_case = correct_exam_use_case.read_answers_use_case
+        self.omr_engine = self.read_answers_use_case.omr_engine
+        self.result_repository = correct_exam_use_case.result_repository
+
+    def execute(
+        self,
+        images: List[Tuple[BinaryIO, str]],
+        answer_keys: Dict[str, AnswerKey],
+        version_field: Optional[VersionField] = None,
+        layout: Optional[SheetLayout] = None,
+        student_id_field: Optional[StudentIdField] = None,
+        adaptive_thresholds: bool = True,
+        skip_duplicates: bool = True
+    ) -> BatchCorrection:
+        """
+        Executa a correção do lote.
+
+        Todas as folhas são lidas antes da correção: com adaptive_thresholds,
+        as marcações são decididas de novo com limiares ajustados às
+        densidades do lote (mesmo papel, caneta e iluminação da turma).
+        Com skip_duplicates, uma cópia de outra folha já lida (a mesma
+        folha fotografada ou escaneada de novo, com a mesma matrícula) não
+        é corrigida nem registrada: o item aponta a folha original. Folhas
+        quase idênticas sem matrícula que confirme a cópia são corrigidas
+        e também apontam a original (podem ser dois alunos).
+
+        Args:
+            images: Lista de (arquivo, nome do arquivo)
+            answer_keys: Gabaritos por tipo de prova {"A": gabarito, ...}
+            version_field: Marcação do tipo de prova na folha; obrigatória
+                quando houver mais de um gabarito
+            layout: Layout da folha (padrão: tabela única)
+            student_id_field: Bloco de matrícula do aluno, se houver
+            adaptive_thresholds: Ajustar os limiares de marcação ao lote
+            skip_duplicates: Pular folhas repetidas no lote (requer
+                sheet_index)
+
+        Returns:
+            BatchCorrection com o resultado de cada folha
+
+        Raises:
+            ValueError: Se os gabaritos forem inconsistentes com o lote
+        """
+        options = self.begin(answer_keys, version_field, layout, student_id_field)
+        single_key = next(iter(answer_keys.values())) if len(answer_keys) == 1 else None
+        sheet_index = self.sheet_index if skip_duplicates else None
+
+        batch = BatchCorrection()
+        readings = [
+            self._read_one(image_file, filename, options, sheet_index)
+            for image_file, filename in images
+        ]
+
+        if adaptive_thresholds:
+            read = [i for i, (result, *_) in enumerate(readings) if result is not None]
+            results, batch.mark_thresholds = self.omr_engine.classify_batch(
+                [readings[i][0] for i in read]
+            )
+            for i, result in zip(read, results):
+                readings[i] = (result, None, None)
+
+        for (_, filename), (omr_result, error, original) in zip(images, readings):
+            if omr_result is None:
+                batch.items.append(BatchItem(
+                    filename=filename, error=error, duplicate_of=original
+                ))
+                continue
+            batch.items.append(self._grade_one(
+                filename, omr_result, answer_keys, single_key
+            ))
+
+        if self.result_repository:
+            records = [
+                (item.correction, single_key or answer_keys[item.exam_version])
+                for item in batch.items if item.correction is not None
+            ]
+            if records:
+                self.result_repository.save_many(records)
+
+        return batch
+
+    def begin(
+        self,
+        answer_keys: Dict[str, AnswerKey],
+        version_field: Optional[VersionField] = None,
+        layout: Optional[SheetLayout] = None,
+        student_id_field: Optional[StudentIdField] = None
+    ) -> OMROptions:
+        """
+        Começa um lote: valida os gabaritos e esvazia o índice de duplicatas.
+
+        Returns:
+            Opções de leitura de todas as folhas do lote
+
+        Raises:
+            ValueError: Se os gabaritos forem inconsistentes com o lote
+        """
+        if not answer_keys:
+            raise ValueError("Informe pelo menos um gabarito")
+        if len(answer_keys) > 1 and version_field is None:
+            raise ValueError(
+                "Marcação do tipo de prova é obrigatória com mais de um gabarito"
+            )
+
+        if self.sheet_index is not None:
+            self.sheet_index.clear()
+
+        # Todas as versões são lidas com a mesma grade de questões
+        return OMROptions(
+            num_questions=max(len(key.questions) for key in answer_keys.values()),
+            choices=["A", "B", "C", "D", "E"],  # Padrão
+            template="AUTO",
+            debug=False,
+            layout=layout,
+            student_id_field=student_id_field,
+            version_field=version_field
+        )
+
+    def correct_one(
+        self,
+        image_file: BinaryIO,
+        filename: str,
+        options: OMROptions,
+        answer_keys: Dict[str, AnswerKey],
+        skip_duplicates: bool = True
+    ) -> BatchItem:
+        """
+        Lê e corrige uma folha de um lote aberto com begin.
+
+        Para lotes corrigidos em fluxo (entradas de um .zip): várias folhas
+        do mesmo lote podem ser corrigidas ao mesmo tempo, e cada correção
+        vai para o histórico assim que sai. As marcações são decididas por
+        folha (os limiares do lote pedem todas as folhas lidas antes).
+
+        Args:
+            image_file: Arquivo de imagem
+            filename: Nome da folha no lote
+            options: Opções devolvidas por begin
+            answer_keys: Gabaritos por tipo de prova (os mesmos de begin)
+            skip_duplicates: Pular a folha se ela repetir outra do lote
+
+        Returns:
+            BatchItem da folha (falhas viram o motivo, sem exceção)
+        """
+        omr_result, error, original = self._read_one(
+            image_file, filename, options,
+            self.sheet_index if skip_duplicates else None
+        )
+        if omr_result is None:
+            return BatchItem(filename=filename, error=error, duplicate_of=original)
+
+        single_key = next(iter(answer_keys.values())) if len(answer_keys) == 1 else None
+        item = self._grade_one(filename, omr_result, answer_keys, single_key)
+        if self.result_repository and item.correction is not None:
+            self.result_repository.save_many([
+                (item.correction, single_key or answer_keys[item.exam_version])
+            ])
+        return item
+
+    def _read_one(
+        self,
+        image_file: BinaryIO,
+        filename: str,
+        options: OMROptions,
+        sheet_index: Optional[ISheetIndex] = None
+    ) -> Tuple[Optional[OMRResult], Optional[str], Optional[str]]:
+        """
+        Lê uma folha; falhas viram o motivo, sem interromper o lote.
+
+        Returns:
+            (resultado, motivo da falha, folha original de uma duplicata)
+        """
+        try:
+            return self.read_answers_use_case.execute(
+                image_file, filename, options, sheet_index
+            ), None, None
+        except DuplicateSheetError as e:
+            return None, None, e.original
+        except (ValueError, RuntimeError) as e:
+            return None, str(e), None
+
+    def _grade_one(
+        self,
+        filename: str,
+        omr_result: OMRResult,
+        answer_keys: Dict[str, AnswerKey],
+        single_key: Optional[AnswerKey]
+    ) -> BatchItem:
+        """Corrige uma folha lida com o gabarito da sua versão"""
+        version = omr_result.exam_version
+        answer_key = single_key or answer_keys.get(version)
+        if answer_key is None:
+            reason = (
+                "Tipo de prova ilegível" if version is None
+                else f"Sem gabarito para o tipo de prova '{version}'"
+            )
+            return BatchItem(filename=filename, exam_version=version, error=reason)
+
+        return BatchItem(
+            filename=filename,
+            exam_version=version,
+            correction=self.correct_exam_use_case.grade(omr_result, answer_key),
+            duplicate_of=omr_result.duplicate_of
+        )
+
+
+class ManageAnswerKeysUseCase:
+    """
+    Use Case: Cadastro de gabaritos no servidor.
+
+    Responsabilidades:
+    - Criar, substituir, consultar e remover gabaritos
+    - Resolver o gabarito referenciado por id nas correções
+    """
+
+    def __init__(self, repository: IAnswerKeyRepository):
+        self.repository = repository
+
+    def create(self, answer_key: AnswerKey) -> AnswerKey:
+        """
+        Cadastra um novo gabarito.
+
+        Raises:
+            AnswerKeyExistsError: Se já houver gabarito com o mesmo id
+        """
+        if self.repository.get(answer_key.id) is not None:
+            raise AnswerKeyExistsError(answer_key.id)
+        self.repository.save(answer_key)
+        return answer_key
+
+    def update(self, key_id: str, answer_key: AnswerKey) -> AnswerKey:
+        """
+        Substitui um gabarito existente.
+
+        Raises:
+            ValueError: Se o id do corpo divergir do id informado
+            AnswerKeyNotFoundError: Se o gabarito não existir
+        """
+        if answer_key.id != key_id:
+            raise ValueError(
+                f"Id do gabarito ('{answer_key.id}') difere do informado ('{key_id}')"
+            )
+        if self.repository.get(key_id) is None:
+            raise AnswerKeyNotFoundError(key_id)
+        self.repository.save(answer_key)
+        return answer_key
+
+    def get(self, key_id: str) -> AnswerKey:
+        """
+        Busca um gabarito pelo id.
+
+        Raises:
+            AnswerKeyNotFoundError: Se o gabarito não existir
+        """
+        answer_key = self.repository.get(key_id)
+        if answer_key is None:
+            raise AnswerKeyNotFoundError(key_id)
+        return answer_key
+
+    def list_all(self) -> List[AnswerKey]:
+        """Lista os gabaritos cadastrados"""
+        return self.repository.list_all()
+
+    def delete(self, key_id: str):
+        """
+        Remove um gabarito.
+
+        Raises:
+            AnswerKeyNotFoundError: Se o gabarito não existir
+        """
+        if not self.repository.delete(key_id):
+            raise AnswerKeyNotFoundError(key_id)
+
+
+class ClassAnalyticsUseCase:
+    """
+    Use Case: Estatísticas da turma a partir do histórico de correções.
+
+    Responsabilidades:
+    - Médias e taxa de aprovação por gabarito
+    - Dificuldade de cada questão
+    - Análise de distratores (escolha de cada alternativa)
+    - Análise de itens (discriminação e ponto-bisserial)
+    """
+
+    def __init__(self, result_repository: IResultRepository):
+        self.result_repository = result_repository
+
+    def summary(self, answer_key_id: str) -> ClassSummary:
+        """Desempenho agregado da turma"""
+        return self.result_repository.class_summary(answer_key_id)
+
+    def questions(self, answer_key_id: str) -> List[QuestionStatistics]:
+        """Estatísticas por questão, ordenadas pelo número"""
+        return self.result_repository.question_statistics(answer_key_id)
+
+    def distractors(self, answer_key_id: str) -> List[DistractorAnalysis]:
+        """Análise de distratores por questão, ordenada pelo número"""
+        return self.result_repository.distractor_analysis(answer_key_id)
+
+    def items(self, answer_key_id: str) -> ItemAnalysis:
+        """Análise de itens sobre a matriz de respostas da turma"""
+        return analyze_items(self.result_repository.response_matrix(answer_key_id))
+
+
+class ReviewSessionUseCase:
+    """
+    Use Case: Revisão interativa de uma folha, ajustando o ROI à mão.
+
+    Responsabilidades:
+    - Receber a foto uma única vez e guardá-la já decodificada
+    - Devolver uma prévia reduzida e a leitura inicial
+    - A cada ajuste de ROI ou dos cantos, refazer só os estágios finais
+      (binarização do ROI, perspectiva, grade e células), dentro do mesmo
+      orçamento de memória das leituras
+    """
+
+    def __init__(
+        self,
+        read_answers_use_case: ReadAnswersUseCase,
+        sessions: MutableMapping[str, Dict[str, Any]],
+        preview_size: int = 800
+    ):
+        """
+        Args:
+            read_answers_use_case: Validação da foto e motor OMR
+            sessions: Onde guardar as imagens preparadas (ex: cache com TTL)
+            preview_size: Lado maior da prévia
+        """
+        self.read_answers_use_case = read_answers_use_case
+        self.omr_engine = read_answers_use_case.omr_engine
+        self.sessions = sessions
+        self.preview_size = preview_size
+
+    def start(
+        self,
+        image_file: BinaryIO,
+        filename: str,
+        options: OMROptions
+    ) -> ReviewSession:
+        """
+        Abre a sessão e faz a leitura inicial.
+
+        Uma falha na leitura (ex: ROI não detectado) não impede a sessão:
+        o motivo vai em ReviewSession.error, e o ROI pode ser ajustado.
+
+        Raises:
+            ValueError: Se a imagem for inválida
+            CapacityExceededError: Se não houver memória para a leitura a tempo
+            RuntimeError: Se a imagem não couber no armazenamento de sessões
+        """
+        read = self.read_answers_use_case
+        image_data, metadata = read.load_image(image_file, filename)
+        with read.admit(metadata):
+            prepared = self.omr_engine.prepare_image(image_data)
+
+            session_id = secrets.token_urlsafe(12)
+            # Os metadados ficam com a imagem: cada ajuste é admitido como
+            # uma leitura da mesma foto
+            self.sessions[session_id] = {**prepared, "metadata": metadata}
+            if session_id not in self.sessions:
+                raise RuntimeError("Imagem grande demais para uma sessão de revisão")
+
+            preview, scale = self.omr_engine.render_preview(
+                prepared, self.preview_size
+            )
+            session = ReviewSession(
+                id=session_id,
+                image_width=metadata.width,
+                image_height=metadata.height,
+                preview=preview,
+                preview_scale=scale
+            )
+            try:
+                session.result = self.omr_engine.process_prepared(prepared, options)
+            except RuntimeError as e:
+                session.error = str(e)
+        return session
+
+    def adjust(self, session_id: str, options: OMROptions) -> OMRResult:
+        """
+        Relê a foto da sessão com novas opções (em geral, ROI ou cantos).
+
+        Raises:
+            ReviewSessionNotFoundError: Se a sessão não existir ou tiver expirado
+            CapacityExceededError: Se não houver memória para a leitura a tempo
+            RuntimeError: Se houver erro no processamento
+        """
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            raise ReviewSessionNotFoundError(session_id)
+        prepared = dict(entry)
+        metadata = prepared.pop("metadata")
+        with self.read_answers_use_case.admit(metadata):
+            return self.omr_engine.process_prepared(prepared, options)
+
+    def close(self, session_id: str) -> bool:
+        """Encerra a sessão; retorna False se ela não existia"""
+        return self.sessions.pop(session_id, None) is not None
+
+
+class LiveScanUseCase:
+    """
+    Use Case: Leitura ao vivo pela câmera (uma instância por conexão).
+
+    Responsabilidades:
+    - Avaliar cada quadro de baixa resolução e devolver orientação
+      (folha presente, enquadrada, nítida e parada)
+    - Pedir a captura em resolução total só quando o quadro fica pronto
+    - Ler a captura pelo fluxo normal (validação, qualidade, admissão)
+    """
+
+    def __init__(
+        self,
+        read_answers_use_case: ReadAnswersUseCase,
+        tracker: ISheetTracker
+    ):
+        """
+        Args:
+            read_answers_use_case: Leitura da captura em resolução total
+            tracker: Acompanhamento da folha nos quadros desta conexão
+        """
+        self.read_answers_use_case = read_answers_use_case
+        self.tracker = tracker
+        self.awaiting_capture = False  # Captura pedida e ainda não recebida
+
+    def frame(self, frame_data: bytes) -> FrameAssessment:
+        """
+        Avalia um quadro; quando ele fica pronto, a próxima imagem esperada
+        é a captura em resolução total.
+
+        Raises:
+            ValueError: Se o quadro não puder ser decodificado
+        """
+        assessment = self.tracker.assess(frame_data)
+        self.awaiting_capture = assessment.ready
+        return assessment
+
+    def read(
+        self,
+        image_data: bytes,
+        filename: str,
+        options: OMROptions
+    ) -> OMRResult:
+        """
+        Lê a captura em resolução total e recomeça o acompanhamento.
+
+        Raises:
+            ImageQualityError: Se a captura for rejeitada pela verificação rápida
+            ValueError: Se a imagem for inválida
+            CapacityExceededError: Se não houver memória para a leitura a tempo
+            RuntimeError: Se houver erro no processamento
+        """
+        self.awaiting_capture = False
+        self.tracker.reset()
+        return self.read_answers_use_case.execute(
+            io.BytesIO(image_data), filename, options
+        )
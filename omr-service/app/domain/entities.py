@@ -1,14 +1,20 @@
 """
 Domain Layer - Entities
 
-Entidades de negócio puras sem dependências externas.
+Entidades de negócio puras (NumPy apenas para as colunas de respostas).
 Representam os conceitos centrais do domínio OMR.
 """
 
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from enum import Enum
 
+import numpy as np
+
+from app.domain.value_objects import ImageQuality, MarkThresholds, ROI
+
 
 class MarkQuality(Enum):
     """Qualidade da marcação detectada"""
@@ -18,8 +24,40 @@ class MarkQuality(Enum):
     MULTIPLE = "multiple"  # Múltiplas marcações
 
 
+class QuestionOutcome(Enum):
+    """Resultado de uma questão na correção"""
+    CORRECT = "correct"  # Acertou
+    WRONG = "wrong"  # Errou
+    BLANK = "blank"  # Em branco
+    VOID = "void"  # Anulada (dupla marcação)
+
+
+# Código numérico de cada qualidade (posição na tupla)
+QUALITY_CODES = tuple(MarkQuality)
+CLEAR_CODE = QUALITY_CODES.index(MarkQuality.CLEAR)
+LOW_CONFIDENCE_CODE = QUALITY_CODES.index(MarkQuality.LOW_CONFIDENCE)
+BLANK_CODE = QUALITY_CODES.index(MarkQuality.BLANK)
+MULTIPLE_CODE = QUALITY_CODES.index(MarkQuality.MULTIPLE)
+
+# Índice de alternativa para questões sem resposta
+NO_CHOICE = -1
+
+
+class AnswerChecks:
+    """Regras de validade comuns a Answer e AnswerRow"""
+    __slots__ = ()
+
+    def is_valid(self) -> bool:
+        """Verifica se a resposta é válida para correção"""
+        return self.quality in [MarkQuality.CLEAR, MarkQuality.LOW_CONFIDENCE]
+
+    def needs_review(self) -> bool:
+        """Verifica se a resposta precisa de revisão manual"""
+        return self.quality in [MarkQuality.LOW_CONFIDENCE, MarkQuality.BLANK, MarkQuality.MULTIPLE]
+
+
 @dataclass
-class Answer:
+class Answer(AnswerChecks):
     """Resposta detectada para uma questão"""
     question_number: int
     marked_choice: Optional[str]  # A, B, C, D, E ou None se em branco
@@ -27,53 +65,224 @@ class Answer:
     quality: MarkQuality
     densities: Dict[str, float]  # Densidade de tinta por alternativa {"A": 0.1, "B": 0.8, ...}
 
-    def is_valid(self) -> bool:
-        """Verifica se a resposta é válida para correção"""
-        return self.quality in [MarkQuality.CLEAR, MarkQuality.LOW_CONFIDENCE]
 
-    def needs_review(self) -> bool:
-        """Verifica se a resposta precisa de revisão manual"""
-        return self.quality in [MarkQuality.LOW_CONFIDENCE, MarkQuality.BLANK, MarkQuality.MULTIPLE]
+class AnswerRow(AnswerChecks):
+    """Visão de uma questão de AnswerTable (mesma interface de Answer)"""
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "AnswerTable", index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def question_number(self) -> int:
+        return int(self._table.question_numbers[self._index])
+
+    @property
+    def marked_choice(self) -> Optional[str]:
+        choice = int(self._table.choice_index[self._index])
+        return None if choice == NO_CHOICE else self._table.choices[choice]
+
+    @property
+    def confidence(self) -> float:
+        return float(self._table.confidence[self._index])
+
+    @property
+    def quality(self) -> MarkQuality:
+        return QUALITY_CODES[self._table.quality_codes[self._index]]
+
+    @property
+    def densities(self) -> Dict[str, float]:
+        """Densidades por alternativa (montado a cada acesso)"""
+        return {
+            choice: density
+            for choice, density in zip(
+                self._table.choices, self._table.densities[self._index].tolist()
+            )
+            if density == density  # NaN = alternativa ausente
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"AnswerRow(question_number={self.question_number}, "
+            f"marked_choice={self.marked_choice!r}, confidence={self.confidence}, "
+            f"quality={self.quality})"
+        )
+
+
+class AnswerTable(Sequence):
+    """
+    Respostas de uma folha em colunas (arrays NumPy).
+
+    Evita um objeto e um dicionário por questão: cada coluna é um único
+    array e as linhas são visões leves (AnswerRow). Os dicionários usados
+    pela API são montados uma vez e reaproveitados; não devem ser
+    modificados por quem os recebe.
+    """
+    __slots__ = (
+        "question_numbers", "choices", "choice_index", "confidence",
+        "quality_codes", "densities", "_views"
+    )
+
+    def __init__(
+        self,
+        question_numbers: np.ndarray,
+        choices: Iterable[str],
+        choice_index: np.ndarray,
+        confidence: np.ndarray,
+        quality_codes: np.ndarray,
+        densities: np.ndarray
+    ):
+        """
+        Args:
+            question_numbers: (Q,) números das questões
+            choices: Alternativas, na ordem das colunas de densities
+            choice_index: (Q,) alternativa marcada (NO_CHOICE = em branco)
+            confidence: (Q,) confiança de 0.0 a 1.0
+            quality_codes: (Q,) posição da qualidade em QUALITY_CODES
+            densities: (Q, C) densidade de tinta (NaN = alternativa ausente)
+        """
+        self.choices = tuple(choices)
+        self.question_numbers = _frozen(question_numbers, np.int32)
+        self.choice_index = _frozen(choice_index, np.int8)
+        self.confidence = _frozen(confidence, np.float64)
+        self.quality_codes = _frozen(quality_codes, np.int8)
+        self.densities = _frozen(densities, np.float64).reshape(
+            len(self.question_numbers), len(self.choices)
+        )
+        self._views = {}
+
+        size = len(self.question_numbers)
+        if not (len(self.choice_index) == len(self.confidence)
+                == len(self.quality_codes) == size):
+            raise ValueError("Colunas de respostas com tamanhos diferentes")
+
+    @classmethod
+    def from_answers(cls, answers: Iterable[Answer]) -> "AnswerTable":
+        """Converte uma lista de Answer para colunas"""
+        answers = list(answers)
+
+        # Alternativas na ordem em que aparecem (densidades e marcações)
+        choices = {}
+        for ans in answers:
+            choices.update(dict.fromkeys(ans.densities))
+            if ans.marked_choice is not None:
+                choices.setdefault(ans.marked_choice)
+        choices = tuple(choices)
+        column = {choice: i for i, choice in enumerate(choices)}
+
+        densities = np.full((len(answers), len(choices)), np.nan)
+        for row, ans in enumerate(answers):
+            for choice, density in ans.densities.items():
+                densities[row, column[choice]] = density
+
+        return cls(
+            question_numbers=np.array([a.question_number for a in answers]),
+            choices=choices,
+            choice_index=np.array([
+                NO_CHOICE if a.marked_choice is None else column[a.marked_choice]
+                for a in answers
+            ]),
+            confidence=np.array([a.confidence for a in answers]),
+            quality_codes=np.array([QUALITY_CODES.index(a.quality) for a in answers]),
+            densities=densities
+        )
+
+    def __len__(self) -> int:
+        return len(self.question_numbers)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Índice de resposta fora do intervalo")
+        return AnswerRow(self, index)
+
+    def __iter__(self):
+        return (AnswerRow(self, i) for i in range(len(self)))
+
+    def _keys(self) -> List[str]:
+        if "keys" not in self._views:
+            self._views["keys"] = [str(n) for n in self.question_numbers.tolist()]
+        return self._views["keys"]
+
+    def answers_dict(self) -> Dict[str, Optional[str]]:
+        """Dicionário {questão: resposta}, montado uma única vez"""
+        if "answers" not in self._views:
+            labels = self.choices + (None,)  # NO_CHOICE (-1) = último rótulo
+            self._views["answers"] = dict(zip(
+                self._keys(), [labels[i] for i in self.choice_index.tolist()]
+            ))
+        return self._views["answers"]
+
+    def confidence_dict(self) -> Dict[str, float]:
+        """Dicionário {questão: confiança}, montado uma única vez"""
+        if "confidence" not in self._views:
+            self._views["confidence"] = dict(zip(
+                self._keys(), self.confidence.tolist()
+            ))
+        return self._views["confidence"]
+
+    def flags(self) -> Dict[str, List[int]]:
+        """Números das questões por flag de qualidade, montado uma única vez"""
+        if "flags" not in self._views:
+            self._views["flags"] = {
+                name: self.question_numbers[self.quality_codes == code].tolist()
+                for name, code in (
+                    ("blank", BLANK_CODE),
+                    ("multiple", MULTIPLE_CODE),
+                    ("lowConfidence", LOW_CONFIDENCE_CODE),
+                )
+            }
+        return self._views["flags"]
+
+
+def _frozen(values, dtype) -> np.ndarray:
+    """Array somente leitura (1-D ou mais) do tipo indicado"""
+    array = np.array(values, dtype=dtype)
+    array.setflags(write=False)
+    return array
 
 
 @dataclass
 class OMRResult:
-    """Resultado completo da leitura OMR"""
-    answers: List[Answer]
+    """
+    Resultado completo da leitura OMR.
+
+    As respostas ficam em colunas (AnswerTable); uma lista de Answer
+    passada no construtor é convertida automaticamente.
+    """
+    answers: Union[AnswerTable, List[Answer]]
     total_questions: int
     debug_images: Optional[Dict[str, str]] = None  # {"roi": "path", "binary": "path", ...}
+    student_id: Optional[str] = None  # Matrícula lida ("?" em dígitos ilegíveis)
+    student_id_confidence: Optional[float] = None  # Confiança do dígito menos confiável
+    exam_version: Optional[str] = None  # Tipo de prova marcado (A, B, ...)
+    exam_version_confidence: Optional[float] = None
+    quality: Optional[ImageQuality] = None  # Indicadores da verificação rápida
+    roi: Optional[ROI] = None  # Região do gabarito usada na leitura
+    orientation: int = 0  # Giro da folha na foto (graus, sentido horário)
+    # Folha quase idêntica já lida no lote, sem matrícula que confirme a
+    # cópia: lida mesmo assim (podem ser dois alunos)
+    duplicate_of: Optional[str] = None
+
+    def __post_init__(self):
+        if not isinstance(self.answers, AnswerTable):
+            self.answers = AnswerTable.from_answers(self.answers)
 
     def get_answers_dict(self) -> Dict[str, Optional[str]]:
         """Retorna dicionário {questão: resposta}"""
-        return {
-            str(ans.question_number): ans.marked_choice
-            for ans in self.answers
-        }
+        return self.answers.answers_dict()
 
     def get_confidence_dict(self) -> Dict[str, float]:
         """Retorna dicionário {questão: confiança}"""
-        return {
-            str(ans.question_number): ans.confidence
-            for ans in self.answers
-        }
+        return self.answers.confidence_dict()
 
     def get_flags(self) -> Dict[str, List[int]]:
         """Retorna flags de qualidade agrupadas"""
-        flags = {
-            "blank": [],
-            "multiple": [],
-            "lowConfidence": []
-        }
-
-        for ans in self.answers:
-            if ans.quality == MarkQuality.BLANK:
-                flags["blank"].append(ans.question_number)
-            elif ans.quality == MarkQuality.MULTIPLE:
-                flags["multiple"].append(ans.question_number)
-            elif ans.quality == MarkQuality.LOW_CONFIDENCE:
-                flags["lowConfidence"].append(ans.question_number)
-
-        return flags
+        return self.answers.flags()
 
 
 @dataclass
@@ -98,17 +307,19 @@ class AnswerKey:
     questions: List[Question]
     passing_score: float  # Percentual mínimo para aprovação (0-100)
 
-    @property
+    @cached_property
     def total_points(self) -> float:
-        """Pontuação total da prova"""
+        """Pontuação total da prova, calculada uma vez por gabarito"""
         return sum(q.points for q in self.questions)
 
+    @cached_property
+    def questions_by_number(self) -> Dict[int, Question]:
+        """Índice {número: questão}, montado uma vez por gabarito"""
+        return {q.number: q for q in self.questions}
+
     def get_question(self, number: int) -> Optional[Question]:
         """Busca questão por número"""
-        for q in self.questions:
-            if q.number == number:
-                return q
-        return None
+        return self.questions_by_number.get(number)
 
 
 @dataclass
@@ -124,6 +335,9 @@ class ExamCorrection:
     percentage: float
     passed: bool
     review_needed: List[Dict[str, any]]  # [{"q": 5, "motivo": "baixa_confianca", ...}]
+    student_id: Optional[str] = None
+    student_id_confidence: Optional[float] = None
+    exam_version: Optional[str] = None
 
     def to_dict(self) -> dict:
         """Converte para dicionário para serialização"""
@@ -137,5 +351,220 @@ class ExamCorrection:
             "pontuacao": self.score,
             "percentual": self.percentage,
             "aprovado": self.passed,
-            "revisao": self.review_needed
+            "revisao": self.review_needed,
+            "alunoId": self.student_id,
+            "alunoIdConfianca": self.student_id_confidence,
+            "tipoProva": self.exam_version
+        }
+
+    def question_outcomes(
+        self, answer_key: AnswerKey
+    ) -> List[Tuple[int, Optional[str], QuestionOutcome]]:
+        """
+        Resultado de cada questão do gabarito: (questão, marcada, resultado).
+
+        Segue as mesmas regras de CorrectExamUseCase.grade: questões com
+        baixa confiança contam normalmente; dupla marcação anula a questão.
+        """
+        blank = set(self.blank_questions)
+        wrong = {error["q"] for error in self.errors}
+        void = {
+            item["q"] for item in self.review_needed
+            if item["motivo"] == "dupla_marcacao"
         }
+
+        outcomes = []
+        for question in answer_key.questions:
+            number = question.number
+            key = str(number)
+            if key not in self.detected_answers:
+                continue  # Questão fora da leitura
+            if number in blank:
+                outcome = QuestionOutcome.BLANK
+            elif number in void:
+                outcome = QuestionOutcome.VOID
+            elif number in wrong:
+                outcome = QuestionOutcome.WRONG
+            else:
+                outcome = QuestionOutcome.CORRECT
+            outcomes.append((number, self.detected_answers[key], outcome))
+        return outcomes
+
+
+@dataclass
+class BatchItem:
+    """Resultado de uma folha dentro de um lote"""
+    filename: str
+    correction: Optional[ExamCorrection] = None
+    exam_version: Optional[str] = None
+    error: Optional[str] = None  # Motivo da falha quando não houve correção
+    # Folha quase idêntica já lida no lote: sem correção quando a
+    # matrícula confirma a cópia, corrigida quando não há como confirmar
+    duplicate_of: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário para serialização"""
+        return {
+            "arquivo": self.filename,
+            "tipoProva": self.exam_version,
+            "correcao": self.correction.to_dict() if self.correction else None,
+            "erro": self.error,
+            "duplicataDe": self.duplicate_of
+        }
+
+
+@dataclass
+class BatchCorrection:
+    """Resultado da correção de um lote de folhas"""
+    items: List[BatchItem] = field(default_factory=list)
+    # Limiares ajustados às densidades do lote (None: decisões por folha)
+    mark_thresholds: Optional[MarkThresholds] = None
+
+    @property
+    def corrected_count(self) -> int:
+        """Quantidade de folhas corrigidas"""
+        return sum(1 for item in self.items if item.correction is not None)
+
+    @property
+    def duplicate_count(self) -> int:
+        """Quantidade de folhas que repetem outra do lote (puladas ou não)"""
+        return sum(1 for item in self.items if item.duplicate_of is not None)
+
+    @property
+    def failed_count(self) -> int:
+        """Quantidade de folhas sem correção que não são cópias"""
+        return sum(
+            1 for item in self.items
+            if item.correction is None and item.duplicate_of is None
+        )
+
+    def count_by_version(self) -> Dict[str, int]:
+        """Quantidade de folhas corrigidas por tipo de prova"""
+        counts: Dict[str, int] = {}
+        for item in self.items:
+            if item.correction is not None and item.exam_version:
+                counts[item.exam_version] = counts.get(item.exam_version, 0) + 1
+        return counts
+
+    def summary_dict(self) -> dict:
+        """Contagens do lote, sem os itens (resumo da correção em fluxo)"""
+        return {
+            "total": len(self.items),
+            "corrigidas": self.corrected_count,
+            "falhas": self.failed_count,
+            "duplicatas": self.duplicate_count,
+            "porTipo": self.count_by_version()
+        }
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário para serialização"""
+        return {
+            **self.summary_dict(),
+            "limiarMarcacao": (
+                round(self.mark_thresholds.threshold, 4)
+                if self.mark_thresholds else None
+            ),
+            "itens": [item.to_dict() for item in self.items]
+        }
+
+
+@dataclass
+class ClassSummary:
+    """Desempenho agregado de uma turma em um gabarito"""
+    answer_key_id: str
+    exam_count: int
+    student_count: int
+    average_score: Optional[float] = None  # None quando não há provas
+    average_percentage: Optional[float] = None
+    pass_rate: Optional[float] = None
+    min_percentage: Optional[float] = None
+    max_percentage: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário para serialização"""
+        return {
+            "provaId": self.answer_key_id,
+            "provas": self.exam_count,
+            "alunos": self.student_count,
+            "mediaPontuacao": self.average_score,
+            "mediaPercentual": self.average_percentage,
+            "taxaAprovacao": self.pass_rate,
+            "menorPercentual": self.min_percentage,
+            "maiorPercentual": self.max_percentage
+        }
+
+
+@dataclass
+class QuestionStatistics:
+    """Desempenho agregado da turma em uma questão"""
+    question_number: int
+    correct_answer: str
+    total: int
+    correct: int
+    wrong: int
+    blank: int
+    void: int
+
+    @property
+    def difficulty(self) -> float:
+        """Índice de facilidade: proporção de acertos (0 = ninguém acertou)"""
+        return round(self.correct / self.total, 4) if self.total else 0.0
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário para serialização"""
+        return {
+            "q": self.question_number,
+            "correta": self.correct_answer,
+            "total": self.total,
+            "acertos": self.correct,
+            "erros": self.wrong,
+            "emBranco": self.blank,
+            "anuladas": self.void,
+            "dificuldade": self.difficulty
+        }
+
+
+@dataclass
+class ChoiceStatistics:
+    """Escolha de uma alternativa pela turma"""
+    choice: str
+    count: int
+    rate: float  # Proporção das respostas marcadas na questão
+    average_percentage: float  # Percentual médio de quem marcou
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário para serialização"""
+        return {
+            "alternativa": self.choice,
+            "quantidade": self.count,
+            "taxa": self.rate,
+            "mediaPercentual": self.average_percentage
+        }
+
+
+@dataclass
+class DistractorAnalysis:
+    """Análise de distratores de uma questão"""
+    question_number: int
+    correct_answer: str
+    choices: List[ChoiceStatistics] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário para serialização"""
+        return {
+            "q": self.question_number,
+            "correta": self.correct_answer,
+            "alternativas": [choice.to_dict() for choice in self.choices]
+        }
+
+
+@dataclass
+class ReviewSession:
+    """Sessão de revisão: foto enviada uma vez, ROI ajustado várias vezes"""
+    id: str
+    image_width: int
+    image_height: int
+    preview: bytes  # JPEG reduzido para o ajuste na tela
+    preview_scale: float  # Pixels da prévia por pixel da imagem original
+    result: Optional[OMRResult] = None  # Leitura inicial
+    error: Optional[str] = None  # Motivo da falha da leitura inicial
@@ -0,0 +1,57 @@
+"""
+Domain Layer - Exceptions
+
+Erros de negócio que carregam contexto para as camadas externas.
+"""
+
+from app.domain.value_objects import ImageQuality
+
+
+class ImageQualityError(ValueError):
+    """Imagem rejeitada pela verificação rápida de qualidade"""
+
+    def __init__(self, quality: ImageQuality):
+        super().__init__(f"Imagem inadequada: {quality.rejection_reason}")
+        self.quality = quality
+
+
+class AnswerKeyNotFoundError(LookupError):
+    """Gabarito não cadastrado"""
+
+    def __init__(self, key_id: str):
+        super().__init__(f"Gabarito '{key_id}' não encontrado")
+        self.key_id = key_id
+
+
+class AnswerKeyExistsError(ValueError):
+    """Já existe gabarito cadastrado com o mesmo id"""
+
+    def __init__(self, key_id: str):
+        super().__init__(f"Gabarito '{key_id}' já cadastrado")
+        self.key_id = key_id
+
+
+class ReviewSessionNotFoundError(LookupError):
+    """Sessão de revisão inexistente ou expirada"""
+
+    def __init__(self, session_id: str):
+        super().__init__(f"Sessão '{session_id}' não encontrada ou expirada")
+        self.session_id = session_id
+
+
+class DuplicateSheetError(ValueError):
+    """Folha quase idêntica a outra já lida no mesmo lote"""
+
+    def __init__(self, original: str):
+        super().__init__(f"Folha duplicada de '{original}'")
+        self.original = original  # Rótulo da folha já lida
+
+
+class CapacityExceededError(RuntimeError):
+    """Servidor sem memória disponível para mais uma leitura no momento"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            "Servidor ocupado: memória insuficiente para processar a imagem agora"
+        )
+        self.retry_after = retry_after  # Segundos sugeridos para nova tentativa
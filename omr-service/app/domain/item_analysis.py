@@ -0,0 +1,212 @@
+"""
+Domain Layer - Item Analysis
+
+Análise de itens (questões) de uma turma a partir da matriz de respostas
+N × Q (alunos × questões). Todas as estatísticas são calculadas de uma
+vez para todas as questões com NumPy, sem laços por aluno ou questão.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.domain.entities import AnswerKey, ExamCorrection, QuestionOutcome
+
+
+# Códigos de marcação na matriz (demais valores: índice da alternativa)
+BLANK_MARK = -1
+VOID_MARK = -2  # Dupla marcação: nunca conta como acerto
+
+# Fração da turma em cada grupo extremo do índice de discriminação
+GROUP_FRACTION = 0.27
+
+
+@dataclass
+class ResponseMatrix:
+    """Respostas da turma em um gabarito, uma linha por prova"""
+    answer_key_id: str
+    question_numbers: np.ndarray  # (Q,) int32
+    choices: tuple  # Alternativas, na ordem dos índices de marks
+    correct_index: np.ndarray  # (Q,) int8, índice da alternativa correta
+    marks: np.ndarray  # (N, Q) int8: índice marcado, BLANK_MARK ou VOID_MARK
+
+    def __post_init__(self):
+        self.question_numbers = np.asarray(self.question_numbers, np.int32)
+        self.choices = tuple(self.choices)
+        self.correct_index = np.asarray(self.correct_index, np.int8)
+        self.marks = np.asarray(self.marks, np.int8)
+        if len(self.correct_index) != len(self.question_numbers):
+            raise ValueError("Gabarito e questões com tamanhos diferentes")
+        if self.marks.ndim != 2 or self.marks.shape[1] != len(self.question_numbers):
+            raise ValueError("Matriz de marcações deve ter uma coluna por questão")
+
+    @property
+    def students(self) -> int:
+        """Quantidade de provas (linhas)"""
+        return self.marks.shape[0]
+
+    @classmethod
+    def from_corrections(
+        cls,
+        corrections: Iterable[ExamCorrection],
+        answer_key: AnswerKey,
+        choices: Optional[Sequence[str]] = None
+    ) -> "ResponseMatrix":
+        """
+        Monta a matriz a partir das correções de um mesmo gabarito.
+
+        Args:
+            corrections: Correções (por exemplo, os itens de um lote)
+            answer_key: Gabarito usado nas correções
+            choices: Alternativas (padrão: A-E mais as que aparecerem)
+        """
+        numbers = [q.number for q in answer_key.questions]
+        column = {number: j for j, number in enumerate(numbers)}
+        corrections = [
+            c for c in corrections if c.answer_key_id == answer_key.id
+        ]
+        outcomes = [c.question_outcomes(answer_key) for c in corrections]
+
+        letters = set(q.correct_answer for q in answer_key.questions)
+        letters.update(
+            marked for rows in outcomes for _, marked, _ in rows if marked
+        )
+        choices = tuple(choices or sorted(letters | set("ABCDE")))
+        index = {choice: i for i, choice in enumerate(choices)}
+
+        marks = np.full((len(corrections), len(numbers)), BLANK_MARK, np.int8)
+        for i, rows in enumerate(outcomes):
+            for number, marked, outcome in rows:
+                if outcome == QuestionOutcome.VOID:
+                    marks[i, column[number]] = VOID_MARK
+                elif outcome != QuestionOutcome.BLANK:
+                    marks[i, column[number]] = index[marked]
+
+        return cls(
+            answer_key_id=answer_key.id,
+            question_numbers=numbers,
+            choices=choices,
+            correct_index=[index[q.correct_answer] for q in answer_key.questions],
+            marks=marks
+        )
+
+
+@dataclass
+class ItemStatistics:
+    """Estatísticas de uma questão"""
+    question_number: int
+    correct_answer: str
+    difficulty: float  # Proporção de acertos
+    discrimination: float  # Acertos do grupo superior - grupo inferior
+    point_biserial: float  # Correlação acerto × nota no restante da prova
+    choice_rates: Dict[str, float] = field(default_factory=dict)
+    blank_rate: float = 0.0
+    void_rate: float = 0.0
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário para serialização"""
+        return {
+            "q": self.question_number,
+            "correta": self.correct_answer,
+            "dificuldade": self.difficulty,
+            "discriminacao": self.discrimination,
+            "pontoBisserial": self.point_biserial,
+            "alternativas": self.choice_rates,
+            "emBranco": self.blank_rate,
+            "anuladas": self.void_rate
+        }
+
+
+@dataclass
+class ItemAnalysis:
+    """Análise de itens de uma turma"""
+    answer_key_id: str
+    students: int
+    items: List[ItemStatistics] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário para serialização"""
+        return {
+            "provaId": self.answer_key_id,
+            "alunos": self.students,
+            "itens": [item.to_dict() for item in self.items]
+        }
+
+
+def analyze_items(
+    matrix: ResponseMatrix, group_fraction: float = GROUP_FRACTION
+) -> ItemAnalysis:
+    """
+    Calcula dificuldade, discriminação, ponto-bisserial e taxas de escolha.
+
+    - Dificuldade: proporção de acertos na questão.
+    - Discriminação: dificuldade no grupo superior menos no grupo inferior
+      (os 27% de maior e de menor número de acertos).
+    - Ponto-bisserial: correlação entre acertar a questão e o número de
+      acertos nas demais questões (corrigida, sem a própria questão).
+    - Taxas de escolha: proporção da turma em cada alternativa, em branco
+      e anulada.
+
+    Questões sem variação (todos acertam ou todos erram) têm
+    ponto-bisserial 0. Turma vazia resulta em estatísticas zeradas.
+    """
+    marks = matrix.marks
+    n, q = marks.shape
+    choices = matrix.choices
+    analysis = ItemAnalysis(matrix.answer_key_id, n)
+    if q == 0:
+        return analysis
+
+    correct = marks == matrix.correct_index  # (N, Q) bool
+    if n:
+        scores = correct.astype(np.float64)
+        totals = scores.sum(axis=1)
+        difficulty = scores.mean(axis=0)
+
+        # Grupos extremos pelo total de acertos
+        group = max(1, int(round(group_fraction * n)))
+        order = np.argsort(totals, kind="stable")
+        discrimination = (
+            scores[order[-group:]].mean(axis=0) - scores[order[:group]].mean(axis=0)
+        )
+
+        # Correlação coluna a coluna com a nota sem a própria questão
+        rest = totals[:, None] - scores
+        item_dev = scores - difficulty
+        rest_dev = rest - rest.mean(axis=0)
+        denominator = np.sqrt(
+            np.einsum("ij,ij->j", item_dev, item_dev)
+            * np.einsum("ij,ij->j", rest_dev, rest_dev)
+        )
+        covariance = np.einsum("ij,ij->j", item_dev, rest_dev)
+        point_biserial = np.divide(
+            covariance, denominator,
+            out=np.zeros(q), where=denominator > 0
+        )
+
+        # Contagem de cada código por questão em um único bincount
+        width = len(choices) + 2  # VOID_MARK, BLANK_MARK, alternativas
+        codes = marks.astype(np.int64) - VOID_MARK + np.arange(q) * width
+        rates = np.bincount(codes.ravel(), minlength=q * width).reshape(q, width) / n
+    else:
+        difficulty = discrimination = point_biserial = np.zeros(q)
+        rates = np.zeros((q, len(choices) + 2))
+
+    difficulty = np.round(difficulty, 4).tolist()
+    discrimination = np.round(discrimination, 4).tolist()
+    point_biserial = np.round(point_biserial, 4).tolist()
+    rates = np.round(rates, 4).tolist()
+    for j, number in enumerate(matrix.question_numbers.tolist()):
+        void_rate, blank_rate, *choice_rates = rates[j]
+        analysis.items.append(ItemStatistics(
+            question_number=number,
+            correct_answer=choices[matrix.correct_index[j]],
+            difficulty=difficulty[j],
+            discrimination=discrimination[j],
+            point_biserial=point_biserial[j],
+            choice_rates=dict(zip(choices, choice_rates)),
+            blank_rate=blank_rate,
+            void_rate=void_rate
+        ))
+    return analysis
@@ -4,8 +4,14 @@ Domain Layer - Value Objects
 Objetos de valor imutáveis que representam conceitos do domínio.
 """
 
+import math
 from dataclasses import dataclass
-from typing import List, Optional
+from enum import Enum
+from typing import List, Optional, Tuple
+
+
+# Limite de questões por folha (folhas reais têm de 100 a 200 questões em blocos)
+MAX_QUESTIONS = 500
 
 
 @dataclass(frozen=True)
@@ -21,6 +27,204 @@ class ROI:
         return self.width > 0 and self.height > 0 and self.x >= 0 and self.y >= 0
 
 
+@dataclass(frozen=True)
+class Quadrilateral:
+    """
+    Cantos do gabarito na foto, em pixels da imagem original.
+
+    Ordem: superior esquerdo, superior direito, inferior direito,
+    inferior esquerdo. Permite corrigir a perspectiva de fotos tiradas
+    em ângulo, onde um retângulo (ROI) não acompanha a folha.
+    """
+    points: Tuple[Tuple[float, float], ...]
+
+    def is_valid(self) -> bool:
+        """Quatro cantos não negativos formando um quadrilátero convexo"""
+        if len(self.points) != 4:
+            return False
+        if any(x < 0 or y < 0 for x, y in self.points):
+            return False
+
+        # Produto vetorial das arestas consecutivas: mesmo sinal = convexo
+        crosses = []
+        for i in range(4):
+            (x0, y0), (x1, y1), (x2, y2) = (
+                self.points[i], self.points[(i + 1) % 4], self.points[(i + 2) % 4]
+            )
+            crosses.append((x1 - x0) * (y2 - y1) - (y1 - y0) * (x2 - x1))
+        return all(c > 0 for c in crosses) or all(c < 0 for c in crosses)
+
+    def bounding_roi(self) -> ROI:
+        """Menor ROI que contém os quatro cantos"""
+        xs = [x for x, _ in self.points]
+        ys = [y for _, y in self.points]
+        x, y = int(min(xs)), int(min(ys))
+        return ROI(
+            x=x, y=y,
+            width=int(math.ceil(max(xs))) - x,
+            height=int(math.ceil(max(ys))) - y
+        )
+
+
+@dataclass(frozen=True)
+class RelativeRegion:
+    """Região em coordenadas relativas (0.0 a 1.0) a uma imagem de referência"""
+    x: float
+    y: float
+    width: float
+    height: float
+
+    def is_valid(self) -> bool:
+        """Verifica se a região está contida na imagem de referência"""
+        return (
+            self.width > 0 and self.height > 0
+            and self.x >= 0 and self.y >= 0
+            and self.x + self.width <= 1.0 + 1e-6
+            and self.y + self.height <= 1.0 + 1e-6
+        )
+
+    def rotated(self, degrees: int) -> "RelativeRegion":
+        """
+        Mesma região na imagem de referência girada em múltiplos de 90
+        graus no sentido horário (ex: folha fotografada de lado).
+        """
+        turns = (degrees // 90) % 4
+        if turns == 1:
+            return RelativeRegion(1 - self.y - self.height, self.x, self.height, self.width)
+        if turns == 2:
+            return RelativeRegion(
+                1 - self.x - self.width, 1 - self.y - self.height, self.width, self.height
+            )
+        if turns == 3:
+            return RelativeRegion(self.y, 1 - self.x - self.width, self.height, self.width)
+        return self
+
+    def to_pixels(self, img_width: int, img_height: int) -> ROI:
+        """Converte para ROI em pixels da imagem de referência"""
+        x = int(self.x * img_width)
+        y = int(self.y * img_height)
+        return ROI(
+            x=x,
+            y=y,
+            width=min(int(round(self.width * img_width)), img_width - x),
+            height=min(int(round(self.height * img_height)), img_height - y)
+        )
+
+
+@dataclass(frozen=True)
+class GridBlock:
+    """Bloco de questões da folha (uma tabela de respostas)"""
+    region: RelativeRegion  # Relativa ao ROI do gabarito
+    first_question: int
+    num_questions: int
+    has_number_column: bool = True  # Estrutura: [Número] [A] [B] [C] ...
+
+    @property
+    def last_question(self) -> int:
+        """Número da última questão do bloco"""
+        return self.first_question + self.num_questions - 1
+
+
+@dataclass(frozen=True)
+class SheetLayout:
+    """Disposição física da folha: um ou mais blocos de questões"""
+    blocks: Tuple[GridBlock, ...]
+
+    def __post_init__(self):
+        """Validações após inicialização"""
+        if not self.blocks:
+            raise ValueError("layout deve ter pelo menos um bloco")
+
+        for block in self.blocks:
+            if block.num_questions < 1 or block.first_question < 1:
+                raise ValueError("bloco deve ter questões numeradas a partir de 1")
+            if not block.region.is_valid():
+                raise ValueError("região do bloco inválida")
+
+        numbers = [
+            n for block in self.blocks
+            for n in range(block.first_question, block.last_question + 1)
+        ]
+        if len(numbers) != len(set(numbers)):
+            raise ValueError("blocos do layout não podem repetir questões")
+
+    @property
+    def total_questions(self) -> int:
+        """Total de questões somando todos os blocos"""
+        return sum(block.num_questions for block in self.blocks)
+
+    @classmethod
+    def single(cls, num_questions: int) -> "SheetLayout":
+        """Layout padrão: uma tabela ocupando todo o ROI"""
+        return cls(blocks=(
+            GridBlock(RelativeRegion(0.0, 0.0, 1.0, 1.0), 1, num_questions),
+        ))
+
+    @classmethod
+    def columns(
+        cls,
+        num_questions: int,
+        num_columns: int,
+        has_number_column: bool = True
+    ) -> "SheetLayout":
+        """
+        Layout com questões distribuídas em colunas de mesma largura.
+
+        As questões são preenchidas coluna a coluna (1..N na primeira, ...).
+        """
+        if num_columns < 1:
+            raise ValueError("num_columns deve ser pelo menos 1")
+
+        per_column = -(-num_questions // num_columns)  # Divisão com teto
+        width = 1.0 / num_columns
+        blocks = []
+        first = 1
+        for col in range(num_columns):
+            count = min(per_column, num_questions - first + 1)
+            if count <= 0:
+                break
+            blocks.append(GridBlock(
+                region=RelativeRegion(col * width, 0.0, width, 1.0),
+                first_question=first,
+                num_questions=count,
+                has_number_column=has_number_column
+            ))
+            first += count
+        return cls(blocks=tuple(blocks))
+
+
+@dataclass(frozen=True)
+class StudentIdField:
+    """
+    Bloco de bolhas da matrícula do aluno.
+
+    Uma coluna por dígito, com as bolhas 0 a 9 de cima para baixo.
+    """
+    region: RelativeRegion  # Relativa à imagem inteira
+    digits: int
+
+    def __post_init__(self):
+        """Validações após inicialização"""
+        if self.digits < 1 or self.digits > 20:
+            raise ValueError("digits deve estar entre 1 e 20")
+        if not self.region.is_valid():
+            raise ValueError("região da matrícula inválida")
+
+
+@dataclass(frozen=True)
+class VersionField:
+    """Linha de bolhas do tipo de prova (versões A/B/C/D)"""
+    region: RelativeRegion  # Relativa à imagem inteira
+    versions: Tuple[str, ...] = ("A", "B", "C", "D")
+
+    def __post_init__(self):
+        """Validações após inicialização"""
+        if len(self.versions) < 2 or len(set(self.versions)) != len(self.versions):
+            raise ValueError("versions deve ter pelo menos 2 versões distintas")
+        if not self.region.is_valid():
+            raise ValueError("região do tipo de prova inválida")
+
+
 @dataclass(frozen=True)
 class OMROptions:
     """Opções de configuração para leitura OMR"""
@@ -28,12 +232,16 @@ class OMROptions:
     choices: List[str]  # ["A", "B", "C", "D", "E"]
     template: str = "AUTO"  # "AUTO" ou "MANUAL_ROI"
     roi: Optional[ROI] = None
+    corners: Optional[Quadrilateral] = None  # Alternativa ao roi no MANUAL_ROI
     debug: bool = False
+    layout: Optional[SheetLayout] = None  # None = uma única tabela
+    student_id_field: Optional[StudentIdField] = None
+    version_field: Optional[VersionField] = None
 
     def __post_init__(self):
         """Validações após inicialização"""
-        if self.num_questions < 1 or self.num_questions > 100:
-            raise ValueError("num_questions deve estar entre 1 e 100")
+        if self.num_questions < 1 or self.num_questions > MAX_QUESTIONS:
+            raise ValueError(f"num_questions deve estar entre 1 e {MAX_QUESTIONS}")
 
         if not self.choices or len(self.choices) < 2:
             raise ValueError("choices deve ter pelo menos 2 alternativas")
@@ -41,12 +249,91 @@ class OMROptions:
         if self.template not in ["AUTO", "MANUAL_ROI"]:
             raise ValueError("template deve ser 'AUTO' ou 'MANUAL_ROI'")
 
-        if self.template == "MANUAL_ROI" and self.roi is None:
-            raise ValueError("ROI é obrigatório quando template é 'MANUAL_ROI'")
+        if self.template == "MANUAL_ROI" and self.roi is None and self.corners is None:
+            raise ValueError("ROI ou cantos são obrigatórios quando template é 'MANUAL_ROI'")
 
         if self.roi and not self.roi.is_valid():
             raise ValueError("ROI inválido")
 
+        if self.corners and not self.corners.is_valid():
+            raise ValueError("Cantos inválidos: informe 4 pontos de um quadrilátero convexo")
+
+        if self.layout and self.layout.total_questions != self.num_questions:
+            raise ValueError("layout deve cobrir exatamente num_questions questões")
+
+    @property
+    def sheet_layout(self) -> SheetLayout:
+        """Layout efetivo da folha (padrão: tabela única)"""
+        return self.layout or SheetLayout.single(self.num_questions)
+
+
+@dataclass(frozen=True)
+class ImageQuality:
+    """Indicadores de qualidade da foto, medidos em uma miniatura"""
+    sharpness: float  # Variância do Laplaciano (maior = mais nítida)
+    brightness: float  # Luminância média (0.0 a 1.0)
+    contrast: float  # Faixa entre os percentis 5 e 95 (0.0 a 1.0)
+    glare: float  # Fração de pixels saturados acima do nível do papel
+    grid: float  # Fração de pixels em linhas horizontais/verticais longas
+    border: float  # Fração da borda atravessada por linhas da grade
+    rejection_reason: Optional[str] = None  # None = imagem aceitável
+
+    @property
+    def is_acceptable(self) -> bool:
+        """Verifica se a imagem pode seguir para o processamento OMR"""
+        return self.rejection_reason is None
+
+
+class FrameStatus(Enum):
+    """Situação de um quadro da câmera na leitura ao vivo"""
+    NO_SHEET = "no_sheet"  # Folha não encontrada no quadro
+    CUT_OFF = "cut_off"  # Folha tocando a borda do quadro
+    TOO_FAR = "too_far"  # Folha pequena demais no quadro
+    TILTED = "tilted"  # Câmera inclinada em relação à folha (perspectiva)
+    ROTATED = "rotated"  # Folha girada no quadro
+    MOVING = "moving"  # Câmera ou folha em movimento
+    BLURRY = "blurry"  # Quadro desfocado
+    HOLD = "hold"  # Tudo certo, aguardando alguns quadros estáveis
+    READY = "ready"  # Pronto para a captura em resolução total
+
+
+# Orientação exibida ao usuário para cada situação do quadro
+FRAME_GUIDANCE = {
+    FrameStatus.NO_SHEET: "Enquadre a folha de respostas",
+    FrameStatus.CUT_OFF: "Afaste a câmera: a folha está cortada",
+    FrameStatus.TOO_FAR: "Aproxime a câmera da folha",
+    FrameStatus.TILTED: "Segure a câmera paralela à folha",
+    FrameStatus.ROTATED: "Gire a câmera para alinhar com a folha",
+    FrameStatus.MOVING: "Segure a câmera parada",
+    FrameStatus.BLURRY: "Imagem desfocada: aguarde o foco",
+    FrameStatus.HOLD: "Segure firme...",
+    FrameStatus.READY: "Pronto: capturando",
+}
+
+
+@dataclass(frozen=True)
+class FrameAssessment:
+    """Avaliação de um quadro de baixa resolução da câmera"""
+    status: FrameStatus
+    frame_width: int
+    frame_height: int
+    corners: Optional[Quadrilateral] = None  # Cantos da folha, em pixels do quadro
+    coverage: float = 0.0  # Fração do quadro ocupada pela folha
+    sharpness: float = 0.0  # Variância do Laplaciano dentro da folha
+    motion: float = 0.0  # Deslocamento dos cantos desde o quadro anterior (fração da diagonal)
+    stable_frames: int = 0  # Quadros seguidos em condições de captura
+    tracked: bool = False  # Cantos acompanhados do quadro anterior (sem nova detecção)
+    elapsed_ms: float = 0.0  # Tempo de processamento do quadro
+
+    @property
+    def guidance(self) -> str:
+        return FRAME_GUIDANCE[self.status]
+
+    @property
+    def ready(self) -> bool:
+        """Quadro estável, nítido e alinhado: pedir a captura"""
+        return self.status == FrameStatus.READY
+
 
 @dataclass(frozen=True)
 class ImageMetadata:
@@ -55,6 +342,8 @@ class ImageMetadata:
     height: int
     format: str  # "JPEG", "PNG", "WEBP"
     size_bytes: int
+    channels: int = 3  # Bandas de cor (1 = escala de cinza)
+    digest: Optional[str] = None  # Resumo dos bytes, chave dos caches da leitura
 
     def is_valid_size(self, max_mb: int = 5) -> bool:
         """Verifica se o tamanho está dentro do limite"""
@@ -64,3 +353,50 @@ class ImageMetadata:
     def is_valid_dimensions(self, min_width: int = 800, min_height: int = 600) -> bool:
         """Verifica se as dimensões são adequadas"""
         return self.width >= min_width and self.height >= min_height
+
+
+@dataclass(frozen=True)
+class UploadFormat:
+    """
+    Formato compacto de envio, publicado para o cliente: a foto já reduzida
+    à resolução de trabalho do motor, em escala de cinza e JPEG.
+
+    O cliente marca o envio com o nome de arquivo publicado: o canvas do
+    navegador sempre codifica JPEG em três canais, então o conteúdo cinza
+    não distingue uma foto reduzida pelo cliente de uma foto qualquer.
+    """
+    max_side: int = 2000  # Lado maior (A4 em ~170dpi)
+    quality: float = 0.9  # Qualidade JPEG sugerida (0.0 a 1.0)
+    grayscale: bool = True  # O motor só usa a luminância
+    format: str = "JPEG"
+    filename: str = "omr-compacto.jpg"  # Nome que marca o envio compacto
+
+    @property
+    def media_type(self) -> str:
+        return f"image/{self.format.lower()}"
+
+    def matches(self, metadata: ImageMetadata, filename: str) -> bool:
+        """
+        A imagem chegou marcada como compacta e dentro dos limites de envio.
+
+        Sem o nome publicado, um JPEG pequeno não foi reduzido pelo
+        cliente e passa pela validação completa.
+        """
+        return (
+            filename == self.filename
+            and metadata.format == self.format
+            and max(metadata.width, metadata.height) <= self.max_side
+            and metadata.is_valid_dimensions()
+            and metadata.is_valid_size()
+        )
+
+
+@dataclass(frozen=True)
+class MarkThresholds:
+    """
+    Divisão das densidades de um lote de folhas em células em branco e
+    marcadas (mesmo papel, caneta e iluminação para a turma inteira).
+    """
+    threshold: float  # Densidade que separa os dois grupos
+    blank_level: float  # Densidade típica (mediana) das células em branco
+    mark_level: float  # Densidade típica (mediana) das células marcadas
@@ -0,0 +1,140 @@
+"""
+Infrastructure Layer - Answer Key Store
+
+Implementação concreta da interface IAnswerKeyRepository em SQLite.
+
+Os gabaritos lidos do banco são "compilados" (entidade montada com os
+índices por número e a pontuação total já calculados) e mantidos em um
+LRU em memória; salvar ou remover um gabarito invalida a sua entrada.
+Assim, nas correções, resolver um gabarito por id é uma consulta a um
+dicionário. Com vários workers, cada processo mantém o seu LRU.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional
+
+from app.application.interfaces import IAnswerKeyRepository
+from app.domain.entities import AnswerKey, Question
+
+
+DEFAULT_DB_PATH = "/tmp/omr_data/omr.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answer_keys (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    passing_score REAL NOT NULL,
+    questions TEXT NOT NULL,  -- JSON [[número, resposta, pontos], ...]
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class SqliteAnswerKeyRepository(IAnswerKeyRepository):
+    """Cadastro de gabaritos em SQLite com LRU de gabaritos compilados"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, cache_size: int = 128):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, AnswerKey]" = OrderedDict()
+        self._generation = 0  # Incrementado a cada escrita
+        self._lock = threading.Lock()
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute(SCHEMA)
+
+    def get(self, key_id: str) -> Optional[AnswerKey]:
+        """Busca no LRU e, se ausente, no banco (compilando o gabarito)"""
+        with self._lock:
+            answer_key = self._cache.get(key_id)
+            if answer_key is not None:
+                self._cache.move_to_end(key_id)
+                return answer_key
+            generation = self._generation
+
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, name, passing_score, questions "
+                "FROM answer_keys WHERE id = ?",
+                (key_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        answer_key = self._compile(row)
+        with self._lock:
+            if generation != self._generation:
+                return answer_key  # Escrita concorrente: não guardar versão antiga
+            self._cache[key_id] = answer_key
+            self._cache.move_to_end(key_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return answer_key
+
+    def list_all(self) -> List[AnswerKey]:
+        """Lista todos os gabaritos, ordenados por id"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, name, passing_score, questions "
+                "FROM answer_keys ORDER BY id"
+            ).fetchall()
+        return [self._compile(row) for row in rows]
+
+    def save(self, answer_key: AnswerKey) -> bool:
+        """Cria ou substitui o gabarito e invalida a entrada do LRU"""
+        questions = json.dumps([
+            [q.number, q.correct_answer, q.points] for q in answer_key.questions
+        ])
+        with closing(self._connect()) as conn, conn:
+            existed = conn.execute(
+                "SELECT 1 FROM answer_keys WHERE id = ?", (answer_key.id,)
+            ).fetchone() is not None
+            conn.execute(
+                "INSERT OR REPLACE INTO answer_keys "
+                "(id, name, passing_score, questions, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (answer_key.id, answer_key.name, answer_key.passing_score,
+                 questions, time.time())
+            )
+        self._invalidate(answer_key.id)
+        return not existed
+
+    def delete(self, key_id: str) -> bool:
+        """Remove o gabarito e invalida a entrada do LRU"""
+        with closing(self._connect()) as conn, conn:
+            deleted = conn.execute(
+                "DELETE FROM answer_keys WHERE id = ?", (key_id,)
+            ).rowcount
+        self._invalidate(key_id)
+        return deleted > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _invalidate(self, key_id: str):
+        with self._lock:
+            self._generation += 1
+            self._cache.pop(key_id, None)
+
+    def _compile(self, row: tuple) -> AnswerKey:
+        """Monta a entidade com os índices prontos para a correção"""
+        key_id, name, passing_score, questions = row
+        answer_key = AnswerKey(
+            id=key_id,
+            name=name,
+            questions=[
+                Question(number=number, correct_answer=correct, points=points)
+                for number, correct, points in json.loads(questions)
+            ],
+            passing_score=passing_score
+        )
+        answer_key.questions_by_number  # Pré-calcula os índices
+        answer_key.total_points
+        return answer_key
@@ -0,0 +1,209 @@
+"""
+Infrastructure Layer - Binarization
+
+Binarização escolhida por imagem.
+
+A iluminação da foto é estimada em uma versão reduzida: com iluminação
+uniforme um limiar global (Otsu) basta e é o caminho mais rápido; com
+sombras ou gradientes usa-se limiar local (Otsu por blocos interpolado ou
+média adaptativa), com o tamanho do bloco proporcional à resolução.
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.infrastructure.scratch import ScratchBuffers
+
+
+# Métodos disponíveis
+OTSU = "otsu"
+TILED_OTSU = "tiled_otsu"
+ADAPTIVE_MEAN = "adaptive_mean"
+ADAPTIVE_GAUSSIAN = "adaptive_gaussian"  # Método original (bloco fixo 11)
+AUTO = "auto"
+
+METHODS = (OTSU, TILED_OTSU, ADAPTIVE_MEAN, ADAPTIVE_GAUSSIAN, AUTO)
+
+# Resolução de referência em que o bloco 11 foi calibrado (lado maior)
+REFERENCE_SIZE = 1240
+REFERENCE_BLOCK = 11
+
+
+class Binarizer:
+    """Escolhe e aplica a binarização adequada à iluminação da imagem"""
+
+    def __init__(
+        self,
+        method: str = AUTO,
+        even_threshold: float = 0.12,
+        uneven_threshold: float = 0.35,
+        tiles: int = 6,
+        analysis_size: int = 256,
+        scratch: Optional[ScratchBuffers] = None
+    ):
+        """
+        Args:
+            method: Método fixo ou AUTO para escolher por imagem
+            even_threshold: Desnível de iluminação abaixo do qual usa Otsu global
+            uneven_threshold: Desnível acima do qual usa média adaptativa
+                (entre os dois: Otsu por blocos)
+            tiles: Blocos por lado no Otsu por blocos
+            analysis_size: Lado maior da miniatura usada na estimativa
+            scratch: Buffers para os temporários (redução, superfície de
+                limiar); a imagem binária devolvida é sempre nova
+        """
+        if method not in METHODS:
+            raise ValueError(f"Método de binarização inválido: {method}")
+
+        self.method = method
+        self.even_threshold = even_threshold
+        self.uneven_threshold = uneven_threshold
+        self.tiles = tiles
+        self.analysis_size = analysis_size
+        self.scratch = scratch or ScratchBuffers()
+
+    def choose_method(self, gray: np.ndarray) -> str:
+        """Escolhe o método para a imagem (ou retorna o método fixo)"""
+        if self.method != AUTO:
+            return self.method
+
+        unevenness = self.illumination_unevenness(gray)
+        if unevenness < self.even_threshold:
+            return OTSU
+        if unevenness < self.uneven_threshold:
+            return TILED_OTSU
+        return ADAPTIVE_MEAN
+
+    def illumination_unevenness(self, gray: np.ndarray) -> float:
+        """
+        Estima o desnível de iluminação do papel.
+
+        O fundo é obtido removendo a tinta (fechamento morfológico) de uma
+        miniatura; o desnível é a faixa entre os percentis 5 e 95 do fundo,
+        relativa à sua mediana.
+        """
+        # Amostragem por passo: a estimativa do fundo não precisa de filtragem
+        step = max(1, -(-max(gray.shape) // self.analysis_size))
+        small = np.ascontiguousarray(gray[::step, ::step])
+
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 15))
+        background = cv2.morphologyEx(small, cv2.MORPH_CLOSE, kernel)
+        p5, p50, p95 = np.percentile(background, (5, 50, 95))
+        if p50 <= 0:
+            return 1.0
+        return float(p95 - p5) / float(p50)
+
+    def binarize(
+        self,
+        gray: np.ndarray,
+        method: Optional[str] = None,
+        reference_size: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Binariza (tinta = 255) a imagem em escala de cinza já suavizada.
+
+        Args:
+            gray: Imagem (ou recorte) em escala de cinza
+            method: Método a usar (padrão: choose_method)
+            reference_size: Lado maior da imagem inteira, para escalar o
+                bloco quando gray é um recorte (padrão: o próprio recorte)
+        """
+        method = method or self.choose_method(gray)
+        block = self.block_size(reference_size or max(gray.shape))
+
+        if method == OTSU:
+            _, binary = cv2.threshold(
+                gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU
+            )
+            return binary
+
+        if method == TILED_OTSU:
+            return self._tiled_otsu(gray)
+
+        if method == ADAPTIVE_MEAN:
+            return cv2.adaptiveThreshold(
+                gray, 255,
+                cv2.ADAPTIVE_THRESH_MEAN_C,
+                cv2.THRESH_BINARY_INV,
+                block, 5
+            )
+
+        return cv2.adaptiveThreshold(
+            gray, 255,
+            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY_INV,
+            REFERENCE_BLOCK, 2
+        )
+
+    def block_size(self, long_side: int) -> int:
+        """Tamanho (ímpar) do bloco adaptativo proporcional à resolução"""
+        block = int(round(REFERENCE_BLOCK * long_side / REFERENCE_SIZE))
+        block = max(REFERENCE_BLOCK, block)
+        return block if block % 2 == 1 else block + 1
+
+    def detection_binary(
+        self,
+        gray: np.ndarray,
+        working_size: int
+    ) -> Tuple[np.ndarray, float]:
+        """
+        Binariza uma versão reduzida da imagem para detectar o ROI.
+
+        Returns:
+            (imagem binária reduzida, fator de escala aplicado)
+        """
+        h, w = gray.shape
+        scale = min(1.0, working_size / max(h, w))
+        small = gray
+        if scale < 1:
+            size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+            small = cv2.resize(
+                gray, size, dst=self.scratch.get("detection", size[::-1]),
+                interpolation=cv2.INTER_AREA
+            )
+
+        binary = cv2.adaptiveThreshold(
+            small, 255,
+            cv2.ADAPTIVE_THRESH_MEAN_C,
+            cv2.THRESH_BINARY_INV,
+            self.block_size(max(small.shape)), 5
+        )
+        return binary, scale
+
+    def _tiled_otsu(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Otsu por blocos com superfície de limiar interpolada.
+
+        Blocos sem tinta (pouco contraste) recebem um limiar abaixo do nível
+        do papel, para que ruído não vire marcação.
+        """
+        h, w = gray.shape
+        rows = cols = self.tiles
+        thresholds = np.empty((rows, cols), dtype=np.uint8)
+
+        # Estatísticas dos blocos em amostra por passo (o limiar é suave)
+        step = max(1, -(-max(h, w) // (self.analysis_size * 4)))
+        sample = gray[::step, ::step]
+        sh, sw = sample.shape
+
+        for r in range(rows):
+            for c in range(cols):
+                tile = np.ascontiguousarray(
+                    sample[r * sh // rows:(r + 1) * sh // rows,
+                           c * sw // cols:(c + 1) * sw // cols]
+                )
+                # Entrada já suavizada: mínimo/máximo capturam tinta esparsa
+                low, high, _, _ = cv2.minMaxLoc(tile)
+                if high - low < 40:
+                    thresholds[r, c] = max(0, int(tile.mean()) - 40)
+                else:
+                    t, _ = cv2.threshold(tile, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+                    thresholds[r, c] = t
+
+        surface = cv2.resize(
+            thresholds, (w, h), dst=self.scratch.get("threshold_surface", (h, w)),
+            interpolation=cv2.INTER_LINEAR
+        )
+        return cv2.compare(gray, surface, cv2.CMP_LE)
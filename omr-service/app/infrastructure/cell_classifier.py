@@ -0,0 +1,268 @@
+"""
+Infrastructure Layer - Cell Classifier
+
+Classificador aprendido de células, opcional, avaliado de uma vez sobre
+todas as células de uma folha.
+
+A densidade de tinta não distingue um "X" de uma resposta rasurada ou de
+uma sujeira. Cada célula vira um vetor pequeno de características: uma
+miniatura PATCH_SIZE x PATCH_SIZE da tinta (densidade de cada subcaixa,
+tirada da mesma imagem integral das densidades) e algumas estatísticas de
+forma. Um modelo softmax treinado offline (ver train_cell_classifier)
+classifica todas as questões x alternativas com um único produto de
+matrizes.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Sequence, Union
+
+import numpy as np
+
+from app.domain.entities import (
+    AnswerTable, NO_CHOICE,
+    CLEAR_CODE, LOW_CONFIDENCE_CODE, BLANK_CODE, MULTIPLE_CODE
+)
+from app.infrastructure.cell_map import box_densities, integral_ink
+
+
+# Classes das células, na ordem das saídas do modelo
+CELL_CLASSES = ("blank", "mark", "scribble", "smudge")
+MARK_CLASS = CELL_CLASSES.index("mark")
+
+# Lado da miniatura de cada célula (subcaixas por lado)
+PATCH_SIZE = 6
+
+# Características por célula: miniatura + estatísticas de forma
+NUM_FEATURES = PATCH_SIZE * PATCH_SIZE + 7
+
+# Menor lado de célula avaliado pelo modelo (pixels); em folhas com
+# células menores valem as decisões por densidade
+MIN_CELL_SIDE = 2 * PATCH_SIZE
+
+# Confiança mínima (probabilidade combinada da decisão) para não revisar
+LOW_CONFIDENCE = 0.5
+
+# Probabilidade mínima de "mark" para contar a célula como marcada
+MARK_PROBABILITY = 0.5
+
+
+def patch_boxes(boxes: np.ndarray) -> np.ndarray:
+    """
+    Divide cada célula em PATCH_SIZE x PATCH_SIZE subcaixas.
+
+    Args:
+        boxes: (..., 4) coordenadas (y1, y2, x1, x2) das células
+
+    Returns:
+        (..., PATCH_SIZE * PATCH_SIZE, 4) coordenadas das subcaixas
+    """
+    steps = np.linspace(0, 1, PATCH_SIZE + 1)
+    y1, y2, x1, x2 = (boxes[..., i, None].astype(np.float64) for i in range(4))
+    row_edges = np.rint(y1 + (y2 - y1) * steps).astype(np.int32)
+    col_edges = np.rint(x1 + (x2 - x1) * steps).astype(np.int32)
+
+    sub = np.empty(boxes.shape[:-1] + (PATCH_SIZE, PATCH_SIZE, 4), dtype=np.int32)
+    sub[..., 0] = row_edges[..., :-1, None]
+    sub[..., 1] = row_edges[..., 1:, None]
+    sub[..., 2] = col_edges[..., None, :-1]
+    sub[..., 3] = col_edges[..., None, 1:]
+    return sub.reshape(boxes.shape[:-1] + (PATCH_SIZE * PATCH_SIZE, 4))
+
+
+def cell_features(integral: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """
+    Características de todas as células, em uma passada vetorizada.
+
+    Args:
+        integral: Imagem integral da tinta (ver integral_ink)
+        boxes: (..., 4) coordenadas das células
+
+    Returns:
+        (N, NUM_FEATURES) uma linha por célula, na ordem de boxes
+    """
+    patch = box_densities(integral, patch_boxes(boxes)).reshape(-1, PATCH_SIZE, PATCH_SIZE)
+    density = patch.mean(axis=(1, 2))
+    diagonal = np.diagonal(patch, axis1=1, axis2=2).mean(axis=1)
+    anti_diagonal = np.diagonal(patch[:, :, ::-1], axis1=1, axis2=2).mean(axis=1)
+    half = PATCH_SIZE // 2
+    center = patch[:, half - 1:half + 1, half - 1:half + 1].mean(axis=(1, 2))
+    rows_with_ink = (patch.max(axis=2) > 0.1).mean(axis=1)
+    cols_with_ink = (patch.max(axis=1) > 0.1).mean(axis=1)
+    solid = (patch > 0.6).mean(axis=(1, 2))
+    return np.column_stack([
+        patch.reshape(len(patch), -1), density, diagonal, anti_diagonal,
+        center, rows_with_ink, cols_with_ink, solid
+    ])
+
+
+def crop_features(crops: Sequence[np.ndarray]) -> np.ndarray:
+    """Características de recortes binários de células (um por célula)"""
+    rows = []
+    for crop in crops:
+        h, w = crop.shape
+        box = np.array([[0, h, 0, w]], dtype=np.int32)
+        rows.append(cell_features(integral_ink(crop), box))
+    return np.concatenate(rows) if rows else np.empty((0, NUM_FEATURES))
+
+
+class CellClassifier:
+    """
+    Modelo softmax sobre as características das células.
+
+    Os pesos são treinados offline (train_cell_classifier) e guardados em
+    um .npz; a avaliação é um produto de matrizes sobre todas as células.
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        mean: np.ndarray,
+        scale: np.ndarray
+    ):
+        """
+        Args:
+            weights: (NUM_FEATURES, classes) pesos do modelo
+            bias: (classes,) viés
+            mean, scale: Normalização das características
+        """
+        if weights.shape != (NUM_FEATURES, len(CELL_CLASSES)):
+            raise ValueError(
+                f"Modelo incompatível: esperado {(NUM_FEATURES, len(CELL_CLASSES))}, "
+                f"recebido {weights.shape}"
+            )
+        self.weights = weights
+        self.bias = bias
+        self.mean = mean
+        self.scale = scale
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "CellClassifier":
+        """Carrega os pesos salvos com save"""
+        with np.load(path) as data:
+            return cls(data["weights"], data["bias"], data["mean"], data["scale"])
+
+    def save(self, path: Union[str, Path]):
+        np.savez(
+            path, weights=self.weights, bias=self.bias,
+            mean=self.mean, scale=self.scale
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifica os pesos (chave do cache de resultados)"""
+        return hashlib.blake2b(self.weights.tobytes(), digest_size=8).hexdigest()
+
+    def supports(self, boxes: np.ndarray) -> bool:
+        """As células são grandes o bastante para a miniatura"""
+        return bool(
+            (boxes[..., 1] - boxes[..., 0]).min() >= MIN_CELL_SIDE
+            and (boxes[..., 3] - boxes[..., 2]).min() >= MIN_CELL_SIDE
+        )
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """(N, classes) probabilidade de cada classe por célula"""
+        logits = ((features - self.mean) / self.scale) @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        return probabilities
+
+    def decide(
+        self,
+        question_numbers: np.ndarray,
+        choices: Sequence[str],
+        integral: np.ndarray,
+        boxes: np.ndarray,
+        density_matrix: np.ndarray
+    ) -> AnswerTable:
+        """
+        Decide as respostas de uma folha com o modelo.
+
+        Uma célula está marcada se a classe "mark" for provável; rasuras e
+        sujeiras não contam. A confiança combina a probabilidade da célula
+        escolhida com a de nenhuma outra estar marcada.
+
+        Args:
+            question_numbers: (Q,) números das questões
+            choices: Alternativas (colunas de boxes)
+            integral: Imagem integral da tinta da folha
+            boxes: (Q, C, 4) coordenadas das células
+            density_matrix: (Q, C) densidades, guardadas no resultado
+        """
+        num_questions, num_choices = density_matrix.shape
+        rows = np.arange(num_questions)
+        mark = self.predict_proba(
+            cell_features(integral, boxes)
+        )[:, MARK_CLASS].reshape(num_questions, num_choices)
+
+        order = np.argsort(-mark, axis=1, kind="stable")
+        best_choice = order[:, 0]
+        best = mark[rows, best_choice]
+        second = mark[rows, order[:, 1]] if num_choices > 1 else np.zeros(num_questions)
+        marked_count = (mark > MARK_PROBABILITY).sum(axis=1)
+
+        confidence = np.where(marked_count > 0, best * (1 - second), 1 - best)
+
+        # Mesma prioridade das decisões por densidade (da menor para a maior)
+        quality_codes = np.full(num_questions, CLEAR_CODE, dtype=np.int8)
+        quality_codes[confidence < LOW_CONFIDENCE] = LOW_CONFIDENCE_CODE
+        quality_codes[marked_count > 1] = MULTIPLE_CODE
+        quality_codes[marked_count == 0] = BLANK_CODE
+
+        choice_index = best_choice.astype(np.int8)
+        choice_index[marked_count == 0] = NO_CHOICE
+        return AnswerTable(
+            question_numbers=question_numbers,
+            choices=choices,
+            choice_index=choice_index,
+            confidence=np.round(confidence, 2),
+            quality_codes=quality_codes,
+            densities=density_matrix
+        )
+
+
+def train_cell_classifier(
+    features: np.ndarray,
+    labels: np.ndarray,
+    iterations: int = 500,
+    learning_rate: float = 0.5,
+    l2: float = 1e-4
+) -> CellClassifier:
+    """
+    Treina o modelo softmax (gradiente descendente em lote inteiro).
+
+    Args:
+        features: (N, NUM_FEATURES) características (cell_features ou
+            crop_features)
+        labels: (N,) índice da classe em CELL_CLASSES
+        iterations: Passos de gradiente
+        learning_rate: Tamanho do passo
+        l2: Regularização dos pesos
+
+    Returns:
+        CellClassifier treinado
+    """
+    labels = np.asarray(labels)
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0) + 1e-6
+    x = (features - mean) / scale
+    targets = np.eye(len(CELL_CLASSES))[labels]
+
+    # Classes balanceadas: células em branco são a grande maioria
+    counts = np.bincount(labels, minlength=len(CELL_CLASSES)).astype(np.float64)
+    sample_weights = (len(labels) / (len(CELL_CLASSES) * np.maximum(counts, 1)))[labels]
+    sample_weights /= sample_weights.sum()
+
+    weights = np.zeros((features.shape[1], len(CELL_CLASSES)))
+    bias = np.zeros(len(CELL_CLASSES))
+    for _ in range(iterations):
+        logits = x @ weights + bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        error = (probabilities - targets) * sample_weights[:, None]
+        weights -= learning_rate * (x.T @ error + l2 * weights)
+        bias -= learning_rate * error.sum(axis=0)
+    return CellClassifier(weights, bias, mean, scale)
@@ -0,0 +1,172 @@
+"""
+Infrastructure Layer - Cell Map
+
+Mapa pré-calculado de coordenadas das células de uma folha.
+As coordenadas de todos os blocos são calculadas uma única vez e a
+densidade de tinta de todas as células é obtida com uma imagem integral,
+mantendo o custo por folha linear no número de células.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.infrastructure.scratch import ScratchBuffers
+
+
+# Margem interna da célula (5% - reduzido para capturar mais do X)
+CELL_PADDING = 0.05
+
+# Retângulo em pixels: (x, y, largura, altura)
+Rect = Tuple[int, int, int, int]
+
+# Bloco registrado: (retângulo, primeira questão, nº de questões, tem coluna de números)
+RegisteredBlock = Tuple[Rect, int, int, bool]
+
+
+@dataclass(frozen=True)
+class CellMap:
+    """Coordenadas (y1, y2, x1, x2) de cada célula, por questão e alternativa"""
+    question_numbers: np.ndarray  # (Q,) números das questões
+    boxes: np.ndarray  # (Q, C, 4) coordenadas das células
+
+    @property
+    def num_cells(self) -> int:
+        """Total de células do mapa"""
+        return self.boxes.shape[0] * self.boxes.shape[1]
+
+    def densities(
+        self,
+        binary: np.ndarray,
+        scratch: Optional[ScratchBuffers] = None
+    ) -> np.ndarray:
+        """
+        Calcula a densidade de tinta de todas as células de uma vez.
+
+        Args:
+            binary: Imagem binária (tinta != 0)
+            scratch: Buffers para a imagem integral (padrão: alocar)
+
+        Returns:
+            Matriz (Q, C) com a fração de pixels marcados em cada célula
+        """
+        return box_densities(integral_ink(binary, scratch), self.boxes)
+
+
+def integral_ink(
+    binary: np.ndarray,
+    scratch: Optional[ScratchBuffers] = None
+) -> np.ndarray:
+    """
+    Imagem integral da contagem de pixels de tinta.
+
+    Com scratch, a máscara e a integral usam buffers reaproveitados: o
+    resultado só vale até a próxima chamada na mesma thread.
+    """
+    if scratch is None:
+        ink = (binary > 0).view(np.uint8)
+        return cv2.integral(ink, sdepth=cv2.CV_32S)
+
+    h, w = binary.shape
+    ink = scratch.get("ink", (h, w))
+    cv2.threshold(binary, 0, 1, cv2.THRESH_BINARY, dst=ink)
+    integral = scratch.get("integral", (h + 1, w + 1), np.int32)
+    return cv2.integral(ink, sum=integral, sdepth=cv2.CV_32S)
+
+
+def box_densities(integral: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """Densidade de tinta de cada caixa (y1, y2, x1, x2) via imagem integral"""
+    y1, y2, x1, x2 = (boxes[..., i] for i in range(4))
+    counts = (
+        integral[y2, x2] - integral[y1, x2]
+        - integral[y2, x1] + integral[y1, x1]
+    )
+    areas = (y2 - y1) * (x2 - x1)
+    densities = np.zeros(boxes.shape[:-1], dtype=np.float64)
+    np.divide(counts, areas, out=densities, where=areas > 0)
+    return densities
+
+
+def grid_boxes(
+    rect: Rect,
+    rows: int,
+    cols: int,
+    skip_first_col: bool = False,
+    padding: float = CELL_PADDING
+) -> np.ndarray:
+    """
+    Divide um retângulo em grade e retorna as caixas das células.
+
+    Args:
+        rect: Retângulo (x, y, largura, altura) em pixels
+        rows: Número de linhas
+        cols: Número de colunas analisadas
+        skip_first_col: Reserva a primeira coluna (números das questões)
+        padding: Margem interna relativa ao tamanho da célula
+
+    Returns:
+        Array (rows, cols, 4) com (y1, y2, x1, x2) de cada célula
+    """
+    x, y, w, h = rect
+    total_cols = cols + 1 if skip_first_col else cols
+    offset = 1 if skip_first_col else 0
+    cell_height = h / rows
+    cell_width = w / total_cols
+    padding_y = int(cell_height * padding)
+    padding_x = int(cell_width * padding)
+
+    # Limites proporcionais (sem acumular o erro de arredondamento por linha)
+    row_edges = y + np.rint(np.arange(rows + 1) * cell_height).astype(np.int32)
+    col_edges = x + np.rint(
+        np.arange(offset, cols + offset + 1) * cell_width
+    ).astype(np.int32)
+
+    boxes = np.empty((rows, cols, 4), dtype=np.int32)
+    boxes[..., 0] = row_edges[:-1, None] + padding_y
+    boxes[..., 1] = row_edges[1:, None] - padding_y
+    boxes[..., 2] = col_edges[None, :-1] + padding_x
+    boxes[..., 3] = col_edges[None, 1:] - padding_x
+
+    # Células degeneradas (padding maior que a célula) ficam com área zero
+    np.maximum(boxes[..., 1], boxes[..., 0], out=boxes[..., 1])
+    np.maximum(boxes[..., 3], boxes[..., 2], out=boxes[..., 3])
+    return boxes
+
+
+@lru_cache(maxsize=64)
+def build_cell_map(
+    blocks: Tuple[RegisteredBlock, ...],
+    num_choices: int
+) -> CellMap:
+    """
+    Monta o mapa de células de uma folha com um ou mais blocos.
+
+    Args:
+        blocks: Blocos já registrados em pixels do ROI
+        num_choices: Número de alternativas
+
+    Returns:
+        CellMap com as questões ordenadas pelo número
+    """
+    all_boxes = []
+    all_numbers = []
+    for rect, first_question, num_questions, has_number_column in blocks:
+        all_boxes.append(grid_boxes(
+            rect, num_questions, num_choices, skip_first_col=has_number_column
+        ))
+        all_numbers.append(
+            np.arange(first_question, first_question + num_questions)
+        )
+
+    numbers = np.concatenate(all_numbers)
+    boxes = np.concatenate(all_boxes)
+    order = np.argsort(numbers, kind="stable")
+
+    question_numbers = numbers[order]
+    boxes = np.ascontiguousarray(boxes[order])
+    question_numbers.setflags(write=False)
+    boxes.setflags(write=False)
+    return CellMap(question_numbers=question_numbers, boxes=boxes)
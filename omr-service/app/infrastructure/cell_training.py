@@ -0,0 +1,91 @@
+"""
+Infrastructure Layer - Cell Training Set
+
+Conjunto de treino sintético do classificador de células.
+
+Folhas com marcações, rasuras e sujeiras sorteadas passam pelo pipeline
+do motor, e as características de cada célula saem da imagem sem grade,
+exatamente como na leitura. Recortes rotulados de folhas reais podem ser
+somados com crop_features.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.domain.value_objects import OMROptions
+from app.infrastructure.cell_classifier import CELL_CLASSES, cell_features
+from app.infrastructure.cell_map import build_cell_map, integral_ink
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.synthetic_sheet import encode_image, render_answer_sheet
+
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+# Probabilidades por questão: resposta em "X" ou preenchida, rasura e
+# sujeira em outra alternativa
+ANSWER_RATES = {"x": 0.7, "fill": 0.15}
+SCRIBBLE_RATE = 0.2
+SMUDGE_RATE = 0.25
+
+# Tamanhos de folha e de tabela sorteados (escala das células)
+SHEET_SIZES = ((1240, 1754), (1000, 1414))
+QUESTION_COUNTS = (20, 30, 40)
+
+
+def synthetic_cell_set(
+    num_sheets: int = 24,
+    seed: int = 0,
+    engine: Optional[OpenCVOMREngine] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gera células rotuladas a partir de folhas sintéticas.
+
+    Args:
+        num_sheets: Folhas renderizadas
+        seed: Semente do sorteio
+        engine: Motor usado na leitura (padrão: novo, sem orientação)
+
+    Returns:
+        (características (N, NUM_FEATURES), classes (N,) em CELL_CLASSES)
+    """
+    engine = engine or OpenCVOMREngine(auto_orient=False)
+    rng = np.random.default_rng(seed)
+    all_features, all_labels = [], []
+
+    for sheet in range(num_sheets):
+        num_questions = QUESTION_COUNTS[sheet % len(QUESTION_COUNTS)]
+        size = SHEET_SIZES[sheet % len(SHEET_SIZES)]
+        answers = [None] * num_questions
+        cell_marks = {}
+        labels = np.zeros((num_questions, len(CHOICES)), dtype=np.int64)
+
+        for question in range(num_questions):
+            free = list(rng.permutation(len(CHOICES)))
+            roll = rng.random()
+            if roll < ANSWER_RATES["x"] + ANSWER_RATES["fill"]:
+                choice = free.pop()
+                labels[question, choice] = CELL_CLASSES.index("mark")
+                if roll < ANSWER_RATES["x"]:
+                    answers[question] = CHOICES[choice]
+                else:
+                    cell_marks[(question + 1, CHOICES[choice])] = "fill"
+            for kind, rate in (("scribble", SCRIBBLE_RATE), ("smudge", SMUDGE_RATE)):
+                if rng.random() < rate:
+                    choice = free.pop()
+                    labels[question, choice] = CELL_CLASSES.index(kind)
+                    cell_marks[(question + 1, CHOICES[choice])] = kind
+
+        page = render_answer_sheet(answers, CHOICES, size=size, cell_marks=cell_marks)
+        noise = rng.normal(0, 4, page.shape)
+        page = np.clip(page + noise, 0, 255).astype(np.uint8)
+
+        ctx = engine.run_pipeline(
+            encode_image(page),
+            OMROptions(num_questions=num_questions, choices=CHOICES)
+        )
+        cell_map = build_cell_map(ctx.blocks, len(CHOICES))
+        all_features.append(cell_features(integral_ink(ctx.no_grid), cell_map.boxes))
+        all_labels.append(labels.reshape(-1))
+
+    return np.concatenate(all_features), np.concatenate(all_labels)
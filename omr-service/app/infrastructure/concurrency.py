@@ -0,0 +1,182 @@
+"""
+Infrastructure Layer - Concurrency
+
+Topologia de threads do serviço: workers do uvicorn, leituras simultâneas
+por worker e threads internas do OpenCV.
+
+Sem coordenação, cada worker usa o pool padrão do OpenCV (uma thread por
+núcleo) e o BLAS do NumPy faz o mesmo; com vários workers em uma máquina
+de 4 núcleos isso cria dezenas de threads disputando a CPU. Aqui os
+núcleos disponíveis (afinidade e quota do cgroup do container) são
+divididos entre workers, leituras e threads do OpenCV, de modo que
+workers × leituras × threads do OpenCV ≈ núcleos.
+
+Variáveis de ambiente (todas opcionais; sem elas, detecção automática):
+- WEB_CONCURRENCY: workers do uvicorn (a mesma variável que o uvicorn lê)
+- OMR_READ_THREADS: leituras simultâneas por worker
+- OMR_CV_THREADS: threads do OpenCV por worker
+- OMR_CPU_AFFINITY: núcleos do processo (ex: "0-3" ou "0,2")
+"""
+
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
+
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+# Bibliotecas nativas que criam o próprio pool de threads (BLAS do NumPy)
+NATIVE_THREAD_VARS = (
+    "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"
+)
+
+
+def cgroup_cpu_quota(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """
+    Núcleos permitidos pela quota de CPU do cgroup (None: sem quota).
+
+    Lê cpu.max (cgroup v2) ou cpu.cfs_quota_us/cpu.cfs_period_us (v1).
+    """
+    try:
+        quota, period = (root / "cpu.max").read_text().split()
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+
+    try:
+        quota = int((root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((root / "cpu" / "cpu.cfs_period_us").read_text())
+    except (OSError, ValueError):
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return quota / period
+
+
+def available_cpus(root: Path = CGROUP_ROOT) -> int:
+    """Núcleos utilizáveis: afinidade do processo limitada pela quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Plataformas sem afinidade (macOS, Windows)
+        cpus = os.cpu_count() or 1
+
+    quota = cgroup_cpu_quota(root)
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(1, cpus)
+
+
+def parse_cpu_list(value: str) -> Tuple[int, ...]:
+    """
+    Converte uma lista de núcleos ("0-3,6") em tupla ordenada.
+
+    Raises:
+        ValueError: Se a lista for inválida
+    """
+    cpus = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = (int(n) for n in part.split("-", 1))
+            if first > last:
+                raise ValueError(f"Intervalo de núcleos inválido: {part}")
+            cpus.update(range(first, last + 1))
+        else:
+            cpus.add(int(part))
+    if not cpus or min(cpus) < 0:
+        raise ValueError(f"Lista de núcleos inválida: {value!r}")
+    return tuple(sorted(cpus))
+
+
+@dataclass(frozen=True)
+class ConcurrencyConfig:
+    """Divisão dos núcleos entre workers, leituras e threads do OpenCV"""
+    cpus: int  # Núcleos disponíveis para o container
+    workers: int  # Processos do uvicorn
+    read_threads: int  # Leituras simultâneas por worker
+    cv_threads: int  # Threads internas do OpenCV por worker
+    cpu_affinity: Optional[Tuple[int, ...]] = None
+
+    @classmethod
+    def from_env(
+        cls,
+        env: Mapping[str, str] = os.environ,
+        cpus: Optional[int] = None
+    ) -> "ConcurrencyConfig":
+        """
+        Lê a configuração do ambiente, completando o que faltar.
+
+        Padrão: os núcleos de cada worker vão para leituras simultâneas
+        com uma thread do OpenCV cada (vazão máxima, sem disputa); com
+        OMR_READ_THREADS menor, as threads do OpenCV ocupam o restante.
+
+        Raises:
+            ValueError: Se algum valor for inválido
+        """
+        affinity = None
+        if env.get("OMR_CPU_AFFINITY"):
+            affinity = parse_cpu_list(env["OMR_CPU_AFFINITY"])
+        if cpus is None:
+            cpus = len(affinity) if affinity else available_cpus()
+
+        workers = _positive(env, "WEB_CONCURRENCY", 1)
+        share = max(1, cpus // workers)
+        read_threads = _positive(env, "OMR_READ_THREADS", share)
+        cv_threads = _positive(
+            env, "OMR_CV_THREADS", max(1, share // read_threads)
+        )
+        return cls(cpus, workers, read_threads, cv_threads, affinity)
+
+    @property
+    def total_threads(self) -> int:
+        """Threads de CPU no pior caso (todas as leituras ativas)"""
+        return self.workers * self.read_threads * self.cv_threads
+
+    @property
+    def oversubscribed(self) -> bool:
+        return self.total_threads > self.cpus
+
+    def limit_native_threads(self, environ=os.environ):
+        """
+        Limita o BLAS do NumPy às threads do OpenCV por worker.
+
+        Só tem efeito antes de o NumPy ser importado; valores já definidos
+        no ambiente são mantidos.
+        """
+        for name in NATIVE_THREAD_VARS:
+            environ.setdefault(name, str(self.cv_threads))
+
+    def apply(self):
+        """Aplica ao processo atual: threads do OpenCV e afinidade"""
+        import cv2
+
+        cv2.setNumThreads(self.cv_threads)
+        if self.cpu_affinity and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, self.cpu_affinity)
+
+    def to_dict(self) -> Dict[str, object]:
+        """Resumo para a API (chaves em camelCase)"""
+        return {
+            "cpus": self.cpus,
+            "workers": self.workers,
+            "readThreads": self.read_threads,
+            "cvThreads": self.cv_threads,
+            "cpuAffinity": list(self.cpu_affinity) if self.cpu_affinity else None,
+            "oversubscribed": self.oversubscribed,
+        }
+
+
+def _positive(env: Mapping[str, str], name: str, default: int) -> int:
+    value = env.get(name)
+    if value in (None, ""):
+        return default
+    number = int(value)
+    if number < 1:
+        raise ValueError(f"{name} deve ser um inteiro positivo")
+    return number
@@ -9,6 +9,7 @@ from typing import BinaryIO
 from PIL import Image
 from app.application.interfaces import IImageValidator
 from app.domain.value_objects import ImageMetadata
+from app.infrastructure.pipeline import image_digest
 
 
 class ImageValidator(IImageValidator):
@@ -75,7 +76,7 @@ class ImageValidator(IImageValidator):
             image_data: Bytes da imagem
 
         Returns:
-            ImageMetadata com informações da imagem
+            ImageMetadata com informações da imagem e o resumo dos bytes
 
         Raises:
             ValueError: Se a imagem for inválida
@@ -86,7 +87,9 @@ class ImageValidator(IImageValidator):
                 width=img.width,
                 height=img.height,
                 format=img.format or "UNKNOWN",
-                size_bytes=len(image_data)
+                size_bytes=len(image_data),
+                channels=len(img.getbands()),
+                digest=image_digest(image_data)
             )
         except Exception as e:
             raise ValueError(f"Erro ao ler metadados da imagem: {str(e)}")
@@ -0,0 +1,364 @@
+"""
+Infrastructure Layer - Live Scanner
+
+Acompanhamento da folha nos quadros da câmera (leitura ao vivo).
+
+Cada quadro chega em baixa resolução (~480px) e precisa de resposta em
+bem menos de 50 ms na CPU. Detectar a folha do zero a cada quadro, como
+_detect_roi faz na foto inteira, é caro e oscila de um quadro para o
+outro; aqui a detecção por contornos só roda quando não há folha
+acompanhada. Nos quadros seguintes os quatro cantos são seguidos por
+fluxo óptico (Lucas-Kanade piramidal, conferido de volta), e a cada
+poucos quadros uma nova detecção, restrita à vizinhança da folha,
+corrige a deriva.
+
+Por quadro são medidos:
+- cobertura: fração do quadro ocupada pela folha
+- alinhamento: razão entre lados opostos (inclinação) e giro das bordas
+- nitidez: variância do Laplaciano dentro da folha
+- movimento: deslocamento médio dos cantos desde o quadro anterior
+
+A captura em resolução total é pedida quando o quadro fica estável,
+nítido e alinhado por alguns quadros seguidos.
+"""
+
+import io
+import math
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from app.application.interfaces import ISheetTracker
+from app.domain.value_objects import FrameAssessment, FrameStatus, Quadrilateral
+
+
+# Lado maior do quadro analisado (os limites abaixo são calibrados nele)
+FRAME_SIZE = 480
+
+# Limites de um quadro recebido, conferidos antes de decodificá-lo: bytes
+# de um quadro FRAME_SIZE² colorido sem compressão, e pixels de fato
+# decodificados (JPEG já sai reduzido por até 4; PNG e demais, inteiros)
+MAX_FRAME_BYTES = 3 * FRAME_SIZE * FRAME_SIZE
+MAX_FRAME_PIXELS = (2 * FRAME_SIZE) ** 2
+
+# Menor área de contorno considerada folha (fração do quadro)
+MIN_SHEET_AREA = 0.05
+
+# Margem, em fração do lado do quadro, abaixo da qual a folha está cortada
+BORDER_MARGIN = 0.01
+
+# Fluxo óptico: janela, níveis da pirâmide e erro máximo ida e volta (px)
+LK_PARAMS = dict(
+    winSize=(21, 21),
+    maxLevel=3,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03)
+)
+MAX_ROUND_TRIP_ERROR = 1.0
+
+
+class SheetTracker(ISheetTracker):
+    """Detecta a folha uma vez e acompanha os cantos nos quadros seguintes"""
+
+    def __init__(
+        self,
+        min_coverage: float = 0.25,
+        min_side_ratio: float = 0.85,
+        max_rotation: float = 10.0,
+        min_sharpness: float = 60.0,
+        max_motion: float = 0.005,
+        required_stable_frames: int = 4,
+        redetect_every: int = 10
+    ):
+        """
+        Args:
+            min_coverage: Fração mínima do quadro ocupada pela folha
+            min_side_ratio: Razão mínima entre lados opostos (1.0 = sem inclinação)
+            max_rotation: Giro máximo das bordas, em graus
+            min_sharpness: Variância mínima do Laplaciano dentro da folha
+            max_motion: Deslocamento máximo dos cantos por quadro (fração da diagonal)
+            required_stable_frames: Quadros seguidos em condições antes da captura
+            redetect_every: Quadros acompanhados entre detecções de correção
+        """
+        self.min_coverage = min_coverage
+        self.min_side_ratio = min_side_ratio
+        self.max_rotation = max_rotation
+        self.min_sharpness = min_sharpness
+        self.max_motion = max_motion
+        self.required_stable_frames = required_stable_frames
+        self.redetect_every = redetect_every
+        self.reset()
+
+    def reset(self):
+        self._previous: Optional[np.ndarray] = None  # Quadro anterior (cinza)
+        self._corners: Optional[np.ndarray] = None  # Cantos no quadro anterior (4, 1, 2)
+        self._tracked_frames = 0  # Quadros acompanhados desde a última detecção
+        self._stable_frames = 0
+
+    def assess(self, frame_data: bytes) -> FrameAssessment:
+        began = time.perf_counter()
+        gray, scale = self._decode(frame_data)
+        height, width = gray.shape
+
+        corners, motion, tracked = None, None, False
+        if self._can_track(gray):
+            corners = self._track(gray)
+        if corners is not None:
+            tracked = True
+            motion = self._motion(corners, gray.shape)
+            if self._tracked_frames >= self.redetect_every:
+                refined = self._detect(gray, around=corners)
+                if refined is not None:
+                    corners, tracked = refined, False
+        else:
+            corners = self._detect(gray)
+            if corners is not None and self._corners is not None:
+                motion = self._motion(corners, gray.shape)
+
+        self._previous = gray
+        self._corners = corners
+        self._tracked_frames = self._tracked_frames + 1 if tracked else 0
+
+        status, coverage, sharpness = self._classify(gray, corners, motion)
+        if status in (FrameStatus.HOLD, FrameStatus.READY):
+            self._stable_frames += 1
+            if self._stable_frames >= self.required_stable_frames:
+                status = FrameStatus.READY
+            else:
+                status = FrameStatus.HOLD
+        else:
+            self._stable_frames = 0
+
+        quad = None
+        if corners is not None:
+            quad = Quadrilateral(points=tuple(
+                (round(float(x) / scale, 1), round(float(y) / scale, 1))
+                for x, y in corners.reshape(4, 2)
+            ))
+        return FrameAssessment(
+            status=status,
+            frame_width=round(width / scale),
+            frame_height=round(height / scale),
+            corners=quad,
+            coverage=round(coverage, 3),
+            sharpness=round(sharpness, 1),
+            motion=round(motion or 0.0, 4),
+            stable_frames=self._stable_frames,
+            tracked=tracked,
+            elapsed_ms=round(1000 * (time.perf_counter() - began), 2)
+        )
+
+    def _decode(self, frame_data: bytes) -> Tuple[np.ndarray, float]:
+        """
+        Quadro em cinza com o lado maior até FRAME_SIZE, e a escala aplicada.
+
+        Quadros maiores que o esperado são decodificados já reduzidos
+        (JPEG usa escala na DCT) e ajustados com interpolação linear.
+
+        Raises:
+            ValueError: Se o quadro não for uma imagem ou passar de
+                MAX_FRAME_BYTES ou MAX_FRAME_PIXELS (conferidos antes de
+                decodificar, pelo cabeçalho)
+        """
+        if len(frame_data) > MAX_FRAME_BYTES:
+            raise ValueError(
+                f"Quadro muito grande: {len(frame_data)} bytes "
+                f"(máximo {MAX_FRAME_BYTES}); envie ~{FRAME_SIZE}px"
+            )
+        try:
+            header = Image.open(io.BytesIO(frame_data))
+            width, height = header.size
+        except Exception:
+            raise ValueError("Erro ao decodificar quadro")
+
+        flag, factor = cv2.IMREAD_GRAYSCALE, 1
+        for candidate, reduced in (
+            (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+            (2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+        ):
+            if max(width, height) // candidate >= FRAME_SIZE:
+                flag, factor = reduced, candidate
+                break
+        # Só o JPEG decodifica reduzido; os demais formatos, inteiros
+        decoded = factor if header.format == "JPEG" else 1
+        if width * height // (decoded * decoded) > MAX_FRAME_PIXELS:
+            raise ValueError(
+                f"Quadro muito grande: {width}x{height} pixels; envie ~{FRAME_SIZE}px"
+            )
+
+        gray = cv2.imdecode(np.frombuffer(frame_data, np.uint8), flag)
+        if gray is None:
+            raise ValueError("Erro ao decodificar quadro")
+
+        scale = min(1.0, FRAME_SIZE / max(gray.shape))
+        if scale < 1:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+        return gray, scale / factor
+
+    def _can_track(self, gray: np.ndarray) -> bool:
+        return (
+            self._corners is not None
+            and self._previous is not None
+            and self._previous.shape == gray.shape
+        )
+
+    def _track(self, gray: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Segue os cantos do quadro anterior por fluxo óptico.
+
+        O fluxo é conferido de volta (quadro atual → anterior): cantos que
+        não retornam ao ponto de partida, ou um quadrilátero que deixa de
+        ser plausível, encerram o acompanhamento.
+        """
+        corners, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._previous, gray, self._corners, None, **LK_PARAMS
+        )
+        if corners is None or not status.all():
+            return None
+        back, status, _ = cv2.calcOpticalFlowPyrLK(
+            gray, self._previous, corners, None, **LK_PARAMS
+        )
+        if back is None or not status.all():
+            return None
+        if np.abs(back - self._corners).max() > MAX_ROUND_TRIP_ERROR:
+            return None
+
+        height, width = gray.shape
+        points = corners.reshape(4, 2)
+        if (points[:, 0] >= width).any() or (points[:, 1] >= height).any():
+            return None
+        if not Quadrilateral(points=tuple(map(tuple, points.tolist()))).is_valid():
+            return None
+
+        # Mudança brusca de área: o fluxo escorregou para outra estrutura
+        growth = cv2.contourArea(corners) / max(cv2.contourArea(self._corners), 1.0)
+        if not 0.8 <= growth <= 1.25:
+            return None
+        return corners
+
+    def _detect(
+        self,
+        gray: np.ndarray,
+        around: Optional[np.ndarray] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Procura a folha: maior contorno com quatro vértices convexos.
+
+        Args:
+            around: Cantos atuais; a busca fica restrita à vizinhança deles
+
+        Returns:
+            Cantos (4, 1, 2) em float32, na ordem de Quadrilateral, ou None
+        """
+        height, width = gray.shape
+        x0 = y0 = 0
+        region = gray
+        if around is not None:
+            x, y, w, h = cv2.boundingRect(around)
+            pad = max(w, h) // 8
+            x0, y0 = max(0, x - pad), max(0, y - pad)
+            region = gray[y0:min(height, y + h + pad), x0:min(width, x + w + pad)]
+
+        binary = cv2.adaptiveThreshold(
+            region, 255,
+            cv2.ADAPTIVE_THRESH_MEAN_C,
+            cv2.THRESH_BINARY_INV,
+            15, 10
+        )
+        # Fecha falhas nas linhas finas (bordas a ~480px têm 1 a 2 pixels)
+        binary = cv2.dilate(binary, np.ones((3, 3), np.uint8))
+        # Dois níveis: contornos externos e buracos. A borda da folha sobre a
+        # mesa é um buraco (o papel claro cercado pela faixa escura), que
+        # não se mistura aos objetos da mesa que encostam na folha
+        contours, hierarchy = cv2.findContours(
+            binary, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE
+        )
+        if not contours:
+            return None
+
+        min_area = MIN_SHEET_AREA * width * height
+        candidates = []
+        for contour, (_, _, _, parent) in zip(contours, hierarchy[0]):
+            area = cv2.contourArea(contour)
+            if area >= min_area:
+                candidates.append((parent >= 0, area, contour))
+
+        # Buracos primeiro (folha inteira visível), depois a tabela do gabarito
+        candidates.sort(key=lambda c: c[:2], reverse=True)
+        for _, _, contour in candidates[:8]:
+            approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+            if len(approx) == 4 and cv2.isContourConvex(approx):
+                points = approx.reshape(4, 2).astype(np.float32) + (x0, y0)
+                return _order_corners(points).reshape(4, 1, 2)
+        return None
+
+    def _motion(self, corners: np.ndarray, shape: Tuple[int, int]) -> float:
+        """Deslocamento médio dos cantos desde o quadro anterior"""
+        diagonal = math.hypot(*shape)
+        shift = np.linalg.norm((corners - self._corners).reshape(4, 2), axis=1)
+        return float(shift.mean()) / diagonal
+
+    def _classify(
+        self,
+        gray: np.ndarray,
+        corners: Optional[np.ndarray],
+        motion: Optional[float]
+    ) -> Tuple[FrameStatus, float, float]:
+        """
+        Primeiro problema encontrado no quadro (ou HOLD, se nenhum).
+
+        Returns:
+            (situação, cobertura, nitidez)
+        """
+        if corners is None:
+            return FrameStatus.NO_SHEET, 0.0, 0.0
+
+        height, width = gray.shape
+        points = corners.reshape(4, 2)
+        coverage = cv2.contourArea(corners) / (width * height)
+        x, y, w, h = cv2.boundingRect(corners)
+        sharpness = float(cv2.Laplacian(gray[y:y + h, x:x + w], cv2.CV_64F).var())
+
+        margin_x, margin_y = BORDER_MARGIN * width, BORDER_MARGIN * height
+        if (
+            (points[:, 0] <= margin_x).any() or (points[:, 0] >= width - 1 - margin_x).any()
+            or (points[:, 1] <= margin_y).any() or (points[:, 1] >= height - 1 - margin_y).any()
+        ):
+            return FrameStatus.CUT_OFF, coverage, sharpness
+        if coverage < self.min_coverage:
+            return FrameStatus.TOO_FAR, coverage, sharpness
+
+        # Lados na ordem: superior, direito, inferior, esquerdo
+        edges = np.roll(points, -1, axis=0) - points
+        lengths = np.linalg.norm(edges, axis=1)
+        side_ratio = min(
+            min(lengths[0], lengths[2]) / max(lengths[0], lengths[2]),
+            min(lengths[1], lengths[3]) / max(lengths[1], lengths[3])
+        )
+        if side_ratio < self.min_side_ratio:
+            return FrameStatus.TILTED, coverage, sharpness
+
+        # Giro: bordas superior e inferior contra a horizontal
+        angles = np.degrees(np.arctan2(edges[[0, 2], 1], np.abs(edges[[0, 2], 0])))
+        if np.abs(angles).mean() > self.max_rotation:
+            return FrameStatus.ROTATED, coverage, sharpness
+        if motion is None or motion > self.max_motion:
+            return FrameStatus.MOVING, coverage, sharpness
+        if sharpness < self.min_sharpness:
+            return FrameStatus.BLURRY, coverage, sharpness
+
+        return FrameStatus.HOLD, coverage, sharpness
+
+
+def _order_corners(points: np.ndarray) -> np.ndarray:
+    """Ordena como Quadrilateral: sup. esquerdo, sup. direito, inf. direito, inf. esquerdo"""
+    total = points.sum(axis=1)
+    diff = points[:, 1] - points[:, 0]
+    return np.array([
+        points[np.argmin(total)],
+        points[np.argmin(diff)],
+        points[np.argmax(total)],
+        points[np.argmax(diff)],
+    ], dtype=np.float32)
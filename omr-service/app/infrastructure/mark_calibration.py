@@ -0,0 +1,202 @@
+"""
+Infrastructure Layer - Mark Calibration
+
+Classificação das células de um lote inteiro com limiares ajustados às
+densidades da turma.
+
+As folhas de uma turma compartilham papel, caneta e iluminação: as
+densidades de todas as células do lote formam dois grupos (em branco e
+marcadas). A divisão é ajustada uma vez sobre as densidades reunidas
+(Otsu sobre o histograma) e todas as células são classificadas em uma
+única passada sobre o array do lote, no lugar das regras relativas de
+cada folha (ver OpenCVOMREngine._decide_answers).
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.domain.entities import (
+    AnswerTable, NO_CHOICE,
+    CLEAR_CODE, LOW_CONFIDENCE_CODE, BLANK_CODE, MULTIPLE_CODE
+)
+from app.domain.value_objects import MarkThresholds
+
+
+# Intervalos do histograma usado na divisão em dois grupos
+HISTOGRAM_BINS = 256
+
+# Células mínimas em cada grupo para confiar na divisão
+MIN_CLUSTER_CELLS = 20
+
+# Separação mínima dos grupos: distância entre os níveis sobre a soma dos
+# desvios (abaixo disso valem as decisões de cada folha)
+MIN_SEPARATION = 2.0
+
+# Desvio mínimo de cada grupo, como fração da distância entre os níveis
+# (folhas sintéticas ou muito limpas têm células em branco sem ruído)
+MIN_SPREAD = 0.05
+
+# Confiança mínima (como nas decisões por folha); abaixo dela a questão
+# vai para revisão
+LOW_CONFIDENCE = 0.15
+
+# Margem de uma marcação segura, como fração da distância do limiar ao
+# nível das marcações: pontos de caneta e marcações apagadas ficam no meio
+# do caminho
+SURE_MARGIN = 0.5
+
+# Densidade mínima absoluta de uma marcação (como nas decisões por folha)
+MIN_MARK_DENSITY = 0.01
+
+
+def fit_mark_thresholds(densities: np.ndarray) -> Optional[MarkThresholds]:
+    """
+    Divide as densidades do lote em células em branco e marcadas.
+
+    Args:
+        densities: Densidades de todas as células do lote (NaN = ausente)
+
+    Returns:
+        MarkThresholds, ou None se os grupos não forem bem separados
+        (lote pequeno, folhas em branco, marcações muito variadas)
+    """
+    values = densities[np.isfinite(densities)]
+    if values.size < 2 * MIN_CLUSTER_CELLS or values.max() <= 0:
+        return None
+
+    # Otsu: corte que maximiza a variância entre os grupos
+    hist, edges = np.histogram(values, bins=HISTOGRAM_BINS, range=(0, values.max()))
+    centers = (edges[:-1] + edges[1:]) / 2
+    below = np.cumsum(hist)[:-1].astype(np.float64)
+    above = values.size - below
+    mass = np.cumsum(hist * centers)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spread = below * above * (
+            mass[:-1] / below - (mass[-1] - mass[:-1]) / above
+        ) ** 2
+    threshold = float(edges[np.nanargmax(np.nan_to_num(spread)) + 1])
+
+    blank = values[values <= threshold]
+    marked = values[values > threshold]
+    if min(blank.size, marked.size) < MIN_CLUSTER_CELLS:
+        return None
+
+    # Nível e desvio robustos (mediana e MAD): sujeiras entre os grupos
+    # não deslocam o nível das células em branco nem o das marcações
+    blank_level, mark_level = np.median(blank), np.median(marked)
+    gap = mark_level - blank_level
+    blank_spread, mark_spread = (
+        max(1.4826 * np.median(np.abs(cluster - level)), MIN_SPREAD * gap)
+        for cluster, level in ((blank, blank_level), (marked, mark_level))
+    )
+    if gap < MIN_SEPARATION * (blank_spread + mark_spread):
+        return None
+
+    # O corte de Otsu fica em qualquer ponto do vão entre os grupos; o
+    # limiar vai para o ponto a igual número de desvios dos dois níveis
+    share = blank_spread / (blank_spread + mark_spread)
+    return MarkThresholds(
+        threshold=float(blank_level + gap * share),
+        blank_level=float(blank_level),
+        mark_level=float(mark_level)
+    )
+
+
+def classify_cells(
+    densities: np.ndarray,
+    thresholds: MarkThresholds
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Decide as respostas de todas as questões do lote de uma vez.
+
+    Cada célula é marcada ou em branco pelo limiar do lote, com uma margem
+    (distância ao limiar relativa ao nível do seu grupo). A confiança é a
+    margem da célula mais marcada, limitada pela confiança relativa das
+    decisões por folha ((melhor - segunda) / melhor). Só marcações seguras
+    (perto do nível das marcações da turma) decidem a questão ou a tornam
+    dupla: uma sujeira entre os grupos vai para revisão ou não atrapalha a
+    marcação ao lado.
+
+    Args:
+        densities: (Q, C) densidade por célula de todas as folhas
+        thresholds: Divisão ajustada ao lote (fit_mark_thresholds)
+
+    Returns:
+        (choice_index, confidence, quality_codes), um valor por questão
+    """
+    num_questions, num_choices = densities.shape
+    rows = np.arange(num_questions)
+    ink = np.nan_to_num(densities, nan=0.0)  # Alternativa ausente = sem tinta
+
+    t = thresholds.threshold
+    is_marked = (ink > t) & (ink >= MIN_MARK_DENSITY)
+    margins = np.clip(np.where(
+        is_marked,
+        (ink - t) / max(thresholds.mark_level - t, 1e-9),
+        (t - ink) / max(t - thresholds.blank_level, 1e-9)
+    ), 0.0, 1.0)
+    marked_count = is_marked.sum(axis=1)
+    sure = is_marked & (margins >= SURE_MARGIN)
+
+    order = np.argsort(-ink, axis=1, kind="stable")
+    best_choice = order[:, 0]
+    best_density = ink[rows, best_choice]
+    second_density = np.zeros(num_questions)
+    if num_choices > 1:
+        second_density = ink[rows, order[:, 1]]
+    relative = np.ones(num_questions)
+    np.divide(
+        best_density - second_density, best_density,
+        out=relative, where=marked_count > 0
+    )
+    confidence = np.minimum(margins[rows, best_choice], relative)
+
+    # Mesma prioridade das decisões por folha (da menor para a maior)
+    quality_codes = np.full(num_questions, CLEAR_CODE, dtype=np.int8)
+    quality_codes[
+        (confidence < LOW_CONFIDENCE) | ~sure[rows, best_choice]
+    ] = LOW_CONFIDENCE_CODE
+    quality_codes[sure.sum(axis=1) > 1] = MULTIPLE_CODE
+    quality_codes[marked_count == 0] = BLANK_CODE
+
+    choice_index = best_choice.astype(np.int8)
+    choice_index[marked_count == 0] = NO_CHOICE
+    return choice_index, np.round(confidence, 2), quality_codes
+
+
+def classify_tables(
+    tables: Sequence[AnswerTable]
+) -> Tuple[List[AnswerTable], Optional[MarkThresholds]]:
+    """
+    Reclassifica as respostas de um lote de folhas com os limiares do lote.
+
+    As folhas precisam ter as mesmas alternativas; sem divisão confiável
+    (ver fit_mark_thresholds), as tabelas são devolvidas sem alteração.
+
+    Returns:
+        (tabelas na ordem recebida, limiares usados ou None)
+    """
+    tables = list(tables)
+    if not tables or len({table.choices for table in tables}) > 1:
+        return tables, None
+
+    densities = np.concatenate([table.densities for table in tables])
+    thresholds = fit_mark_thresholds(densities)
+    if thresholds is None:
+        return tables, None
+
+    columns = classify_cells(densities, thresholds)
+    bounds = np.cumsum([len(table) for table in tables])[:-1]
+    split = [np.split(column, bounds) for column in columns]
+    return [
+        AnswerTable(
+            question_numbers=table.question_numbers,
+            choices=table.choices,
+            choice_index=choice_index,
+            confidence=confidence,
+            quality_codes=quality_codes,
+            densities=table.densities
+        )
+        for table, choice_index, confidence, quality_codes in zip(tables, *split)
+    ], thresholds
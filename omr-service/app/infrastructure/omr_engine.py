@@ -8,12 +8,56 @@ Este é o coração do sistema que detecta marcações em provas.
 import cv2
 import numpy as np
 import io
-from typing import List, Tuple, Dict, Optional
+import pickle
+from dataclasses import replace
+from typing import Any, List, MutableMapping, Sequence, Tuple, Dict, Optional
 from PIL import Image
 
-from app.application.interfaces import IOMREngine, IDebugStorage
-from app.domain.entities import OMRResult, Answer, MarkQuality
-from app.domain.value_objects import OMROptions, ROI
+from app.application.interfaces import IOMREngine, IDebugStorage, ISheetIndex
+from app.domain.entities import (
+    OMRResult, AnswerTable, NO_CHOICE,
+    CLEAR_CODE, LOW_CONFIDENCE_CODE, BLANK_CODE, MULTIPLE_CODE
+)
+from app.domain.exceptions import DuplicateSheetError
+from app.domain.value_objects import (
+    OMROptions, ROI, Quadrilateral, SheetLayout, RelativeRegion,
+    StudentIdField, VersionField, MarkThresholds
+)
+from app.infrastructure.cell_map import (
+    build_cell_map, grid_boxes, box_densities, integral_ink,
+    Rect, RegisteredBlock
+)
+from app.infrastructure.binarization import Binarizer
+from app.infrastructure.cell_classifier import CellClassifier
+from app.infrastructure.mark_calibration import classify_tables
+from app.infrastructure.orientation import detect_orientation, rotate_upright
+from app.infrastructure.pipeline import (
+    Pipeline, PipelineContext, Stage, image_digest
+)
+from app.infrastructure.scratch import ScratchBuffers
+from app.infrastructure.sheet_hash import SheetHash, header_ink, sheet_hash
+
+
+# Símbolos das bolhas de dígitos (matrícula)
+DIGIT_SYMBOLS = [str(d) for d in range(10)]
+
+# Lado maior da imagem reduzida usada na detecção do ROI
+DETECTION_SIZE = 1000
+
+# Estágio após o qual o estado é guardado no cache de estágios: o que vem
+# depois depende das opções das células e é barato de refazer
+CHECKPOINT_STAGE = "remove_grid"
+
+# Último estágio independente das opções: estado guardado nas sessões de
+# revisão (imagem decodificada e suavizada)
+PREPARED_STAGE = "preprocess"
+
+# Último estágio antes das etapas caras (grade e células): a folha é
+# comparada às já lidas no lote neste ponto (ver process_unique)
+HASH_STAGE = "register_blocks"
+
+# Lado maior da prévia enviada nas sessões de revisão
+PREVIEW_SIZE = 800
 
 
 class OpenCVOMREngine(IOMREngine):
@@ -24,86 +68,307 @@ class OpenCVOMREngine(IOMREngine):
         debug_storage: Optional[IDebugStorage] = None,
         min_confidence: float = 0.2,  # Valor intermediário
         blank_threshold: float = 0.03,  # Valor intermediário - evitar falsos positivos
-        multiple_threshold: float = 0.8  # Valor intermediário
+        multiple_threshold: float = 0.8,  # Valor intermediário
+        binarizer: Optional[Binarizer] = None,
+        detection_size: int = DETECTION_SIZE,
+        stage_cache: Optional[MutableMapping] = None,
+        result_cache: Optional[MutableMapping] = None,
+        scratch: Optional[ScratchBuffers] = None,
+        auto_orient: bool = True,
+        cell_classifier: Optional[CellClassifier] = None
     ):
+        """
+        Args:
+            stage_cache: Cache do estado após CHECKPOINT_STAGE (ex:
+                StageCache, ou SharedStageCache entre workers),
+                compartilhado para reanálises da mesma foto
+            result_cache: Cache dos resultados, separado do de estágios
+                para não disputar as entradas dos checkpoints
+            scratch: Buffers por thread para os temporários do pipeline
+                (cinza, linhas da grade, integral), reaproveitados entre
+                folhas; também usados pelo binarizador padrão
+            auto_orient: Detectar folhas de lado ou de cabeça para baixo
+                e girar o ROI antes da leitura
+            cell_classifier: Modelo treinado que decide as células (X,
+                rasura, sujeira) no lugar das regras de densidade; folhas
+                com células pequenas demais continuam com as regras
+        """
         self.debug_storage = debug_storage
         self.min_confidence = min_confidence
         self.blank_threshold = blank_threshold
         self.multiple_threshold = multiple_threshold
+        self.scratch = scratch or ScratchBuffers()
+        self.binarizer = binarizer or Binarizer(scratch=self.scratch)
+        self.detection_size = detection_size
+        self.stage_cache = stage_cache
+        self.result_cache = result_cache
+        self.auto_orient = auto_orient
+        self.cell_classifier = cell_classifier
+        # Pipeline por template; pode ser substituído para montar pipelines
+        # mais baratos (ex: sem remoção de grade em folhas só de bolhas)
+        self.pipelines: Dict[str, Pipeline] = {
+            "AUTO": self.default_pipeline(),
+            "MANUAL_ROI": self.default_pipeline(manual_roi=True),
+        }
 
-    def process_image(self, image_data: bytes, options: OMROptions) -> OMRResult:
+    def process_image(
+        self,
+        image_data: bytes,
+        options: OMROptions,
+        digest: Optional[str] = None
+    ) -> OMRResult:
         """
         Processa imagem e detecta marcações.
 
-        Pipeline:
-        1. Pré-processamento (grayscale, blur, threshold)
-        2. Detecção de ROI do gabarito
-        3. Correção de perspectiva
-        4. Remoção de linhas da grade
-        5. Divisão em células
-        6. Análise de densidade por célula
-        7. Decisão e cálculo de confiança
-        """
-        # 1. Carregar imagem
-        img_array = np.frombuffer(image_data, np.uint8)
-        img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-        if img is None:
-            raise ValueError("Erro ao decodificar imagem")
+        Executa o pipeline do template (ver default_pipeline):
+        1. Decodificação e pré-processamento (grayscale, blur)
+        2. Detecção de ROI do gabarito (em imagem reduzida)
+        3. Binarização do ROI (método escolhido pela iluminação),
+           correção de perspectiva e orientação (0/90/180/270 graus)
+        4. Registro dos blocos e remoção de linhas da grade
+        5. Análise de densidade por célula e decisão das respostas
+        6. Matrícula, tipo de prova e imagens de debug, quando pedidos
+
+        Com result_cache, o resultado é guardado pelo resumo da imagem e
+        pelas opções: repetir a mesma leitura não roda o pipeline.
+        O resumo (digest) já calculado pelo chamador é reaproveitado.
+        """
+        digest = digest or image_digest(image_data)
+        cached = self.cached_result(image_data, options, digest)
+        if cached is not None:
+            return cached
+
+        result = self._to_result(self.run_pipeline(image_data, options, digest))
+        key = self._result_key(digest, options)
+        if key is not None:
+            self.result_cache[key] = {"result": pickle.dumps(result)}
+        return result
 
-        # 2. Pré-processamento
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        binary = cv2.adaptiveThreshold(
-            blurred, 255,
-            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY_INV,
-            11, 2
+    def cached_result(
+        self,
+        image_data: bytes,
+        options: OMROptions,
+        digest: Optional[str] = None
+    ) -> Optional[OMRResult]:
+        """Resultado guardado pelo resumo da imagem e pelas opções (ou None)"""
+        key = self._result_key(digest or image_digest(image_data), options)
+        if key is None:
+            return None
+        cached = self.result_cache.get(key)
+        if cached is None:
+            return None
+        # Cópia própria: o chamador pode alterar o resultado
+        return pickle.loads(cached["result"])
+
+    def _result_key(self, digest: str, options: OMROptions) -> Optional[str]:
+        """Chave do resultado no cache (None: sem cache ou com debug)"""
+        if self.result_cache is None or options.debug:
+            return None  # Imagens de debug são geradas por requisição
+        thresholds = (
+            self.min_confidence, self.blank_threshold, self.multiple_threshold,
+            self.cell_classifier.fingerprint if self.cell_classifier else None
         )
+        return f"result:{digest}:{thresholds!r}:{options!r}"
 
-        # 3. Detectar ROI
-        if options.template == "MANUAL_ROI" and options.roi:
-            roi_coords = options.roi
-        else:
-            roi_coords = self._detect_roi(binary, img.shape)
+    def prepare_image(self, image_data: bytes) -> Dict[str, Any]:
+        """
+        Decodifica e suaviza a imagem uma vez (ver process_prepared).
 
-        if not roi_coords:
-            raise RuntimeError(
-                "Não foi possível detectar o gabarito automaticamente. "
-                "Tente usar modo MANUAL_ROI."
+        Só a imagem suavizada é guardada: a decodificada serve apenas à
+        suavização, e a sessão não fica com duas cópias da foto inteira.
+        """
+        prepared = self.pipelines["AUTO"].prepare(image_data, PREPARED_STAGE)
+        del prepared["image"]
+        return prepared
+
+    def process_prepared(
+        self, prepared: Dict[str, Any], options: OMROptions
+    ) -> OMRResult:
+        """
+        Lê as respostas de uma imagem já preparada.
+
+        Roda só os estágios após PREPARED_STAGE do pipeline do template:
+        localização do ROI, binarização, perspectiva, grade e células.
+        """
+        pipeline = self._pipeline(options)
+        return self._to_result(pipeline.resume(prepared, options, PREPARED_STAGE))
+
+    def render_preview(
+        self, prepared: Dict[str, Any], max_side: int = PREVIEW_SIZE
+    ) -> Tuple[bytes, float]:
+        """JPEG reduzido da imagem preparada e a escala (prévia / original)"""
+        image = prepared["blurred"]
+        scale = min(1.0, max_side / max(image.shape[:2]))
+        if scale < 1:
+            image = cv2.resize(
+                image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
             )
+        _, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        return encoded.tobytes(), scale
 
-        # 4. Extrair e corrigir perspectiva
-        roi_img = self._extract_and_warp_roi(
-            binary, img, roi_coords
-        )
+    def process_unique(
+        self,
+        image_data: bytes,
+        options: OMROptions,
+        sheet_index: ISheetIndex,
+        label: str
+    ) -> OMRResult:
+        """
+        Lê a folha, salvo se ela for uma cópia de outra já lida no lote.
+
+        O pipeline roda até HASH_STAGE (ROI retificado e blocos
+        registrados); o hash perceptual da folha em pé (ver sheet_hash:
+        células, cabeçalho e, quando pedidos, matrícula e tipo de prova) é
+        procurado no índice antes da remoção da grade e da análise das
+        células, e a folha fica indexada já nesse ponto (leituras
+        simultâneas do lote veem a folha em leitura); se a leitura falhar
+        depois, ela sai do índice.
+
+        Só uma folha quase idêntica com a mesma matrícula, lida por
+        inteiro, é uma cópia certa e não é lida. Sem matrícula, as mesmas
+        respostas com o mesmo cabeçalho podem ser de dois alunos (nome em
+        branco): a folha é lida e volta com duplicate_of apontando a
+        original. Essas leituras não passam pelos caches de estágios e de
+        resultados: o hash sai de um estado que o cache não guarda.
+
+        Raises:
+            DuplicateSheetError: Se a folha é uma cópia de outra do lote
+        """
+        pipeline = self._pipeline(options)
+        state = pipeline.prepare(image_data, HASH_STAGE, options)
+        fingerprint = self.hash_sheet(state, options)
+        original = sheet_index.claim(fingerprint, label)
+        student_id = fingerprint.identity[0]
+        if original is not None and student_id is not None and "?" not in student_id:
+            raise DuplicateSheetError(original)
+
+        try:
+            result = self._to_result(pipeline.resume(state, options, HASH_STAGE))
+        except Exception:
+            if original is None:
+                sheet_index.release(label)
+            raise
+        result.duplicate_of = original
+        return result
+
+    def classify_batch(
+        self, results: Sequence[OMRResult]
+    ) -> Tuple[List[OMRResult], Optional[MarkThresholds]]:
+        """
+        Reclassifica as respostas do lote com os limiares da turma.
+
+        As densidades de todas as folhas são divididas uma vez em células
+        em branco e marcadas (ver mark_calibration) e as questões são
+        decididas em uma única passada; sem grupos bem separados, valem as
+        decisões de cada folha (_decide_answers). Com cell_classifier, as
+        decisões do modelo são mantidas: a densidade sozinha não distingue
+        rasuras de marcações.
+        """
+        if self.cell_classifier is not None:
+            return list(results), None
+        tables, thresholds = classify_tables([result.answers for result in results])
+        if thresholds is None:
+            return list(results), None
+        return [
+            replace(result, answers=table) for result, table in zip(results, tables)
+        ], thresholds
+
+    def run_pipeline(
+        self,
+        image_data: bytes,
+        options: OMROptions,
+        digest: Optional[str] = None
+    ) -> PipelineContext:
+        """
+        Executa o pipeline do template e retorna o contexto completo.
 
-        # 5. Remover grade
-        no_grid = self._remove_grid(roi_img)
+        Além do resultado, o contexto traz os artefatos intermediários e o
+        tempo de cada estágio (ctx.timings, em ms).
+        """
+        pipeline = self._pipeline(options)
+        return pipeline.run(image_data, options, digest)
+
+    def hash_sheet(self, state: Dict[str, Any], options: OMROptions) -> SheetHash:
+        """
+        Hash perceptual da folha no estado até HASH_STAGE (ver sheet_hash).
 
-        # 6. Dividir em células e analisar
-        answers = self._analyze_cells(
-            no_grid,
-            options.num_questions,
-            options.choices
+        A folha é orientada e a matrícula e o tipo de prova são lidos
+        (bolhas fora da tabela, leitura barata) só para o hash: o estado
+        não muda, e o resto do pipeline refaz a orientação a partir dele,
+        como em uma leitura comum. A identidade é (matrícula, tipo de prova).
+        """
+        ctx = PipelineContext(image_data=b"", options=options, **state)
+        for stage in (OrientStage(self), StudentIdStage(self), ExamVersionStage(self)):
+            if stage.applies(options):
+                stage.run(ctx)
+        return sheet_hash(
+            rotate_upright(ctx.roi_img, ctx.orientation), ctx.blocks,
+            len(options.choices),
+            identity=(ctx.student_id, ctx.exam_version),
+            header=header_ink(ctx.blurred, self._roi_corners(ctx), ctx.orientation)
         )
 
-        # 7. Salvar debug se solicitado
-        debug_images = None
-        if options.debug and self.debug_storage:
-            debug_images = self._save_debug_images(
-                img, roi_img, binary, no_grid, roi_coords
-            )
+    @staticmethod
+    def _roi_corners(ctx: PipelineContext) -> Tuple[Tuple[float, float], ...]:
+        """Cantos do ROI na foto (os do gabarito ou os do retângulo)"""
+        if ctx.corners is not None:
+            return ctx.corners.points
+        roi = ctx.roi
+        right, bottom = roi.x + roi.width, roi.y + roi.height
+        return (roi.x, roi.y), (right, roi.y), (right, bottom), (roi.x, bottom)
+
+    def _pipeline(self, options: OMROptions) -> Pipeline:
+        pipeline = self.pipelines.get(options.template)
+        if pipeline is None:
+            raise ValueError(f"Nenhum pipeline para o template '{options.template}'")
+        return pipeline
 
+    def _to_result(self, ctx: PipelineContext) -> OMRResult:
         return OMRResult(
-            answers=answers,
-            total_questions=options.num_questions,
-            debug_images=debug_images
+            answers=ctx.answers,
+            total_questions=ctx.options.num_questions,
+            debug_images=ctx.debug_images,
+            student_id=ctx.student_id,
+            student_id_confidence=ctx.student_id_confidence,
+            exam_version=ctx.exam_version,
+            exam_version_confidence=ctx.exam_version_confidence,
+            roi=ctx.roi,
+            orientation=ctx.orientation
         )
 
+    def default_pipeline(self, manual_roi: bool = False) -> Pipeline:
+        """
+        Pipeline completo do motor.
+
+        Args:
+            manual_roi: Usar o ROI informado nas opções em vez de detectá-lo
+
+        Com stage_cache, o estado após CHECKPOINT_STAGE é guardado e
+        reaproveitado em novas leituras da mesma imagem.
+        """
+        stages = [
+            DecodeStage(),
+            PreprocessStage(self.scratch),
+            ManualRoiStage() if manual_roi else DetectRoiStage(self),
+            BinarizeRoiStage(self),
+            WarpStage(self),
+            RegisterBlocksStage(self),
+            RemoveGridStage(self),
+            OrientStage(self),
+            AnalyzeCellsStage(self),
+            StudentIdStage(self),
+            ExamVersionStage(self),
+            DebugImagesStage(self),
+        ]
+        if self.stage_cache is None:
+            return Pipeline(stages)
+        return Pipeline(stages, cache=self.stage_cache, checkpoint=CHECKPOINT_STAGE)
+
     def _detect_roi(
         self,
         binary: np.ndarray,
-        img_shape: Tuple[int, int, int]
+        img_shape: Tuple[int, int, int],
+        num_blocks: int = 1
     ) -> Optional[ROI]:
         """
         Detecta automaticamente a região do gabarito.
@@ -112,6 +377,7 @@ class OpenCVOMREngine(IOMREngine):
         - Encontrar contornos retangulares grandes
         - Calcular "score de grade" (quantidade de linhas internas)
         - Escolher o contorno com maior score
+        - Em folhas com vários blocos, unir os melhores candidatos
         """
         # Encontrar contornos
         contours, _ = cv2.findContours(
@@ -122,7 +388,8 @@ class OpenCVOMREngine(IOMREngine):
             return None
 
         height, width = img_shape[:2]
-        min_area = (width * height) * 0.1  # Pelo menos 10% da imagem
+        # Pelo menos 10% da imagem, dividido entre os blocos da folha
+        min_area = (width * height) * 0.1 / num_blocks
 
         candidates = []
 
@@ -156,8 +423,18 @@ class OpenCVOMREngine(IOMREngine):
             return ROI(x, y, w, h)
 
         # Escolher candidato com maior score
-        best = max(candidates, key=lambda c: c["score"])
-        return best["roi"]
+        if num_blocks == 1:
+            best = max(candidates, key=lambda c: c["score"])
+            return best["roi"]
+
+        # Vários blocos: ROI é a união dos blocos com maior score
+        best = sorted(candidates, key=lambda c: c["score"], reverse=True)
+        rois = [c["roi"] for c in best[:num_blocks]]
+        x1 = min(r.x for r in rois)
+        y1 = min(r.y for r in rois)
+        x2 = max(r.x + r.width for r in rois)
+        y2 = max(r.y + r.height for r in rois)
+        return ROI(x1, y1, x2 - x1, y2 - y1)
 
     def _calculate_grid_score(self, roi_binary: np.ndarray) -> float:
         """
@@ -166,63 +443,148 @@ class OpenCVOMREngine(IOMREngine):
         """
         h, w = roi_binary.shape
 
+        lines = self.scratch.get("grid_score", (h, w))
+
         # Detectar linhas horizontais
         horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (w // 10, 1))
-        horizontal = cv2.morphologyEx(
-            roi_binary, cv2.MORPH_OPEN, horizontal_kernel
-        )
-        h_lines = cv2.countNonZero(horizontal)
+        cv2.morphologyEx(roi_binary, cv2.MORPH_OPEN, horizontal_kernel, dst=lines)
+        h_lines = cv2.countNonZero(lines)
 
         # Detectar linhas verticais
         vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, h // 10))
-        vertical = cv2.morphologyEx(
-            roi_binary, cv2.MORPH_OPEN, vertical_kernel
-        )
-        v_lines = cv2.countNonZero(vertical)
+        cv2.morphologyEx(roi_binary, cv2.MORPH_OPEN, vertical_kernel, dst=lines)
+        v_lines = cv2.countNonZero(lines)
 
         # Score = quantidade de pixels de linhas
         return h_lines + v_lines
 
+    def _scale_roi(self, roi: ROI, factor: float) -> ROI:
+        """Converte um ROI da imagem reduzida para a resolução original"""
+        return ROI(
+            int(roi.x * factor), int(roi.y * factor),
+            int(round(roi.width * factor)), int(round(roi.height * factor))
+        )
+
+    def _crop(self, image: np.ndarray, roi: ROI) -> np.ndarray:
+        """Recorta o ROI da imagem"""
+        return image[roi.y:roi.y+roi.height, roi.x:roi.x+roi.width]
+
+    def _expand_roi(self, roi: ROI, shape: Tuple[int, int]) -> ROI:
+        """Amplia o ROI com uma margem (1% do lado maior), limitada à imagem"""
+        h, w = shape[:2]
+        margin = max(4, int(0.01 * max(roi.width, roi.height)))
+        x1, y1 = max(0, roi.x - margin), max(0, roi.y - margin)
+        x2 = min(w, roi.x + roi.width + margin)
+        y2 = min(h, roi.y + roi.height + margin)
+        return ROI(x1, y1, x2 - x1, y2 - y1)
+
+    def _refine_roi(
+        self,
+        window_binary: np.ndarray,
+        window: ROI,
+        num_blocks: int = 1
+    ) -> ROI:
+        """
+        Ajusta o ROI detectado na imagem reduzida à resolução original.
+
+        Usa a união dos contornos de tabela encontrados na janela
+        binarizada em torno do ROI ampliado.
+        """
+        contours, _ = cv2.findContours(
+            window_binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+        )
+
+        min_area = 0.15 * window.width * window.height / num_blocks
+        rects = [
+            cv2.boundingRect(c) for c in contours
+            if cv2.contourArea(c) >= min_area
+        ]
+        if not rects:
+            return window
+
+        x1 = min(r[0] for r in rects)
+        y1 = min(r[1] for r in rects)
+        x2 = max(r[0] + r[2] for r in rects)
+        y2 = max(r[1] + r[3] for r in rects)
+        return ROI(window.x + x1, window.y + y1, x2 - x1, y2 - y1)
+
     def _extract_and_warp_roi(
         self,
-        binary: np.ndarray,
-        img: np.ndarray,
-        roi: ROI
+        window_binary: np.ndarray,
+        window: ROI,
+        roi: ROI,
+        corners: Optional[Quadrilateral] = None
     ) -> np.ndarray:
         """
-        Extrai ROI e corrige perspectiva se necessário.
+        Extrai o ROI da janela já binarizada e corrige a perspectiva.
+
+        Com os cantos do gabarito, o quadrilátero é retificado para um
+        retângulo com o comprimento das maiores arestas opostas; sem
+        eles, o ROI é apenas recortado.
         """
-        # Extrair região
-        roi_img = binary[roi.y:roi.y+roi.height, roi.x:roi.x+roi.width]
+        if corners is None:
+            return self._crop(
+                window_binary,
+                ROI(roi.x - window.x, roi.y - window.y, roi.width, roi.height)
+            )
+
+        src = np.float32(corners.points) - np.float32([window.x, window.y])
+        top, right, bottom, left = (
+            np.linalg.norm(src[(i + 1) % 4] - src[i]) for i in range(4)
+        )
+        width = max(1, int(round(max(top, bottom))))
+        height = max(1, int(round(max(left, right))))
+        dst = np.float32([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]])
 
-        # TODO: Implementar correção de perspectiva mais sofisticada
-        # Por enquanto, apenas retornar o ROI extraído
-        return roi_img
+        warped = cv2.warpPerspective(
+            window_binary, cv2.getPerspectiveTransform(src, dst), (width, height),
+            flags=cv2.INTER_LINEAR, borderValue=0
+        )
+        # A interpolação cria tons intermediários: voltar a binário
+        cv2.threshold(warped, 127, 255, cv2.THRESH_BINARY, dst=warped)
+        return warped
 
-    def _remove_grid(self, roi_img: np.ndarray) -> np.ndarray:
+    def _remove_grid(
+        self,
+        roi_img: np.ndarray,
+        line_extent: Optional[Tuple[int, int]] = None
+    ) -> np.ndarray:
         """
         Remove linhas da grade para não contaminar a contagem de tinta.
 
         Estratégia:
         - Extrair linhas horizontais e verticais com morphology
         - Subtrair da imagem original
+
+        As linhas ficam em buffers reaproveitados; só o resultado é novo.
+
+        Args:
+            roi_img: ROI binarizado
+            line_extent: (largura, altura) da menor tabela; os kernels são
+                proporcionais a ela (padrão: o próprio ROI)
         """
         h, w = roi_img.shape
+        horizontal_lines = self.scratch.get("horizontal_lines", (h, w))
+        vertical_lines = self.scratch.get("vertical_lines", (h, w))
+        if line_extent:
+            w, h = line_extent
 
         # Linhas horizontais
         horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (w // 5, 1))
-        horizontal_lines = cv2.morphologyEx(
-            roi_img, cv2.MORPH_OPEN, horizontal_kernel, iterations=2
+        cv2.morphologyEx(
+            roi_img, cv2.MORPH_OPEN, horizontal_kernel,
+            dst=horizontal_lines, iterations=2
         )
 
         # Linhas verticais
         vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, h // 5))
-        vertical_lines = cv2.morphologyEx(
-            roi_img, cv2.MORPH_OPEN, vertical_kernel, iterations=2
+        cv2.morphologyEx(
+            roi_img, cv2.MORPH_OPEN, vertical_kernel,
+            dst=vertical_lines, iterations=2
         )
 
-        # Combinar linhas
-        grid = cv2.add(horizontal_lines, vertical_lines)
+        # Combinar linhas (no próprio buffer horizontal)
+        grid = cv2.add(horizontal_lines, vertical_lines, dst=horizontal_lines)
 
         # Subtrair da imagem original
         no_grid = cv2.subtract(roi_img, grid)
@@ -233,130 +595,282 @@ class OpenCVOMREngine(IOMREngine):
         self,
         no_grid: np.ndarray,
         num_questions: int,
-        choices: List[str]
-    ) -> List[Answer]:
+        choices: List[str],
+        blocks: Optional[Tuple[RegisteredBlock, ...]] = None
+    ) -> AnswerTable:
         """
         Divide a imagem em células e analisa cada uma.
-        
-        IMPORTANTE: A tabela tem uma coluna de números à esquerda que deve ser ignorada.
-        Estrutura: [Número] [A] [B] [C] [D] [E]
-        
-        Retorna lista de Answer com respostas detectadas.
-        """
-        h, w = no_grid.shape
-        cell_height = h // num_questions
-        
-        # Total de colunas = alternativas + 1 (coluna de números)
-        total_columns = len(choices) + 1
-        cell_width = w // total_columns
-
-        answers = []
-
-        for q in range(num_questions):
-            question_num = q + 1
-            densities = {}
-
-            # Analisar cada alternativa (pulando a primeira coluna de números)
-            for c, choice in enumerate(choices):
-                # Coordenadas da célula
-                y1 = q * cell_height
-                y2 = (q + 1) * cell_height
-                
-                # Pular a primeira coluna (números) - começar da coluna 1
-                x1 = (c + 1) * cell_width  # +1 para pular coluna de números
-                x2 = (c + 2) * cell_width
-
-                # Aplicar padding interno (5% de margem - reduzido para capturar mais do X)
-                padding_y = int(cell_height * 0.05)
-                padding_x = int(cell_width * 0.05)
-
-                y1 += padding_y
-                y2 -= padding_y
-                x1 += padding_x
-                x2 -= padding_x
-
-                # Extrair célula
-                cell = no_grid[y1:y2, x1:x2]
-
-                # Calcular densidade de tinta
-                if cell.size > 0:
-                    density = cv2.countNonZero(cell) / cell.size
-                else:
-                    density = 0.0
-
-                densities[choice] = density
-
-            # Decidir resposta baseado nas densidades
-            answer = self._decide_answer(question_num, densities, choices)
-            answers.append(answer)
-
-        return answers
-
-    def _decide_answer(
+
+        IMPORTANTE: Cada tabela tem uma coluna de números à esquerda que deve
+        ser ignorada. Estrutura: [Número] [A] [B] [C] [D] [E]
+
+        Os blocos já registrados (ver _register_blocks) definem um mapa de
+        células pré-calculado; as densidades de todas as células saem de uma
+        única imagem integral. Com cell_classifier, as miniaturas das
+        células saem da mesma integral e o modelo decide as respostas.
+
+        Retorna AnswerTable com as respostas detectadas.
+        """
+        if blocks is None:
+            blocks = self._register_blocks(
+                no_grid, SheetLayout.single(num_questions)
+            )
+        cell_map = build_cell_map(blocks, len(choices))
+        integral = integral_ink(no_grid, self.scratch)
+        density_matrix = box_densities(integral, cell_map.boxes)
+
+        # Modelo de células, se houver, sobre a mesma imagem integral
+        if self.cell_classifier is not None and self.cell_classifier.supports(
+            cell_map.boxes
+        ):
+            return self.cell_classifier.decide(
+                cell_map.question_numbers, choices, integral, cell_map.boxes,
+                density_matrix
+            )
+
+        # Decidir respostas baseado nas densidades
+        return self._decide_answers(
+            cell_map.question_numbers, choices, density_matrix
+        )
+
+    def _register_blocks(
+        self,
+        roi_binary: np.ndarray,
+        layout: SheetLayout
+    ) -> Tuple[RegisteredBlock, ...]:
+        """
+        Registra os blocos do layout no ROI.
+
+        Com um único bloco o próprio ROI já é a tabela. Com vários blocos,
+        cada região nominal é ajustada ao contorno da tabela encontrada
+        nela (quando houver), compensando espaçamentos entre colunas.
+        """
+        h, w = roi_binary.shape
+        registered = []
+
+        for block in layout.blocks:
+            nominal = block.region.to_pixels(w, h)
+            rect = (nominal.x, nominal.y, nominal.width, nominal.height)
+            if len(layout.blocks) > 1:
+                rect = self._snap_to_table(roi_binary, rect)
+            registered.append((
+                rect, block.first_question, block.num_questions,
+                block.has_number_column
+            ))
+
+        return tuple(registered)
+
+    def _snap_to_table(
+        self,
+        roi_binary: np.ndarray,
+        rect: Rect
+    ) -> Rect:
+        """Ajusta um retângulo nominal ao maior contorno de tabela dentro dele"""
+        h, w = roi_binary.shape
+        x, y, bw, bh = rect
+
+        # Janela de busca com pequena margem além da região nominal
+        margin_x = int(bw * 0.05)
+        margin_y = int(bh * 0.05)
+        wx1, wy1 = max(0, x - margin_x), max(0, y - margin_y)
+        wx2, wy2 = min(w, x + bw + margin_x), min(h, y + bh + margin_y)
+
+        contours, _ = cv2.findContours(
+            roi_binary[wy1:wy2, wx1:wx2],
+            cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
+        )
+        if not contours:
+            return rect
+
+        largest = max(contours, key=cv2.contourArea)
+        cx, cy, cw, ch = cv2.boundingRect(largest)
+        if cw * ch < 0.5 * bw * bh:
+            return rect  # Nenhuma tabela convincente: manter região nominal
+
+        return (wx1 + cx, wy1 + cy, cw, ch)
+
+    def _read_bubble_groups(
+        self,
+        blurred: np.ndarray,
+        region: RelativeRegion,
+        symbols: Sequence[str],
+        groups: int,
+        vertical: bool,
+        method: Optional[str] = None,
+        orientation: int = 0
+    ) -> AnswerTable:
+        """
+        Lê um bloco de bolhas fora da tabela de respostas.
+
+        Cada grupo (coluna se vertical, linha caso contrário) recebe uma
+        única marcação entre os símbolos, decidida com as mesmas regras de
+        densidade das questões (_decide_answers).
+
+        Args:
+            blurred: Imagem inteira em escala de cinza suavizada
+            region: Região do bloco relativa à imagem
+            symbols: Símbolos de cada bolha do grupo (ex: "0".."9")
+            groups: Número de grupos no bloco
+            vertical: Símbolos dispostos de cima para baixo
+            method: Método de binarização (padrão: escolhido pelo recorte)
+            orientation: Giro da folha na foto; a região é procurada na
+                posição girada e só o recorte é desvirado
+
+        Returns:
+            AnswerTable com uma linha por grupo (questão = índice + 1)
+        """
+        h, w = blurred.shape
+        nominal = region.rotated(orientation).to_pixels(w, h)
+
+        # Binariza só a janela de busca em torno da região nominal
+        margin_x = int(nominal.width * 0.05)
+        margin_y = int(nominal.height * 0.05)
+        wx1, wy1 = max(0, nominal.x - margin_x), max(0, nominal.y - margin_y)
+        wx2 = min(w, nominal.x + nominal.width + margin_x)
+        wy2 = min(h, nominal.y + nominal.height + margin_y)
+        window = blurred[wy1:wy2, wx1:wx2]
+        nominal = ROI(nominal.x - wx1, nominal.y - wy1, nominal.width, nominal.height)
+        if orientation:
+            window_h, window_w = window.shape
+            window = rotate_upright(window, orientation)
+            nominal = RelativeRegion(
+                nominal.x / window_w, nominal.y / window_h,
+                nominal.width / window_w, nominal.height / window_h
+            ).rotated(-orientation).to_pixels(window.shape[1], window.shape[0])
+        binary = self.binarizer.binarize(window, method, reference_size=max(h, w))
+
+        x, y, bw, bh = self._snap_to_table(
+            binary, (nominal.x, nominal.y, nominal.width, nominal.height)
+        )
+        field = self._remove_grid(binary[y:y + bh, x:x + bw])
+
+        if vertical:
+            boxes = grid_boxes((0, 0, bw, bh), len(symbols), groups)
+            boxes = boxes.transpose(1, 0, 2)  # (grupos, símbolos, 4)
+        else:
+            boxes = grid_boxes((0, 0, bw, bh), groups, len(symbols))
+
+        density_matrix = box_densities(integral_ink(field, self.scratch), boxes)
+        return self._decide_answers(
+            np.arange(1, groups + 1), symbols, density_matrix
+        )
+
+    def _read_student_id(
+        self,
+        blurred: np.ndarray,
+        field: StudentIdField,
+        method: Optional[str] = None,
+        orientation: int = 0
+    ) -> Tuple[str, float]:
+        """
+        Decodifica a matrícula do aluno (um dígito por coluna).
+
+        Dígitos em branco ou com dupla marcação viram "?" e zeram a
+        confiança; caso contrário a confiança é a do dígito menos confiável.
+        """
+        digits = self._read_bubble_groups(
+            blurred, field.region, DIGIT_SYMBOLS, field.digits,
+            vertical=True, method=method, orientation=orientation
+        )
+
+        student_id = "".join(
+            d.marked_choice if d.is_valid() else "?" for d in digits
+        )
+        if "?" in student_id:
+            return student_id, 0.0
+        return student_id, min(d.confidence for d in digits)
+
+    def _read_exam_version(
+        self,
+        blurred: np.ndarray,
+        field: VersionField,
+        method: Optional[str] = None,
+        orientation: int = 0
+    ) -> Tuple[Optional[str], float]:
+        """
+        Lê a marcação do tipo de prova (uma linha de bolhas).
+
+        Retorna (None, 0.0) se a marcação estiver em branco ou ambígua.
+        """
+        mark = self._read_bubble_groups(
+            blurred, field.region, field.versions, 1,
+            vertical=False, method=method, orientation=orientation
+        )[0]
+
+        if not mark.is_valid():
+            return None, 0.0
+        return mark.marked_choice, mark.confidence
+
+    def _decide_answers(
         self,
-        question_num: int,
-        densities: Dict[str, float],
-        choices: List[str]
-    ) -> Answer:
+        question_numbers: np.ndarray,
+        choices: Sequence[str],
+        density_matrix: np.ndarray
+    ) -> AnswerTable:
         """
-        Decide a resposta baseado nas densidades.
-        
+        Decide as respostas de todas as questões de uma vez.
+
         Nova lógica para detectar QUALQUER tipo de marcação:
         - Ponto, X, preenchimento completo, etc.
         - Usa comparação relativa em vez de threshold absoluto
+
+        Args:
+            question_numbers: (Q,) números das questões
+            choices: Alternativas (colunas de density_matrix)
+            density_matrix: (Q, C) densidade de tinta por célula
+
+        Returns:
+            AnswerTable com resposta, confiança e qualidade por questão
         """
-        # Ordenar por densidade (maior primeiro)
-        sorted_choices = sorted(
-            choices,
-            key=lambda c: densities[c],
-            reverse=True
-        )
+        num_questions, num_choices = density_matrix.shape
+        rows = np.arange(num_questions)
+
+        # Ordenar por densidade (maior primeiro; empates na ordem das alternativas)
+        order = np.argsort(-density_matrix, axis=1, kind="stable")
+        best_choice = order[:, 0]
+        best_density = density_matrix[rows, best_choice]
+
+        second_density = np.zeros(num_questions)
+        if num_choices > 1:
+            second_density = density_matrix[rows, order[:, 1]]
 
-        best_choice = sorted_choices[0]
-        best_density = densities[best_choice]
-        
-        second_density = densities[sorted_choices[1]] if len(sorted_choices) > 1 else 0.0
-        
         # Calcular média das densidades para threshold adaptativo
-        avg_density = sum(densities.values()) / len(densities)
-        
+        total = np.zeros(num_questions)
+        for col in range(num_choices):
+            total += density_matrix[:, col]
+        avg_density = total / num_choices
+
         # Calcular confiança relativa
-        if best_density > 0:
-            confidence = (best_density - second_density) / best_density
-        else:
-            confidence = 0.0
+        has_ink = best_density > 0
+        confidence = np.zeros(num_questions)
+        np.divide(best_density - second_density, best_density, out=confidence, where=has_ink)
 
         # Nova lógica de decisão baseada em comparação relativa
         # Se a melhor densidade é significativamente maior que a média, é uma marcação
         is_marked = best_density > (avg_density * 1.5)  # 50% acima da média
-        
+
         # Detectar múltiplas marcações (segunda muito próxima da primeira)
-        is_multiple = (second_density / best_density > 0.75) if best_density > 0 else False
-        
-        # Determinar qualidade e resposta
-        if not is_marked or best_density < 0.01:  # Threshold mínimo absoluto muito baixo
-            # Questão em branco
-            quality = MarkQuality.BLANK
-            marked_choice = None
-        elif is_multiple:
-            # Múltiplas marcações
-            quality = MarkQuality.MULTIPLE
-            marked_choice = best_choice  # Retornar a mais marcada mesmo assim
-        elif confidence < 0.15:  # Confiança muito baixa
-            # Baixa confiança
-            quality = MarkQuality.LOW_CONFIDENCE
-            marked_choice = best_choice
-        else:
-            # Marcação clara
-            quality = MarkQuality.CLEAR
-            marked_choice = best_choice
+        second_ratio = np.zeros(num_questions)
+        np.divide(second_density, best_density, out=second_ratio, where=has_ink)
+        is_multiple = second_ratio > 0.75
+
+        # Determinar qualidade (da menor para a maior prioridade)
+        quality_codes = np.full(num_questions, CLEAR_CODE, dtype=np.int8)
+        quality_codes[confidence < 0.15] = LOW_CONFIDENCE_CODE  # Confiança muito baixa
+        quality_codes[is_multiple] = MULTIPLE_CODE  # Retorna a mais marcada mesmo assim
+        is_blank = ~is_marked | (best_density < 0.01)  # Threshold mínimo absoluto muito baixo
+        quality_codes[is_blank] = BLANK_CODE
+
+        choice_index = best_choice.astype(np.int8)
+        choice_index[is_blank] = NO_CHOICE
 
-        return Answer(
-            question_number=question_num,
-            marked_choice=marked_choice,
-            confidence=round(confidence, 2),
-            quality=quality,
-            densities=densities
+        return AnswerTable(
+            question_numbers=question_numbers,
+            choices=choices,
+            choice_index=choice_index,
+            confidence=[round(c, 2) for c in confidence.tolist()],
+            quality_codes=quality_codes,
+            densities=density_matrix
         )
 
     def _save_debug_images(
@@ -373,8 +887,12 @@ class OpenCVOMREngine(IOMREngine):
 
         debug_paths = {}
 
-        # ROI destacado na imagem original
-        roi_debug = original.copy()
+        # ROI destacado em uma cópia colorida (buffer reaproveitado) da foto
+        roi_debug = self.scratch.get("debug", original.shape[:2] + (3,))
+        if original.ndim == 2:
+            cv2.cvtColor(original, cv2.COLOR_GRAY2BGR, dst=roi_debug)
+        else:
+            np.copyto(roi_debug, original)
         cv2.rectangle(
             roi_debug,
             (roi.x, roi.y),
@@ -399,3 +917,293 @@ class OpenCVOMREngine(IOMREngine):
         )
 
         return debug_paths
+
+
+# Estágios do pipeline. Os que dependem da configuração do motor
+# (binarizador, limiares, debug) recebem o motor na construção.
+
+
+class DecodeStage(Stage):
+    """
+    Decodifica os bytes da imagem direto em tons de cinza.
+
+    O pipeline só usa a luminância: em JPEG o decodificador lê apenas o
+    canal Y, sem reconstruir as cores, e a imagem ocupa um terço da
+    memória.
+    """
+    name = "decode"
+    requires = ("image_data",)
+    provides = ("image",)
+
+    def run(self, ctx: PipelineContext) -> None:
+        img = cv2.imdecode(
+            np.frombuffer(ctx.image_data, np.uint8), cv2.IMREAD_GRAYSCALE
+        )
+        if img is None:
+            raise ValueError("Erro ao decodificar imagem")
+        ctx.image = img
+
+
+class PreprocessStage(Stage):
+    """Escala de cinza e suavização"""
+    name = "preprocess"
+    requires = ("image",)
+    provides = ("blurred",)
+
+    def __init__(self, scratch: Optional[ScratchBuffers] = None):
+        """
+        Args:
+            scratch: Buffers para o cinza intermediário (padrão: alocar)
+        """
+        self.scratch = scratch
+
+    def run(self, ctx: PipelineContext) -> None:
+        gray = ctx.image
+        if gray.ndim == 3:  # Imagem colorida recebida de outra origem
+            h, w = gray.shape[:2]
+            buffer = self.scratch.get("gray", (h, w)) if self.scratch else None
+            gray = cv2.cvtColor(gray, cv2.COLOR_BGR2GRAY, dst=buffer)
+        # A imagem suavizada fica no contexto (cache, sessões): nova
+        ctx.blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+
+
+class EngineStage(Stage):
+    """Estágio que usa a configuração do motor"""
+
+    def __init__(self, engine: OpenCVOMREngine):
+        self.engine = engine
+
+
+class DetectRoiStage(EngineStage):
+    """Detecta o ROI em imagem reduzida e o amplia para a resolução original"""
+    name = "detect_roi"
+    requires = ("blurred", "options")
+    provides = ("detection_binary", "roi", "window", "corners")
+
+    def cache_params(self, options: OMROptions) -> tuple:
+        return (len(options.sheet_layout.blocks),)
+
+    def run(self, ctx: PipelineContext) -> None:
+        engine = self.engine
+        num_blocks = len(ctx.options.sheet_layout.blocks)
+        binary, scale = engine.binarizer.detection_binary(
+            ctx.blurred, engine.detection_size
+        )
+        roi = engine._detect_roi(binary, binary.shape, num_blocks=num_blocks)
+        if not roi:
+            raise RuntimeError(
+                "Não foi possível detectar o gabarito automaticamente. "
+                "Tente usar modo MANUAL_ROI."
+            )
+        ctx.detection_binary = binary
+        ctx.roi = roi
+        ctx.corners = None  # Contorno aproximado por retângulo
+        ctx.window = engine._expand_roi(
+            engine._scale_roi(roi, 1 / scale), ctx.blurred.shape
+        )
+
+
+class ManualRoiStage(Stage):
+    """Usa o ROI ou os cantos informados nas opções"""
+    name = "manual_roi"
+    requires = ("options",)
+    provides = ("roi", "window", "corners")
+
+    def cache_params(self, options: OMROptions) -> tuple:
+        return (options.roi, options.corners)
+
+    def run(self, ctx: PipelineContext) -> None:
+        corners = ctx.options.corners
+        if corners is not None:
+            # Binariza o retângulo que contém os cantos; o warp retifica
+            ctx.roi = ctx.window = corners.bounding_roi()
+            ctx.corners = corners
+        elif ctx.options.roi:
+            ctx.roi = ctx.window = ctx.options.roi
+        else:
+            raise RuntimeError("ROI não informado para o modo MANUAL_ROI")
+
+
+class BinarizeRoiStage(EngineStage):
+    """Binariza só a janela do ROI e ajusta o ROI à resolução original"""
+    name = "binarize_roi"
+    requires = ("blurred", "roi", "window", "options")
+    provides = ("method", "window_binary", "roi")
+
+    def cache_params(self, options: OMROptions) -> tuple:
+        return (len(options.sheet_layout.blocks),)
+
+    def run(self, ctx: PipelineContext) -> None:
+        engine = self.engine
+        window_gray = engine._crop(ctx.blurred, ctx.window)
+        ctx.method = engine.binarizer.choose_method(window_gray)
+        ctx.window_binary = engine.binarizer.binarize(
+            window_gray, ctx.method, reference_size=max(ctx.blurred.shape)
+        )
+        if ctx.window is not ctx.roi:
+            ctx.roi = engine._refine_roi(
+                ctx.window_binary, ctx.window,
+                len(ctx.options.sheet_layout.blocks)
+            )
+
+
+class WarpStage(EngineStage):
+    """Extrai o ROI da janela binarizada e corrige a perspectiva"""
+    name = "warp"
+    requires = ("window_binary", "window", "roi", "corners")
+    provides = ("roi_img",)
+
+    def run(self, ctx: PipelineContext) -> None:
+        ctx.roi_img = self.engine._extract_and_warp_roi(
+            ctx.window_binary, ctx.window, ctx.roi, ctx.corners
+        )
+
+
+class RegisterBlocksStage(EngineStage):
+    """Ajusta os blocos do layout às tabelas encontradas no ROI"""
+    name = "register_blocks"
+    requires = ("roi_img", "options")
+    provides = ("blocks",)
+
+    def cache_params(self, options: OMROptions) -> tuple:
+        # Só a geometria dos blocos: a numeração das questões não muda os
+        # retângulos e é refeita em AnalyzeCellsStage
+        return tuple(block.region for block in options.sheet_layout.blocks)
+
+    def run(self, ctx: PipelineContext) -> None:
+        ctx.blocks = self.engine._register_blocks(
+            ctx.roi_img, ctx.options.sheet_layout
+        )
+
+
+class RemoveGridStage(EngineStage):
+    """Remove as linhas da grade, com kernels proporcionais à menor tabela"""
+    name = "remove_grid"
+    requires = ("roi_img", "blocks")
+    provides = ("no_grid",)
+
+    def run(self, ctx: PipelineContext) -> None:
+        ctx.no_grid = self.engine._remove_grid(
+            ctx.roi_img,
+            line_extent=(
+                min(rect[2] for rect, *_ in ctx.blocks),
+                min(rect[3] for rect, *_ in ctx.blocks)
+            )
+        )
+
+
+class OrientStage(EngineStage):
+    """
+    Detecta folhas de lado ou de cabeça para baixo e desvira só o ROI.
+
+    Fica após o checkpoint: a decisão usa o número de questões e de
+    alternativas, e uma reanálise com outras opções não perde o estado
+    guardado. A remoção da grade não depende da orientação; com a folha
+    girada, os blocos são registrados de novo no ROI desvirado e
+    AnalyzeCellsStage desvira a imagem que analisa.
+    """
+    name = "orient"
+    requires = ("roi_img", "blocks", "options")
+    provides = ("orientation", "blocks")
+
+    def applies(self, options: OMROptions) -> bool:
+        return self.engine.auto_orient
+
+    def run(self, ctx: PipelineContext) -> None:
+        engine = self.engine
+        layout = ctx.options.sheet_layout
+        ctx.orientation = detect_orientation(
+            ctx.roi_img, layout, len(ctx.options.choices),
+            register=engine._register_blocks
+        )
+        if ctx.orientation:
+            ctx.blocks = engine._register_blocks(
+                rotate_upright(ctx.roi_img, ctx.orientation), layout
+            )
+
+
+class AnalyzeCellsStage(EngineStage):
+    """Mede a tinta de cada célula e decide as respostas"""
+    name = "analyze_cells"
+    provides = ("answers",)
+
+    def __init__(self, engine: OpenCVOMREngine, source: str = "no_grid"):
+        """
+        Args:
+            source: Campo do contexto com a imagem binária a analisar
+                (ex: "roi_img" em pipelines sem remoção de grade)
+        """
+        super().__init__(engine)
+        self.source = source
+        self.requires = (source, "blocks", "orientation", "options")
+
+    def run(self, ctx: PipelineContext) -> None:
+        # Os blocos podem vir do cache, registrados com outra numeração
+        blocks = tuple(
+            (rect, block.first_question, block.num_questions,
+             block.has_number_column)
+            for (rect, *_), block in zip(ctx.blocks, ctx.options.sheet_layout.blocks)
+        )
+        ctx.answers = self.engine._analyze_cells(
+            rotate_upright(getattr(ctx, self.source), ctx.orientation),
+            ctx.options.num_questions,
+            ctx.options.choices,
+            blocks=blocks
+        )
+
+
+class StudentIdStage(EngineStage):
+    """Lê a matrícula, se a folha tiver o bloco"""
+    name = "student_id"
+    requires = ("blurred", "method", "orientation", "options")
+    provides = ("student_id", "student_id_confidence")
+
+    def applies(self, options: OMROptions) -> bool:
+        return options.student_id_field is not None
+
+    def run(self, ctx: PipelineContext) -> None:
+        ctx.student_id, ctx.student_id_confidence = self.engine._read_student_id(
+            ctx.blurred, ctx.options.student_id_field, ctx.method, ctx.orientation
+        )
+
+
+class ExamVersionStage(EngineStage):
+    """Lê o tipo de prova, se a folha tiver a marcação"""
+    name = "exam_version"
+    requires = ("blurred", "method", "orientation", "options")
+    provides = ("exam_version", "exam_version_confidence")
+
+    def applies(self, options: OMROptions) -> bool:
+        return options.version_field is not None
+
+    def run(self, ctx: PipelineContext) -> None:
+        ctx.exam_version, ctx.exam_version_confidence = \
+            self.engine._read_exam_version(
+                ctx.blurred, ctx.options.version_field, ctx.method,
+                ctx.orientation
+            )
+
+
+class DebugImagesStage(EngineStage):
+    """
+    Salva as imagens de debug, quando pedidas e com armazenamento.
+
+    O ROI é destacado sobre a foto suavizada, que os estágios de leitura já
+    usam: a decodificada não precisa passar do pré-processamento.
+    """
+    name = "debug_images"
+    requires = ("blurred", "roi_img", "roi")
+    provides = ("debug_images",)
+
+    def applies(self, options: OMROptions) -> bool:
+        return options.debug and self.engine.debug_storage is not None
+
+    def run(self, ctx: PipelineContext) -> None:
+        binary = ctx.detection_binary
+        no_grid = ctx.no_grid
+        ctx.debug_images = self.engine._save_debug_images(
+            ctx.blurred, ctx.roi_img,
+            binary if binary is not None else ctx.roi_img,
+            no_grid if no_grid is not None else ctx.roi_img,
+            ctx.roi
+        )
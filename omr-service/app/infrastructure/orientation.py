@@ -0,0 +1,213 @@
+"""
+Infrastructure Layer - Sheet Orientation
+
+Detecção da orientação da folha (0, 90, 180 ou 270 graus) no ROI binário.
+
+Folhas fotografadas de lado ou de cabeça para baixo têm o ROI detectado
+normalmente (a tabela continua retangular), mas as linhas e colunas
+trocam de lugar. A orientação é decidida em uma miniatura do ROI, em
+poucos milissegundos:
+- eixo (0/180 contra 90/270): as linhas da grade esperadas pelo layout
+  caem sobre linhas de tinta só na orientação certa
+- sentido (0 contra 180): a coluna de números tem tinta em todas as
+  linhas e fica à esquerda de cada tabela
+
+Só o ROI é girado (cv2.rotate, sem interpolação), nunca a foto inteira.
+"""
+
+from typing import Callable, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.domain.value_objects import SheetLayout
+from app.infrastructure.cell_map import (
+    box_densities, grid_boxes, integral_ink, RegisteredBlock
+)
+
+
+# Lado maior da miniatura do ROI usada na decisão
+THUMBNAIL_SIZE = 400
+
+# Menor lado de célula preservado na miniatura: em folhas com muitas
+# questões a redução para, para que os números continuem legíveis
+MIN_CELL_PIXELS = 12
+
+# Vantagem mínima de encaixe da grade para trocar de eixo
+AXIS_MARGIN = 0.1
+
+# Diferença mínima de preenchimento entre a primeira e a última coluna
+# para virar a folha (a coluna de números tem tinta em todas as linhas)
+FLIP_MARGIN = 0.25
+
+# Tinta mínima no miolo de uma célula para contá-la como preenchida
+FILLED_CELL = 0.03
+
+# Giros que desfazem a orientação (a folha aparece girada no sentido horário)
+UPRIGHT_ROTATIONS: Dict[int, int] = {
+    90: cv2.ROTATE_90_COUNTERCLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_CLOCKWISE,
+}
+
+# Registra os blocos do layout em uma imagem binária (ver
+# OpenCVOMREngine._register_blocks)
+BlockRegistration = Callable[[np.ndarray, SheetLayout], Tuple[RegisteredBlock, ...]]
+
+
+def rotate_upright(image: np.ndarray, orientation: int) -> np.ndarray:
+    """Desfaz a orientação (graus no sentido horário) da imagem"""
+    if orientation == 0:
+        return image
+    return cv2.rotate(image, UPRIGHT_ROTATIONS[orientation])
+
+
+def detect_orientation(
+    roi_binary: np.ndarray,
+    layout: SheetLayout,
+    num_choices: int,
+    register: Optional[BlockRegistration] = None
+) -> int:
+    """
+    Orientação da folha no ROI binário, em graus no sentido horário.
+
+    Na dúvida (layout simétrico, folha sem coluna de números) retorna a
+    orientação mais próxima de 0.
+
+    Args:
+        roi_binary: ROI binarizado (tinta = 255), como recortado da foto
+        layout: Layout da folha, que define as grades esperadas
+        num_choices: Número de alternativas por questão
+        register: Registro dos blocos em cada orientação candidata
+            (padrão: regiões nominais do layout)
+
+    Returns:
+        0, 90, 180 ou 270
+    """
+    register = register or _nominal_blocks
+    thumbnail = _thumbnail(roi_binary, layout, num_choices)
+    blocks = register(thumbnail, layout)
+    sideways_thumbnail = rotate_upright(thumbnail, 90)
+    sideways_blocks = register(sideways_thumbnail, layout)
+
+    orientation = 0
+    if (
+        _grid_fit(sideways_thumbnail, sideways_blocks, num_choices)
+        > _grid_fit(thumbnail, blocks, num_choices) + AXIS_MARGIN
+    ):
+        orientation, thumbnail, blocks = 90, sideways_thumbnail, sideways_blocks
+
+    asymmetry = _number_column_asymmetry(thumbnail, blocks, num_choices)
+    if asymmetry is not None and asymmetry < -FLIP_MARGIN:
+        orientation += 180
+    return orientation
+
+
+def _thumbnail(
+    roi_binary: np.ndarray,
+    layout: SheetLayout,
+    num_choices: int
+) -> np.ndarray:
+    """
+    Miniatura em tons de cinza (fração de tinta por pixel, 0 a 255).
+
+    Redução por fator inteiro sobre um recorte múltiplo do fator: o
+    INTER_AREA inteiro é ~3x mais rápido que o fracionário. O fator é
+    limitado para que a menor célula (em qualquer orientação) mantenha
+    MIN_CELL_PIXELS.
+    """
+    h, w = roi_binary.shape
+    smallest_cell = min(
+        min(
+            width * block.region.width / (num_choices + block.has_number_column),
+            height * block.region.height / block.num_questions
+        )
+        for width, height in ((w, h), (h, w))  # Em pé e de lado
+        for block in layout.blocks
+    )
+    factor = min(
+        -(-max(h, w) // THUMBNAIL_SIZE), int(smallest_cell // MIN_CELL_PIXELS)
+    )
+    if factor <= 1:
+        return roi_binary
+    h, w = h // factor, w // factor
+    return cv2.resize(
+        roi_binary[:h * factor, :w * factor], (w, h), interpolation=cv2.INTER_AREA
+    )
+
+
+def _nominal_blocks(
+    image: np.ndarray,
+    layout: SheetLayout
+) -> Tuple[RegisteredBlock, ...]:
+    """Blocos nas regiões nominais do layout, sem ajuste às tabelas"""
+    h, w = image.shape
+    blocks = []
+    for block in layout.blocks:
+        rect = block.region.to_pixels(w, h)
+        blocks.append((
+            (rect.x, rect.y, rect.width, rect.height), block.first_question,
+            block.num_questions, block.has_number_column
+        ))
+    return tuple(blocks)
+
+
+def _grid_fit(
+    image: np.ndarray,
+    blocks: Tuple[RegisteredBlock, ...],
+    num_choices: int
+) -> float:
+    """
+    Encaixe da grade esperada: tinta média sobre as linhas do layout.
+
+    Cada linha esperada é procurada em uma faixa de ±2 pixels (a miniatura
+    e o registro dos blocos não são exatos). 1.0 = todas as linhas
+    esperadas estão inteiras na imagem.
+    """
+    fits = []
+    for (x, y, w, h), _, rows, has_number_column in blocks:
+        if w < 4 or h < 4:
+            continue
+        cells = image[y:y + h, x:x + w]
+        cols = num_choices + has_number_column
+        row_profile = cv2.reduce(cells, 1, cv2.REDUCE_AVG, dtype=cv2.CV_32F).ravel() / 255
+        col_profile = cv2.reduce(cells, 0, cv2.REDUCE_AVG, dtype=cv2.CV_32F).ravel() / 255
+        fits.append((
+            _line_hits(row_profile, rows) + _line_hits(col_profile, cols)
+        ) / 2)
+    return float(np.mean(fits)) if fits else 0.0
+
+
+def _line_hits(profile: np.ndarray, cells: int) -> float:
+    """Maior tinta perto de cada uma das cells + 1 linhas igualmente espaçadas"""
+    positions = np.rint(np.linspace(0, len(profile) - 1, cells + 1)).astype(np.intp)
+    # Máximo em ±2 pixels: cinco deslocamentos do perfil (bordas repetidas)
+    padded = np.pad(profile, 2, mode="edge")
+    windows = np.stack([padded[positions + shift] for shift in range(5)])
+    return float(windows.max(axis=0).mean())
+
+
+def _number_column_asymmetry(
+    image: np.ndarray,
+    blocks: Tuple[RegisteredBlock, ...],
+    num_choices: int
+) -> Optional[float]:
+    """
+    Preenchimento da primeira coluna menos o da última, nos blocos com
+    coluna de números (None se nenhum bloco tiver).
+
+    O preenchimento é a fração de linhas com tinta no miolo da célula:
+    perto de 1 na coluna de números e de 1/alternativas nas demais.
+    """
+    integral = None
+    asymmetry = []
+    for rect, _, rows, has_number_column in blocks:
+        if not has_number_column or rect[2] < 4 or rect[3] < 4:
+            continue
+        if integral is None:
+            integral = integral_ink(image)
+        boxes = grid_boxes(rect, rows, num_choices + 1, padding=0.2)
+        densities = box_densities(integral, boxes[:, [0, -1]])
+        filled = (densities > FILLED_CELL).mean(axis=0)
+        asymmetry.append(filled[0] - filled[1])
+    return float(np.mean(asymmetry)) if asymmetry else None
@@ -0,0 +1,292 @@
+"""
+Infrastructure Layer - Processing Pipeline
+
+Pipeline declarativo de estágios do motor OMR.
+
+Cada estágio declara os campos do contexto que lê (requires) e que
+produz (provides); o pipeline valida a ordem ao ser montado, mede o
+tempo de cada estágio e pode guardar o estado em uma fronteira de
+estágio (checkpoint) para que uma nova execução com a mesma imagem e os
+mesmos parâmetros retome a partir dali.
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass, field, fields
+from typing import (
+    Any, Dict, List, MutableMapping, Optional, Sequence, Tuple
+)
+
+import numpy as np
+
+from app.domain.entities import AnswerTable
+from app.domain.value_objects import OMROptions, ROI, Quadrilateral
+
+
+@dataclass
+class PipelineContext:
+    """Estado compartilhado entre os estágios de uma execução"""
+    image_data: bytes
+    options: OMROptions
+    image: Optional[np.ndarray] = None  # Decodificada em tons de cinza
+    blurred: Optional[np.ndarray] = None  # Cinza suavizada
+    detection_binary: Optional[np.ndarray] = None  # Reduzida, para o ROI
+    window: Optional[ROI] = None  # ROI ampliado, binarizado uma vez
+    roi: Optional[ROI] = None
+    corners: Optional[Quadrilateral] = None  # Cantos para corrigir a perspectiva
+    method: Optional[str] = None  # Método de binarização escolhido
+    window_binary: Optional[np.ndarray] = None
+    roi_img: Optional[np.ndarray] = None  # ROI binarizado e retificado
+    orientation: int = 0  # Giro da folha na foto (graus, sentido horário)
+    blocks: Optional[Tuple] = None  # Blocos do layout registrados no ROI
+    no_grid: Optional[np.ndarray] = None
+    answers: Optional[AnswerTable] = None
+    student_id: Optional[str] = None
+    student_id_confidence: Optional[float] = None
+    exam_version: Optional[str] = None
+    exam_version_confidence: Optional[float] = None
+    debug_images: Optional[Dict[str, str]] = None
+    timings: Dict[str, float] = field(default_factory=dict)  # ms por estágio
+
+
+CONTEXT_FIELDS = frozenset(f.name for f in fields(PipelineContext))
+INPUT_FIELDS = frozenset({"image_data", "options"})
+
+
+def image_digest(image_data: bytes) -> str:
+    """
+    Resumo dos bytes da imagem, usado como chave de cache.
+
+    SHA-256 (acelerado por instruções do processador) resume uma foto de
+    5MB em poucos milissegundos, cerca de 3x mais rápido que BLAKE2b. O
+    resumo é calculado uma vez por requisição (ImageMetadata.digest) e
+    repassado à verificação de qualidade e ao motor.
+    """
+    return hashlib.sha256(image_data).hexdigest()
+
+
+class Stage:
+    """
+    Estágio do pipeline.
+
+    Subclasses definem name, requires e provides e implementam run.
+    Estágios não devem alterar suas entradas in-place: os arrays podem
+    estar guardados no cache de checkpoint.
+    """
+    name: str = ""
+    requires: Tuple[str, ...] = ()
+    provides: Tuple[str, ...] = ()
+
+    def applies(self, options: OMROptions) -> bool:
+        """Se o estágio roda para estas opções (padrão: sempre)"""
+        return True
+
+    def cache_params(self, options: OMROptions) -> Tuple[Any, ...]:
+        """Opções das quais a saída do estágio depende (chave do cache)"""
+        return ()
+
+    def run(self, ctx: PipelineContext) -> None:
+        """Lê os campos de requires e preenche os de provides"""
+        raise NotImplementedError
+
+
+class Pipeline:
+    """Sequência validada de estágios, com tempos e cache opcional"""
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        cache: Optional[MutableMapping[str, Dict[str, Any]]] = None,
+        checkpoint: Optional[str] = None
+    ):
+        """
+        Args:
+            stages: Estágios, na ordem de execução
+            cache: Mapa onde guardar o estado no checkpoint (ex: um LRU)
+            checkpoint: Nome do estágio após o qual o estado é guardado
+
+        Raises:
+            ValueError: Se um estágio depender de campo não produzido antes,
+                declarar campo inexistente ou repetir nome
+        """
+        self.stages: Tuple[Stage, ...] = tuple(stages)
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self._validate()
+
+    @property
+    def stage_names(self) -> List[str]:
+        return [stage.name for stage in self.stages]
+
+    def without(self, *names: str) -> "Pipeline":
+        """Novo pipeline sem os estágios indicados"""
+        self._check_names(names)
+        return self._with_stages([s for s in self.stages if s.name not in names])
+
+    def replacing(self, name: str, stage: Stage) -> "Pipeline":
+        """Novo pipeline com o estágio indicado substituído"""
+        self._check_names([name])
+        return self._with_stages([
+            stage if s.name == name else s for s in self.stages
+        ])
+
+    def prepare(
+        self,
+        image_data: bytes,
+        until: str,
+        options: Optional[OMROptions] = None
+    ) -> Dict[str, Any]:
+        """
+        Executa os estágios até `until` (inclusive) e devolve o que produziram.
+
+        O estado (com os arrays somente leitura) pode ser retomado com
+        resume quantas vezes for preciso, inclusive por outro pipeline com
+        os mesmos estágios iniciais. Os estágios até `until` não devem
+        depender das opções.
+        """
+        self._check_names([until])
+        ctx = PipelineContext(image_data=image_data, options=options)
+        head = self.stages[:self.stage_names.index(until) + 1]
+        self._execute(ctx, head)
+        return self._snapshot(
+            ctx, [name for stage in head for name in stage.provides]
+        )
+
+    def resume(
+        self,
+        state: Dict[str, Any],
+        options: OMROptions,
+        after: str
+    ) -> PipelineContext:
+        """Executa os estágios aplicáveis após `after` a partir de um estado"""
+        self._check_names([after])
+        ctx = PipelineContext(image_data=b"", options=options)
+        for name, value in state.items():
+            setattr(ctx, name, value)
+        tail = self.stages[self.stage_names.index(after) + 1:]
+        self._execute(ctx, [stage for stage in tail if stage.applies(options)])
+        return ctx
+
+    def run(
+        self,
+        image_data: bytes,
+        options: OMROptions,
+        digest: Optional[str] = None
+    ) -> PipelineContext:
+        """
+        Executa os estágios aplicáveis, retomando do checkpoint se possível.
+
+        Args:
+            digest: Resumo da imagem (image_digest), se já calculado
+        """
+        ctx = PipelineContext(image_data=image_data, options=options)
+        stages = [stage for stage in self.stages if stage.applies(options)]
+        names = [stage.name for stage in stages]
+
+        start, key, boundary = 0, None, -1
+        if self.cache is not None and self.checkpoint in names:
+            boundary = names.index(self.checkpoint)
+            carried = self._carried(stages[boundary + 1:])
+            key = self._boundary_key(
+                digest or image_digest(image_data), options,
+                stages[:boundary + 1], carried
+            )
+            began = time.perf_counter()
+            snapshot = self.cache.get(key)
+            if snapshot is not None:
+                for name, value in snapshot.items():
+                    setattr(ctx, name, value)
+                start = boundary + 1
+                ctx.timings["cache"] = 1000 * (time.perf_counter() - began)
+
+        if start <= boundary:
+            self._execute(ctx, stages[start:boundary + 1])
+            self.cache[key] = self._snapshot(ctx, carried)
+            start = boundary + 1
+        self._execute(ctx, stages[start:])
+        return ctx
+
+    @staticmethod
+    def _execute(ctx: PipelineContext, stages: Sequence[Stage]):
+        """Roda os estágios em ordem, medindo o tempo de cada um"""
+        for stage in stages:
+            began = time.perf_counter()
+            stage.run(ctx)
+            ctx.timings[stage.name] = 1000 * (time.perf_counter() - began)
+
+    @staticmethod
+    def _snapshot(ctx: PipelineContext, names: Sequence[str]) -> Dict[str, Any]:
+        """Campos do contexto para reuso, com os arrays somente leitura"""
+        snapshot = {name: getattr(ctx, name) for name in names}
+        for value in snapshot.values():
+            if isinstance(value, np.ndarray):
+                # Compartilhado com as próximas execuções
+                value.setflags(write=False)
+        return snapshot
+
+    def _validate(self):
+        available = set(INPUT_FIELDS)
+        seen = set()
+        for stage in self.stages:
+            if not stage.name or stage.name in seen:
+                raise ValueError(f"Nome de estágio inválido ou repetido: '{stage.name}'")
+            seen.add(stage.name)
+
+            unknown = set(stage.requires + stage.provides) - CONTEXT_FIELDS
+            if unknown:
+                raise ValueError(
+                    f"Estágio '{stage.name}' declara campos inexistentes: "
+                    f"{sorted(unknown)}"
+                )
+            missing = set(stage.requires) - available
+            if missing:
+                raise ValueError(
+                    f"Estágio '{stage.name}' depende de {sorted(missing)}, "
+                    "não produzidos por estágios anteriores"
+                )
+            available.update(stage.provides)
+
+        if self.checkpoint is not None and self.checkpoint not in seen:
+            raise ValueError(f"Checkpoint '{self.checkpoint}' não é um estágio")
+
+    def _check_names(self, names: Sequence[str]):
+        unknown = set(names) - set(self.stage_names)
+        if unknown:
+            raise ValueError(f"Estágios inexistentes: {sorted(unknown)}")
+
+    def _with_stages(self, stages: Sequence[Stage]) -> "Pipeline":
+        checkpoint = self.checkpoint
+        if checkpoint not in [s.name for s in stages]:
+            checkpoint = None
+        return Pipeline(stages, cache=self.cache, checkpoint=checkpoint)
+
+    @staticmethod
+    def _carried(later: Sequence[Stage]) -> List[str]:
+        """
+        Campos lidos pelos estágios seguintes e não produzidos por eles.
+
+        Só os estágios que rodam nesta execução contam: a foto suavizada,
+        do tamanho da original, só é guardada quando algum deles a lê (ex:
+        matrícula). Os campos entram na chave do cache, e uma execução que
+        precisa de outros guarda o próprio estado.
+        """
+        carried, produced = [], set()
+        for stage in later:
+            for name in stage.requires:
+                if name not in produced and name not in carried:
+                    carried.append(name)
+            produced.update(stage.provides)
+        return [name for name in carried if name not in INPUT_FIELDS]
+
+    @staticmethod
+    def _boundary_key(
+        digest: str,
+        options: OMROptions,
+        stages: Sequence[Stage],
+        carried: Sequence[str]
+    ) -> str:
+        """Hash da imagem + parâmetros de cada estágio + campos guardados"""
+        params = tuple(
+            (s.name, type(s).__name__, s.cache_params(options)) for s in stages
+        )
+        return f"{digest}:{params!r}:{tuple(carried)!r}"
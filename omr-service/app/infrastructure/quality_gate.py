@@ -0,0 +1,193 @@
+"""
+Infrastructure Layer - Image Quality Gate
+
+Verificação rápida de qualidade antes do pipeline OMR completo.
+Todas as medidas são feitas em uma miniatura em escala de cinza,
+decodificada já reduzida, e custam poucos milissegundos por imagem.
+As avaliações recentes ficam guardadas pelo resumo da imagem, para que
+uma reanálise da mesma foto não repita a verificação.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from app.application.interfaces import IImageQualityGate
+from app.domain.value_objects import ImageQuality
+from app.infrastructure.pipeline import image_digest
+
+
+# Lado maior da miniatura analisada (os limites abaixo são calibrados nela)
+THUMBNAIL_SIZE = 400
+
+
+class ImageQualityGate(IImageQualityGate):
+    """Rejeita fotos desfocadas, escuras, com reflexo ou sem gabarito visível"""
+
+    def __init__(
+        self,
+        min_sharpness: float = 60.0,
+        min_brightness: float = 0.10,
+        min_contrast: float = 0.08,
+        max_glare: float = 0.05,
+        min_grid: float = 0.02,
+        max_border: float = 0.01,
+        memo_size: int = 64
+    ):
+        self.min_sharpness = min_sharpness
+        self.min_brightness = min_brightness
+        self.min_contrast = min_contrast
+        self.max_glare = max_glare
+        self.min_grid = min_grid
+        self.max_border = max_border
+        self.memo_size = memo_size
+        self._memo: "OrderedDict[str, ImageQuality]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def assess(self, image_data: bytes, digest: Optional[str] = None) -> ImageQuality:
+        """
+        Mede a qualidade da imagem em uma miniatura.
+
+        Indicadores:
+        - Nitidez: variância do Laplaciano
+        - Exposição: luminância média e faixa entre percentis 5 e 95
+        - Reflexo: pixels saturados bem acima do nível do papel
+        - Grade: pixels em linhas longas e linhas cruzando a borda (corte)
+
+        As avaliações são lembradas pelo resumo da imagem (digest, calculado
+        aqui se não vier do chamador).
+        """
+        digest = digest or image_digest(image_data)
+        with self._lock:
+            quality = self._memo.get(digest)
+            if quality is not None:
+                self._memo.move_to_end(digest)
+                return quality
+
+        quality = self._measure(image_data)
+        with self._lock:
+            self._memo[digest] = quality
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return quality
+
+    def _measure(self, image_data: bytes) -> ImageQuality:
+        """Calcula os indicadores na miniatura"""
+        thumb = self._load_thumbnail(image_data)
+
+        sharpness = float(cv2.Laplacian(thumb, cv2.CV_64F).var())
+        p5, p50, p95 = np.percentile(thumb, (5, 50, 95))
+        brightness = float(thumb.mean()) / 255
+        contrast = float(p95 - p5) / 255
+
+        saturated = (thumb >= 250) & (thumb >= p50 + 25)
+        glare = int(np.count_nonzero(saturated)) / thumb.size
+
+        grid, border = self._measure_grid(thumb)
+
+        metrics = dict(
+            sharpness=round(sharpness, 1),
+            brightness=round(brightness, 3),
+            contrast=round(contrast, 3),
+            glare=round(glare, 4),
+            grid=round(grid, 4),
+            border=round(border, 4)
+        )
+        return ImageQuality(
+            **metrics,
+            rejection_reason=self._rejection_reason(**metrics)
+        )
+
+    def _load_thumbnail(self, image_data: bytes) -> np.ndarray:
+        """
+        Decodifica a imagem já reduzida (JPEG usa escala na DCT) e
+        normaliza o lado maior para THUMBNAIL_SIZE.
+        """
+        try:
+            width, height = Image.open(io.BytesIO(image_data)).size
+        except Exception:
+            raise ValueError("Erro ao decodificar imagem")
+
+        flag = cv2.IMREAD_GRAYSCALE
+        for factor, reduced in (
+            (8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+            (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+            (2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+        ):
+            if max(width, height) // factor >= THUMBNAIL_SIZE:
+                flag = reduced
+                break
+
+        thumb = cv2.imdecode(np.frombuffer(image_data, np.uint8), flag)
+        if thumb is None:
+            raise ValueError("Erro ao decodificar imagem")
+
+        scale = THUMBNAIL_SIZE / max(thumb.shape)
+        if scale != 1:
+            interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+            thumb = cv2.resize(
+                thumb, None, fx=scale, fy=scale, interpolation=interpolation
+            )
+        return thumb
+
+    def _measure_grid(self, thumb: np.ndarray) -> Tuple[float, float]:
+        """
+        Mede a presença de grade e se ela atravessa a borda da foto.
+
+        Returns:
+            (fração de pixels em linhas longas, fração da borda cruzada)
+        """
+        h, w = thumb.shape
+        binary = cv2.adaptiveThreshold(
+            thumb, 255,
+            cv2.ADAPTIVE_THRESH_MEAN_C,
+            cv2.THRESH_BINARY_INV,
+            15, 10
+        )
+        horizontal = cv2.morphologyEx(
+            binary, cv2.MORPH_OPEN,
+            cv2.getStructuringElement(cv2.MORPH_RECT, (w // 8, 1))
+        )
+        vertical = cv2.morphologyEx(
+            binary, cv2.MORPH_OPEN,
+            cv2.getStructuringElement(cv2.MORPH_RECT, (1, h // 8))
+        )
+
+        grid = (cv2.countNonZero(horizontal) + cv2.countNonZero(vertical)) / thumb.size
+
+        # Linhas verticais tocando topo/base ou horizontais tocando as laterais
+        crossings = (
+            cv2.countNonZero(vertical[0]) + cv2.countNonZero(vertical[-1])
+            + cv2.countNonZero(horizontal[:, 0]) + cv2.countNonZero(horizontal[:, -1])
+        )
+        border = crossings / (2 * (h + w))
+        return grid, border
+
+    def _rejection_reason(
+        self,
+        sharpness: float,
+        brightness: float,
+        contrast: float,
+        glare: float,
+        grid: float,
+        border: float
+    ) -> Optional[str]:
+        """Retorna o primeiro motivo de rejeição encontrado (ou None)"""
+        if brightness < self.min_brightness:
+            return "imagem muito escura"
+        if contrast < self.min_contrast:
+            return "imagem sem contraste (superexposta ou em branco)"
+        if sharpness < self.min_sharpness:
+            return "imagem desfocada"
+        if glare > self.max_glare:
+            return "reflexo sobre a folha"
+        if grid < self.min_grid:
+            return "gabarito não encontrado na foto"
+        if border > self.max_border:
+            return "gabarito cortado na foto"
+        return None
@@ -0,0 +1,273 @@
+"""
+Infrastructure Layer - Result Store
+
+Implementação concreta da interface IResultRepository em SQLite.
+
+Cada correção vira uma linha em `corrections` e uma linha por questão em
+`question_outcomes` (alternativa marcada e resultado). As estatísticas da
+turma são agregações SQL sobre índices que cobrem as consultas, sem reler
+o JSON das respostas.
+
+Para a análise de itens, cada correção guarda também as marcações e o
+gabarito como texto compacto (um caractere por número de questão), de
+modo que a matriz N × Q da turma é montada com um único np.frombuffer.
+"""
+
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from app.application.interfaces import IResultRepository
+from app.domain.entities import (
+    AnswerKey, ExamCorrection, QuestionOutcome, ClassSummary,
+    QuestionStatistics, ChoiceStatistics, DistractorAnalysis
+)
+from app.domain.item_analysis import ResponseMatrix, BLANK_MARK, VOID_MARK
+from app.infrastructure.answer_key_store import DEFAULT_DB_PATH
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS corrections (
+    id INTEGER PRIMARY KEY,
+    answer_key_id TEXT NOT NULL,
+    student_id TEXT,
+    exam_version TEXT,
+    correct_count INTEGER NOT NULL,
+    score REAL NOT NULL,
+    percentage REAL NOT NULL,
+    passed INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    responses TEXT,  -- Marcações compactas (ver _compact)
+    key_answers TEXT  -- Gabarito compacto
+);
+CREATE INDEX IF NOT EXISTS idx_corrections_key
+    ON corrections (answer_key_id, percentage, score, passed, student_id);
+CREATE INDEX IF NOT EXISTS idx_corrections_student
+    ON corrections (student_id, created_at);
+
+CREATE TABLE IF NOT EXISTS question_outcomes (
+    correction_id INTEGER NOT NULL REFERENCES corrections (id) ON DELETE CASCADE,
+    answer_key_id TEXT NOT NULL,  -- Repetido para agrupar sem JOIN
+    question INTEGER NOT NULL,
+    correct_answer TEXT NOT NULL,
+    marked TEXT,
+    outcome TEXT NOT NULL,
+    PRIMARY KEY (correction_id, question)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_outcomes_key_question
+    ON question_outcomes (answer_key_id, question, marked, outcome, correct_answer);
+"""
+
+CORRECT = QuestionOutcome.CORRECT.value
+WRONG = QuestionOutcome.WRONG.value
+BLANK = QuestionOutcome.BLANK.value
+VOID = QuestionOutcome.VOID.value
+
+# Caracteres das marcações compactas (posição i = questão i + 1)
+ABSENT_CHAR = " "  # Questão fora do gabarito
+BLANK_CHAR = "."
+VOID_CHAR = "*"
+
+
+class SqliteResultRepository(IResultRepository):
+    """Histórico de correções em SQLite com consultas agregadas da turma"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            # WAL: leituras das estatísticas não bloqueiam as correções
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {
+                row[1] for row in conn.execute("PRAGMA table_info(corrections)")
+            }
+            for column in ("responses", "key_answers"):
+                if column not in columns:  # Bancos criados antes da coluna
+                    conn.execute(f"ALTER TABLE corrections ADD COLUMN {column} TEXT")
+
+    def save_many(
+        self, corrections: Sequence[Tuple[ExamCorrection, AnswerKey]]
+    ) -> List[int]:
+        """Registra as correções e seus resultados por questão"""
+        now = time.time()
+        ids = []
+        with closing(self._connect()) as conn, conn:
+            for correction, answer_key in corrections:
+                outcomes = correction.question_outcomes(answer_key)
+                responses, key_answers = _compact(outcomes, answer_key)
+                cursor = conn.execute(
+                    "INSERT INTO corrections (answer_key_id, student_id, "
+                    "exam_version, correct_count, score, percentage, passed, "
+                    "created_at, responses, key_answers) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (correction.answer_key_id, correction.student_id,
+                     correction.exam_version, correction.correct_count,
+                     correction.score, correction.percentage,
+                     int(correction.passed), now, responses, key_answers)
+                )
+                correction_id = cursor.lastrowid
+                correct_answers = {
+                    q.number: q.correct_answer for q in answer_key.questions
+                }
+                conn.executemany(
+                    "INSERT INTO question_outcomes (correction_id, answer_key_id, "
+                    "question, correct_answer, marked, outcome) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (correction_id, correction.answer_key_id, number,
+                         correct_answers[number], marked, outcome.value)
+                        for number, marked, outcome in outcomes
+                    ]
+                )
+                ids.append(correction_id)
+        return ids
+
+    def class_summary(self, answer_key_id: str) -> ClassSummary:
+        """Médias calculadas pelo SQLite sobre o índice do gabarito"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT student_id), AVG(score), "
+                "AVG(percentage), AVG(passed), MIN(percentage), MAX(percentage) "
+                "FROM corrections WHERE answer_key_id = ?",
+                (answer_key_id,)
+            ).fetchone()
+
+        count, students, score, percentage, pass_rate, lowest, highest = row
+        return ClassSummary(
+            answer_key_id=answer_key_id,
+            exam_count=count,
+            student_count=students,
+            average_score=_round(score),
+            average_percentage=_round(percentage),
+            pass_rate=_round(pass_rate, 4),
+            min_percentage=lowest,
+            max_percentage=highest
+        )
+
+    def question_statistics(self, answer_key_id: str) -> List[QuestionStatistics]:
+        """Contagens por resultado, agrupadas por questão"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT question, MAX(correct_answer), COUNT(*), "
+                "SUM(outcome = ?), SUM(outcome = ?), SUM(outcome = ?), "
+                "SUM(outcome = ?) "
+                "FROM question_outcomes WHERE answer_key_id = ? "
+                "GROUP BY question ORDER BY question",
+                (CORRECT, WRONG, BLANK, VOID, answer_key_id)
+            ).fetchall()
+
+        return [
+            QuestionStatistics(
+                question_number=question, correct_answer=correct_answer,
+                total=total, correct=correct, wrong=wrong, blank=blank, void=void
+            )
+            for question, correct_answer, total, correct, wrong, blank, void in rows
+        ]
+
+    def distractor_analysis(self, answer_key_id: str) -> List[DistractorAnalysis]:
+        """Escolhas por alternativa e percentual médio de quem as marcou"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT o.question, MAX(o.correct_answer), o.marked, COUNT(*), "
+                "AVG(c.percentage) "
+                "FROM question_outcomes o JOIN corrections c "
+                "ON c.id = o.correction_id "
+                "WHERE o.answer_key_id = ? AND o.outcome IN (?, ?) "
+                "GROUP BY o.question, o.marked ORDER BY o.question, o.marked",
+                (answer_key_id, CORRECT, WRONG)
+            ).fetchall()
+
+        analyses: List[DistractorAnalysis] = []
+        for question, correct_answer, marked, count, percentage in rows:
+            if not analyses or analyses[-1].question_number != question:
+                analyses.append(DistractorAnalysis(question, correct_answer))
+            analyses[-1].choices.append(ChoiceStatistics(
+                choice=marked, count=count, rate=0.0,
+                average_percentage=_round(percentage)
+            ))
+
+        for analysis in analyses:
+            answered = sum(choice.count for choice in analysis.choices)
+            for choice in analysis.choices:
+                choice.rate = round(choice.count / answered, 4)
+        return analyses
+
+    def response_matrix(self, answer_key_id: str) -> ResponseMatrix:
+        """
+        Matriz de respostas da turma, com o gabarito da correção mais recente.
+
+        Usar o gabarito mais recente recorrige as provas antigas caso o
+        gabarito tenha sido alterado (por exemplo, para corrigir um erro).
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT responses, key_answers FROM corrections "
+                "WHERE answer_key_id = ? AND responses IS NOT NULL ORDER BY id",
+                (answer_key_id,)
+            ).fetchall()
+
+        if not rows:
+            return ResponseMatrix(answer_key_id, [], (), [], np.empty((0, 0)))
+
+        key_answers = rows[-1][1]
+        width = max(len(key_answers), max(len(r) for r, _ in rows))
+        columns = [i for i, c in enumerate(key_answers) if c != ABSENT_CHAR]
+
+        # Um code point por questão, todas as provas com a mesma largura
+        text = "".join(r.ljust(width) for r, _ in rows)
+        codes = np.frombuffer(text.encode("utf-32-le"), "<u4")
+        codes = codes.reshape(len(rows), width)[:, columns]
+
+        # Tradução caractere -> código da matriz, pela posição no alfabeto usado
+        symbols = sorted(set(text) | set(key_answers) | set("ABCDE"))
+        choices = tuple(
+            c for c in symbols if c not in (ABSENT_CHAR, BLANK_CHAR, VOID_CHAR)
+        )
+        translation = np.array([
+            VOID_MARK if c == VOID_CHAR
+            else choices.index(c) if c in choices
+            else BLANK_MARK
+            for c in symbols
+        ], np.int8)
+        positions = np.searchsorted(
+            np.array([ord(c) for c in symbols], np.uint32), codes
+        )
+
+        return ResponseMatrix(
+            answer_key_id=answer_key_id,
+            question_numbers=[i + 1 for i in columns],
+            choices=choices,
+            correct_index=[choices.index(key_answers[i]) for i in columns],
+            marks=translation[positions]
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+
+def _compact(outcomes: list, answer_key: AnswerKey) -> Tuple[str, str]:
+    """Marcações e gabarito como texto, um caractere por número de questão"""
+    size = max((q.number for q in answer_key.questions), default=0)
+    responses = [ABSENT_CHAR] * size
+    key_answers = [ABSENT_CHAR] * size
+    for question in answer_key.questions:
+        key_answers[question.number - 1] = question.correct_answer
+    for number, marked, outcome in outcomes:
+        if outcome == QuestionOutcome.BLANK:
+            responses[number - 1] = BLANK_CHAR
+        elif outcome == QuestionOutcome.VOID:
+            responses[number - 1] = VOID_CHAR
+        else:
+            responses[number - 1] = marked
+    return "".join(responses), "".join(key_answers)
+
+
+def _round(value, digits: int = 2):
+    """Arredonda agregados do SQLite (None quando não há linhas)"""
+    return None if value is None else round(value, digits)
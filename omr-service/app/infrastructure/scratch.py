@@ -0,0 +1,75 @@
+"""
+Infrastructure Layer - Scratch Buffers
+
+Buffers de trabalho reutilizáveis, um conjunto por thread.
+
+Os temporários do pipeline (cinza antes da suavização, linhas da grade,
+superfície de limiar, imagem integral) têm o tamanho da foto ou do ROI e
+eram alocados e liberados a cada folha. Aqui cada thread guarda um buffer
+por nome, que cresce até o maior tamanho pedido e é reaproveitado nas
+folhas seguintes como saída (dst) das funções do OpenCV.
+
+Só temporários usam estes buffers: o que fica no contexto do pipeline
+(e pode ir para o cache de estágios ou uma sessão) é sempre alocado.
+"""
+
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+# Limite por thread: acima dele o pedido recebe um array novo (não guardado)
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+
+class ScratchBuffers:
+    """Buffers nomeados por thread, reaproveitados entre execuções"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            max_bytes: Memória guardada por thread (0 desativa o reuso)
+        """
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+    def get(
+        self,
+        name: str,
+        shape: Tuple[int, ...],
+        dtype: type = np.uint8
+    ) -> np.ndarray:
+        """
+        Array contíguo com o formato pedido, com conteúdo indefinido.
+
+        O mesmo nome devolve a mesma memória na próxima chamada da thread:
+        o array só vale até o próximo get com esse nome.
+        """
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        buffers = self._buffers()
+
+        backing = buffers.get(name)
+        if backing is None or backing.nbytes < nbytes:
+            retained = self.size_bytes - (backing.nbytes if backing is not None else 0)
+            if retained + nbytes > self.max_bytes:
+                return np.empty(shape, dtype)  # Sem espaço: temporário comum
+            backing = np.empty(nbytes, np.uint8)
+            buffers[name] = backing
+        return backing[:nbytes].view(dtype).reshape(shape)
+
+    @property
+    def size_bytes(self) -> int:
+        """Memória guardada pela thread atual"""
+        return sum(b.nbytes for b in self._buffers().values())
+
+    def clear(self):
+        """Libera os buffers da thread atual"""
+        self._buffers().clear()
+
+    def _buffers(self) -> Dict[str, np.ndarray]:
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+        return buffers
@@ -0,0 +1,289 @@
+"""
+Infrastructure Layer - Shared Stage Cache
+
+Cache de estágios compartilhado entre os workers de uma máquina.
+
+Com vários workers do uvicorn, o StageCache de cada processo é frio para
+as requisições que caem em outro worker. Aqui as entradas ficam em um
+diretório local (por padrão em /dev/shm, memória compartilhada):
+- cada array do snapshot em um arquivo .npy, lido com memory-map
+  (somente leitura, sem cópia; as páginas são as mesmas para todos os
+  processos)
+- os demais valores (blocos, método, ROI, resultados) serializados no
+  índice, um banco SQLite em WAL com tamanho, expiração e último uso
+
+A interface é a mesma do StageCache (MutableMapping): entradas expiram
+após um TTL e, acima do limite de bytes ou de entradas, as menos usadas
+saem primeiro.
+
+Os valores do índice são desserializados com pickle, então quem escreve
+no diretório executa código no serviço. O diretório padrão leva o uid no
+nome, e qualquer diretório só é usado se for do usuário do serviço, sem
+permissões para grupo e outros, e se nenhum diretório acima dele puder
+ser alterado por outro usuário (salvo os de sticky bit, como /dev/shm).
+
+O /dev/shm de um container Docker tem 64MB por padrão: uma escrita que não
+cabe (ENOSPC) é descartada e vira uma falta no cache, sem falhar a leitura.
+"""
+
+import os
+import pickle
+import sqlite3
+import stat
+import tempfile
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, MutableMapping, Optional
+
+import numpy as np
+
+from app.infrastructure.stage_cache import (
+    DEFAULT_MAX_BYTES, DEFAULT_TTL_SECONDS, Snapshot, snapshot_bytes
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,  -- Prefixo dos arquivos .npy da entrada
+    size INTEGER NOT NULL,  -- Bytes dos arrays e dos valores em bytes
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    meta BLOB NOT NULL  -- pickle: {"arrays": [...], "values": {...}}
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+"""
+
+# Arquivos sem entrada no índice mais antigos que isto são restos de uma
+# escrita interrompida; os mais novos podem ser de outro worker escrevendo
+ORPHAN_GRACE_SECONDS = 60.0
+
+
+def default_directory() -> Path:
+    """Memória compartilhada quando disponível (tmpfs), senão o temporário"""
+    base = Path("/dev/shm")
+    if not base.is_dir():
+        base = Path(tempfile.gettempdir())
+    return base / f"omr-stage-cache-{os.getuid()}"
+
+
+def ensure_private_directory(directory: Path):
+    """
+    Cria o diretório (modo 0700) e confere que só o usuário do serviço o altera.
+
+    Raises:
+        PermissionError: Se o diretório for de outro usuário, tiver
+            permissões para grupo ou outros, não for um diretório (ex: link
+            simbólico) ou estiver sob um diretório que outro usuário altera
+    """
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    uid = os.getuid()
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != uid or info.st_mode & 0o077:
+        raise PermissionError(
+            f"Diretório do cache inseguro: {directory} (esperado: do usuário "
+            f"{uid}, modo 0700)"
+        )
+    for parent in directory.resolve().parents:
+        info = os.stat(parent)
+        writable_by_others = info.st_mode & 0o022 and not info.st_mode & stat.S_ISVTX
+        if info.st_uid not in (0, uid) or writable_by_others:
+            raise PermissionError(
+                f"Diretório do cache sob diretório alterável por outros: {parent}"
+            )
+
+
+class SharedStageCache(MutableMapping):
+    """Cache de snapshots em arquivos mapeados, com índice SQLite comum"""
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_entries: int = 256,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            directory: Diretório do cache, o mesmo para todos os workers
+            clock: Relógio comum aos processos (tempo de parede)
+
+        Raises:
+            PermissionError: Se o diretório puder ser alterado por outro
+                usuário (ver ensure_private_directory)
+        """
+        self.directory = Path(directory or default_directory())
+        ensure_private_directory(self.directory)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.clock = clock
+        self.db_path = self.directory / "index.sqlite3"
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._remove_orphans(conn)
+
+    @property
+    def size_bytes(self) -> int:
+        """Bytes guardados (ver snapshot_bytes), todas as entradas e workers"""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
+
+    def __getitem__(self, key: str) -> Snapshot:
+        now = self.clock()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT name, expires_at, meta FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            expired = row is not None and row[1] <= now
+            if expired:
+                self._delete(conn, key, row[0])
+            elif row is not None:
+                conn.execute(
+                    "UPDATE entries SET last_used = ? WHERE key = ?", (now, key)
+                )
+        if row is None or expired:
+            raise KeyError(key)
+
+        name, _, meta = row
+        meta = pickle.loads(meta)
+        snapshot: Dict[str, Any] = dict(meta["values"])
+        try:
+            for field in meta["arrays"]:
+                # Somente leitura: as páginas são compartilhadas
+                snapshot[field] = np.load(self._path(name, field), mmap_mode="r")
+        except FileNotFoundError:
+            raise KeyError(key)  # Removida por outro worker entre as leituras
+        return snapshot
+
+    def __setitem__(self, key: str, snapshot: Snapshot):
+        """
+        Guarda o snapshot; sem espaço no diretório (ENOSPC), não guarda.
+
+        Uma escrita que falha remove os arquivos já escritos e é tratada
+        como se a entrada tivesse saído do cache: a próxima leitura refaz.
+        """
+        arrays = {
+            f: v for f, v in snapshot.items()
+            if isinstance(v, np.ndarray) and v.size  # Vazio não é mapeável
+        }
+        values = {f: v for f, v in snapshot.items() if f not in arrays}
+        size = snapshot_bytes(snapshot)
+        if size > self.max_bytes:
+            return  # Maior que o cache inteiro: não guardar
+
+        name = uuid.uuid4().hex
+        try:
+            for field, value in arrays.items():
+                # Escreve em temporário e renomeia: leitores nunca veem arquivo parcial
+                partial = self._path(name, field).with_suffix(".tmp")
+                with open(partial, "wb") as file:
+                    np.save(file, value, allow_pickle=False)
+                os.replace(partial, self._path(name, field))
+            meta = pickle.dumps({"arrays": list(arrays), "values": values})
+
+            now = self.clock()
+            with closing(self._connect()) as conn, conn:
+                previous = conn.execute(
+                    "SELECT name FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if previous is not None:
+                    self._delete(conn, key, previous[0])
+                conn.execute(
+                    "INSERT INTO entries (key, name, size, expires_at, last_used, meta) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, name, size, now + self.ttl_seconds, now, meta)
+                )
+                self._evict(conn, now)
+        except (OSError, sqlite3.OperationalError):
+            # Sem espaço (ENOSPC) ou banco cheio: a entrada não é guardada
+            self._unlink_files(name)
+
+    def __delitem__(self, key: str):
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT name FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(key)
+            self._delete(conn, key, row[0])
+
+    def __iter__(self) -> Iterator[str]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT key FROM entries WHERE expires_at > ?", (self.clock(),)
+            ).fetchall()
+        return iter([key for key, in rows])
+
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE expires_at > ?", (self.clock(),)
+            ).fetchone()[0]
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            for key, name in conn.execute("SELECT key, name FROM entries").fetchall():
+                self._delete(conn, key, name)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _path(self, name: str, field: str) -> Path:
+        return self.directory / f"{name}.{field}.npy"
+
+    def _delete(self, conn: sqlite3.Connection, key: str, name: str):
+        """Remove a entrada e os seus arquivos (mapeamentos abertos seguem válidos)"""
+        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._unlink_files(name)
+
+    def _unlink_files(self, name: str):
+        """Remove os arquivos de uma entrada, inclusive os temporários"""
+        for path in self.directory.glob(f"{name}.*"):
+            path.unlink(missing_ok=True)
+
+    def _remove_orphans(self, conn: sqlite3.Connection):
+        """
+        Remove arquivos sem entrada no índice (processo morto entre a
+        escrita dos arrays e a inserção no índice).
+        """
+        names = {name for name, in conn.execute("SELECT name FROM entries")}
+        stale = time.time() - ORPHAN_GRACE_SECONDS
+        for path in self.directory.iterdir():
+            if path.suffix not in (".npy", ".tmp"):
+                continue
+            if path.name.split(".", 1)[0] in names:
+                continue
+            try:
+                if path.stat().st_mtime < stale:
+                    path.unlink()
+            except FileNotFoundError:
+                pass  # Removido por outro worker
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Remove expiradas e, depois, as menos usadas até caber nos limites"""
+        for key, name in conn.execute(
+            "SELECT key, name FROM entries WHERE expires_at <= ?", (now,)
+        ).fetchall():
+            self._delete(conn, key, name)
+
+        total, count = conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries"
+        ).fetchone()
+        if total <= self.max_bytes and count <= self.max_entries:
+            return
+        for key, name, size in conn.execute(
+            "SELECT key, name, size FROM entries ORDER BY last_used"
+        ).fetchall():
+            if total <= self.max_bytes and count <= self.max_entries:
+                break
+            self._delete(conn, key, name)
+            total -= size
+            count -= 1
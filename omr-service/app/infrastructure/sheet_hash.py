@@ -0,0 +1,385 @@
+"""
+Infrastructure Layer - Sheet Hash
+
+Hash perceptual das folhas de um lote, para achar a mesma folha enviada
+duas vezes (fotografada de novo, escaneada nas duas bandejas).
+
+O hash é tirado do ROI retificado e em pé logo após o registro dos
+blocos, antes da remoção da grade e da análise das células (as etapas
+caras). Ele tem duas partes:
+- as células: o ROI é reduzido até células de MIN_CELL_PIXELS, a grade é
+  removida na miniatura e cada célula (entre as linhas da grade achadas
+  na própria miniatura) vira a sua densidade de tinta e um bit
+- o cabeçalho: a faixa da foto logo acima da tabela (nome, turma),
+  levada ao ROI normalizado pelos cantos do gabarito e reduzida a uma
+  miniatura em tons de cinza
+Fotos diferentes da mesma folha mudam o enquadramento e o ruído, não as
+células marcadas nem o que está escrito no cabeçalho. Alunos diferentes
+com as mesmas respostas (comum em provas curtas) só se distinguem pelo
+cabeçalho ou pela matrícula: um nome escrito à mão separa as folhas, um
+cabeçalho em branco não. Por isso a matrícula e o tipo de prova, quando a
+folha os tem, também entram no hash, e quem usa o índice só deve tratar
+como cópia certa uma folha com a matrícula lida (ver
+OpenCVOMREngine.process_unique).
+
+O índice compara os bits (distância de Hamming, um XOR vetorizado sobre
+todas as folhas já vistas) e confirma pela maior diferença de densidade
+entre as células, relativa ao nível das marcações, e pelos pixels do
+cabeçalho. Ele é compartilhado pelas leituras simultâneas de um lote (ver
+SheetHashIndex.claim).
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from app.application.interfaces import ISheetIndex
+from app.infrastructure.cell_map import box_densities, RegisteredBlock
+from app.infrastructure.orientation import rotate_upright
+
+
+# Menor lado de célula na miniatura (pixels)
+MIN_CELL_PIXELS = 12
+
+# Margem interna das células, como fração do lado (fora das linhas)
+HASH_PADDING = 0.1
+
+# Uma linha da grade tem ao menos esta fração da tinta da linha mais forte
+LINE_SHARE = 0.5
+
+# Densidade mínima de uma célula com tinta
+MIN_INK = 0.03
+
+# Uma célula tem tinta acima desta fração do nível das marcações
+INK_SHARE = 0.5
+
+# Bits diferentes tolerados entre duplicatas (células perto do limiar)
+MAX_FLIPS = 2
+
+# Maior diferença de densidade entre duplicatas, com as densidades de
+# cada folha relativas ao seu nível das marcações (a escala da foto muda a
+# espessura dos traços): uma resposta a mais ou a menos muda uma célula
+# inteira
+MAX_DENSITY_DELTA = 0.4
+
+# Faixa do cabeçalho (nome, turma) logo acima da tabela, como fração da
+# altura do ROI
+HEADER_SHARE = 0.1
+
+# Maior lado do ROI na redução da foto antes de retificar a faixa (a
+# miniatura sai por média de áreas e não perde os traços finos)
+HEADER_WORK_SIDE = 512
+
+# Miniatura da faixa do cabeçalho (largura, altura)
+HEADER_SIZE = (128, 12)
+
+# Maior diferença de tinta entre cabeçalhos da mesma folha; fotos da mesma
+# folha ficam abaixo de 0.1 e nomes diferentes passam de 0.35 em algum pixel
+HEADER_INK_DELTA = 0.2
+
+# Fração mínima da faixa vista nas duas fotos para comparar os cabeçalhos
+MIN_HEADER_OVERLAP = 0.5
+
+# Faixa do cabeçalho no quadrado unitário do ROI (u para a direita, v para
+# baixo, na foto) por orientação da folha: o lado de cima da folha em pé
+HEADER_BANDS = {
+    0: ((0, 1), (-HEADER_SHARE, 0)),
+    90: ((1, 1 + HEADER_SHARE), (0, 1)),
+    180: ((0, 1), (1, 1 + HEADER_SHARE)),
+    270: ((-HEADER_SHARE, 0), (0, 1)),
+}
+
+
+@dataclass(frozen=True)
+class SheetHash:
+    """Hash perceptual de uma folha: bits e densidades das células"""
+    bits: np.ndarray  # (B,) bits empacotados (np.packbits), uint8
+    densities: np.ndarray  # (células,) densidade na miniatura
+    mark_level: float  # Densidade típica das marcações da folha
+    identity: Tuple[Optional[str], ...] = ()  # Matrícula, tipo de prova
+    header: Optional[np.ndarray] = None  # Tinta do cabeçalho (NaN fora da foto)
+
+
+def sheet_hash(
+    roi_img: np.ndarray,
+    blocks: Tuple[RegisteredBlock, ...],
+    num_choices: int,
+    identity: Tuple[Optional[str], ...] = (),
+    header: Optional[np.ndarray] = None
+) -> SheetHash:
+    """
+    Calcula o hash da folha no ROI binário, antes da remoção da grade.
+
+    Args:
+        roi_img: ROI binarizado, retificado e em pé (tinta = 255)
+        blocks: Blocos registrados no ROI em pé
+        num_choices: Número de alternativas por questão
+        identity: Campos lidos fora da tabela que também distinguem as
+            folhas (matrícula, tipo de prova)
+        header: Tinta do cabeçalho (ver header_ink)
+
+    Returns:
+        SheetHash da folha
+    """
+    smallest_cell = min(
+        min(w / (num_choices + has_number_column), h / rows)
+        for (_, _, w, h), _, rows, has_number_column in blocks
+    )
+    factor = max(1, int(smallest_cell // MIN_CELL_PIXELS))
+    h, w = roi_img.shape[0] // factor, roi_img.shape[1] // factor
+    small = cv2.resize(
+        roi_img[:h * factor, :w * factor], (w, h), interpolation=cv2.INTER_AREA
+    )
+    densities = []
+    for (x, y, bw, bh), _, rows, has_number_column in blocks:
+        x, y, bw, bh = x // factor, y // factor, bw // factor, bh // factor
+        cols = num_choices + has_number_column
+        cell_w, cell_h = bw / cols, bh / rows
+
+        # Bloco com meia célula de folga: as bordas da tabela entram
+        top, left = max(0, int(y - cell_h / 2)), max(0, int(x - cell_w / 2))
+        bottom, right = min(h, int(y + bh + cell_h / 2)), min(w, int(x + bw + cell_w / 2))
+        region = small[top:bottom, left:right]
+
+        # Remoção da grade na miniatura (como OpenCVOMREngine._remove_grid)
+        horizontal = cv2.morphologyEx(region, cv2.MORPH_OPEN, cv2.getStructuringElement(
+            cv2.MORPH_RECT, (max(bw // 5, 1), 1)
+        ))
+        vertical = cv2.morphologyEx(region, cv2.MORPH_OPEN, cv2.getStructuringElement(
+            cv2.MORPH_RECT, (1, max(bh // 5, 1))
+        ))
+        no_grid = cv2.subtract(region, cv2.add(horizontal, vertical))
+
+        # As células vão de uma linha da grade à outra: o registro dos
+        # blocos desliza alguns pixels entre fotos e cortaria as marcações
+        # de formas diferentes. Sem as linhas esperadas, vale o registro
+        row_spans = _cell_spans(
+            horizontal.sum(axis=1, dtype=np.float64), rows, y - top, bh
+        )
+        col_spans = _cell_spans(
+            vertical.sum(axis=0, dtype=np.float64), cols, x - left, bw
+        )[has_number_column:]
+
+        boxes = np.empty((rows, num_choices, 4), dtype=np.int32)
+        boxes[..., 0:2] = row_spans[:, None]
+        boxes[..., 2:4] = col_spans[None]
+        # Integral dos tons da miniatura (fração de tinta de cada pixel)
+        integral = cv2.integral(no_grid, sdepth=cv2.CV_32S)
+        densities.append(box_densities(integral, boxes).ravel() / 255)
+    densities = np.concatenate(densities)
+
+    # Nível das marcações: a célula mais cheia típica de cada questão
+    row_max = densities.reshape(-1, num_choices).max(axis=1)
+    answered = row_max[row_max >= MIN_INK]
+    mark_level = float(np.median(answered)) if answered.size else MIN_INK
+    inked = densities > max(MIN_INK, INK_SHARE * mark_level)
+    return SheetHash(
+        bits=np.packbits(inked), densities=densities.astype(np.float32),
+        mark_level=mark_level, identity=tuple(identity), header=header
+    )
+
+
+def header_ink(
+    gray: np.ndarray,
+    corners: Sequence[Tuple[float, float]],
+    orientation: int = 0
+) -> Optional[np.ndarray]:
+    """
+    Miniatura da faixa do cabeçalho, logo acima da tabela.
+
+    A faixa é definida no ROI normalizado: os cantos do gabarito levam o
+    quadrado unitário à foto, e o enquadramento, a escala e a perspectiva
+    da foto não mudam a miniatura. Só o recorte da faixa é reduzido e
+    retificado, nunca a foto inteira; com a folha girada, a faixa é a do
+    lado de cima da folha em pé.
+
+    Args:
+        gray: Foto em tons de cinza
+        corners: Cantos do ROI na foto (superior esquerdo, superior
+            direito, inferior direito, inferior esquerdo)
+        orientation: Giro da folha na foto (graus, sentido horário)
+
+    Returns:
+        (altura, largura) de HEADER_SIZE: tinta de 0 a 1 relativa ao papel,
+        NaN fora da foto; None se a faixa não aparece na foto
+    """
+    quad = np.float32(corners)
+    unit = cv2.getPerspectiveTransform(
+        np.float32([[0, 0], [1, 0], [1, 1], [0, 1]]), quad
+    )
+    (u0, u1), (v0, v1) = HEADER_BANDS[orientation]
+    band = cv2.perspectiveTransform(
+        np.float32([[[u0, v0], [u1, v0], [u1, v1], [u0, v1]]]), unit
+    )[0]
+
+    # Recorte da foto em volta da faixa, reduzido por média de áreas
+    x0, y0 = np.maximum(np.floor(band.min(axis=0)), 0).astype(int)
+    x1, y1 = np.minimum(np.ceil(band.max(axis=0)) + 1, gray.shape[::-1]).astype(int)
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return None
+    crop = gray[y0:y1, x0:x1]
+    side = max(np.linalg.norm(quad[1] - quad[0]), np.linalg.norm(quad[3] - quad[0]))
+    scale = min(1.0, HEADER_WORK_SIDE / max(side, 1.0))
+    if scale < 1:
+        crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    scale_xy = np.float32([crop.shape[1] / (x1 - x0), crop.shape[0] / (y1 - y0)])
+
+    # Faixa retificada, do tamanho que ela tem no recorte reduzido
+    src = (band - np.float32([x0, y0])) * scale_xy
+    width = max(2, int(round(np.linalg.norm(src[1] - src[0]))))
+    height = max(2, int(round(np.linalg.norm(src[3] - src[0]))))
+    dst = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    matrix = cv2.getPerspectiveTransform(src, dst)
+    region = cv2.warpPerspective(crop, matrix, (width, height), borderValue=0)
+    # Fora do recorte é fora da foto
+    visible = cv2.warpPerspective(
+        np.full(crop.shape, 255, np.uint8), matrix, (width, height),
+        flags=cv2.INTER_NEAREST, borderValue=0
+    )
+
+    region = cv2.resize(
+        rotate_upright(region, orientation), HEADER_SIZE, interpolation=cv2.INTER_AREA
+    ).astype(np.float32)
+    visible = cv2.resize(
+        rotate_upright(visible, orientation), HEADER_SIZE, interpolation=cv2.INTER_AREA
+    ) == 255
+    if not visible.any():
+        return None
+
+    # Tinta relativa ao papel: o brilho da foto não muda a miniatura
+    paper = max(float(np.percentile(region[visible], 90)), 1.0)
+    ink = np.clip(1 - region / paper, 0, 1)
+    ink[~visible] = np.nan
+    return ink
+
+
+def _cell_spans(profile: np.ndarray, cells: int, start: int, length: int) -> np.ndarray:
+    """
+    Miolo de cada célula ao longo de um eixo, entre as linhas da grade.
+
+    As linhas são as faixas do perfil com tinta acima de LINE_SHARE da
+    mais forte; cada célula vai do fim de uma linha ao começo da próxima
+    (mais um pixel de cada lado, onde a linha é falhada), menos
+    HASH_PADDING. Sem exatamente cells + 1 linhas (grade apagada, tabela
+    cortada), vale a divisão regular do bloco registrado.
+
+    Args:
+        profile: Tinta das linhas da grade ao longo do eixo
+        cells: Células no eixo
+        start, length: Posição e tamanho do bloco registrado no eixo
+
+    Returns:
+        (cells, 2) início e fim (exclusivo) de cada célula
+    """
+    on = (profile > LINE_SHARE * profile.max()).view(np.int8)
+    steps = np.diff(on, prepend=0, append=0)
+    line_starts, line_ends = np.flatnonzero(steps == 1), np.flatnonzero(steps == -1)
+    if profile.max() > 0 and len(line_starts) == cells + 1:
+        first, last = line_ends[:-1] + 1.0, line_starts[1:] - 1.0
+    else:
+        edges = np.linspace(start, start + length, cells + 1)
+        first, last = edges[:-1], edges[1:]
+    padding = np.maximum(last - first, 0) * HASH_PADDING
+    spans = np.rint(np.column_stack([first + padding, last - padding])).astype(np.int32)
+    spans[:, 1] = np.maximum(spans[:, 1], spans[:, 0])
+    return spans
+
+
+class SheetHashIndex(ISheetIndex):
+    """
+    Índice das folhas já lidas em um lote.
+
+    Os bits de todas as folhas ficam em uma matriz: cada consulta é um XOR
+    contra todas as linhas e uma contagem de bits, e só as candidatas
+    próximas têm as densidades e os cabeçalhos comparados.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self._labels: List[str] = []
+        self._bits: Optional[np.ndarray] = None  # (folhas, B)
+        self._marks: List[np.ndarray] = []  # Densidades / nível das marcações
+        self._identities: List[Tuple[Optional[str], ...]] = []
+        self._headers: List[Optional[np.ndarray]] = []
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def find(self, sheet: SheetHash) -> Optional[str]:
+        """Rótulo da primeira folha quase idêntica já indexada, se houver"""
+        with self._lock:
+            return self._find(sheet)
+
+    def add(self, sheet: SheetHash, label: str):
+        """Indexa a folha lida com o rótulo (ex: nome do arquivo)"""
+        with self._lock:
+            self._add(sheet, label)
+
+    def claim(self, sheet: SheetHash, label: str) -> Optional[str]:
+        """Busca e, sem folha quase idêntica, indexa sob a mesma trava"""
+        with self._lock:
+            original = self._find(sheet)
+            if original is None:
+                self._add(sheet, label)
+            return original
+
+    def release(self, label: str):
+        """Esquece a última folha indexada com o rótulo (leitura que falhou)"""
+        with self._lock:
+            for i in reversed(range(len(self._labels))):
+                if self._labels[i] == label:
+                    self._bits = np.delete(self._bits, i, axis=0)
+                    for column in (self._labels, self._marks, self._identities, self._headers):
+                        del column[i]
+                    if not self._labels:
+                        self._bits = None
+                    return
+
+    def _find(self, sheet: SheetHash) -> Optional[str]:
+        if self._bits is None or self._bits.shape[1] != sheet.bits.size:
+            return None
+        marks = sheet.densities / sheet.mark_level
+        flips = np.unpackbits(self._bits ^ sheet.bits, axis=1).sum(axis=1)
+        for i in np.flatnonzero(flips <= MAX_FLIPS):
+            if self._identities[i] != sheet.identity:
+                continue
+            if np.abs(self._marks[i] - marks).max() > MAX_DENSITY_DELTA:
+                continue
+            if _same_header(self._headers[i], sheet.header):
+                return self._labels[i]
+        return None
+
+    def _add(self, sheet: SheetHash, label: str):
+        if self._bits is not None and self._bits.shape[1] != sheet.bits.size:
+            return  # Outra grade de questões: nunca é duplicata
+        row = sheet.bits[None]
+        self._bits = row if self._bits is None else np.concatenate([self._bits, row])
+        self._labels.append(label)
+        self._marks.append(sheet.densities / sheet.mark_level)
+        self._identities.append(sheet.identity)
+        self._headers.append(sheet.header)
+
+
+def _same_header(first: Optional[np.ndarray], second: Optional[np.ndarray]) -> bool:
+    """
+    Cabeçalhos da mesma folha: nenhum pixel difere mais que HEADER_INK_DELTA.
+
+    Sem a faixa em uma das fotos (tabela rente à borda, cabeçalho cortado)
+    não há como distinguir e valem as células.
+    """
+    if first is None or second is None:
+        return True
+    seen = ~np.isnan(first) & ~np.isnan(second)
+    if seen.mean() < MIN_HEADER_OVERLAP:
+        return True
+    return float(np.abs(first[seen] - second[seen]).max()) <= HEADER_INK_DELTA
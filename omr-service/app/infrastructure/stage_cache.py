@@ -0,0 +1,120 @@
+"""
+Infrastructure Layer - Stage Cache
+
+Cache de curta duração para o estado intermediário do pipeline OMR.
+
+Guarda, por imagem e parâmetros de pré-processamento, o estado após o
+checkpoint do pipeline (ROI binarizado e sem grade). Quando o usuário
+repete a leitura da mesma foto mudando só opções das células (alternativas,
+número de questões), apenas os estágios finais rodam de novo.
+
+As entradas expiram após um TTL e o total de bytes dos arrays (e dos
+valores já serializados, como os resultados) é limitado; ao passar do
+limite, as menos usadas saem primeiro.
+
+Os resultados das leituras ficam em um cache próprio, menor (ver
+RESULT_CACHE_ENTRIES): não disputam as entradas dos checkpoints.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, MutableMapping, Tuple
+
+import numpy as np
+
+
+DEFAULT_TTL_SECONDS = 300.0
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Cache dos resultados: entradas de poucos KB (resultado serializado)
+RESULT_CACHE_ENTRIES = 256
+RESULT_CACHE_BYTES = 16 * 1024 * 1024
+
+Snapshot = Dict[str, Any]
+
+
+class StageCache(MutableMapping):
+    """LRU com TTL e limite de memória, seguro entre threads"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_entries: int = 64,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.clock = clock
+        # chave -> (expira_em, bytes, snapshot)
+        self._entries: "OrderedDict[str, Tuple[float, int, Snapshot]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self) -> int:
+        """Bytes dos arrays e dos valores serializados guardados"""
+        return self._bytes
+
+    def __getitem__(self, key: str) -> Snapshot:
+        with self._lock:
+            expires_at, _, snapshot = self._entries[key]
+            if expires_at <= self.clock():
+                self._remove(key)
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            return snapshot
+
+    def __setitem__(self, key: str, snapshot: Snapshot):
+        size = snapshot_bytes(snapshot)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return  # Maior que o cache inteiro: não guardar
+            self._entries[key] = (self.clock() + self.ttl_seconds, size, snapshot)
+            self._bytes += size
+            self._evict()
+
+    def __delitem__(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        """Remove expiradas e, depois, as menos usadas até caber nos limites"""
+        now = self.clock()
+        for key in [k for k, (expires, _, _) in self._entries.items() if expires <= now]:
+            self._remove(key)
+        while self._entries and (
+            self._bytes > self.max_bytes or len(self._entries) > self.max_entries
+        ):
+            self._remove(next(iter(self._entries)))
+
+
+def snapshot_bytes(snapshot: Snapshot) -> int:
+    """Memória aproximada do snapshot (arrays e valores em bytes)"""
+    size = 0
+    for value in snapshot.values():
+        if isinstance(value, np.ndarray):
+            size += value.nbytes
+        elif isinstance(value, bytes):
+            size += len(value)  # Ex: resultado serializado
+    return size
@@ -0,0 +1,271 @@
+"""
+Infrastructure Layer - Synthetic Sheet
+
+Gera folhas de resposta sintéticas a partir de um layout.
+Usado em testes, benchmarks e no aquecimento do motor OMR.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from app.domain.value_objects import SheetLayout, StudentIdField, VersionField
+
+
+# Área das tabelas na página (x, y, largura, altura relativos)
+ANSWER_AREA = (0.1, 0.1, 0.8, 0.8)
+
+# Espaço horizontal entre blocos vizinhos (relativo à largura do bloco)
+BLOCK_GAP = 0.06
+
+LINE_THICKNESS = 3
+
+# Tipos de traço desenhados em uma célula (ver cell_marks)
+CELL_MARK_KINDS = ("x", "fill", "scribble", "smudge")
+
+
+def render_answer_sheet(
+    answers: Sequence[Optional[str]],
+    choices: Sequence[str] = ("A", "B", "C", "D", "E"),
+    layout: Optional[SheetLayout] = None,
+    size: Tuple[int, int] = (1240, 1754),
+    answer_area: Tuple[float, float, float, float] = ANSWER_AREA,
+    student_id: Optional[str] = None,
+    student_id_field: Optional[StudentIdField] = None,
+    exam_version: Optional[str] = None,
+    version_field: Optional[VersionField] = None,
+    cell_marks: Optional[Dict[Tuple[int, str], str]] = None
+) -> np.ndarray:
+    """
+    Desenha uma folha de respostas com marcações em "X".
+
+    Args:
+        answers: Resposta marcada por questão (None = em branco)
+        choices: Alternativas impressas em cada tabela
+        layout: Disposição dos blocos (padrão: tabela única)
+        size: Dimensões da página (largura, altura)
+        answer_area: Área das tabelas na página (x, y, largura, altura relativos)
+        student_id: Matrícula a marcar no bloco de dígitos
+        student_id_field: Posição do bloco de dígitos da matrícula
+        exam_version: Tipo de prova a marcar
+        version_field: Posição da linha de bolhas do tipo de prova
+        cell_marks: Traços extras por (questão, alternativa), de um dos
+            CELL_MARK_KINDS: "x", "fill" (preenchida), "scribble" (rasurada)
+            ou "smudge" (sujeira: ponto ou traço curto)
+
+    Returns:
+        Imagem BGR da folha
+    """
+    width, height = size
+    img = np.full((height, width, 3), 255, dtype=np.uint8)
+    layout = layout or SheetLayout.single(len(answers))
+
+    if student_id_field:
+        rect = student_id_field.region.to_pixels(width, height)
+        rect = (rect.x, rect.y, rect.width, rect.height)
+        _draw_grid(img, rect, 10, student_id_field.digits)
+        for col, digit in enumerate(student_id or ""):
+            if digit.isdigit():
+                _draw_mark(img, rect, 10, student_id_field.digits, int(digit), col)
+
+    if version_field:
+        rect = version_field.region.to_pixels(width, height)
+        rect = (rect.x, rect.y, rect.width, rect.height)
+        num_versions = len(version_field.versions)
+        _draw_grid(img, rect, 1, num_versions)
+        if exam_version:
+            col = version_field.versions.index(exam_version)
+            _draw_mark(img, rect, 1, num_versions, 0, col)
+
+    ax, ay, aw, ah = answer_area
+    area = (int(ax * width), int(ay * height), int(aw * width), int(ah * height))
+
+    for block in layout.blocks:
+        rect = block.region.to_pixels(area[2], area[3])
+        x, y, w, h = area[0] + rect.x, area[1] + rect.y, rect.width, rect.height
+        if len(layout.blocks) > 1:
+            gap = int(w * BLOCK_GAP)
+            x, w = x + gap, w - 2 * gap
+
+        block_answers = answers[block.first_question - 1:block.last_question]
+        _draw_table(
+            img, (x, y, w, h), block.first_question, block_answers,
+            list(choices), block.has_number_column, cell_marks or {}
+        )
+
+    return img
+
+
+def render_camera_frame(
+    page: np.ndarray,
+    center: Tuple[float, float],
+    scale: float,
+    angle: float = 0.0,
+    tilt: float = 0.0,
+    size: Tuple[int, int] = (360, 480),
+    background: Tuple[int, int, int] = (90, 80, 70),
+    desk: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Simula um quadro da câmera: a página sobre uma mesa, vista de cima.
+
+    Args:
+        page: Folha renderizada (render_answer_sheet)
+        center: Centro da folha no quadro (x, y)
+        scale: Tamanho da folha no quadro em relação à página
+        angle: Giro da folha, em graus
+        tilt: Estreitamento da borda superior (0.0 = câmera paralela)
+        size: Dimensões do quadro (largura, altura)
+        background: Cor da mesa (BGR)
+        desk: Imagem da mesa, do tamanho do quadro (no lugar da cor lisa)
+
+    Returns:
+        Imagem BGR do quadro
+    """
+    h, w = page.shape[:2]
+    source = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
+    corners = (source - (w / 2, h / 2)) * scale
+    corners[:2, 0] *= 1 - tilt
+    radians = np.radians(angle)
+    rotation = np.array([
+        [np.cos(radians), -np.sin(radians)],
+        [np.sin(radians), np.cos(radians)]
+    ])
+    corners = corners @ rotation.T + center
+    matrix = cv2.getPerspectiveTransform(source, np.float32(corners))
+    if desk is not None:
+        return cv2.warpPerspective(
+            page, matrix, size, dst=desk.copy(), borderMode=cv2.BORDER_TRANSPARENT
+        )
+    return cv2.warpPerspective(page, matrix, size, borderValue=background)
+
+
+def encode_image(img: np.ndarray, ext: str = ".jpg") -> bytes:
+    """Codifica a imagem no formato indicado pela extensão"""
+    ok, encoded = cv2.imencode(ext, img)
+    if not ok:
+        raise RuntimeError(f"Falha ao codificar imagem {ext}")
+    return encoded.tobytes()
+
+
+def _draw_table(
+    img: np.ndarray,
+    rect: Tuple[int, int, int, int],
+    first_question: int,
+    answers: Sequence[Optional[str]],
+    choices: Sequence[str],
+    has_number_column: bool,
+    cell_marks: Dict[Tuple[int, str], str]
+):
+    """Desenha uma tabela de questões e as marcações"""
+    x, y, w, h = rect
+    rows = len(answers)
+    offset = 1 if has_number_column else 0
+    cols = len(choices) + offset
+    cell_h = h / rows
+    cell_w = w / cols
+
+    _draw_grid(img, rect, rows, cols)
+
+    font_scale = min(cell_h, cell_w) / 45
+    for i, answer in enumerate(answers):
+        if has_number_column:
+            cv2.putText(
+                img, str(first_question + i),
+                (int(x + cell_w * 0.15), int(y + (i + 0.7) * cell_h)),
+                cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 0, 0), 2
+            )
+        if answer is not None:
+            _draw_mark(img, rect, rows, cols, i, choices.index(answer) + offset)
+
+    for (question, choice), kind in cell_marks.items():
+        row = question - first_question
+        if 0 <= row < rows:
+            _draw_cell_mark(
+                img, rect, rows, cols, row, choices.index(choice) + offset, kind
+            )
+
+
+def _draw_grid(
+    img: np.ndarray,
+    rect: Tuple[int, int, int, int],
+    rows: int,
+    cols: int
+):
+    """Desenha as linhas de uma grade rows × cols"""
+    x, y, w, h = rect
+    for i in range(rows + 1):
+        row_y = int(y + i * h / rows)
+        cv2.line(img, (x, row_y), (x + w, row_y), (0, 0, 0), LINE_THICKNESS)
+    for j in range(cols + 1):
+        col_x = int(x + j * w / cols)
+        cv2.line(img, (col_x, y), (col_x, y + h), (0, 0, 0), LINE_THICKNESS)
+
+
+def _draw_mark(
+    img: np.ndarray,
+    rect: Tuple[int, int, int, int],
+    rows: int,
+    cols: int,
+    row: int,
+    col: int
+):
+    """Desenha um "X" na célula (row, col) da grade"""
+    x, y, w, h = rect
+    cell_h = h / rows
+    cell_w = w / cols
+    cx = int(x + (col + 0.5) * cell_w)
+    cy = int(y + (row + 0.5) * cell_h)
+    r = int(min(cell_h, cell_w) * 0.3)
+    cv2.line(img, (cx - r, cy - r), (cx + r, cy + r), (0, 0, 0), 4)
+    cv2.line(img, (cx - r, cy + r), (cx + r, cy - r), (0, 0, 0), 4)
+
+
+def _draw_cell_mark(
+    img: np.ndarray,
+    rect: Tuple[int, int, int, int],
+    rows: int,
+    cols: int,
+    row: int,
+    col: int,
+    kind: str
+):
+    """Desenha um dos CELL_MARK_KINDS na célula (row, col)"""
+    if kind == "x":
+        _draw_mark(img, rect, rows, cols, row, col)
+        return
+
+    x, y, w, h = rect
+    cell_h = h / rows
+    cell_w = w / cols
+    cx = int(x + (col + 0.5) * cell_w)
+    cy = int(y + (row + 0.5) * cell_h)
+    r = int(min(cell_h, cell_w) * 0.3)
+    # Traço reproduzível por célula
+    rng = np.random.default_rng(row * 1009 + col)
+
+    if kind == "fill":
+        cv2.ellipse(img, (cx, cy), (r, int(r * 0.8)), 0, 0, 360, (0, 0, 0), -1)
+    elif kind == "scribble":
+        # Vaivém denso sobre a célula inteira (resposta rasurada)
+        points = [
+            (cx + int(sign * r * rng.uniform(0.8, 1.2)), int(cy - r + i * r / 5))
+            for i, sign in zip(range(11), [-1, 1] * 6)
+        ]
+        cv2.polylines(img, [np.int32(points)], False, (0, 0, 0), 4)
+        cv2.line(img, (cx - r, cy - r), (cx + r, cy + r), (0, 0, 0), 4)
+    elif kind == "smudge":
+        dx, dy = (int(v) for v in rng.integers(-r // 2, r // 2 + 1, 2))
+        if rng.random() < 0.5:
+            radius = max(2, int(r * rng.uniform(0.15, 0.3)))
+            cv2.circle(img, (cx + dx, cy + dy), radius, (0, 0, 0), -1)
+        else:
+            length = int(r * rng.uniform(0.4, 0.8))
+            cv2.line(
+                img, (cx + dx - length, cy + dy), (cx + dx + length, cy + dy + 2),
+                (0, 0, 0), 3
+            )
+    else:
+        raise ValueError(f"Traço desconhecido: {kind}")
+
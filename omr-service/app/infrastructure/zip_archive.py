@@ -0,0 +1,141 @@
+"""
+Infrastructure Layer - Zip Archive
+
+Imagens de um .zip enviado (turma exportada do celular ou do scanner),
+lidas entrada por entrada, sem extrair para o disco.
+
+O diretório central do .zip lista as entradas sem descomprimir nada; cada
+imagem só é descomprimida quando vai para a leitura, então a memória fica
+limitada às entradas em leitura e não ao tamanho do arquivo. Antes de
+descomprimir, o tamanho declarado da entrada é conferido (a descompressão
+não passa dele); depois, os primeiros bytes (assinatura do formato)
+recusam entradas que não são imagens sem ocupar uma leitura.
+
+O upload é fechado pelo servidor quando o endpoint retorna, antes de a
+resposta em fluxo terminar: copy_of abre o .zip sobre uma cópia própria
+(em memória até SPOOL_MAX_BYTES, depois em disco), fechada com o arquivo.
+"""
+
+import shutil
+import tempfile
+import zipfile
+from typing import BinaryIO, List, Optional
+
+from app.infrastructure.image_validator import ImageValidator
+
+
+# Maior imagem aceita em uma entrada (como no envio de um arquivo)
+MAX_ENTRY_BYTES = 5 * 1024 * 1024
+
+# Entradas do .zip lidas ao mesmo tempo por thread de leitura: enquanto
+# uma folha é lida, a próxima já está descomprimida e na fila
+ENTRIES_IN_FLIGHT_PER_THREAD = 2
+
+# Cópia do upload mantida em memória até este tamanho; acima vai para o disco
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+# Assinaturas dos formatos aceitos (início do arquivo)
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+)
+
+
+def sniff_image_format(head: bytes) -> Optional[str]:
+    """Formato da imagem pelos primeiros bytes (None se não for aceito)"""
+    for signature, image_format in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return image_format
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    return None
+
+
+class ZipImageArchive:
+    """
+    Entradas de imagem de um .zip, abertas sobre o próprio arquivo enviado.
+
+    Pastas, arquivos ocultos, metadados do macOS (__MACOSX) e extensões que
+    não são de imagem são ignorados; as demais entradas ficam em entries,
+    na ordem do .zip.
+    """
+
+    def __init__(self, file: BinaryIO, max_entry_bytes: int = MAX_ENTRY_BYTES):
+        """
+        Args:
+            file: Arquivo .zip (com seek, ex: UploadFile.file)
+            max_entry_bytes: Maior imagem aceita em uma entrada
+
+        Raises:
+            ValueError: Se o arquivo não for um .zip válido
+        """
+        try:
+            self._zip = zipfile.ZipFile(file)
+        except (zipfile.BadZipFile, OSError) as e:
+            raise ValueError(f"Arquivo .zip inválido: {e}")
+        self.max_entry_bytes = max_entry_bytes
+        self._copy: Optional[BinaryIO] = None
+        self.entries: List[zipfile.ZipInfo] = [
+            entry for entry in self._zip.infolist() if _is_image_entry(entry)
+        ]
+
+    @classmethod
+    def copy_of(
+        cls, file: BinaryIO, max_entry_bytes: int = MAX_ENTRY_BYTES
+    ) -> "ZipImageArchive":
+        """
+        Abre o .zip sobre uma cópia do arquivo, fechada em close().
+
+        O arquivo original pode ser fechado logo depois (ex: UploadFile,
+        fechado ao fim do endpoint enquanto a resposta ainda está em fluxo).
+
+        Raises:
+            ValueError: Se o arquivo não for um .zip válido
+        """
+        copy = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        try:
+            file.seek(0)
+            shutil.copyfileobj(file, copy)
+            copy.seek(0)
+            archive = cls(copy, max_entry_bytes)
+        except BaseException:
+            copy.close()
+            raise
+        archive._copy = copy
+        return archive
+
+    def read(self, entry: zipfile.ZipInfo) -> bytes:
+        """
+        Descomprime uma entrada.
+
+        Raises:
+            ValueError: Se a entrada for grande demais, estiver corrompida
+                ou não começar com a assinatura de uma imagem aceita
+        """
+        limit_mb = self.max_entry_bytes // (1024 * 1024)
+        if entry.file_size > self.max_entry_bytes:
+            raise ValueError(f"Arquivo muito grande. Tamanho máximo: {limit_mb}MB.")
+        try:
+            # A descompressão para no tamanho declarado (e confere o CRC)
+            data = self._zip.read(entry)
+        except (zipfile.BadZipFile, OSError, RuntimeError) as e:
+            raise ValueError(f"Entrada corrompida no .zip: {e}")
+        if sniff_image_format(data[:12]) is None:
+            raise ValueError("Tipo de arquivo inválido. Use JPG, PNG ou WEBP.")
+        return data
+
+    def close(self):
+        self._zip.close()
+        if self._copy is not None:
+            self._copy.close()
+
+
+def _is_image_entry(entry: zipfile.ZipInfo) -> bool:
+    """Entrada de imagem (não pasta, não oculta, extensão aceita)"""
+    if entry.is_dir():
+        return False
+    parts = entry.filename.split("/")
+    if parts[0] == "__MACOSX" or parts[-1].startswith("."):
+        return False
+    extension = parts[-1].rsplit(".", 1)[-1].lower() if "." in parts[-1] else ""
+    return f".{extension}" in ImageValidator.ALLOWED_EXTENSIONS
@@ -4,15 +4,65 @@ FastAPI Main Application
 Entry point da aplicação com configuração de CORS e rotas.
 """
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.presentation.routes import router
+from app.infrastructure.concurrency import ConcurrencyConfig
+
+# Antes de o NumPy ser importado: BLAS limitado às threads do OpenCV
+ConcurrencyConfig.from_env().limit_native_threads()
+
+import asyncio  # noqa: E402
+import logging  # noqa: E402
+from contextlib import asynccontextmanager  # noqa: E402
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.concurrency import run_in_threadpool  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from app.presentation.routes import (  # noqa: E402
+    router, get_concurrency, get_readiness, warm_up_engine
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Aquece o motor OMR em segundo plano na inicialização.
+
+    O servidor já responde a /api/health (vivo) enquanto aquece; /api/ready
+    só fica OK quando a primeira leitura já não paga a inicialização.
+    Antes, as threads do OpenCV e a afinidade do worker são aplicadas.
+    """
+    get_concurrency().apply()
+    # Referência guardada: a falha do aquecimento é registrada ao terminar
+    # (ver report_warm_up), não quando a tarefa for coletada
+    app.state.warm_up = asyncio.create_task(run_in_threadpool(warm_up_engine))
+    app.state.warm_up.add_done_callback(report_warm_up)
+    yield
+    if not app.state.warm_up.done():
+        app.state.warm_up.cancel()
+
+
+def report_warm_up(task: asyncio.Task):
+    """
+    Registra a falha do aquecimento no log e na prontidão (/api/ready
+    responde "error"). Cancelado no desligamento não é falha.
+    """
+    if task.cancelled() or task.exception() is None:
+        return
+    error = task.exception()
+    logger.error("Falha no aquecimento do motor OMR", exc_info=error)
+    readiness = get_readiness()
+    if readiness.error is None:
+        readiness.mark_failed(str(error) or type(error).__name__)
+
 
 # Criar aplicação FastAPI
 app = FastAPI(
     title="OMR Service",
     description="Serviço de leitura de marcações (OMR) para correção automática de provas",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS para aceitar requests do frontend
@@ -46,4 +96,7 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "app.main:app", host="0.0.0.0", port=8000,
+        workers=get_concurrency().workers
+    )
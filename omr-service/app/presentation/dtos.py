@@ -4,9 +4,11 @@ Presentation Layer - DTOs (Data Transfer Objects)
 Modelos Pydantic para validação de requests e responses da API.
 """
 
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from pydantic import BaseModel, Field, validator
 
+from app.domain.value_objects import MAX_QUESTIONS
+
 
 class ROIDto(BaseModel):
     """DTO para Region of Interest"""
@@ -19,13 +21,72 @@ class ROIDto(BaseModel):
         populate_by_name = True
 
 
+class GridBlockDto(BaseModel):
+    """DTO para bloco de questões (coordenadas relativas ao ROI, de 0 a 1)"""
+    x: float = Field(ge=0, le=1)
+    y: float = Field(ge=0, le=1)
+    w: float = Field(gt=0, le=1)
+    h: float = Field(gt=0, le=1)
+    firstQuestion: int = Field(ge=1)
+    numQuestions: int = Field(ge=1)
+    numberColumn: bool = True
+
+
+class SheetLayoutDto(BaseModel):
+    """DTO para layout da folha: colunas de mesma largura ou blocos explícitos"""
+    columns: Optional[int] = Field(default=None, ge=1, le=8)
+    blocks: Optional[List[GridBlockDto]] = None
+    numberColumn: bool = True
+
+    @validator('blocks', always=True)
+    def validate_mode(cls, v, values):
+        """Valida que exatamente um modo (columns ou blocks) foi informado"""
+        if (v is None) == (values.get('columns') is None):
+            raise ValueError("Informe 'columns' ou 'blocks' (apenas um)")
+        if v is not None and not v:
+            raise ValueError("Layout deve ter pelo menos um bloco")
+        return v
+
+
+class StudentIdFieldDto(BaseModel):
+    """DTO para bloco de matrícula (coordenadas relativas à imagem, de 0 a 1)"""
+    x: float = Field(ge=0, le=1)
+    y: float = Field(ge=0, le=1)
+    w: float = Field(gt=0, le=1)
+    h: float = Field(gt=0, le=1)
+    digits: int = Field(ge=1, le=20)
+
+
+class VersionFieldDto(BaseModel):
+    """DTO para marcação do tipo de prova (coordenadas relativas à imagem)"""
+    x: float = Field(ge=0, le=1)
+    y: float = Field(ge=0, le=1)
+    w: float = Field(gt=0, le=1)
+    h: float = Field(gt=0, le=1)
+    versions: List[str] = Field(default=["A", "B", "C", "D"], min_length=2)
+
+    @validator('versions')
+    def validate_versions(cls, v):
+        """Valida que as versões são únicas"""
+        if len(v) != len(set(v)):
+            raise ValueError("Versões duplicadas não são permitidas")
+        return v
+
+
 class OMROptionsDto(BaseModel):
     """DTO para opções de processamento OMR"""
-    numQuestions: int = Field(ge=1, le=100)
+    numQuestions: int = Field(ge=1, le=MAX_QUESTIONS)
     choices: List[str] = Field(min_length=2)
     template: str = Field(default="AUTO", pattern="^(AUTO|MANUAL_ROI)$")
     roi: Optional[ROIDto] = None
+    # Cantos do gabarito em pixels: sup. esq., sup. dir., inf. dir., inf. esq.
+    corners: Optional[List[Tuple[float, float]]] = Field(
+        default=None, min_length=4, max_length=4
+    )
     debug: bool = False
+    layout: Optional[SheetLayoutDto] = None
+    studentId: Optional[StudentIdFieldDto] = None
+    version: Optional[VersionFieldDto] = None
 
     @validator('choices')
     def validate_choices(cls, v):
@@ -66,12 +127,50 @@ class AnswerKeyDto(BaseModel):
         return v
 
 
+class ImageQualityDto(BaseModel):
+    """DTO para indicadores da verificação rápida de qualidade"""
+    sharpness: float
+    brightness: float
+    contrast: float
+    glare: float
+    grid: float
+    border: float
+    reason: Optional[str] = None
+
+
 class OMRResultDto(BaseModel):
     """DTO para resultado da leitura OMR"""
     answers: Dict[str, Optional[str]]
     confidence: Dict[str, float]
     flags: Dict[str, List[int]]
     debug: Optional[Dict[str, str]] = None
+    studentId: Optional[str] = None
+    studentIdConfidence: Optional[float] = None
+    examVersion: Optional[str] = None
+    examVersionConfidence: Optional[float] = None
+    quality: Optional[ImageQualityDto] = None
+    orientation: int = 0  # Giro da folha na foto (0, 90, 180 ou 270 graus)
+
+
+class UploadFormatDto(BaseModel):
+    """DTO para o formato compacto de envio das fotos"""
+    maxSide: int  # Lado maior da imagem, em pixels
+    mediaType: str  # Codificação (image/jpeg)
+    quality: float  # Qualidade do codificador, de 0 a 1
+    grayscale: bool  # Converter para tons de cinza antes de codificar
+    filename: str  # Nome do arquivo enviado, que marca o envio compacto
+
+
+class ReviewSessionDto(BaseModel):
+    """DTO para sessão de revisão com ajuste manual do ROI"""
+    sessionId: str
+    width: int  # Dimensões da imagem original
+    height: int
+    preview: str  # data:image/jpeg;base64,...
+    previewScale: float  # Pixels da prévia por pixel da imagem original
+    roi: Optional[ROIDto] = None  # ROI da leitura inicial
+    result: Optional[OMRResultDto] = None
+    error: Optional[str] = None
 
 
 class ExamCorrectionDto(BaseModel):
@@ -86,9 +185,93 @@ class ExamCorrectionDto(BaseModel):
     percentual: float
     aprovado: bool
     revisao: List[Dict[str, Any]]
+    alunoId: Optional[str] = None
+    alunoIdConfianca: Optional[float] = None
+    tipoProva: Optional[str] = None
+
+
+class BatchItemDto(BaseModel):
+    """DTO para resultado de uma folha do lote"""
+    arquivo: str
+    tipoProva: Optional[str] = None
+    correcao: Optional[ExamCorrectionDto] = None
+    erro: Optional[str] = None
+    # Arquivo já lido com a mesma folha (sem correcao: cópia confirmada
+    # pela matrícula; com correcao: sem como confirmar)
+    duplicataDe: Optional[str] = None
+
+
+class BatchCorrectionDto(BaseModel):
+    """DTO para resultado da correção em lote"""
+    total: int
+    corrigidas: int
+    falhas: int
+    duplicatas: int = 0  # Folhas que repetem outra do lote (com duplicataDe)
+    porTipo: Dict[str, int]
+    limiarMarcacao: Optional[float] = None  # Limiar de densidade ajustado ao lote
+    itens: List[BatchItemDto]
+
+
+class ClassSummaryDto(BaseModel):
+    """DTO para o desempenho agregado da turma"""
+    provaId: str
+    provas: int
+    alunos: int
+    mediaPontuacao: Optional[float] = None
+    mediaPercentual: Optional[float] = None
+    taxaAprovacao: Optional[float] = None
+    menorPercentual: Optional[float] = None
+    maiorPercentual: Optional[float] = None
+
+
+class QuestionStatisticsDto(BaseModel):
+    """DTO para as estatísticas de uma questão"""
+    q: int
+    correta: str
+    total: int
+    acertos: int
+    erros: int
+    emBranco: int
+    anuladas: int
+    dificuldade: float
+
+
+class ChoiceStatisticsDto(BaseModel):
+    """DTO para a escolha de uma alternativa"""
+    alternativa: str
+    quantidade: int
+    taxa: float
+    mediaPercentual: float
+
+
+class DistractorAnalysisDto(BaseModel):
+    """DTO para a análise de distratores de uma questão"""
+    q: int
+    correta: str
+    alternativas: List[ChoiceStatisticsDto]
+
+
+class ItemStatisticsDto(BaseModel):
+    """DTO para a análise de uma questão"""
+    q: int
+    correta: str
+    dificuldade: float
+    discriminacao: float
+    pontoBisserial: float
+    alternativas: Dict[str, float]
+    emBranco: float
+    anuladas: float
+
+
+class ItemAnalysisDto(BaseModel):
+    """DTO para a análise de itens da turma"""
+    provaId: str
+    alunos: int
+    itens: List[ItemStatisticsDto]
 
 
 class ErrorResponseDto(BaseModel):
     """DTO para resposta de erro"""
     detail: str
     error_type: Optional[str] = None
+    quality: Optional[ImageQualityDto] = None
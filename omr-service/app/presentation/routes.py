@@ -4,46 +4,565 @@ Presentation Layer - API Routes
 Controllers FastAPI que recebem requests HTTP e delegam para use cases.
 """
 
+import asyncio
+import io
 import json
-from typing import BinaryIO
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
-from fastapi.responses import JSONResponse
+import logging
+import os
+from collections import deque
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Callable, Deque, Dict, List, Optional, Tuple
+
+import anyio
+from fastapi import (
+    APIRouter, UploadFile, File, Form, Header, HTTPException, Depends, Response,
+    WebSocket, WebSocketDisconnect
+)
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.presentation.dtos import (
-    OMROptionsDto, OMRResultDto, AnswerKeyDto,
-    ExamCorrectionDto, ErrorResponseDto
+    OMROptionsDto, OMRResultDto, AnswerKeyDto, QuestionDto,
+    ExamCorrectionDto, ErrorResponseDto, SheetLayoutDto, StudentIdFieldDto,
+    VersionFieldDto, BatchCorrectionDto, ImageQualityDto, ClassSummaryDto,
+    QuestionStatisticsDto, DistractorAnalysisDto, ItemAnalysisDto,
+    ReviewSessionDto, UploadFormatDto
+)
+from app.presentation.serialization import (
+    encoded_response, encode_json, omr_result_payload, review_session_payload,
+    frame_assessment_payload, quality_payload
+)
+from app.application.use_cases import (
+    ReadAnswersUseCase, CorrectExamUseCase, CorrectExamBatchUseCase,
+    ManageAnswerKeysUseCase, ClassAnalyticsUseCase, ReviewSessionUseCase,
+    LiveScanUseCase
+)
+from app.application.interfaces import IAnswerKeyRepository, IResultRepository
+from app.domain.entities import AnswerKey, Question, BatchCorrection, BatchItem
+from app.domain.exceptions import (
+    ImageQualityError, AnswerKeyNotFoundError, AnswerKeyExistsError,
+    ReviewSessionNotFoundError, CapacityExceededError
+)
+from app.domain.value_objects import (
+    OMROptions, ROI, Quadrilateral, SheetLayout, GridBlock, RelativeRegion,
+    StudentIdField, VersionField, ImageQuality, UploadFormat
 )
-from app.application.use_cases import ReadAnswersUseCase, CorrectExamUseCase
-from app.domain.entities import AnswerKey, Question
-from app.domain.value_objects import OMROptions, ROI
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_concurrency():
+    """Topologia de threads do worker (ver app.infrastructure.concurrency)"""
+    from app.infrastructure.concurrency import ConcurrencyConfig
+
+    return ConcurrencyConfig.from_env()
+
+
+# Threads de leitura por vaga: além das leituras em andamento, as que
+# esperam memória ou vaga na admissão (e as respostas já guardadas)
+READ_THREADS_PER_SLOT = 4
+
+
+@lru_cache(maxsize=None)
+def get_read_limiter() -> anyio.CapacityLimiter:
+    """Threads de leitura por worker (pool próprio, fora do pool padrão)"""
+    return anyio.CapacityLimiter(READ_THREADS_PER_SLOT * get_concurrency().read_threads)
+
+
+async def run_read(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Roda uma leitura (CPU) em thread, fora do event loop.
+
+    As vagas de leitura (OMR_READ_THREADS por worker) são dadas pela
+    admissão, depois da memória: uma thread que espera memória não ocupa
+    a vaga de uma leitura que caberia, e uma resposta já guardada não
+    espera vaga nenhuma. O pool é próprio, e não o padrão de 40 threads,
+    que também atende dependências síncronas.
+    """
+    return await anyio.to_thread.run_sync(
+        partial(func, *args, **kwargs), limiter=get_read_limiter()
+    )
+
+
+@lru_cache(maxsize=None)
+def get_frame_limiter() -> anyio.CapacityLimiter:
+    """
+    Threads dos quadros da leitura ao vivo (pool próprio, fora do padrão).
+
+    Quadros não passam pela admissão: são pequenos (limites conferidos
+    pelo cabeçalho antes de decodificar) e não esperam leituras completas.
+    """
+    return anyio.CapacityLimiter(get_concurrency().read_threads)
+
+
+def shared_cache_directory() -> Optional[Path]:
+    """
+    Diretório dos caches comuns aos workers da máquina.
+
+    OMR_SHARED_CACHE_DIR escolhe o diretório (vazio: caches por processo);
+    sem a variável, o cache é compartilhado quando há vários workers.
+    """
+    from app.infrastructure.shared_cache import default_directory
+
+    value = os.getenv("OMR_SHARED_CACHE_DIR")
+    if value is None:
+        return default_directory() if get_concurrency().workers > 1 else None
+    return Path(value) if value else None
+
+
+def open_cache(name: str, **limits):
+    """
+    Cache comum aos workers (subdiretório `name`) ou, sem ele, por processo.
+
+    Um diretório comum que outro usuário pode alterar não é usado (ver
+    shared_cache.ensure_private_directory): o cache fica por processo.
+    """
+    from app.infrastructure.shared_cache import SharedStageCache
+    from app.infrastructure.stage_cache import StageCache
+
+    directory = shared_cache_directory()
+    if directory is not None:
+        try:
+            return SharedStageCache(directory / name, **limits)
+        except PermissionError as e:
+            logger.warning("Cache comum desativado, usando cache por processo: %s", e)
+    return StageCache(**limits)
+
+
+@lru_cache(maxsize=None)
+def get_stage_cache():
+    """Cache do estado intermediário (por processo ou comum)"""
+    from app.infrastructure.stage_cache import DEFAULT_TTL_SECONDS, DEFAULT_MAX_BYTES
+
+    max_mb = float(os.getenv(
+        "OMR_STAGE_CACHE_MB", DEFAULT_MAX_BYTES / (1024 * 1024)
+    ))
+    if max_mb <= 0:
+        return None  # Cache desativado
+    ttl = float(os.getenv("OMR_STAGE_CACHE_TTL", DEFAULT_TTL_SECONDS))
+    return open_cache("stages", ttl_seconds=ttl, max_bytes=int(max_mb * 1024 * 1024))
+
+
+@lru_cache(maxsize=None)
+def get_result_cache():
+    """Cache dos resultados, próprio e pequeno (desativado com o de estágios)"""
+    from app.infrastructure.stage_cache import (
+        DEFAULT_TTL_SECONDS, RESULT_CACHE_BYTES, RESULT_CACHE_ENTRIES
+    )
+
+    if get_stage_cache() is None:
+        return None
+    return open_cache(
+        "results",
+        ttl_seconds=float(os.getenv("OMR_STAGE_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+        max_bytes=RESULT_CACHE_BYTES,
+        max_entries=RESULT_CACHE_ENTRIES
+    )
+
+
+@lru_cache(maxsize=None)
+def get_admission_control():
+    """Orçamento de memória e vagas das leituras simultâneas (único por processo)"""
+    from app.infrastructure.admission import (
+        MemoryAdmissionController, DEFAULT_BUDGET_BYTES, DEFAULT_TIMEOUT_SECONDS
+    )
+
+    budget_mb = float(os.getenv(
+        "OMR_MEMORY_BUDGET_MB", DEFAULT_BUDGET_BYTES / (1024 * 1024)
+    ))
+    return MemoryAdmissionController(
+        budget_bytes=int(budget_mb * 1024 * 1024),
+        timeout_seconds=float(os.getenv(
+            "OMR_ADMISSION_TIMEOUT", DEFAULT_TIMEOUT_SECONDS
+        )),
+        max_running=get_concurrency().read_threads
+    )
+
+
+@lru_cache(maxsize=None)
+def get_quality_gate():
+    """Verificação de qualidade (única por processo, para manter a memória)"""
+    from app.infrastructure.quality_gate import ImageQualityGate
+
+    return ImageQualityGate()
+
+
+@lru_cache(maxsize=None)
+def get_omr_engine():
+    """
+    Motor OMR (único por processo).
+
+    Pipelines, kernels e buffers de trabalho por thread são criados uma vez
+    e aquecidos na inicialização (ver warm_up_engine). OMR_CELL_MODEL
+    aponta para um classificador de células treinado (.npz, ver
+    cli.py --trainCellModel); sem ele valem as regras de densidade.
+    """
+    from app.infrastructure.omr_engine import OpenCVOMREngine
+    from app.infrastructure.debug_storage import DebugStorage
+    from app.infrastructure.cell_classifier import CellClassifier
+
+    model_path = os.getenv("OMR_CELL_MODEL")
+    return OpenCVOMREngine(
+        debug_storage=DebugStorage(), stage_cache=get_stage_cache(),
+        result_cache=get_result_cache(),
+        cell_classifier=CellClassifier.load(model_path) if model_path else None
+    )
+
+
+@lru_cache(maxsize=None)
+def get_readiness():
+    """Prontidão do processo (ver /ready)"""
+    from app.infrastructure.warmup import Readiness
+
+    return Readiness()
+
+
+def warm_up_engine():
+    """
+    Aquece o motor com folhas sintéticas e marca o processo como pronto.
+
+    Chamado na inicialização da aplicação, fora do event loop. Com
+    OMR_WARMUP=0 o processo fica pronto sem aquecer.
+    """
+    from app.infrastructure.warmup import warm_up
+
+    readiness = get_readiness()
+    if os.getenv("OMR_WARMUP", "1") == "0":
+        readiness.mark_ready({})
+        return
+    try:
+        timings = warm_up(get_omr_engine(), get_quality_gate())
+    except Exception as e:
+        readiness.mark_failed(str(e))
+        raise
+    readiness.mark_ready(timings)
+
+
+@lru_cache(maxsize=None)
+def get_upload_format() -> UploadFormat:
+    """Formato compacto publicado aos clientes (OMR_UPLOAD_MAX_SIDE)"""
+    return UploadFormat(
+        max_side=int(os.getenv("OMR_UPLOAD_MAX_SIDE", UploadFormat.max_side))
+    )
 
 
 def get_read_answers_use_case() -> ReadAnswersUseCase:
     """Dependency injection para ReadAnswersUseCase"""
-    from app.infrastructure.omr_engine import OpenCVOMREngine
     from app.infrastructure.image_validator import ImageValidator
-    from app.infrastructure.debug_storage import DebugStorage
 
-    debug_storage = DebugStorage()
-    omr_engine = OpenCVOMREngine(debug_storage=debug_storage)
+    omr_engine = get_omr_engine()
     image_validator = ImageValidator()
 
-    return ReadAnswersUseCase(omr_engine, image_validator, debug_storage)
+    return ReadAnswersUseCase(
+        omr_engine, image_validator, omr_engine.debug_storage,
+        quality_gate=get_quality_gate(),
+        admission=get_admission_control(),
+        upload_format=get_upload_format()
+    )
 
 
-def get_correct_exam_use_case() -> CorrectExamUseCase:
+@lru_cache(maxsize=None)
+def get_review_sessions():
+    """
+    Imagens preparadas das sessões de revisão.
+
+    Com vários workers ficam no cache comum: o ajuste de uma sessão pode
+    chegar a qualquer worker.
+    """
+    return open_cache(
+        "sessions",
+        ttl_seconds=float(os.getenv("OMR_REVIEW_SESSION_TTL", 600)),
+        max_bytes=512 * 1024 * 1024,
+        max_entries=32
+    )
+
+
+def get_review_session_use_case(
+    sessions=Depends(get_review_sessions)
+) -> ReviewSessionUseCase:
+    """Dependency injection para ReviewSessionUseCase"""
+    return ReviewSessionUseCase(get_read_answers_use_case(), sessions)
+
+
+def get_live_scan_use_case() -> LiveScanUseCase:
+    """Dependency injection para LiveScanUseCase (acompanhamento por conexão)"""
+    from app.infrastructure.live_scanner import SheetTracker
+
+    return LiveScanUseCase(get_read_answers_use_case(), SheetTracker())
+
+
+@lru_cache(maxsize=None)
+def get_result_repository() -> IResultRepository:
+    """Histórico de correções (esquema criado uma vez por processo)"""
+    from app.infrastructure.answer_key_store import DEFAULT_DB_PATH
+    from app.infrastructure.result_store import SqliteResultRepository
+
+    return SqliteResultRepository(os.getenv("OMR_DB_PATH", DEFAULT_DB_PATH))
+
+
+def get_correct_exam_use_case(
+    result_repository: IResultRepository = Depends(get_result_repository)
+) -> CorrectExamUseCase:
     """Dependency injection para CorrectExamUseCase"""
     read_answers_use_case = get_read_answers_use_case()
-    return CorrectExamUseCase(read_answers_use_case)
+    return CorrectExamUseCase(read_answers_use_case, result_repository)
+
+
+def get_correct_exam_batch_use_case(
+    correct_exam_use_case: CorrectExamUseCase = Depends(get_correct_exam_use_case)
+) -> CorrectExamBatchUseCase:
+    """Dependency injection para CorrectExamBatchUseCase (índice por requisição)"""
+    from app.infrastructure.sheet_hash import SheetHashIndex
+
+    return CorrectExamBatchUseCase(correct_exam_use_case, SheetHashIndex())
+
+
+def get_class_analytics_use_case(
+    result_repository: IResultRepository = Depends(get_result_repository)
+) -> ClassAnalyticsUseCase:
+    """Dependency injection para ClassAnalyticsUseCase"""
+    return ClassAnalyticsUseCase(result_repository)
+
+
+@lru_cache(maxsize=None)
+def get_answer_key_repository() -> IAnswerKeyRepository:
+    """Repositório de gabaritos (único por processo, para manter o LRU)"""
+    from app.infrastructure.answer_key_store import (
+        SqliteAnswerKeyRepository, DEFAULT_DB_PATH
+    )
+
+    return SqliteAnswerKeyRepository(os.getenv("OMR_DB_PATH", DEFAULT_DB_PATH))
+
+
+def get_manage_answer_keys_use_case(
+    repository: IAnswerKeyRepository = Depends(get_answer_key_repository)
+) -> ManageAnswerKeysUseCase:
+    """Dependency injection para ManageAnswerKeysUseCase"""
+    return ManageAnswerKeysUseCase(repository)
+
+
+def to_answer_key(answer_key_dto: AnswerKeyDto) -> AnswerKey:
+    """Converte AnswerKeyDto para a Entity AnswerKey"""
+    questions = [
+        Question(
+            number=q.number,
+            correct_answer=q.correctAnswer,
+            points=q.points
+        )
+        for q in answer_key_dto.questions
+    ]
+
+    return AnswerKey(
+        id=answer_key_dto.id,
+        name=answer_key_dto.name,
+        questions=questions,
+        passing_score=answer_key_dto.passingScore
+    )
+
+
+def to_answer_key_dto(answer_key: AnswerKey) -> AnswerKeyDto:
+    """Converte a Entity AnswerKey para AnswerKeyDto"""
+    return AnswerKeyDto(
+        id=answer_key.id,
+        name=answer_key.name,
+        questions=[
+            QuestionDto(
+                number=q.number,
+                correctAnswer=q.correct_answer,
+                points=q.points
+            )
+            for q in answer_key.questions
+        ],
+        passingScore=answer_key.passing_score
+    )
+
+
+def to_quality_dto(quality: Optional[ImageQuality]) -> Optional[ImageQualityDto]:
+    """Converte ImageQuality para ImageQualityDto"""
+    if quality is None:
+        return None
+
+    return ImageQualityDto(
+        sharpness=quality.sharpness,
+        brightness=quality.brightness,
+        contrast=quality.contrast,
+        glare=quality.glare,
+        grid=quality.grid,
+        border=quality.border,
+        reason=quality.rejection_reason
+    )
+
+
+def quality_error_response(error: ImageQualityError) -> JSONResponse:
+    """Resposta 422 com o motivo da rejeição e os indicadores medidos"""
+    return JSONResponse(
+        status_code=422,
+        content=ErrorResponseDto(
+            detail=str(error),
+            error_type="image_quality",
+            quality=to_quality_dto(error.quality)
+        ).model_dump()
+    )
+
+
+def to_omr_options(options_dto: OMROptionsDto) -> OMROptions:
+    """Converte OMROptionsDto para o Value Object OMROptions"""
+    roi = None
+    if options_dto.roi:
+        roi = ROI(
+            x=options_dto.roi.x,
+            y=options_dto.roi.y,
+            width=options_dto.roi.w,
+            height=options_dto.roi.h
+        )
+
+    corners = None
+    if options_dto.corners:
+        corners = Quadrilateral(points=tuple(options_dto.corners))
+
+    return OMROptions(
+        num_questions=options_dto.numQuestions,
+        choices=options_dto.choices,
+        template=options_dto.template,
+        roi=roi,
+        corners=corners,
+        debug=options_dto.debug,
+        layout=to_sheet_layout(options_dto.layout, options_dto.numQuestions),
+        student_id_field=to_student_id_field(options_dto.studentId),
+        version_field=to_version_field(options_dto.version)
+    )
+
+
+def capacity_error(error: CapacityExceededError) -> HTTPException:
+    """503 com Retry-After quando o orçamento de memória está esgotado"""
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def to_sheet_layout(
+    layout_dto: Optional[SheetLayoutDto],
+    num_questions: int
+) -> Optional[SheetLayout]:
+    """Converte SheetLayoutDto para o Value Object SheetLayout"""
+    if layout_dto is None:
+        return None
+
+    if layout_dto.columns is not None:
+        return SheetLayout.columns(
+            num_questions,
+            layout_dto.columns,
+            has_number_column=layout_dto.numberColumn
+        )
+
+    return SheetLayout(blocks=tuple(
+        GridBlock(
+            region=RelativeRegion(b.x, b.y, b.w, b.h),
+            first_question=b.firstQuestion,
+            num_questions=b.numQuestions,
+            has_number_column=b.numberColumn
+        )
+        for b in layout_dto.blocks
+    ))
+
+
+def to_student_id_field(
+    field_dto: Optional[StudentIdFieldDto]
+) -> Optional[StudentIdField]:
+    """Converte StudentIdFieldDto para o Value Object StudentIdField"""
+    if field_dto is None:
+        return None
+
+    return StudentIdField(
+        region=RelativeRegion(field_dto.x, field_dto.y, field_dto.w, field_dto.h),
+        digits=field_dto.digits
+    )
+
+
+def to_version_field(
+    field_dto: Optional[VersionFieldDto]
+) -> Optional[VersionField]:
+    """Converte VersionFieldDto para o Value Object VersionField"""
+    if field_dto is None:
+        return None
+
+    return VersionField(
+        region=RelativeRegion(field_dto.x, field_dto.y, field_dto.w, field_dto.h),
+        versions=tuple(field_dto.versions)
+    )
+
+
+def to_batch_arguments(
+    answer_keys: ManageAnswerKeysUseCase,
+    gabaritos: str,
+    versao: Optional[str],
+    layout: Optional[str],
+    studentId: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Converte os campos de formulário de um lote para os argumentos de
+    CorrectExamBatchUseCase (answer_keys, version_field, layout,
+    student_id_field).
+
+    Raises:
+        json.JSONDecodeError: Campo que não é JSON
+        AnswerKeyNotFoundError: Gabarito não cadastrado
+        ValueError: Dados inválidos
+    """
+    gabaritos_dict = json.loads(gabaritos)
+    if not isinstance(gabaritos_dict, dict):
+        raise ValueError("Gabaritos devem ser um objeto {tipo: gabarito}")
+
+    keys_by_version = {
+        version: (
+            answer_keys.get(key) if isinstance(key, str)
+            else to_answer_key(AnswerKeyDto(**key))
+        )
+        for version, key in gabaritos_dict.items()
+    }
+    if not keys_by_version:
+        raise ValueError("Informe pelo menos um gabarito")
+
+    version_field = None
+    if versao:
+        version_field = to_version_field(VersionFieldDto(**json.loads(versao)))
+        unknown = set(keys_by_version) - set(version_field.versions)
+        if unknown:
+            raise ValueError(
+                f"Tipos de prova sem marcação na folha: {sorted(unknown)}"
+            )
+
+    sheet_layout = None
+    if layout:
+        sheet_layout = to_sheet_layout(
+            SheetLayoutDto(**json.loads(layout)),
+            max(len(k.questions) for k in keys_by_version.values())
+        )
+
+    student_id_field = None
+    if studentId:
+        student_id_field = to_student_id_field(
+            StudentIdFieldDto(**json.loads(studentId))
+        )
+
+    return dict(
+        answer_keys=keys_by_version,
+        version_field=version_field,
+        layout=sheet_layout,
+        student_id_field=student_id_field
+    )
 
 
 @router.post("/omr/read", response_model=OMRResultDto)
 async def read_answers(
     image: UploadFile = File(...),
     options: str = Form(...),
+    accept: Optional[str] = Header(None),
     use_case: ReadAnswersUseCase = Depends(get_read_answers_use_case)
 ):
     """
@@ -52,14 +571,18 @@ async def read_answers(
     Args:
         image: Arquivo de imagem (JPG/PNG/WEBP)
         options: JSON string com configurações OMROptionsDto
+        accept: Header Accept (application/msgpack para MessagePack)
         use_case: Use case injetado
 
     Returns:
-        OMRResultDto com respostas detectadas
+        OMRResultDto com respostas detectadas (JSON ou MessagePack)
 
     Raises:
         HTTPException 400: Dados inválidos
         HTTPException 500: Erro no processamento
+
+    Responses:
+        422: Foto rejeitada pela verificação rápida de qualidade
     """
     try:
         # Parse options JSON
@@ -67,45 +590,30 @@ async def read_answers(
         options_dto = OMROptionsDto(**options_dict)
 
         # Converter DTO para Value Object
-        roi = None
-        if options_dto.roi:
-            roi = ROI(
-                x=options_dto.roi.x,
-                y=options_dto.roi.y,
-                width=options_dto.roi.w,
-                height=options_dto.roi.h
-            )
-
-        omr_options = OMROptions(
-            num_questions=options_dto.numQuestions,
-            choices=options_dto.choices,
-            template=options_dto.template,
-            roi=roi,
-            debug=options_dto.debug
-        )
+        omr_options = to_omr_options(options_dto)
 
         # Executar use case
-        result = use_case.execute(
+        result = await run_read(
+            use_case.execute,
             image_file=image.file,
             filename=image.filename or "image.jpg",
             options=omr_options
         )
 
-        # Converter resultado para DTO
-        return OMRResultDto(
-            answers=result.get_answers_dict(),
-            confidence=result.get_confidence_dict(),
-            flags=result.get_flags(),
-            debug=result.debug_images
-        )
+        # Serializar direto do domínio (formato de OMRResultDto)
+        return encoded_response(omr_result_payload(result), accept)
 
     except json.JSONDecodeError:
         raise HTTPException(
             status_code=400,
             detail="Options deve ser um JSON válido"
         )
+    except ImageQualityError as e:
+        return quality_error_response(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except CapacityExceededError as e:
+        raise capacity_error(e)
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
@@ -115,11 +623,201 @@ async def read_answers(
         )
 
 
+@router.post("/omr/sessoes", response_model=ReviewSessionDto, status_code=201)
+async def start_review_session(
+    image: UploadFile = File(...),
+    options: str = Form(...),
+    accept: Optional[str] = Header(None),
+    use_case: ReviewSessionUseCase = Depends(get_review_session_use_case)
+):
+    """
+    Abre uma sessão de revisão: a foto é enviada e decodificada uma vez.
+
+    Args:
+        image: Arquivo de imagem (JPG/PNG/WEBP)
+        options: JSON string com configurações OMROptionsDto (leitura inicial)
+        accept: Header Accept (application/msgpack para MessagePack)
+        use_case: Use case injetado
+
+    Returns:
+        ReviewSessionDto com id da sessão, prévia reduzida, ROI e leitura
+        inicial (ou o erro dela, ex: ROI não detectado)
+
+    Raises:
+        HTTPException 400: Dados inválidos
+        HTTPException 500: Erro no processamento
+    """
+    try:
+        options_dto = OMROptionsDto(**json.loads(options))
+        session = await run_read(
+            use_case.start,
+            image_file=image.file,
+            filename=image.filename or "image.jpg",
+            options=to_omr_options(options_dto)
+        )
+        return encoded_response(
+            review_session_payload(session), accept, status_code=201
+        )
+
+    except json.JSONDecodeError:
+        raise HTTPException(
+            status_code=400,
+            detail="Options deve ser um JSON válido"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CapacityExceededError as e:
+        raise capacity_error(e)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/omr/sessoes/{session_id}/roi", response_model=OMRResultDto)
+async def adjust_review_session(
+    session_id: str,
+    options: OMROptionsDto,
+    accept: Optional[str] = Header(None),
+    use_case: ReviewSessionUseCase = Depends(get_review_session_use_case)
+):
+    """
+    Relê a foto da sessão com um novo ROI ou novos cantos.
+
+    Só a binarização do ROI, a correção de perspectiva, a remoção de grade
+    e a análise de células são refeitas. Coordenadas em pixels da imagem
+    original (dividir as da prévia por previewScale).
+
+    Raises:
+        HTTPException 400: Opções inválidas
+        HTTPException 404: Sessão inexistente ou expirada
+        HTTPException 500: Erro no processamento
+    """
+    try:
+        result = await run_read(
+            use_case.adjust, session_id, to_omr_options(options)
+        )
+        return encoded_response(omr_result_payload(result), accept)
+
+    except ReviewSessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CapacityExceededError as e:
+        raise capacity_error(e)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/omr/sessoes/{session_id}", status_code=204)
+async def close_review_session(
+    session_id: str,
+    use_case: ReviewSessionUseCase = Depends(get_review_session_use_case)
+):
+    """Encerra a sessão e libera a imagem guardada"""
+    if not use_case.close(session_id):
+        raise HTTPException(
+            status_code=404, detail=str(ReviewSessionNotFoundError(session_id))
+        )
+    return Response(status_code=204)
+
+
+@router.websocket("/omr/live")
+async def live_scan(
+    websocket: WebSocket,
+    use_case: LiveScanUseCase = Depends(get_live_scan_use_case)
+):
+    """
+    Leitura ao vivo pela câmera.
+
+    Protocolo (mensagens do servidor em JSON, uma por mensagem recebida):
+    1. O cliente envia as opções (texto, JSON de OMROptionsDto); novas
+       opções podem ser enviadas a qualquer momento
+    2. Cada quadro de baixa resolução (binário, JPEG com ~480px) recebe a
+       orientação {"type": "guidance", "status", "message", "corners", ...}
+    3. Quando a orientação traz "capture": true, a próxima mensagem
+       binária é a foto em resolução total, respondida com
+       {"type": "result", ...campos de OMRResultDto} ou {"type": "error", ...};
+       o acompanhamento então recomeça
+
+    O cliente envia um quadro por vez, após a resposta do anterior: assim
+    o servidor nunca acumula fila e a orientação acompanha a câmera.
+    """
+    await websocket.accept()
+    options: Optional[OMROptions] = None
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("text") is not None:
+                try:
+                    options = to_omr_options(
+                        OMROptionsDto(**json.loads(message["text"]))
+                    )
+                except ValueError as e:  # JSON e validação do DTO
+                    await send_live(websocket, live_error("invalid_options", str(e)))
+                continue
+
+            data = message.get("bytes") or b""
+            if options is None:
+                payload = live_error(
+                    "invalid_options", "Envie as opções antes dos quadros"
+                )
+            elif use_case.awaiting_capture:
+                payload = await live_capture(use_case, data, options)
+            else:
+                try:
+                    # Pool próprio: quadros não esperam leituras completas
+                    assessment = await anyio.to_thread.run_sync(
+                        use_case.frame, data, limiter=get_frame_limiter()
+                    )
+                    payload = frame_assessment_payload(assessment)
+                except ValueError as e:
+                    payload = live_error("invalid_frame", str(e))
+            await send_live(websocket, payload)
+
+    except WebSocketDisconnect:
+        pass
+
+
+async def live_capture(
+    use_case: LiveScanUseCase,
+    image_data: bytes,
+    options: OMROptions
+) -> dict:
+    """Lê a captura da leitura ao vivo; erros viram mensagens, não exceções"""
+    try:
+        result = await run_read(use_case.read, image_data, "captura.jpg", options)
+        return {"type": "result", **omr_result_payload(result)}
+    except ImageQualityError as e:
+        return live_error("image_quality", str(e), quality=quality_payload(e.quality))
+    except ValueError as e:
+        return live_error("invalid_image", str(e))
+    except CapacityExceededError as e:
+        return live_error("capacity", str(e), retry_after=e.retry_after)
+    except RuntimeError as e:
+        return live_error("processing", str(e))
+
+
+def live_error(error_type: str, detail: str, **extra: Any) -> dict:
+    """Mensagem de erro da leitura ao vivo (campos de ErrorResponseDto)"""
+    return {"type": "error", "detail": detail, "error_type": error_type, **extra}
+
+
+async def send_live(websocket: WebSocket, payload: dict):
+    await websocket.send_text(encode_json(payload).decode("utf-8"))
+
+
 @router.post("/corrigir", response_model=ExamCorrectionDto)
 async def correct_exam(
     image: UploadFile = File(...),
-    gabarito: str = Form(...),
-    use_case: CorrectExamUseCase = Depends(get_correct_exam_use_case)
+    gabarito: Optional[str] = Form(None),
+    gabaritoId: Optional[str] = Form(None),
+    layout: Optional[str] = Form(None),
+    studentId: Optional[str] = Form(None),
+    accept: Optional[str] = Header(None),
+    use_case: CorrectExamUseCase = Depends(get_correct_exam_use_case),
+    answer_keys: ManageAnswerKeysUseCase = Depends(get_manage_answer_keys_use_case)
 ):
     """
     Endpoint para corrigir uma prova completa.
@@ -127,54 +825,74 @@ async def correct_exam(
     Args:
         image: Arquivo de imagem da prova
         gabarito: JSON string com gabarito (AnswerKeyDto)
+        gabaritoId: Id de gabarito cadastrado (alternativa a gabarito)
+        layout: JSON string opcional com layout da folha (SheetLayoutDto)
+        studentId: JSON string opcional com bloco de matrícula (StudentIdFieldDto)
+        accept: Header Accept (application/msgpack para MessagePack)
         use_case: Use case injetado
+        answer_keys: Cadastro de gabaritos injetado
 
     Returns:
-        ExamCorrectionDto com resultado completo
+        ExamCorrectionDto com resultado completo (JSON ou MessagePack)
 
     Raises:
         HTTPException 400: Dados inválidos
+        HTTPException 404: Gabarito não cadastrado
         HTTPException 500: Erro no processamento
+
+    Responses:
+        422: Foto rejeitada pela verificação rápida de qualidade
     """
     try:
-        # Parse gabarito JSON
-        gabarito_dict = json.loads(gabarito)
-        gabarito_dto = AnswerKeyDto(**gabarito_dict)
+        if (gabarito is None) == (gabaritoId is None):
+            raise ValueError("Informe 'gabarito' ou 'gabaritoId' (apenas um)")
 
-        # Converter DTO para Entity
-        questions = [
-            Question(
-                number=q.number,
-                correct_answer=q.correctAnswer,
-                points=q.points
+        if gabaritoId is not None:
+            # Gabarito cadastrado: já compilado no cache do repositório
+            answer_key = answer_keys.get(gabaritoId)
+        else:
+            # Parse gabarito JSON e converter DTO para Entity
+            gabarito_dto = AnswerKeyDto(**json.loads(gabarito))
+            answer_key = to_answer_key(gabarito_dto)
+
+        sheet_layout = None
+        if layout:
+            sheet_layout = to_sheet_layout(
+                SheetLayoutDto(**json.loads(layout)), len(answer_key.questions)
             )
-            for q in gabarito_dto.questions
-        ]
 
-        answer_key = AnswerKey(
-            id=gabarito_dto.id,
-            name=gabarito_dto.name,
-            questions=questions,
-            passing_score=gabarito_dto.passingScore
-        )
+        student_id_field = None
+        if studentId:
+            student_id_field = to_student_id_field(
+                StudentIdFieldDto(**json.loads(studentId))
+            )
 
         # Executar use case
-        result = use_case.execute(
+        result = await run_read(
+            use_case.execute,
             image_file=image.file,
             filename=image.filename or "image.jpg",
-            answer_key=answer_key
+            answer_key=answer_key,
+            layout=sheet_layout,
+            student_id_field=student_id_field
         )
 
-        # Retornar resultado como dict
-        return result.to_dict()
+        # Serializar direto do domínio (formato de ExamCorrectionDto)
+        return encoded_response(result.to_dict(), accept)
 
     except json.JSONDecodeError:
         raise HTTPException(
             status_code=400,
-            detail="Gabarito deve ser um JSON válido"
+            detail="Gabarito, layout e studentId devem ser JSON válidos"
         )
+    except AnswerKeyNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ImageQualityError as e:
+        return quality_error_response(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except CapacityExceededError as e:
+        raise capacity_error(e)
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
@@ -184,7 +902,410 @@ async def correct_exam(
         )
 
 
+@router.post("/corrigir/lote", response_model=BatchCorrectionDto)
+async def correct_exam_batch(
+    images: List[UploadFile] = File(...),
+    gabaritos: str = Form(...),
+    versao: Optional[str] = Form(None),
+    layout: Optional[str] = Form(None),
+    studentId: Optional[str] = Form(None),
+    limiarAdaptativo: bool = Form(True),
+    pularDuplicatas: bool = Form(True),
+    accept: Optional[str] = Header(None),
+    use_case: CorrectExamBatchUseCase = Depends(get_correct_exam_batch_use_case),
+    answer_keys: ManageAnswerKeysUseCase = Depends(get_manage_answer_keys_use_case)
+):
+    """
+    Endpoint para corrigir um lote de provas com versões misturadas.
+
+    Args:
+        images: Arquivos de imagem das provas
+        gabaritos: JSON string {tipo de prova: AnswerKeyDto ou id cadastrado}
+        versao: JSON string com a marcação do tipo de prova (VersionFieldDto);
+            obrigatória quando houver mais de um gabarito
+        layout: JSON string opcional com layout da folha (SheetLayoutDto)
+        studentId: JSON string opcional com bloco de matrícula (StudentIdFieldDto)
+        limiarAdaptativo: Decidir as marcações com limiares ajustados às
+            densidades do lote inteiro (padrão: sim)
+        pularDuplicatas: Não corrigir cópias de outra folha do lote (a
+            mesma folha enviada duas vezes, com a mesma matrícula; padrão:
+            sim). Folhas quase idênticas sem matrícula são corrigidas e
+            apontadas em duplicataDe
+        accept: Header Accept (application/msgpack para MessagePack)
+        use_case: Use case injetado
+        answer_keys: Cadastro de gabaritos injetado
+
+    Returns:
+        BatchCorrectionDto com o resultado de cada folha (JSON ou MessagePack)
+
+    Raises:
+        HTTPException 400: Dados inválidos
+        HTTPException 404: Gabarito não cadastrado
+        HTTPException 500: Erro no processamento
+    """
+    try:
+        arguments = to_batch_arguments(answer_keys, gabaritos, versao, layout, studentId)
+        result = await run_read(
+            use_case.execute,
+            images=[
+                (image.file, image.filename or f"image_{i}.jpg")
+                for i, image in enumerate(images)
+            ],
+            **arguments,
+            adaptive_thresholds=limiarAdaptativo,
+            skip_duplicates=pularDuplicatas
+        )
+
+        return encoded_response(result.to_dict(), accept)
+
+    except json.JSONDecodeError:
+        raise HTTPException(
+            status_code=400,
+            detail="Gabaritos, versao, layout e studentId devem ser JSON válidos"
+        )
+    except AnswerKeyNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CapacityExceededError as e:
+        raise capacity_error(e)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro inesperado: {str(e)}"
+        )
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@router.post(
+    "/corrigir/zip",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
+)
+async def correct_exam_zip(
+    arquivo: UploadFile = File(...),
+    gabaritos: str = Form(...),
+    versao: Optional[str] = Form(None),
+    layout: Optional[str] = Form(None),
+    studentId: Optional[str] = Form(None),
+    pularDuplicatas: bool = Form(True),
+    use_case: CorrectExamBatchUseCase = Depends(get_correct_exam_batch_use_case),
+    answer_keys: ManageAnswerKeysUseCase = Depends(get_manage_answer_keys_use_case)
+):
+    """
+    Endpoint para corrigir as folhas de um .zip (turma exportada), em fluxo.
+
+    O .zip é lido entrada por entrada, sem extrair para o disco: cada
+    imagem vai para as leituras assim que é descomprimida, e a correção
+    volta assim que sai. As marcações são decididas por folha (sem os
+    limiares do lote de /corrigir/lote, que pedem todas as folhas lidas).
+
+    Args:
+        arquivo: Arquivo .zip com as imagens das provas
+        gabaritos, versao, layout, studentId, pularDuplicatas: Como em
+            /corrigir/lote
+        use_case: Use case injetado
+        answer_keys: Cadastro de gabaritos injetado
+
+    Returns:
+        NDJSON: uma linha por imagem, na ordem do .zip, no formato de
+        BatchItemDto; a última linha é {"resumo": {...}} com as contagens
+        de BatchCorrectionDto
+
+    Raises:
+        HTTPException 400: Dados inválidos ou .zip inválido
+        HTTPException 404: Gabarito não cadastrado
+    """
+    from app.infrastructure.zip_archive import ZipImageArchive
+
+    try:
+        arguments = to_batch_arguments(answer_keys, gabaritos, versao, layout, studentId)
+        options = use_case.begin(**arguments)
+        # O upload é fechado quando o endpoint retorna, antes do fluxo
+        archive = await anyio.to_thread.run_sync(ZipImageArchive.copy_of, arquivo.file)
+    except json.JSONDecodeError:
+        raise HTTPException(
+            status_code=400,
+            detail="Gabaritos, versao, layout e studentId devem ser JSON válidos"
+        )
+    except AnswerKeyNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        stream_zip_corrections(
+            use_case, archive, options, arguments["answer_keys"], pularDuplicatas
+        ),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+async def stream_zip_corrections(
+    use_case: CorrectExamBatchUseCase,
+    archive: Any,
+    options: OMROptions,
+    answer_keys: Dict[str, AnswerKey],
+    skip_duplicates: bool
+) -> AsyncIterator[bytes]:
+    """
+    Corrige as entradas do .zip em leituras simultâneas, uma linha por folha.
+
+    Cada entrada é despachada ao pool de leituras, que a descomprime e a
+    lê na mesma thread (ver correct_zip_entry); com
+    ENTRIES_IN_FLIGHT_PER_THREAD entradas por thread de leitura em voo, a
+    próxima só é despachada quando a mais antiga sai. A memória fica
+    limitada às entradas em leitura, e as linhas saem na ordem do .zip.
+    Uma entrada que falha vira o erro da sua linha: o resumo sai sempre.
+
+    Args:
+        archive: ZipImageArchive sobre a cópia do upload (fechado no fim)
+    """
+    from app.infrastructure.zip_archive import ENTRIES_IN_FLIGHT_PER_THREAD
+
+    in_flight = ENTRIES_IN_FLIGHT_PER_THREAD * get_concurrency().read_threads
+    batch = BatchCorrection()
+    pending: Deque[Tuple[Any, "asyncio.Future[BatchItem]"]] = deque()
+    try:
+        for entry in archive.entries:
+            if len(pending) >= in_flight:
+                batch.items.append(await zip_entry_item(*pending.popleft()))
+                yield encode_json(batch.items[-1].to_dict()) + b"\n"
+
+            pending.append((entry, asyncio.ensure_future(run_read(
+                correct_zip_entry, use_case, archive, entry,
+                options, answer_keys, skip_duplicates
+            ))))
+
+        while pending:
+            batch.items.append(await zip_entry_item(*pending.popleft()))
+            yield encode_json(batch.items[-1].to_dict()) + b"\n"
+        yield encode_json({"resumo": batch.summary_dict()}) + b"\n"
+    finally:
+        # Cliente desconectado: as leituras em voo não são mais esperadas
+        for _, future in pending:
+            future.cancel()
+        archive.close()
+
+
+async def zip_entry_item(entry: Any, future: "asyncio.Future[BatchItem]") -> BatchItem:
+    """
+    Espera a correção de uma entrada; falha ou cancelamento vira o erro.
+
+    O cancelamento do próprio fluxo (cliente desconectado) é propagado.
+    """
+    try:
+        return await future
+    except asyncio.CancelledError:
+        if asyncio.current_task().cancelling():
+            raise
+        return BatchItem(filename=entry.filename, error="Leitura cancelada")
+    except Exception as e:
+        return BatchItem(filename=entry.filename, error=str(e) or type(e).__name__)
+
+
+def correct_zip_entry(
+    use_case: CorrectExamBatchUseCase,
+    archive: Any,
+    entry: Any,
+    options: OMROptions,
+    answer_keys: Dict[str, AnswerKey],
+    skip_duplicates: bool
+) -> BatchItem:
+    """
+    Descomprime e corrige uma entrada do .zip, na thread de leitura.
+
+    A assinatura da imagem é conferida ao descomprimir: entradas que não
+    são imagens viram o motivo da falha antes da leitura. Qualquer outra
+    falha também fica na linha da entrada, sem interromper o fluxo.
+    """
+    try:
+        data = archive.read(entry)
+        return use_case.correct_one(
+            io.BytesIO(data), entry.filename, options, answer_keys, skip_duplicates
+        )
+    except Exception as e:
+        return BatchItem(filename=entry.filename, error=str(e) or type(e).__name__)
+
+
+@router.post("/gabaritos", response_model=AnswerKeyDto, status_code=201)
+async def create_answer_key(
+    answer_key_dto: AnswerKeyDto,
+    use_case: ManageAnswerKeysUseCase = Depends(get_manage_answer_keys_use_case)
+):
+    """
+    Cadastra um gabarito para ser referenciado por id nas correções.
+
+    Raises:
+        HTTPException 409: Já existe gabarito com o mesmo id
+    """
+    try:
+        return to_answer_key_dto(use_case.create(to_answer_key(answer_key_dto)))
+    except AnswerKeyExistsError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/gabaritos", response_model=List[AnswerKeyDto])
+async def list_answer_keys(
+    use_case: ManageAnswerKeysUseCase = Depends(get_manage_answer_keys_use_case)
+):
+    """Lista os gabaritos cadastrados"""
+    return [to_answer_key_dto(key) for key in use_case.list_all()]
+
+
+@router.get("/gabaritos/{key_id}", response_model=AnswerKeyDto)
+async def get_answer_key(
+    key_id: str,
+    use_case: ManageAnswerKeysUseCase = Depends(get_manage_answer_keys_use_case)
+):
+    """
+    Consulta um gabarito cadastrado.
+
+    Raises:
+        HTTPException 404: Gabarito não cadastrado
+    """
+    try:
+        return to_answer_key_dto(use_case.get(key_id))
+    except AnswerKeyNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.put("/gabaritos/{key_id}", response_model=AnswerKeyDto)
+async def update_answer_key(
+    key_id: str,
+    answer_key_dto: AnswerKeyDto,
+    use_case: ManageAnswerKeysUseCase = Depends(get_manage_answer_keys_use_case)
+):
+    """
+    Substitui um gabarito cadastrado (as próximas correções já usam a nova versão).
+
+    Raises:
+        HTTPException 400: Id do corpo diferente do id da URL
+        HTTPException 404: Gabarito não cadastrado
+    """
+    try:
+        return to_answer_key_dto(
+            use_case.update(key_id, to_answer_key(answer_key_dto))
+        )
+    except AnswerKeyNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.delete("/gabaritos/{key_id}", status_code=204)
+async def delete_answer_key(
+    key_id: str,
+    use_case: ManageAnswerKeysUseCase = Depends(get_manage_answer_keys_use_case)
+):
+    """
+    Remove um gabarito cadastrado.
+
+    Raises:
+        HTTPException 404: Gabarito não cadastrado
+    """
+    try:
+        use_case.delete(key_id)
+    except AnswerKeyNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return Response(status_code=204)
+
+
+@router.get("/resultados/{key_id}/resumo", response_model=ClassSummaryDto)
+async def class_summary(
+    key_id: str,
+    accept: Optional[str] = Header(None),
+    use_case: ClassAnalyticsUseCase = Depends(get_class_analytics_use_case)
+):
+    """Médias, extremos e taxa de aprovação da turma no gabarito"""
+    return encoded_response(use_case.summary(key_id).to_dict(), accept)
+
+
+@router.get(
+    "/resultados/{key_id}/questoes", response_model=List[QuestionStatisticsDto]
+)
+async def question_statistics(
+    key_id: str,
+    accept: Optional[str] = Header(None),
+    use_case: ClassAnalyticsUseCase = Depends(get_class_analytics_use_case)
+):
+    """Acertos, erros, brancos, anuladas e dificuldade de cada questão"""
+    return encoded_response(
+        [stats.to_dict() for stats in use_case.questions(key_id)], accept
+    )
+
+
+@router.get(
+    "/resultados/{key_id}/distratores", response_model=List[DistractorAnalysisDto]
+)
+async def distractor_analysis(
+    key_id: str,
+    accept: Optional[str] = Header(None),
+    use_case: ClassAnalyticsUseCase = Depends(get_class_analytics_use_case)
+):
+    """Escolha de cada alternativa e percentual médio de quem a marcou"""
+    return encoded_response(
+        [analysis.to_dict() for analysis in use_case.distractors(key_id)], accept
+    )
+
+
+@router.get("/resultados/{key_id}/itens", response_model=ItemAnalysisDto)
+async def item_analysis(
+    key_id: str,
+    accept: Optional[str] = Header(None),
+    use_case: ClassAnalyticsUseCase = Depends(get_class_analytics_use_case)
+):
+    """Dificuldade, discriminação, ponto-bisserial e taxas de escolha por questão"""
+    return encoded_response(use_case.items(key_id).to_dict(), accept)
+
+
+@router.get("/omr/formato", response_model=UploadFormatDto)
+async def upload_format(upload_format=Depends(get_upload_format)):
+    """
+    Formato compacto de envio das fotos.
+
+    O cliente reduz a foto ao lado maior publicado, converte para tons de
+    cinza e codifica antes do envio: a foto do celular cai de vários MB
+    para poucas centenas de KB. Enviado com o nome de arquivo publicado e
+    dentro dos limites, o servidor aceita o arquivo sem nova verificação
+    nem redimensionamento.
+    """
+    return UploadFormatDto(
+        maxSide=upload_format.max_side,
+        mediaType=upload_format.media_type,
+        quality=upload_format.quality,
+        grayscale=upload_format.grayscale,
+        filename=upload_format.filename
+    )
+
+
 @router.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (vivacidade: o processo responde)"""
     return {"status": "ok", "service": "omr-service"}
+
+
+@router.get("/ready")
+async def readiness_check(readiness=Depends(get_readiness)):
+    """
+    Prontidão: o motor já foi aquecido e pode receber leituras.
+
+    Responde 503 enquanto o aquecimento não terminou (ou se falhou), para
+    que o balanceador só envie tráfego a processos aquecidos.
+    """
+    if not readiness.ready:
+        status = "error" if readiness.error else "warming_up"
+        return JSONResponse(
+            status_code=503,
+            content={"status": status, "service": "omr-service", "error": readiness.error}
+        )
+    return {
+        "status": "ready",
+        "service": "omr-service",
+        "warmupMs": {name: round(ms, 1) for name, ms in readiness.timings.items()},
+        "concurrency": get_concurrency().to_dict()
+    }
@@ -0,0 +1,170 @@
+"""
+Presentation Layer - Serialization
+
+Serialização direta dos resultados do domínio para bytes.
+
+Os resultados já saem de objetos confiáveis do domínio, então as rotas
+montam o payload e o codificam sem passar de novo pela validação dos
+DTOs Pydantic (os DTOs continuam documentando o formato no OpenAPI).
+JSON usa orjson quando instalado; MessagePack é usado quando o cliente
+pede via header Accept e a biblioteca msgpack está instalada.
+"""
+
+import base64
+import json
+from typing import Any, Dict, Optional
+
+from fastapi.responses import Response
+
+from app.domain.entities import OMRResult, ReviewSession
+from app.domain.value_objects import FrameAssessment, ImageQuality
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depende do ambiente
+    msgpack = None
+
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+
+def quality_payload(quality: Optional[ImageQuality]) -> Optional[Dict[str, Any]]:
+    """Payload de ImageQualityDto"""
+    if quality is None:
+        return None
+
+    return {
+        "sharpness": quality.sharpness,
+        "brightness": quality.brightness,
+        "contrast": quality.contrast,
+        "glare": quality.glare,
+        "grid": quality.grid,
+        "border": quality.border,
+        "reason": quality.rejection_reason
+    }
+
+
+def omr_result_payload(result: OMRResult) -> Dict[str, Any]:
+    """Payload de OMRResultDto (mesmas chaves e ordem do DTO)"""
+    return {
+        "answers": result.get_answers_dict(),
+        "confidence": result.get_confidence_dict(),
+        "flags": result.get_flags(),
+        "debug": result.debug_images,
+        "studentId": result.student_id,
+        "studentIdConfidence": result.student_id_confidence,
+        "examVersion": result.exam_version,
+        "examVersionConfidence": result.exam_version_confidence,
+        "quality": quality_payload(result.quality),
+        "orientation": result.orientation
+    }
+
+
+def review_session_payload(session: ReviewSession) -> Dict[str, Any]:
+    """Payload de ReviewSessionDto (prévia como data URL JPEG)"""
+    result = session.result
+    roi = result.roi if result is not None else None
+    return {
+        "sessionId": session.id,
+        "width": session.image_width,
+        "height": session.image_height,
+        "preview": "data:image/jpeg;base64,"
+        + base64.b64encode(session.preview).decode("ascii"),
+        "previewScale": session.preview_scale,
+        "roi": None if roi is None else {
+            "x": roi.x, "y": roi.y, "w": roi.width, "h": roi.height
+        },
+        "result": None if result is None else omr_result_payload(result),
+        "error": session.error
+    }
+
+
+def frame_assessment_payload(assessment: FrameAssessment) -> Dict[str, Any]:
+    """Mensagem de orientação da leitura ao vivo (uma por quadro)"""
+    corners = assessment.corners
+    return {
+        "type": "guidance",
+        "status": assessment.status.value,
+        "message": assessment.guidance,
+        "capture": assessment.ready,
+        "corners": None if corners is None else [list(p) for p in corners.points],
+        "frameWidth": assessment.frame_width,
+        "frameHeight": assessment.frame_height,
+        "coverage": assessment.coverage,
+        "sharpness": assessment.sharpness,
+        "motion": assessment.motion,
+        "stableFrames": assessment.stable_frames,
+        "tracked": assessment.tracked,
+        "elapsedMs": assessment.elapsed_ms
+    }
+
+
+def encode_json(payload: Any) -> bytes:
+    """Codifica em JSON compacto (UTF-8)"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(
+        payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def encode_msgpack(payload: Any) -> bytes:
+    """Codifica em MessagePack"""
+    if msgpack is None:
+        raise RuntimeError("MessagePack indisponível: instale o pacote msgpack")
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """
+    Verifica se o header Accept prefere MessagePack a JSON.
+
+    Considera os pesos (q) informados; em empate, prevalece JSON.
+    """
+    if not accept or msgpack is None:
+        return False
+
+    weights: Dict[str, float] = {}
+    for part in accept.split(","):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[media_type.lower()] = weight
+
+    msgpack_weight = max(weights.get(t, 0.0) for t in MSGPACK_MEDIA_TYPES)
+    json_weight = max(
+        weights.get(JSON_MEDIA_TYPE, 0.0),
+        weights.get("application/*", 0.0),
+        weights.get("*/*", 0.0)
+    )
+    return msgpack_weight > 0 and msgpack_weight > json_weight
+
+
+def encoded_response(
+    payload: Any,
+    accept: Optional[str] = None,
+    status_code: int = 200
+) -> Response:
+    """Resposta já codificada no formato negociado (JSON por padrão)"""
+    if wants_msgpack(accept):
+        return Response(
+            encode_msgpack(payload), status_code=status_code,
+            media_type=MSGPACK_MEDIA_TYPE
+        )
+    return Response(
+        encode_json(payload), status_code=status_code,
+        media_type=JSON_MEDIA_TYPE
+    )
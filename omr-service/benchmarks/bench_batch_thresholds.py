@@ -0,0 +1,123 @@
+"""
+Benchmark dos limiares por lote: decisões por folha contra as da turma.
+
+Gera uma turma de folhas sintéticas com os defeitos comuns de uma mesma
+sala (pontos de caneta, marcações apagadas, ruído do papel) e compara as
+decisões de cada folha com a reclassificação pelo lote:
+- respostas lidas corretamente
+- leituras erradas sem sinalização (resposta errada com qualidade clara)
+- questões respondidas enviadas para revisão
+- tempo da reclassificação por folha (ms), frente ao da leitura
+
+Uso:
+    python -m benchmarks.bench_batch_thresholds --sheets 30
+    python -m benchmarks.bench_batch_thresholds --sheets 40 --questions 50
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from app.domain.entities import MarkQuality, OMRResult
+from app.domain.value_objects import OMROptions
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.synthetic_sheet import (
+    ANSWER_AREA, encode_image, render_answer_sheet
+)
+
+
+CHOICES = ["A", "B", "C", "D", "E"]
+SIZE = (1240, 1754)
+
+
+def _cell_center(question: int, choice: int, num_questions: int):
+    """Centro da célula e o seu menor lado, na tabela única padrão"""
+    ax, ay, aw, ah = ANSWER_AREA
+    cell_w = aw * SIZE[0] / (len(CHOICES) + 1)
+    cell_h = ah * SIZE[1] / num_questions
+    return (
+        int(ax * SIZE[0] + (choice + 1.5) * cell_w),
+        int(ay * SIZE[1] + (question + 0.5) * cell_h),
+        min(cell_w, cell_h)
+    )
+
+
+def _sheet(answers: Sequence[Optional[str]], rng: random.Random) -> bytes:
+    """Folha com pontos de caneta, marcações apagadas e ruído"""
+    img = render_answer_sheet(answers, CHOICES, size=SIZE)
+    for question, answer in enumerate(answers):
+        # Defeitos nas alternativas não marcadas
+        others = [i for i, choice in enumerate(CHOICES) if choice != answer]
+        if rng.random() < 0.15:  # Ponto de caneta
+            cx, cy, _ = _cell_center(question, rng.choice(others), len(answers))
+            center = (cx + rng.randint(-8, 8), cy + rng.randint(-8, 8))
+            cv2.circle(img, center, rng.randint(3, 6), (0, 0, 0), -1)
+        if rng.random() < 0.08:  # Marcação apagada: um traço claro
+            cx, cy, side = _cell_center(question, rng.choice(others), len(answers))
+            r = int(side * 0.3)
+            cv2.line(img, (cx - r, cy - r), (cx + r, cy + r), (150, 150, 150), 3)
+    noise = np.random.default_rng(rng.randrange(1 << 16)).normal(0, 6, img.shape)
+    return encode_image(np.clip(img + noise, 0, 255).astype(np.uint8))
+
+
+def _score(results: List[OMRResult], keys: List[List[Optional[str]]]) -> Dict[str, float]:
+    correct = silent = review = answered = 0
+    for result, key in zip(results, keys):
+        for answer, mark in zip(result.answers, key):
+            correct += answer.marked_choice == mark
+            silent += (
+                answer.marked_choice != mark and answer.quality == MarkQuality.CLEAR
+            )
+            if mark is not None:
+                answered += 1
+                review += answer.needs_review()
+    total = sum(len(key) for key in keys)
+    return {
+        "acertos (%)": 100 * correct / total,
+        "erros sem aviso": silent,
+        "revisões (%)": 100 * review / answered,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sheets", type=int, default=30)
+    parser.add_argument("--questions", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    keys = [
+        [None if rng.random() < 0.08 else rng.choice(CHOICES)
+         for _ in range(args.questions)]
+        for _ in range(args.sheets)
+    ]
+    photos = [_sheet(key, rng) for key in keys]
+
+    engine = OpenCVOMREngine()
+    options = OMROptions(num_questions=args.questions, choices=CHOICES)
+    started = time.perf_counter()
+    per_sheet = [engine.process_image(data, options) for data in photos]
+    read_ms = 1000 * (time.perf_counter() - started) / args.sheets
+
+    started = time.perf_counter()
+    batch, thresholds = engine.classify_batch(per_sheet)
+    classify_ms = 1000 * (time.perf_counter() - started) / args.sheets
+
+    results = {"por folha": _score(per_sheet, keys), "lote": _score(batch, keys)}
+
+    print(f"{args.sheets} folhas, {args.questions} questões; limiar do lote: "
+          + (f"{thresholds.threshold:.4f}" if thresholds else "sem divisão"))
+    print(f"  {'':<16}" + "".join(f"{name:>12}" for name in results))
+    for metric in results["lote"]:
+        print(f"  {metric:<16}" + "".join(
+            f"{values[metric]:>12.1f}" for values in results.values()
+        ))
+    print(f"  leitura {read_ms:.1f} ms/folha, reclassificação {classify_ms:.3f} ms/folha")
+
+
+if __name__ == "__main__":
+    main()
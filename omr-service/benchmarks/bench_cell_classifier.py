@@ -0,0 +1,135 @@
+"""
+Benchmark do classificador de células: regras de densidade contra o modelo.
+
+Treina o modelo em folhas sintéticas e lê outra turma, com rasuras e
+sujeiras ao lado das respostas, com e sem o classificador:
+- respostas lidas corretamente
+- leituras erradas sem sinalização (resposta errada com qualidade clara)
+- questões respondidas enviadas para revisão
+- custo por folha (ms) das características + modelo, frente ao da leitura
+
+Uso:
+    python -m benchmarks.bench_cell_classifier --sheets 20
+    python -m benchmarks.bench_cell_classifier --train-sheets 48 --questions 50
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.domain.entities import MarkQuality, OMRResult
+from app.domain.value_objects import OMROptions
+from app.infrastructure.cell_classifier import train_cell_classifier
+from app.infrastructure.cell_map import box_densities, build_cell_map, integral_ink
+from app.infrastructure.cell_training import synthetic_cell_set
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.synthetic_sheet import encode_image, render_answer_sheet
+
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+
+def _sheet(num_questions: int, rng: random.Random):
+    """Folha com rasuras e sujeiras nas alternativas não marcadas"""
+    key: List[Optional[str]] = []
+    answers, cell_marks = [], {}
+    for question in range(1, num_questions + 1):
+        free = list(CHOICES)
+        rng.shuffle(free)
+        mark = None if rng.random() < 0.08 else free.pop()
+        key.append(mark)
+        if mark is not None and rng.random() < 0.15:
+            cell_marks[(question, mark)] = "fill"
+            mark = None
+        answers.append(mark)
+        if rng.random() < 0.2:
+            cell_marks[(question, free.pop())] = "scribble"
+        if rng.random() < 0.2:
+            cell_marks[(question, free.pop())] = "smudge"
+    img = render_answer_sheet(answers, CHOICES, cell_marks=cell_marks)
+    noise = np.random.default_rng(rng.randrange(1 << 16)).normal(0, 4, img.shape)
+    return encode_image(np.clip(img + noise, 0, 255).astype(np.uint8)), key
+
+
+def _score(results: List[OMRResult], keys: List[List[Optional[str]]]) -> Dict[str, float]:
+    correct = silent = review = answered = 0
+    for result, key in zip(results, keys):
+        for answer, mark in zip(result.answers, key):
+            correct += answer.marked_choice == mark
+            silent += (
+                answer.marked_choice != mark and answer.quality == MarkQuality.CLEAR
+            )
+            if mark is not None:
+                answered += 1
+                review += answer.needs_review()
+    total = sum(len(key) for key in keys)
+    return {
+        "acertos (%)": 100 * correct / total,
+        "erros sem aviso": silent,
+        "revisões (%)": 100 * review / answered,
+    }
+
+
+def _read_ms(engine: OpenCVOMREngine, photos, options) -> float:
+    started = time.perf_counter()
+    for data in photos:
+        engine.process_image(data, options)
+    return 1000 * (time.perf_counter() - started) / len(photos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sheets", type=int, default=20)
+    parser.add_argument("--train-sheets", type=int, default=24)
+    parser.add_argument("--questions", type=int, default=30)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    features, labels = synthetic_cell_set(args.train_sheets, seed=0)
+    classifier = train_cell_classifier(features, labels)
+    train_s = time.perf_counter() - started
+
+    rng = random.Random(42)
+    photos, keys = zip(*(_sheet(args.questions, rng) for _ in range(args.sheets)))
+    options = OMROptions(num_questions=args.questions, choices=CHOICES)
+    engines = {
+        "densidade": OpenCVOMREngine(auto_orient=False),
+        "modelo": OpenCVOMREngine(auto_orient=False, cell_classifier=classifier),
+    }
+    results = {
+        name: _score([engine.process_image(data, options) for data in photos], keys)
+        for name, engine in engines.items()
+    }
+    read_ms = {name: _read_ms(engine, photos, options) for name, engine in engines.items()}
+
+    # Custo isolado das decisões sobre a imagem sem grade de uma folha
+    ctx = engines["densidade"].run_pipeline(photos[0], options)
+    cell_map = build_cell_map(ctx.blocks, len(CHOICES))
+    integral = integral_ink(ctx.no_grid)
+    density_matrix = box_densities(integral, cell_map.boxes)
+    repeats = 200
+    started = time.perf_counter()
+    for _ in range(repeats):
+        classifier.decide(
+            cell_map.question_numbers, tuple(CHOICES), integral,
+            cell_map.boxes, density_matrix
+        )
+    decide_ms = 1000 * (time.perf_counter() - started) / repeats
+
+    print(f"treino: {len(labels)} células de {args.train_sheets} folhas em {train_s:.1f} s")
+    print(f"{args.sheets} folhas, {args.questions} questões, com rasuras e sujeiras")
+    print(f"  {'':<16}" + "".join(f"{name:>12}" for name in results))
+    for metric in results["modelo"]:
+        print(f"  {metric:<16}" + "".join(
+            f"{values[metric]:>12.1f}" for values in results.values()
+        ))
+    print(f"  {'leitura (ms)':<16}" + "".join(f"{ms:>12.1f}" for ms in read_ms.values()))
+    print(f"  características + modelo: {decide_ms:.2f} ms/folha "
+          f"({args.questions * len(CHOICES)} células)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark de concorrência: vazão (folhas/s) por topologia de threads.
+
+Varre combinações de workers (processos), leituras simultâneas por
+worker e threads do OpenCV por worker, como o serviço as aplica
+(ConcurrencyConfig), e mede a vazão com todos os workers processando ao
+mesmo tempo. A configuração automática para esta máquina é marcada com *.
+
+Uso:
+    python -m benchmarks.bench_concurrency --sheets 48
+    python -m benchmarks.bench_concurrency --configs 1x4x1 2x2x1 4x1x1
+"""
+
+import argparse
+import multiprocessing as mp
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from app.infrastructure.concurrency import ConcurrencyConfig, available_cpus
+
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+Topology = Tuple[int, int, int]  # (workers, leituras por worker, threads do OpenCV)
+
+
+def _sheets(count: int, seed: int, size: Tuple[int, int]) -> List[bytes]:
+    from app.infrastructure.synthetic_sheet import encode_image, render_answer_sheet
+
+    rng = random.Random(seed)
+    return [
+        encode_image(render_answer_sheet(
+            [rng.choice(CHOICES) for _ in range(30)], CHOICES, size=size
+        ))
+        for _ in range(count)
+    ]
+
+
+def _worker(config: ConcurrencyConfig, images: List[bytes], barrier):
+    """Processo worker: aquece, espera os demais e lê as folhas"""
+    config.limit_native_threads()
+    config.apply()
+    from app.domain.value_objects import OMROptions
+    from app.infrastructure.omr_engine import OpenCVOMREngine
+
+    engine = OpenCVOMREngine()
+    options = OMROptions(num_questions=30, choices=CHOICES)
+    with ThreadPoolExecutor(config.read_threads) as pool:
+        # Aquecimento: uma folha por thread de leitura
+        list(pool.map(lambda data: engine.process_image(data, options),
+                      images[:config.read_threads]))
+        barrier.wait()
+        list(pool.map(lambda data: engine.process_image(data, options), images))
+    barrier.wait()
+
+
+def run(topology: Topology, images: List[bytes], cpus: int) -> float:
+    """Folhas por segundo com a topologia, somando todos os workers"""
+    workers, read_threads, cv_threads = topology
+    config = ConcurrencyConfig(cpus, workers, read_threads, cv_threads)
+    ctx = mp.get_context("spawn")  # OpenCV não é seguro após fork com threads
+    barrier = ctx.Barrier(workers + 1)
+    share = [images[i::workers] for i in range(workers)]
+    processes = [
+        ctx.Process(target=_worker, args=(config, share[i], barrier))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    barrier.wait()  # Todos aquecidos
+    started = time.perf_counter()
+    barrier.wait()  # Todos terminaram
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+    return len(images) / elapsed
+
+
+def _parse(value: str) -> Topology:
+    workers, reads, threads = (int(n) for n in value.lower().split("x"))
+    return workers, reads, threads
+
+
+def default_sweep(cpus: int) -> List[Topology]:
+    """Workers e leituras que dividem os núcleos, com 1 ou mais threads do OpenCV"""
+    sweep = set()
+    for workers in {1, 2, cpus}:
+        share = max(1, cpus // workers)
+        for reads in {1, share}:
+            sweep.add((workers, reads, max(1, share // reads)))
+            sweep.add((workers, reads, 1))
+    sweep.add((1, 1, cpus))  # Uma leitura por vez usando todos os núcleos
+    return sorted(sweep)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sheets", type=int, default=48)
+    parser.add_argument("--width", type=int, default=2480)
+    parser.add_argument("--height", type=int, default=3508)
+    parser.add_argument(
+        "--configs", nargs="*", type=_parse,
+        help="Topologias WORKERSxLEITURASxTHREADS (padrão: varredura automática)"
+    )
+    args = parser.parse_args()
+
+    cpus = available_cpus()
+    auto = ConcurrencyConfig.from_env(cpus=cpus)
+    auto_topology = (auto.workers, auto.read_threads, auto.cv_threads)
+    topologies = args.configs or default_sweep(cpus)
+    images = _sheets(args.sheets, 42, (args.width, args.height))
+
+    print(f"{cpus} núcleos disponíveis, {args.sheets} folhas {args.width}x{args.height}")
+    print(f"  {'workers':>8} {'leituras':>9} {'threads cv':>11} {'folhas/s':>10}")
+    for topology in topologies:
+        rate = run(topology, images, cpus)
+        mark = "*" if topology == auto_topology else " "
+        print(f"{mark} {topology[0]:>8} {topology[1]:>9} {topology[2]:>11} {rate:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark das duplicatas no lote: folhas repetidas puladas antes da grade.
+
+Gera um lote de alunos com o nome escrito no cabeçalho em que parte das
+folhas é fotografada de novo (outro enquadramento, brilho e ruído), parte
+difere da original em uma única resposta e parte tem as mesmas respostas
+de outro aluno, e lê o lote com e sem a detecção:
+- duplicatas encontradas e folhas diferentes confundidas com duplicatas
+- tempo do lote por folha (ms), com e sem a detecção
+- custo do hash e da busca no índice por folha
+
+Sem bloco de matrícula, as duplicatas são apontadas e lidas mesmo assim
+(ver OpenCVOMREngine.process_unique).
+
+Uso:
+    python -m benchmarks.bench_duplicates --sheets 40
+    python -m benchmarks.bench_duplicates --sheets 60 --repeat-rate 0.3 --questions 50
+"""
+
+import argparse
+import random
+import time
+
+import cv2
+import numpy as np
+
+from app.domain.exceptions import DuplicateSheetError
+from app.domain.value_objects import OMROptions
+from app.infrastructure.omr_engine import HASH_STAGE, OpenCVOMREngine
+from app.infrastructure.sheet_hash import SheetHashIndex
+from app.infrastructure.synthetic_sheet import (
+    encode_image, render_answer_sheet, render_camera_frame
+)
+
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Elisa", "Fabio", "Gabriela", "Heitor"]
+LAST_NAMES = ["Silva", "Souza", "Lima", "Costa", "Pereira", "Alves", "Rocha", "Dias"]
+
+
+def _photo(answers, name: str, rng: random.Random) -> bytes:
+    """Foto da folha com enquadramento, brilho e ruído sorteados"""
+    page = render_answer_sheet(answers, CHOICES)
+    # Cabeçalho escrito à mão logo acima da tabela
+    cv2.putText(page, "Nome:", (130, 140), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 0), 2)
+    cv2.putText(page, name, (240, 140), cv2.FONT_HERSHEY_SCRIPT_SIMPLEX, 1.3, (40, 40, 120), 2)
+    h, w = page.shape[:2]
+    if rng.random() < 0.6:
+        page = render_camera_frame(
+            page, (w * 0.55 + rng.uniform(-20, 20), h * 0.55 + rng.uniform(-20, 20)),
+            scale=rng.uniform(0.85, 1.0), size=(int(w * 1.1), int(h * 1.1)),
+            background=(200, 200, 200)
+        )
+    noise = np.random.default_rng(rng.randrange(1 << 16)).normal(0, 6, page.shape)
+    return encode_image(np.clip(page + noise + rng.uniform(-20, 10), 0, 255).astype(np.uint8))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sheets", type=int, default=40)
+    parser.add_argument("--questions", type=int, default=30)
+    parser.add_argument("--repeat-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    keys, names, photos, originals = [], [], [], []
+    near = same_answers = 0
+    for sheet in range(args.sheets):
+        roll = rng.random()
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if keys and roll < args.repeat_rate:  # A mesma folha de novo
+            source = rng.randrange(len(keys))
+            answers, name, original = keys[source], names[source], source
+            if originals[source] is not None:  # Repetição de uma repetição
+                original = originals[source]
+        elif keys and roll < 1.5 * args.repeat_rate:  # Outro aluno, mesmas respostas
+            source = rng.randrange(len(keys))
+            while name == names[source]:
+                name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            answers, original = keys[source], None
+            same_answers += 1
+        elif keys and roll < 2 * args.repeat_rate:  # Uma resposta diferente
+            answers = keys[0]
+            while answers in keys:  # Sem voltar a uma folha já sorteada
+                answers = list(keys[rng.randrange(len(keys))])
+                question = rng.randrange(args.questions)
+                answers[question] = rng.choice(
+                    [c for c in CHOICES if c != answers[question]]
+                )
+            original = None
+            near += 1
+        else:
+            answers = [rng.choice(CHOICES) for _ in range(args.questions)]
+            original = None
+        keys.append(answers)
+        names.append(name)
+        originals.append(original)
+        photos.append(_photo(answers, name, rng))
+
+    engine = OpenCVOMREngine()
+    options = OMROptions(num_questions=args.questions, choices=CHOICES)
+    engine.process_image(photos[0], options)  # Aquecimento
+
+    started = time.perf_counter()
+    for data in photos:
+        engine.process_image(data, options)
+    plain_ms = 1000 * (time.perf_counter() - started) / args.sheets
+
+    index = SheetHashIndex()
+    found = {}
+    started = time.perf_counter()
+    for sheet, data in enumerate(photos):
+        try:
+            result = engine.process_unique(data, options, index, str(sheet))
+        except DuplicateSheetError as e:
+            found[sheet] = int(e.original)
+            continue
+        if result.duplicate_of is not None:
+            found[sheet] = int(result.duplicate_of)
+    unique_ms = 1000 * (time.perf_counter() - started) / args.sheets
+
+    expected = {sheet: original for sheet, original in enumerate(originals) if original is not None}
+    hits = sum(found.get(sheet) == original for sheet, original in expected.items())
+    false = sum(sheet not in expected for sheet in found)
+
+    # Custo isolado do hash e da busca
+    state = engine.pipelines["AUTO"].prepare(photos[0], HASH_STAGE, options)
+    repeats = 100
+    started = time.perf_counter()
+    for _ in range(repeats):
+        fingerprint = engine.hash_sheet(state, options)
+    hash_ms = 1000 * (time.perf_counter() - started) / repeats
+    started = time.perf_counter()
+    for _ in range(repeats):
+        index.find(fingerprint)
+    find_ms = 1000 * (time.perf_counter() - started) / repeats
+
+    print(f"{args.sheets} folhas, {args.questions} questões: {len(expected)} repetidas, "
+          f"{near} com uma resposta diferente, {same_answers} de outro aluno com as "
+          f"mesmas respostas")
+    print(f"  duplicatas encontradas: {hits}/{len(expected)}, folhas confundidas: {false}")
+    print(f"  lote sem detecção {plain_ms:.1f} ms/folha, com detecção {unique_ms:.1f} ms/folha")
+    print(f"  hash {hash_ms:.2f} ms/folha, busca em {len(index)} folhas {find_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
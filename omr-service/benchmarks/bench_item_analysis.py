@@ -0,0 +1,93 @@
+"""
+Benchmark da análise de itens.
+
+Gera uma turma sintética (modelo logístico de habilidade × dificuldade),
+grava as marcações compactas em um banco SQLite temporário e mede:
+- montagem da matriz N × Q a partir do banco (response_matrix)
+- cálculo das estatísticas (analyze_items)
+
+Uso:
+    python -m benchmarks.bench_item_analysis --students 10000 --questions 200
+"""
+
+import argparse
+import tempfile
+import time
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+
+from app.domain.item_analysis import analyze_items
+from app.infrastructure.result_store import SqliteResultRepository
+
+
+CHOICES = np.array(list("ABCDE"))
+
+
+def _class_marks(students: int, questions: int, seed: int = 0):
+    """Marcações com acerto mais provável para alunos mais hábeis"""
+    rng = np.random.default_rng(seed)
+    ability = rng.normal(size=students)
+    difficulty = rng.normal(size=questions)
+    key = rng.integers(0, len(CHOICES), questions)
+
+    p_correct = 1 / (1 + np.exp(difficulty - ability[:, None]))
+    marks = np.where(
+        rng.random((students, questions)) < p_correct,
+        key, rng.integers(0, len(CHOICES), (students, questions))
+    )
+    letters = CHOICES[marks]
+    letters[rng.random((students, questions)) < 0.03] = "."  # Em branco
+    return letters, "".join(CHOICES[key])
+
+
+def _fill(repository: SqliteResultRepository, letters, key_answers: str):
+    """Grava apenas as colunas usadas pela análise de itens"""
+    with closing(repository._connect()) as conn, conn:
+        conn.executemany(
+            "INSERT INTO corrections (answer_key_id, correct_count, score, "
+            "percentage, passed, created_at, responses, key_answers) "
+            "VALUES ('bench', 0, 0, 0, 0, 0, ?, ?)",
+            (("".join(row), key_answers) for row in letters)
+        )
+
+
+def _time(fn, repeat: int):
+    result = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return 1000 * (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    letters, key_answers = _class_marks(args.students, args.questions)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = SqliteResultRepository(str(Path(tmp) / "bench.sqlite3"))
+        _fill(repository, letters, key_answers)
+
+        load_ms, matrix = _time(
+            lambda: repository.response_matrix("bench"), args.repeat
+        )
+        analyze_ms, analysis = _time(lambda: analyze_items(matrix), args.repeat)
+
+    print(f"matriz {matrix.marks.shape[0]} × {matrix.marks.shape[1]}")
+    print(f"{'etapa':<22} {'ms':>8}")
+    print(f"{'matriz do banco':<22} {load_ms:>8.1f}")
+    print(f"{'análise de itens':<22} {analyze_ms:>8.1f}")
+    print(f"{'total':<22} {load_ms + analyze_ms:>8.1f}")
+
+    discrimination = [item.discrimination for item in analysis.items]
+    print(f"discriminação média: {np.mean(discrimination):.3f}")
+
+
+if __name__ == "__main__":
+    main()
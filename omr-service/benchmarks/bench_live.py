@@ -0,0 +1,121 @@
+"""
+Benchmark da leitura ao vivo: latência por quadro do acompanhamento da folha.
+
+Simula a câmera na mão sobre uma mesa com objetos: a folha se aproxima,
+treme alguns pixels e depois fica quase parada. Compara o SheetTracker
+com detectar a folha do zero em todo quadro:
+- latência por quadro (mediana, p95 e máxima)
+- movimento aparente dos cantos com a folha parada (tremor da detecção,
+  que impede o quadro de ficar estável)
+- fração de quadros resolvidos por acompanhamento e quadros prontos
+
+Uso:
+    python -m benchmarks.bench_live --frames 300
+    python -m benchmarks.bench_live --width 480 --height 640
+"""
+
+import argparse
+import math
+import random
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from app.infrastructure.live_scanner import SheetTracker
+from app.infrastructure.synthetic_sheet import (
+    encode_image, render_answer_sheet, render_camera_frame
+)
+
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+# Fração da sequência a partir da qual a mão fica apoiada
+STILL_FROM = 0.6
+
+
+def _sequence(count: int, width: int, height: int, seed: int) -> List[bytes]:
+    """Quadros JPEG de uma aproximação seguida de tremor e de pausa"""
+    rng = random.Random(seed)
+    page = render_answer_sheet(
+        [rng.choice(CHOICES) for _ in range(30)], CHOICES, size=(620, 877)
+    )
+    fit = 0.9 * min(width / 620, height / 877)
+    desk = np.full((height, width, 3), (90, 80, 70), np.uint8)
+    for _ in range(40):  # Objetos sobre a mesa
+        x, y = rng.randrange(width), rng.randrange(height)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        cv2.rectangle(desk, (x, y), (x + rng.randrange(5, 60), y + rng.randrange(5, 60)), color, -1)
+        cv2.line(desk, (x, y), (rng.randrange(width), rng.randrange(height)), color, 2)
+    frames = []
+    for i in range(count):
+        phase = i / count
+        scale = fit * min(1.0, 0.5 + phase * 2)  # Aproximação no primeiro quarto
+        shake = 3 if phase < STILL_FROM else 0.5  # Tremor, depois mão apoiada
+        center = (
+            width / 2 + rng.uniform(-shake, shake),
+            height / 2 + rng.uniform(-shake, shake)
+        )
+        img = render_camera_frame(
+            page, center, scale, angle=rng.uniform(-shake, shake) / 3,
+            size=(width, height),
+            desk=desk
+        )
+        noise = np.random.default_rng(i).normal(0, 4, img.shape)
+        frames.append(encode_image(np.clip(img + noise, 0, 255).astype(np.uint8)))
+    return frames
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    return {
+        "mediana": ordered[len(ordered) // 2],
+        "p95": ordered[int(len(ordered) * 0.95)],
+        "máxima": ordered[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=360)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    frames = _sequence(args.frames, args.width, args.height, 42)
+    still = int(args.frames * STILL_FROM)  # Início da fase quase parada
+
+    results = {}
+    for name, tracker in (
+        ("acompanhamento", SheetTracker()),
+        # Acompanhamento esquecido a cada quadro: só detecção
+        ("detecção a cada quadro", SheetTracker(redetect_every=0)),
+    ):
+        latency, motion, tracked, ready = [], [], 0, 0
+        for i, data in enumerate(frames):
+            if tracker.redetect_every == 0:
+                tracker._previous = None
+            assessment = tracker.assess(data)
+            latency.append(assessment.elapsed_ms)
+            if i > still:
+                motion.append(assessment.motion)
+            tracked += assessment.tracked
+            ready += assessment.ready
+        diagonal = math.hypot(args.width, args.height)
+        results[name] = {
+            **_percentiles(latency),
+            "tremor (px)": diagonal * sum(motion) / max(len(motion), 1),
+            "acompanhados": 100 * tracked / args.frames,
+            "prontos": ready,
+        }
+
+    print(f"{args.frames} quadros {args.width}x{args.height}, latência em ms")
+    print(f"  {'':<14}" + "".join(f"{name:>24}" for name in results))
+    for metric in results["acompanhamento"]:
+        print(f"  {metric:<14}" + "".join(
+            f"{values[metric]:>24.2f}" for values in results.values()
+        ))
+
+
+if __name__ == "__main__":
+    main()
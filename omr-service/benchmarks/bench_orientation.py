@@ -0,0 +1,95 @@
+"""
+Benchmark da orientação: lote com folhas em 0, 90, 180 e 270 graus.
+
+Gera folhas sintéticas (1 e 4 tabelas) giradas em cada orientação e
+compara a leitura com e sem a detecção automática:
+- orientação detectada corretamente
+- respostas lidas corretamente
+- tempo do estágio de orientação (mediana, ms)
+
+Uso:
+    python -m benchmarks.bench_orientation --sheets 8
+    python -m benchmarks.bench_orientation --columns 4 --questions 120
+"""
+
+import argparse
+import random
+from typing import Dict, List
+
+import cv2
+
+from app.domain.value_objects import OMROptions, SheetLayout
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.synthetic_sheet import encode_image, render_answer_sheet
+
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+# Giro da folha na foto (sentido horário)
+ROTATIONS = {
+    0: None,
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+}
+
+
+def _measure(
+    engine: OpenCVOMREngine, photos: List[bytes], orientations: List[int],
+    keys: List[List[str]], options: OMROptions
+) -> Dict[str, float]:
+    elapsed, detected, correct = [], 0, 0
+    for data, orientation, key in zip(photos, orientations, keys):
+        ctx = engine.run_pipeline(data, options)
+        elapsed.append(ctx.timings.get("orient", 0.0))
+        detected += ctx.orientation == orientation
+        correct += sum(
+            answer.marked_choice == mark for answer, mark in zip(ctx.answers, key)
+        )
+    return {
+        "orientação (%)": 100 * detected / len(photos),
+        "acertos (%)": 100 * correct / sum(len(key) for key in keys),
+        "ms orientação": sorted(elapsed)[len(elapsed) // 2],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sheets", type=int, default=8)
+    parser.add_argument("--questions", type=int, default=30)
+    parser.add_argument("--columns", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    layout = SheetLayout.columns(args.questions, args.columns)
+    options = OMROptions(num_questions=args.questions, choices=CHOICES, layout=layout)
+    keys = [
+        [rng.choice(CHOICES) for _ in range(args.questions)]
+        for _ in range(args.sheets)
+    ]
+    orientations = [list(ROTATIONS)[i % len(ROTATIONS)] for i in range(args.sheets)]
+    photos = []
+    for key, orientation in zip(keys, orientations):
+        page = render_answer_sheet(key, CHOICES, layout=layout)
+        if ROTATIONS[orientation] is not None:
+            page = cv2.rotate(page, ROTATIONS[orientation])
+        photos.append(encode_image(page))
+
+    results = {
+        "sem": _measure(
+            OpenCVOMREngine(auto_orient=False), photos, orientations, keys, options
+        ),
+        "com": _measure(OpenCVOMREngine(), photos, orientations, keys, options),
+    }
+
+    print(f"{args.sheets} folhas, {args.questions} questões em "
+          f"{args.columns} tabela(s), orientações 0/90/180/270")
+    print(f"  {'':<16}" + "".join(f"{name:>10}" for name in results))
+    for metric in results["com"]:
+        print(f"  {metric:<16}" + "".join(
+            f"{values[metric]:>10.1f}" for values in results.values()
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark do pipeline: tempo médio de cada estágio.
+
+Processa folhas sintéticas com o pipeline padrão e mostra a média de
+cada estágio medida pelo próprio pipeline (PipelineContext.timings).
+Em seguida relê as mesmas folhas com outras opções de células (como um
+usuário corrigindo o número de questões), retomando do cache de estágios,
+e mede a reanálise completa pelo caso de uso (validação + qualidade +
+pipeline).
+
+Uso:
+    python -m benchmarks.bench_pipeline --sheets 10
+"""
+
+import argparse
+import io
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from app.application.use_cases import ReadAnswersUseCase
+from app.domain.value_objects import OMROptions
+from app.infrastructure.image_validator import ImageValidator
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.quality_gate import ImageQualityGate
+from app.infrastructure.stage_cache import StageCache
+from app.infrastructure.synthetic_sheet import encode_image, render_answer_sheet
+
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+
+def _average(runs: List[Dict[str, float]]) -> Dict[str, float]:
+    totals: Dict[str, float] = defaultdict(float)
+    for timings in runs:
+        for name, ms in timings.items():
+            totals[name] += ms
+    return {name: total / len(runs) for name, total in totals.items()}
+
+
+def _report(title: str, averages: Dict[str, float]):
+    print(title)
+    for name, ms in averages.items():
+        print(f"  {name:<16} {ms:>8.2f} ms")
+    print(f"  {'total':<16} {sum(averages.values()):>8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sheets", type=int, default=10)
+    parser.add_argument("--questions", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    options = OMROptions(num_questions=args.questions, choices=CHOICES)
+    images = [
+        encode_image(render_answer_sheet(
+            [rng.choice(CHOICES) for _ in range(args.questions)], CHOICES
+        ))
+        for _ in range(args.sheets)
+    ]
+
+    first_try = OMROptions(num_questions=args.questions - 5, choices=CHOICES[:4])
+
+    engine = OpenCVOMREngine(stage_cache=StageCache())
+    first = [engine.run_pipeline(data, first_try).timings for data in images]
+    again = [engine.run_pipeline(data, options).timings for data in images]
+
+    _report(f"Primeira leitura ({args.sheets} folhas)", _average(first))
+    _report("Reanálise com outras opções (cache de estágios)", _average(again))
+
+    use_case = ReadAnswersUseCase(
+        engine, ImageValidator(), None, quality_gate=ImageQualityGate()
+    )
+    for data in images:  # Primeira tentativa, como o usuário faria
+        use_case.execute(io.BytesIO(data), "folha.jpg", first_try)
+    started = time.perf_counter()
+    for data in images:
+        use_case.execute(io.BytesIO(data), "folha.jpg", options)
+    elapsed = 1000 * (time.perf_counter() - started) / len(images)
+    print(f"Reanálise pelo caso de uso: {elapsed:.2f} ms/folha")
+
+
+if __name__ == "__main__":
+    main()
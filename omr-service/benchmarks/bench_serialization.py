@@ -0,0 +1,144 @@
+"""
+Benchmark da serialização das respostas da API.
+
+Compara, para uma leitura OMR e para um lote de correções:
+- caminho anterior: DTO Pydantic montado na rota, revalidado como
+  response_model e codificado com json da biblioteca padrão (o que o
+  FastAPI faz ao receber um DTO ou dict de uma rota)
+- JSON direto do domínio (orjson quando instalado)
+- MessagePack direto do domínio
+
+Uso:
+    python -m benchmarks.bench_serialization --questions 500 --sheets 50
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable
+
+import numpy as np
+from pydantic import TypeAdapter
+
+from app.application.use_cases import CorrectExamUseCase
+from app.domain.entities import (
+    AnswerKey, AnswerTable, BatchCorrection, BatchItem, OMRResult, Question,
+    QUALITY_CODES, NO_CHOICE, BLANK_CODE
+)
+from app.presentation.dtos import BatchCorrectionDto, OMRResultDto
+from app.presentation.routes import to_quality_dto
+from app.presentation.serialization import (
+    encode_json, encode_msgpack, msgpack, omr_result_payload
+)
+
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+
+def _omr_result(num_questions: int, seed: int) -> OMRResult:
+    rng = np.random.default_rng(seed)
+    densities = rng.random((num_questions, len(CHOICES))) ** 4
+    choice_index = densities.argmax(axis=1)
+    quality_codes = rng.integers(0, len(QUALITY_CODES), num_questions)
+    choice_index[quality_codes == BLANK_CODE] = NO_CHOICE
+    return OMRResult(
+        answers=AnswerTable(
+            question_numbers=np.arange(1, num_questions + 1),
+            choices=CHOICES,
+            choice_index=choice_index,
+            confidence=np.round(rng.random(num_questions), 2),
+            quality_codes=quality_codes,
+            densities=densities
+        ),
+        total_questions=num_questions,
+        student_id="20231587",
+        student_id_confidence=0.9
+    )
+
+
+def _batch(num_sheets: int, num_questions: int) -> BatchCorrection:
+    rng = random.Random(0)
+    answer_key = AnswerKey(
+        id="prova", name="Prova",
+        questions=[
+            Question(number=i + 1, correct_answer=rng.choice(CHOICES), points=1)
+            for i in range(num_questions)
+        ],
+        passing_score=60
+    )
+    grader = CorrectExamUseCase(read_answers_use_case=None)
+    return BatchCorrection(items=[
+        BatchItem(
+            filename=f"folha_{i}.jpg",
+            correction=grader.grade(_omr_result(num_questions, i), answer_key)
+        )
+        for i in range(num_sheets)
+    ])
+
+
+def _legacy_json(model: type, content: Any) -> bytes:
+    """Revalidação como response_model + json.dumps (como o FastAPI)"""
+    adapter = TypeAdapter(model)
+    if isinstance(content, model):
+        content = content.model_dump()
+    validated = adapter.validate_python(content)
+    return json.dumps(
+        adapter.dump_python(validated, mode="json"),
+        ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _time(fn: Callable[[], bytes], repeat: int) -> tuple:
+    size = len(fn())
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return 1000 * (time.perf_counter() - start) / repeat, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--questions", type=int, default=500)
+    parser.add_argument("--sheets", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    result = _omr_result(args.questions, seed=0)
+    batch = _batch(args.sheets, min(args.questions, 100))
+
+    cases = {
+        "leitura": {
+            "DTO + json": lambda: _legacy_json(OMRResultDto, OMRResultDto(
+                answers=result.get_answers_dict(),
+                confidence=result.get_confidence_dict(),
+                flags=result.get_flags(),
+                debug=result.debug_images,
+                studentId=result.student_id,
+                studentIdConfidence=result.student_id_confidence,
+                examVersion=result.exam_version,
+                examVersionConfidence=result.exam_version_confidence,
+                quality=to_quality_dto(result.quality)
+            )),
+            "JSON direto": lambda: encode_json(omr_result_payload(result)),
+            "MessagePack": lambda: encode_msgpack(omr_result_payload(result)),
+        },
+        "lote": {
+            "DTO + json": lambda: _legacy_json(BatchCorrectionDto, batch.to_dict()),
+            "JSON direto": lambda: encode_json(batch.to_dict()),
+            "MessagePack": lambda: encode_msgpack(batch.to_dict()),
+        },
+    }
+
+    print(f"{'resposta':<10} {'caminho':<14} {'ms':>8} {'bytes':>9}")
+    for name, paths in cases.items():
+        for path, fn in paths.items():
+            if path == "MessagePack" and msgpack is None:
+                print(f"{name:<10} {path:<14} {'(msgpack não instalado)':>18}")
+                continue
+            elapsed, size = _time(fn, args.repeat)
+            print(f"{name:<10} {path:<14} {elapsed:>8.2f} {size:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark do envio compacto: bytes enviados e tempo no servidor.
+
+Gera fotos sintéticas de celular (12MP, coloridas, com ruído) e compara
+o envio da foto original com o formato compacto publicado pelo serviço,
+feito no cliente (emulado aqui como no canvas do navegador: redução ao
+lado maior, tons de cinza e JPEG):
+- bytes enviados por foto
+- tempo no servidor pelo caso de uso (validação + qualidade + pipeline)
+- respostas lidas corretamente
+
+Uso:
+    python -m benchmarks.bench_upload --photos 5
+    python -m benchmarks.bench_upload --width 3000 --height 4000
+"""
+
+import argparse
+import io
+import random
+import time
+from typing import Dict, List
+
+import cv2
+import numpy as np
+
+from app.application.use_cases import ReadAnswersUseCase
+from app.domain.value_objects import OMROptions, UploadFormat
+from app.infrastructure.image_validator import ImageValidator
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.quality_gate import ImageQualityGate
+from app.infrastructure.synthetic_sheet import encode_image, render_answer_sheet
+
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+
+def _photo(answers: List[str], width: int, height: int, seed: int) -> bytes:
+    """Foto colorida da folha no quadro inteiro, com luz quente e ruído"""
+    img = render_answer_sheet(answers, CHOICES, size=(width, height))
+    img = img * np.float32([0.85, 0.95, 1.0])  # Canais BGR
+    img += np.random.default_rng(seed).normal(0, 3, img.shape)
+    return encode_image(np.clip(img, 0, 255).astype(np.uint8))
+
+
+def _compact(data: bytes, upload_format: UploadFormat) -> bytes:
+    """O que o cliente envia: reduzida, em tons de cinza e em JPEG de três canais (canvas)"""
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    scale = min(1.0, upload_format.max_side / max(img.shape[:2]))
+    img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    if upload_format.grayscale:
+        img = cv2.cvtColor(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
+    _, encoded = cv2.imencode(
+        ".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, int(upload_format.quality * 100)]
+    )
+    return encoded.tobytes()
+
+
+def _measure(
+    use_case: ReadAnswersUseCase, photos: List[bytes], keys: List[List[str]],
+    options: OMROptions, filename: str
+) -> Dict[str, float]:
+    elapsed, correct = [], 0
+    for data, key in zip(photos, keys):
+        started = time.perf_counter()
+        result = use_case.execute(io.BytesIO(data), filename, options)
+        elapsed.append(1000 * (time.perf_counter() - started))
+        answers = result.get_answers_dict()
+        correct += sum(answers[str(i + 1)] == mark for i, mark in enumerate(key))
+    return {
+        "KB por foto": sum(len(data) for data in photos) / len(photos) / 1024,
+        "ms por foto": sorted(elapsed)[len(elapsed) // 2],
+        "acertos (%)": 100 * correct / sum(len(key) for key in keys),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--photos", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=30)
+    parser.add_argument("--width", type=int, default=3024)
+    parser.add_argument("--height", type=int, default=4032)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    options = OMROptions(num_questions=args.questions, choices=CHOICES)
+    keys = [
+        [rng.choice(CHOICES) for _ in range(args.questions)]
+        for _ in range(args.photos)
+    ]
+    originals = [
+        _photo(key, args.width, args.height, seed) for seed, key in enumerate(keys)
+    ]
+    upload_format = UploadFormat()
+    compacts = [_compact(data, upload_format) for data in originals]
+
+    # Validação de 50MB: as fotos originais sintéticas podem passar de 5MB
+    class Validator(ImageValidator):
+        def validate_file_size(self, file, max_mb=50):
+            return super().validate_file_size(file, max_mb)
+
+    use_case = ReadAnswersUseCase(
+        OpenCVOMREngine(), Validator(), None,
+        quality_gate=ImageQualityGate(), upload_format=upload_format
+    )
+    use_case.execute(io.BytesIO(compacts[0]), upload_format.filename, options)  # Aquecimento
+
+    results = {
+        "original": _measure(use_case, originals, keys, options, "foto.jpg"),
+        "compacto": _measure(use_case, compacts, keys, options, upload_format.filename),
+    }
+
+    print(f"{args.photos} fotos {args.width}x{args.height}, "
+          f"compacto: lado {upload_format.max_side}, cinza, JPEG {upload_format.quality}")
+    print(f"  {'':<14}" + "".join(f"{name:>12}" for name in results))
+    for metric in results["original"]:
+        print(f"  {metric:<14}" + "".join(
+            f"{values[metric]:>12.1f}" for values in results.values()
+        ))
+
+
+if __name__ == "__main__":
+    main()
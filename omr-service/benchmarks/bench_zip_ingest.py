@@ -0,0 +1,135 @@
+"""
+Benchmark do envio em .zip: correção em fluxo contra o lote de arquivos.
+
+Gera uma turma de fotos em resolução de celular, compactada em um .zip, e
+corrige as folhas:
+- lote: todas as imagens como arquivos separados, lidas uma após a outra
+  (CorrectExamBatchUseCase.execute, como /corrigir/lote)
+- zip: entradas descomprimidas uma a uma e despachadas às leituras
+  simultâneas, com as linhas saindo em fluxo (como /corrigir/zip)
+
+Mostra o tempo até o primeiro resultado, o tempo total por folha e o pico
+de memória rastreada (tracemalloc) acima do .zip já recebido, com os
+buffers de trabalho das threads de leitura.
+
+Uso:
+    python -m benchmarks.bench_zip_ingest --sheets 24
+    python -m benchmarks.bench_zip_ingest --sheets 48 --threads 4
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import random
+import time
+import tracemalloc
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+from app.infrastructure.synthetic_sheet import encode_image, render_answer_sheet
+
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+
+def _class_zip(count: int, questions: int) -> Tuple[bytes, List[bytes], List[str]]:
+    """(.zip da turma, imagens, gabarito) com fotos de 2000x2800"""
+    rng = random.Random(7)
+    key = [rng.choice(CHOICES) for _ in range(questions)]
+    images = [
+        encode_image(render_answer_sheet(
+            [c if rng.random() < 0.7 else rng.choice(CHOICES) for c in key],
+            CHOICES, size=(2000, 2800)
+        ))
+        for _ in range(count)
+    ]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i, data in enumerate(images):
+            archive.writestr(f"turma/{i:03d}.jpg", data)
+    return buffer.getvalue(), images, key
+
+
+def _measure(run: Callable[[Callable[[], None]], None], traced: bool) -> Tuple[float, float, float]:
+    """(ms até o primeiro resultado, ms totais, pico MB acima do início)"""
+    first = []
+    if traced:
+        tracemalloc.start()
+    started = time.perf_counter()
+    run(lambda: first or first.append(time.perf_counter()))
+    total = time.perf_counter() - started
+    peak = 0.0
+    if traced:
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return 1000 * (first[0] - started), 1000 * total, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sheets", type=int, default=24)
+    parser.add_argument("--questions", type=int, default=30)
+    parser.add_argument("--threads", type=int, default=None,
+                        help="Leituras simultâneas (padrão: OMR_READ_THREADS)")
+    args = parser.parse_args()
+
+    if args.threads:
+        os.environ["OMR_READ_THREADS"] = str(args.threads)
+
+    from app.application.use_cases import (
+        CorrectExamBatchUseCase, CorrectExamUseCase, ReadAnswersUseCase
+    )
+    from app.domain.entities import AnswerKey, Question
+    from app.infrastructure.image_validator import ImageValidator
+    from app.infrastructure.omr_engine import OpenCVOMREngine
+    from app.infrastructure.sheet_hash import SheetHashIndex
+    from app.infrastructure.zip_archive import ZipImageArchive
+    from app.presentation.routes import get_concurrency, stream_zip_corrections
+
+    zipped, images, key = _class_zip(args.sheets, args.questions)
+    answer_keys = {"A": AnswerKey(
+        id="prova", name="Prova", passing_score=60,
+        questions=[Question(i + 1, c, 1) for i, c in enumerate(key)]
+    )}
+    engine = OpenCVOMREngine()
+    read = ReadAnswersUseCase(engine, ImageValidator(), None)
+    use_case = CorrectExamBatchUseCase(CorrectExamUseCase(read), SheetHashIndex())
+    use_case.execute([(io.BytesIO(images[0]), "0.jpg")], answer_keys)  # Aquecimento
+
+    def batch(on_result):
+        # Em uma thread nova, como as leituras do .zip: os dois picos
+        # incluem os buffers de trabalho de uma thread de leitura
+        with ThreadPoolExecutor(1) as pool:
+            pool.submit(
+                use_case.execute,
+                [(io.BytesIO(data), f"{i}.jpg") for i, data in enumerate(images)],
+                answer_keys, adaptive_thresholds=False
+            ).result()
+        on_result()  # A resposta só sai com o lote inteiro
+
+    # Um único event loop, como no servidor: as threads de leitura (e os
+    # seus buffers de trabalho) continuam vivas entre os lotes
+    loop = asyncio.new_event_loop()
+
+    def stream(on_result):
+        async def consume():
+            options = use_case.begin(answer_keys)
+            archive = ZipImageArchive(io.BytesIO(zipped))
+            async for _ in stream_zip_corrections(use_case, archive, options, answer_keys, True):
+                on_result()
+        loop.run_until_complete(consume())
+
+    print(f"{args.sheets} folhas de 2000x2800 ({len(zipped) / 1e6:.1f} MB em .zip), "
+          f"{get_concurrency().read_threads} leituras simultâneas")
+    for name, run in (("lote", batch), ("zip", stream)):
+        first_ms, total_ms, _ = _measure(run, traced=False)
+        *_, peak_mb = _measure(run, traced=True)
+        print(f"  {name:5s} primeiro resultado {first_ms:8.1f} ms, "
+              f"total {total_ms / args.sheets:6.1f} ms/folha, pico {peak_mb:6.1f} MB")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
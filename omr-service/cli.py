@@ -3,16 +3,21 @@ CLI Tool para testar o motor OMR localmente.
 
 Uso:
     python cli.py --image ./sample.jpg --numQuestions 10 --choices A,B,C,D,E --debug
+    python cli.py --itemAnalysis prova-1 [--db /tmp/omr_data/omr.sqlite3]
+    python cli.py --trainCellModel ./cell_model.npz [--cells ./recortes] [--sheets 24]
+    python cli.py --image ./sample.jpg ... --cellModel ./cell_model.npz
 """
 
 import argparse
+import os
 import sys
 from pathlib import Path
 
 from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.cell_classifier import CellClassifier
 from app.infrastructure.image_validator import ImageValidator
 from app.infrastructure.debug_storage import DebugStorage
-from app.domain.value_objects import OMROptions
+from app.domain.value_objects import OMROptions, StudentIdField, RelativeRegion
 
 
 def main():
@@ -21,18 +26,15 @@ def main():
     )
     parser.add_argument(
         "--image",
-        required=True,
         help="Caminho para a imagem da prova"
     )
     parser.add_argument(
         "--numQuestions",
         type=int,
-        required=True,
         help="Número de questões"
     )
     parser.add_argument(
         "--choices",
-        required=True,
         help="Alternativas separadas por vírgula (ex: A,B,C,D,E)"
     )
     parser.add_argument(
@@ -41,14 +43,58 @@ def main():
         choices=["AUTO", "MANUAL_ROI"],
         help="Modo de detecção (AUTO ou MANUAL_ROI)"
     )
+    parser.add_argument(
+        "--studentIdField",
+        help="Bloco de matrícula: x,y,w,h (relativos à imagem) e nº de dígitos (ex: 0.1,0.05,0.4,0.2,8)"
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
         help="Salvar imagens de debug"
     )
+    parser.add_argument(
+        "--itemAnalysis",
+        metavar="PROVA_ID",
+        help="Análise de itens das correções registradas para o gabarito"
+    )
+    parser.add_argument(
+        "--db",
+        help="Banco de resultados (padrão: OMR_DB_PATH ou /tmp/omr_data/omr.sqlite3)"
+    )
+    parser.add_argument(
+        "--trainCellModel",
+        metavar="SAIDA",
+        help="Treinar o classificador de células e salvar os pesos (.npz)"
+    )
+    parser.add_argument(
+        "--cells",
+        help="Recortes rotulados de folhas reais: uma pasta por classe "
+             "(blank, mark, scribble, smudge), somados ao treino sintético"
+    )
+    parser.add_argument(
+        "--sheets",
+        type=int,
+        default=24,
+        help="Folhas sintéticas do treino (padrão: 24)"
+    )
+    parser.add_argument(
+        "--cellModel",
+        help="Pesos do classificador de células usados na leitura (.npz)"
+    )
 
     args = parser.parse_args()
 
+    if args.itemAnalysis:
+        run_item_analysis(args.itemAnalysis, args.db)
+        return
+
+    if args.trainCellModel:
+        run_train_cell_model(args.trainCellModel, args.cells, args.sheets)
+        return
+
+    if not (args.image and args.numQuestions and args.choices):
+        parser.error("--image, --numQuestions e --choices são obrigatórios")
+
     # Validar imagem
     image_path = Path(args.image)
     if not image_path.exists():
@@ -57,16 +103,26 @@ def main():
 
     # Preparar opções
     choices = [c.strip().upper() for c in args.choices.split(",")]
+    student_id_field = None
+    if args.studentIdField:
+        x, y, w, h, digits = args.studentIdField.split(",")
+        student_id_field = StudentIdField(
+            region=RelativeRegion(float(x), float(y), float(w), float(h)),
+            digits=int(digits)
+        )
+
     options = OMROptions(
         num_questions=args.numQuestions,
         choices=choices,
         template=args.template,
-        debug=args.debug
+        debug=args.debug,
+        student_id_field=student_id_field
     )
 
     # Criar engine
     debug_storage = DebugStorage() if args.debug else None
-    engine = OpenCVOMREngine(debug_storage=debug_storage)
+    cell_classifier = CellClassifier.load(args.cellModel) if args.cellModel else None
+    engine = OpenCVOMREngine(debug_storage=debug_storage, cell_classifier=cell_classifier)
 
     # Processar imagem
     print(f"📄 Processando: {image_path.name}")
@@ -83,6 +139,9 @@ def main():
 
         # Exibir resultados
         print("✅ Processamento concluído!\n")
+        if result.student_id is not None:
+            print(f"🎓 Matrícula: {result.student_id} (confiança {result.student_id_confidence:.2f})\n")
+
         print("=" * 50)
         print("RESPOSTAS DETECTADAS")
         print("=" * 50)
@@ -134,5 +193,73 @@ def main():
         sys.exit(1)
 
 
+def run_item_analysis(answer_key_id: str, db_path=None):
+    """Exibe a análise de itens calculada sobre o histórico de correções"""
+    from app.domain.item_analysis import analyze_items
+    from app.infrastructure.answer_key_store import DEFAULT_DB_PATH
+    from app.infrastructure.result_store import SqliteResultRepository
+
+    db_path = db_path or os.getenv("OMR_DB_PATH", DEFAULT_DB_PATH)
+    matrix = SqliteResultRepository(db_path).response_matrix(answer_key_id)
+    if matrix.students == 0:
+        print(f"❌ Nenhuma correção registrada para '{answer_key_id}' em {db_path}")
+        sys.exit(1)
+
+    analysis = analyze_items(matrix)
+
+    print(f"📊 Análise de itens: {answer_key_id} ({analysis.students} provas)\n")
+    header = f"{'Q':>4} {'Gab':>3} {'Dific':>6} {'Discr':>6} {'r_pb':>6}  "
+    header += " ".join(f"{c:>5}" for c in matrix.choices) + f" {'Branco':>6}"
+    print(header)
+    print("-" * len(header))
+    for item in analysis.items:
+        rates = " ".join(
+            f"{item.choice_rates[c]:>5.2f}" for c in matrix.choices
+        )
+        print(
+            f"{item.question_number:>4} {item.correct_answer:>3} "
+            f"{item.difficulty:>6.2f} {item.discrimination:>6.2f} "
+            f"{item.point_biserial:>6.2f}  {rates} {item.blank_rate:>6.2f}"
+        )
+
+
+def run_train_cell_model(output: str, cells_dir=None, num_sheets: int = 24):
+    """Treina o classificador de células e salva os pesos em output"""
+    import cv2
+    import numpy as np
+    from app.infrastructure.cell_classifier import (
+        CELL_CLASSES, crop_features, train_cell_classifier
+    )
+    from app.infrastructure.cell_training import synthetic_cell_set
+
+    print(f"🧪 Gerando células de {num_sheets} folhas sintéticas...")
+    features, labels = synthetic_cell_set(num_sheets)
+
+    if cells_dir:
+        for label, name in enumerate(CELL_CLASSES):
+            crops = []
+            for path in sorted((Path(cells_dir) / name).glob("*.png")):
+                gray = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+                _, binary = cv2.threshold(
+                    gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU
+                )
+                crops.append(binary)
+            if crops:
+                print(f"📁 {name}: {len(crops)} recortes")
+                features = np.concatenate([features, crop_features(crops)])
+                labels = np.concatenate([labels, np.full(len(crops), label)])
+
+    counts = np.bincount(labels, minlength=len(CELL_CLASSES))
+    print("📊 Células: " + ", ".join(
+        f"{name}={count}" for name, count in zip(CELL_CLASSES, counts)
+    ))
+    classifier = train_cell_classifier(features, labels)
+    predicted = classifier.predict_proba(features).argmax(axis=1)
+    print(f"🎯 Acerto no treino: {(predicted == labels).mean():.1%}")
+
+    classifier.save(output)
+    print(f"✨ Modelo salvo em {output} (use OMR_CELL_MODEL={output})")
+
+
 if __name__ == "__main__":
     main()
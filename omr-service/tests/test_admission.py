@@ -0,0 +1,118 @@
+"""
+Testes do Controle de Admissão por Memória - Infrastructure Layer
+"""
+
+import threading
+import time
+
+import pytest
+from app.domain.exceptions import CapacityExceededError
+from app.domain.value_objects import ImageMetadata
+from app.infrastructure.admission import MemoryAdmissionController
+
+
+def photo(width, height):
+    return ImageMetadata(width, height, "JPEG", 0)
+
+
+class TestMemoryAdmissionController:
+    """Testes para reserva e liberação do orçamento"""
+
+    def test_estimate_scales_with_pixels(self):
+        control = MemoryAdmissionController(bytes_per_pixel=10)
+
+        assert control.estimate(ImageMetadata(100, 50, "JPEG", 1000)) == 51000
+
+    def test_admits_reads_within_budget(self):
+        control = MemoryAdmissionController(budget_bytes=200, bytes_per_pixel=1)
+
+        with control.admit(photo(10, 10)):
+            with control.admit(photo(10, 10)):
+                assert control.in_use == 200
+                assert control.running == 2
+
+        assert control.in_use == 0
+        assert control.running == 0
+
+    def test_times_out_when_budget_is_exhausted(self):
+        control = MemoryAdmissionController(
+            budget_bytes=150, bytes_per_pixel=1, timeout_seconds=0.05
+        )
+
+        with control.admit(photo(10, 10)):
+            with pytest.raises(CapacityExceededError) as error:
+                with control.admit(photo(10, 10)):
+                    pass
+
+        assert error.value.retry_after >= 1
+        assert control.in_use == 0
+        assert control.waiting == 0
+
+    def test_oversized_image_is_admitted_alone(self):
+        control = MemoryAdmissionController(budget_bytes=10, bytes_per_pixel=1)
+
+        with control.admit(photo(100, 100)):
+            assert control.running == 1
+
+    def test_waiting_read_starts_when_memory_is_released(self):
+        control = MemoryAdmissionController(
+            budget_bytes=150, bytes_per_pixel=1, timeout_seconds=5
+        )
+        started = threading.Event()
+
+        def second_read():
+            with control.admit(photo(10, 10)):
+                started.set()
+
+        with control.admit(photo(10, 10)):
+            thread = threading.Thread(target=second_read)
+            thread.start()
+            assert not started.wait(0.05)
+
+        thread.join(timeout=5)
+        assert started.is_set()
+        assert control.in_use == 0
+
+    def test_limits_running_reads(self):
+        control = MemoryAdmissionController(
+            budget_bytes=1000, bytes_per_pixel=1, timeout_seconds=0.05,
+            max_running=1
+        )
+
+        with control.admit(photo(10, 10)):
+            with pytest.raises(CapacityExceededError):
+                with control.admit(photo(10, 10)):
+                    pass
+
+    def test_read_waiting_for_memory_holds_no_slot(self):
+        control = MemoryAdmissionController(
+            budget_bytes=150, bytes_per_pixel=1, timeout_seconds=5, max_running=2
+        )
+        small_done = threading.Event()
+
+        def large_read():
+            with control.admit(photo(10, 10)):
+                pass
+
+        with control.admit(photo(10, 10)):
+            thread = threading.Thread(target=large_read)
+            thread.start()
+            deadline = time.monotonic() + 5
+            while control.waiting == 0 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            # A leitura grande espera memória; a pequena ainda tem vaga
+            with control.admit(photo(5, 5)):
+                small_done.set()
+
+        thread.join(timeout=5)
+        assert small_done.is_set()
+        assert control.running == 0
+
+    def test_releases_budget_when_read_fails(self):
+        control = MemoryAdmissionController(budget_bytes=100, bytes_per_pixel=1)
+
+        with pytest.raises(RuntimeError):
+            with control.admit(photo(10, 10)):
+                raise RuntimeError("falha no processamento")
+
+        assert control.in_use == 0
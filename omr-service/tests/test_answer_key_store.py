@@ -0,0 +1,110 @@
+"""
+Testes do Cadastro de Gabaritos - Infrastructure/Application Layers
+
+Persistência em SQLite, LRU de gabaritos compilados e regras do use case.
+"""
+
+import pytest
+from app.application.use_cases import ManageAnswerKeysUseCase
+from app.domain.entities import AnswerKey, Question
+from app.domain.exceptions import AnswerKeyExistsError, AnswerKeyNotFoundError
+from app.infrastructure.answer_key_store import SqliteAnswerKeyRepository
+
+
+def make_key(key_id="prova-1", correct="ABCDE"):
+    return AnswerKey(
+        id=key_id,
+        name=f"Prova {key_id}",
+        questions=[
+            Question(number=i + 1, correct_answer=c, points=1.5)
+            for i, c in enumerate(correct)
+        ],
+        passing_score=60
+    )
+
+
+@pytest.fixture
+def repository(tmp_path):
+    return SqliteAnswerKeyRepository(str(tmp_path / "omr.sqlite3"))
+
+
+class TestSqliteAnswerKeyRepository:
+    """Testes para o repositório SQLite"""
+
+    def test_save_and_get(self, repository):
+        assert repository.save(make_key()) is True
+
+        loaded = repository.get("prova-1")
+
+        assert loaded.name == "Prova prova-1"
+        assert [q.correct_answer for q in loaded.questions] == list("ABCDE")
+        assert loaded.total_points == 7.5
+        assert loaded.get_question(3).correct_answer == "C"
+
+    def test_get_missing(self, repository):
+        assert repository.get("nao-existe") is None
+
+    def test_cached_key_is_reused(self, repository):
+        repository.save(make_key())
+        assert repository.get("prova-1") is repository.get("prova-1")
+
+    def test_save_invalidates_cache(self, repository):
+        repository.save(make_key())
+        before = repository.get("prova-1")
+
+        assert repository.save(make_key(correct="EDCBA")) is False
+
+        after = repository.get("prova-1")
+        assert after is not before
+        assert after.get_question(1).correct_answer == "E"
+
+    def test_delete_invalidates_cache(self, repository):
+        repository.save(make_key())
+        repository.get("prova-1")
+
+        assert repository.delete("prova-1") is True
+        assert repository.get("prova-1") is None
+        assert repository.delete("prova-1") is False
+
+    def test_lru_evicts_oldest(self, tmp_path):
+        repository = SqliteAnswerKeyRepository(str(tmp_path / "db"), cache_size=2)
+        for key_id in ("a", "b", "c"):
+            repository.save(make_key(key_id))
+            repository.get(key_id)
+
+        assert list(repository._cache) == ["b", "c"]
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "omr.sqlite3")
+        SqliteAnswerKeyRepository(path).save(make_key())
+
+        assert [k.id for k in SqliteAnswerKeyRepository(path).list_all()] == ["prova-1"]
+
+
+class TestManageAnswerKeysUseCase:
+    """Testes para as regras do cadastro"""
+
+    def test_create_duplicate(self, repository):
+        use_case = ManageAnswerKeysUseCase(repository)
+        use_case.create(make_key())
+
+        with pytest.raises(AnswerKeyExistsError):
+            use_case.create(make_key())
+
+    def test_update_missing(self, repository):
+        with pytest.raises(AnswerKeyNotFoundError):
+            ManageAnswerKeysUseCase(repository).update("prova-1", make_key())
+
+    def test_update_id_mismatch(self, repository):
+        use_case = ManageAnswerKeysUseCase(repository)
+        use_case.create(make_key())
+
+        with pytest.raises(ValueError):
+            use_case.update("prova-1", make_key("prova-2"))
+
+    def test_get_and_delete_missing(self, repository):
+        use_case = ManageAnswerKeysUseCase(repository)
+        with pytest.raises(AnswerKeyNotFoundError):
+            use_case.get("prova-1")
+        with pytest.raises(AnswerKeyNotFoundError):
+            use_case.delete("prova-1")
@@ -0,0 +1,95 @@
+"""
+Testes da Binarização - Infrastructure Layer
+
+Escolha do método por iluminação e leitura de folhas sintéticas
+com cada método.
+"""
+
+import random
+
+import cv2
+import numpy as np
+import pytest
+from app.domain.value_objects import OMROptions
+from app.infrastructure import binarization
+from app.infrastructure.binarization import Binarizer
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.synthetic_sheet import render_answer_sheet, encode_image
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+
+def random_answers(num_questions, seed=7):
+    rng = random.Random(seed)
+    return [rng.choice(CHOICES) for _ in range(num_questions)]
+
+
+def shadowed(img, darkest):
+    """Sombra em gradiente horizontal (brilho de 100% até darkest)"""
+    ramp = np.linspace(1.0, darkest, img.shape[1])[None, :, None]
+    return (img * ramp).astype(np.uint8)
+
+
+def gray_of(img):
+    return cv2.GaussianBlur(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+
+
+class TestBinarizer:
+    """Testes para a escolha e aplicação do método"""
+
+    def test_even_lighting_uses_otsu(self):
+        sheet = render_answer_sheet(random_answers(20), CHOICES)
+        assert Binarizer().choose_method(gray_of(sheet)) == binarization.OTSU
+
+    @pytest.mark.parametrize("darkest,expected", [
+        (0.75, binarization.TILED_OTSU),
+        (0.4, binarization.ADAPTIVE_MEAN),
+    ])
+    def test_uneven_lighting_uses_local_threshold(self, darkest, expected):
+        sheet = shadowed(render_answer_sheet(random_answers(20), CHOICES), darkest)
+        assert Binarizer().choose_method(gray_of(sheet)) == expected
+
+    def test_fixed_method_skips_analysis(self):
+        binarizer = Binarizer(method=binarization.ADAPTIVE_MEAN)
+        assert binarizer.choose_method(np.zeros((10, 10), np.uint8)) == \
+            binarization.ADAPTIVE_MEAN
+
+    def test_invalid_method(self):
+        with pytest.raises(ValueError):
+            Binarizer(method="sauvola")
+
+    def test_block_size_scales_with_resolution(self):
+        binarizer = Binarizer()
+        assert binarizer.block_size(1240) == 11
+        assert binarizer.block_size(600) == 11
+        assert binarizer.block_size(4000) == 35
+        assert binarizer.block_size(4000) % 2 == 1
+
+    @pytest.mark.parametrize("method", [
+        binarization.OTSU, binarization.TILED_OTSU, binarization.ADAPTIVE_MEAN
+    ])
+    def test_ink_is_white(self, method):
+        gray = np.full((600, 600), 230, np.uint8)
+        gray[298:302, 100:500] = 20  # Traço de caneta
+
+        binary = Binarizer(method=method).binarize(gray)
+
+        assert binary[300, 300] == 255
+        assert binary[100, 100] == 0
+
+
+class TestEngineBinarization:
+    """Leitura de folhas com iluminação irregular"""
+
+    @pytest.mark.parametrize("darkest", [1.0, 0.75, 0.4])
+    def test_reads_shadowed_sheet(self, darkest):
+        answers = random_answers(30)
+        image = encode_image(
+            shadowed(render_answer_sheet(answers, CHOICES), darkest)
+        )
+
+        result = OpenCVOMREngine().process_image(
+            image, OMROptions(num_questions=30, choices=CHOICES)
+        )
+
+        assert [a.marked_choice for a in result.answers] == answers
@@ -0,0 +1,121 @@
+"""
+Testes do Classificador de Células - Infrastructure Layer
+
+Modelo aprendido que separa marcações de rasuras e sujeiras, treinado em
+folhas sintéticas.
+"""
+
+import numpy as np
+import pytest
+from app.domain.value_objects import OMROptions
+from app.infrastructure.cell_classifier import (
+    CELL_CLASSES, MIN_CELL_SIDE, NUM_FEATURES,
+    CellClassifier, cell_features, crop_features, train_cell_classifier
+)
+from app.infrastructure.cell_map import integral_ink
+from app.infrastructure.cell_training import synthetic_cell_set
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.synthetic_sheet import render_answer_sheet, encode_image
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+# Folha com a resposta marcada e, em outra alternativa, uma rasura (questões
+# 2 e 5) ou uma sujeira (questão 7); a questão 9 é preenchida
+ANSWERS = ["A", "B", "C", "D", "E"] * 4
+ANSWERS[8] = "B"
+CELL_MARKS = {(2, "D"): "scribble", (5, "A"): "scribble", (7, "C"): "smudge", (9, "B"): "fill"}
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    features, labels = synthetic_cell_set(num_sheets=6)
+    return train_cell_classifier(features, labels)
+
+
+def scribbled_sheet():
+    answers = list(ANSWERS)
+    answers[8] = None  # Questão 9 só com o preenchimento (CELL_MARKS)
+    return encode_image(render_answer_sheet(answers, CHOICES, cell_marks=CELL_MARKS))
+
+
+class TestCellFeatures:
+    """Testes para as características das células"""
+
+    def test_one_row_per_cell(self):
+        ink = np.zeros((100, 200), dtype=np.uint8)
+        ink[10:30, 10:30] = 255
+        boxes = np.array([[[0, 40, 0, 40], [0, 40, 40, 80]]] * 3, dtype=np.int32)
+
+        features = cell_features(integral_ink(ink), boxes)
+
+        assert features.shape == (6, NUM_FEATURES)
+        assert features[0, :NUM_FEATURES - 7].max() == pytest.approx(1.0)
+        assert features[1].max() == 0
+
+    def test_crop_features_match_cell_features(self):
+        crop = np.zeros((24, 30), dtype=np.uint8)
+        crop[4:20, 6:12] = 255
+        box = np.array([[0, 24, 0, 30]], dtype=np.int32)
+        np.testing.assert_allclose(
+            crop_features([crop]), cell_features(integral_ink(crop), box)
+        )
+
+
+class TestCellClassifier:
+    """Testes para o modelo e a decisão das respostas"""
+
+    def test_separates_marks_from_scribbles(self, classifier):
+        features, labels = synthetic_cell_set(num_sheets=2, seed=1)
+        predicted = classifier.predict_proba(features).argmax(axis=1)
+        mark = CELL_CLASSES.index("mark")
+        assert ((predicted == mark) == (labels == mark)).mean() > 0.97
+
+    def test_save_and_load(self, classifier, tmp_path):
+        path = tmp_path / "cells.npz"
+        classifier.save(path)
+        loaded = CellClassifier.load(path)
+        assert loaded.fingerprint == classifier.fingerprint
+        features = np.random.default_rng(0).random((4, NUM_FEATURES))
+        np.testing.assert_allclose(
+            loaded.predict_proba(features), classifier.predict_proba(features)
+        )
+
+    def test_rejects_incompatible_weights(self):
+        with pytest.raises(ValueError, match="incompatível"):
+            CellClassifier(
+                np.zeros((10, len(CELL_CLASSES))), np.zeros(len(CELL_CLASSES)),
+                np.zeros(10), np.ones(10)
+            )
+
+    def test_supports_only_large_cells(self, classifier):
+        large = np.array([[0, MIN_CELL_SIDE, 0, 40]], dtype=np.int32)
+        small = np.array([[0, MIN_CELL_SIDE - 1, 0, 40]], dtype=np.int32)
+        assert classifier.supports(large)
+        assert not classifier.supports(small)
+
+
+class TestEngineWithClassifier:
+    """Leitura com o classificador no lugar das regras de densidade"""
+
+    def test_scribbles_are_not_answers(self, classifier):
+        options = OMROptions(num_questions=20, choices=CHOICES)
+        heuristic = OpenCVOMREngine(auto_orient=False).process_image(
+            scribbled_sheet(), options
+        )
+        learned = OpenCVOMREngine(
+            auto_orient=False, cell_classifier=classifier
+        ).process_image(scribbled_sheet(), options)
+
+        # A rasura tem mais tinta que o "X" e engana as regras de densidade
+        assert heuristic.answers[1].marked_choice == "D"
+        assert [a.marked_choice for a in learned.answers] == ANSWERS
+        assert learned.answers[1].densities == heuristic.answers[1].densities
+
+    def test_batch_thresholds_skipped(self, classifier):
+        engine = OpenCVOMREngine(cell_classifier=classifier)
+        result = engine.process_image(
+            scribbled_sheet(), OMROptions(num_questions=20, choices=CHOICES)
+        )
+        classified, thresholds = engine.classify_batch([result] * 3)
+        assert thresholds is None
+        assert classified == [result] * 3
@@ -0,0 +1,74 @@
+"""
+Testes da Configuração de Concorrência - Infrastructure Layer
+"""
+
+import pytest
+from app.infrastructure.concurrency import (
+    ConcurrencyConfig, cgroup_cpu_quota, parse_cpu_list
+)
+
+
+class TestCgroupQuota:
+    """Testes para a leitura da quota de CPU do container"""
+
+    def test_cgroup_v2_quota(self, tmp_path):
+        (tmp_path / "cpu.max").write_text("250000 100000\n")
+        assert cgroup_cpu_quota(tmp_path) == 2.5
+
+    def test_cgroup_v2_unlimited(self, tmp_path):
+        (tmp_path / "cpu.max").write_text("max 100000\n")
+        assert cgroup_cpu_quota(tmp_path) is None
+
+    def test_cgroup_v1_quota(self, tmp_path):
+        (tmp_path / "cpu").mkdir()
+        (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("200000")
+        (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000")
+        assert cgroup_cpu_quota(tmp_path) == 2.0
+
+    def test_no_cgroup(self, tmp_path):
+        assert cgroup_cpu_quota(tmp_path) is None
+
+
+class TestConcurrencyConfig:
+    """Testes para a divisão dos núcleos"""
+
+    def test_parse_cpu_list(self):
+        assert parse_cpu_list("0-2, 6") == (0, 1, 2, 6)
+        with pytest.raises(ValueError):
+            parse_cpu_list("3-1")
+
+    def test_defaults_split_cores_between_workers(self):
+        config = ConcurrencyConfig.from_env({"WEB_CONCURRENCY": "2"}, cpus=4)
+
+        assert (config.workers, config.read_threads, config.cv_threads) == (2, 2, 1)
+        assert not config.oversubscribed
+
+    def test_fewer_reads_get_more_opencv_threads(self):
+        config = ConcurrencyConfig.from_env({"OMR_READ_THREADS": "1"}, cpus=4)
+
+        assert (config.workers, config.read_threads, config.cv_threads) == (1, 1, 4)
+
+    def test_explicit_values_may_oversubscribe(self):
+        config = ConcurrencyConfig.from_env(
+            {"WEB_CONCURRENCY": "4", "OMR_CV_THREADS": "4"}, cpus=4
+        )
+
+        assert config.total_threads == 16
+        assert config.oversubscribed
+
+    def test_affinity_defines_cpus(self):
+        config = ConcurrencyConfig.from_env({"OMR_CPU_AFFINITY": "0-1"})
+
+        assert config.cpus == 2
+        assert config.cpu_affinity == (0, 1)
+
+    def test_invalid_value(self):
+        with pytest.raises(ValueError, match="OMR_READ_THREADS"):
+            ConcurrencyConfig.from_env({"OMR_READ_THREADS": "0"}, cpus=4)
+
+    def test_native_threads_keep_explicit_values(self):
+        environ = {"OMP_NUM_THREADS": "3"}
+        ConcurrencyConfig(4, 1, 4, 1).limit_native_threads(environ)
+
+        assert environ["OMP_NUM_THREADS"] == "3"
+        assert environ["OPENBLAS_NUM_THREADS"] == "1"
@@ -4,11 +4,16 @@ Testes Unitários - Domain Layer
 Testa entidades e value objects do domínio.
 """
 
+import numpy as np
 import pytest
 from app.domain.entities import (
-    Answer, MarkQuality, OMRResult, Question, AnswerKey, ExamCorrection
+    Answer, AnswerTable, MarkQuality, OMRResult, Question, AnswerKey,
+    ExamCorrection, NO_CHOICE, CLEAR_CODE, BLANK_CODE
+)
+from app.domain.value_objects import (
+    ROI, Quadrilateral, OMROptions, ImageMetadata, SheetLayout, GridBlock,
+    RelativeRegion, StudentIdField, UploadFormat, MAX_QUESTIONS
 )
-from app.domain.value_objects import ROI, OMROptions, ImageMetadata
 
 
 class TestAnswer:
@@ -73,6 +78,67 @@ class TestOMRResult:
         assert flags["lowConfidence"] == [3]
         assert flags["multiple"] == [4]
 
+    def test_answers_list_becomes_table(self):
+        answers = [
+            Answer(1, "B", 0.8, MarkQuality.CLEAR, {"A": 0.1, "B": 0.9}),
+            Answer(2, None, 0.0, MarkQuality.BLANK, {"A": 0.0, "B": 0.01})
+        ]
+        result = OMRResult(answers=answers, total_questions=2)
+
+        assert isinstance(result.answers, AnswerTable)
+        row = result.answers[0]
+        assert (row.question_number, row.marked_choice, row.confidence) == (1, "B", 0.8)
+        assert row.quality == MarkQuality.CLEAR
+        assert row.densities == {"A": 0.1, "B": 0.9}
+        assert row.is_valid() is True
+        assert result.answers[-1].marked_choice is None
+        assert result.answers[1].needs_review() is True
+
+    def test_dict_views_are_cached(self):
+        result = OMRResult(
+            answers=[Answer(1, "A", 0.5, MarkQuality.CLEAR, {})],
+            total_questions=1
+        )
+        assert result.get_answers_dict() is result.get_answers_dict()
+        assert result.get_confidence_dict() == {"1": 0.5}
+
+
+class TestAnswerTable:
+    """Testes para as respostas em colunas"""
+
+    def test_columns(self):
+        table = AnswerTable(
+            question_numbers=np.array([1, 2, 3]),
+            choices=["A", "B"],
+            choice_index=np.array([1, NO_CHOICE, 0]),
+            confidence=np.array([0.9, 0.0, 0.7]),
+            quality_codes=np.array([CLEAR_CODE, BLANK_CODE, CLEAR_CODE]),
+            densities=np.array([[0.01, 0.3], [0.0, 0.0], [0.25, 0.02]])
+        )
+
+        assert len(table) == 3
+        assert [a.marked_choice for a in table] == ["B", None, "A"]
+        assert table.answers_dict() == {"1": "B", "2": None, "3": "A"}
+        assert table.flags() == {"blank": [2], "multiple": [], "lowConfidence": []}
+        assert table[2].densities == {"A": 0.25, "B": 0.02}
+        assert not table.densities.flags.writeable
+
+    def test_mismatched_columns(self):
+        with pytest.raises(ValueError):
+            AnswerTable(
+                question_numbers=np.array([1, 2]),
+                choices=["A"],
+                choice_index=np.array([0]),
+                confidence=np.array([0.9, 0.1]),
+                quality_codes=np.array([CLEAR_CODE, CLEAR_CODE]),
+                densities=np.zeros((2, 1))
+            )
+
+    def test_index_out_of_range(self):
+        table = AnswerTable.from_answers([])
+        with pytest.raises(IndexError):
+            table[0]
+
 
 class TestQuestion:
     """Testes para a entidade Question"""
@@ -134,6 +200,47 @@ class TestROI:
         assert roi.is_valid() is False
 
 
+class TestRelativeRegion:
+    """Testes para o value object RelativeRegion"""
+
+    @pytest.mark.parametrize("degrees, expected", [
+        (0, (0.1, 0.05, 0.4, 0.2)),
+        (90, (0.75, 0.1, 0.2, 0.4)),  # Topo da folha à direita
+        (180, (0.5, 0.75, 0.4, 0.2)),
+        (270, (0.05, 0.5, 0.2, 0.4)),  # Topo da folha à esquerda
+    ])
+    def test_rotated(self, degrees, expected):
+        region = RelativeRegion(0.1, 0.05, 0.4, 0.2).rotated(degrees)
+        assert (region.x, region.y, region.width, region.height) == pytest.approx(expected)
+
+    @pytest.mark.parametrize("degrees", [90, 180, 270])
+    def test_rotation_round_trip(self, degrees):
+        region = RelativeRegion(0.1, 0.05, 0.4, 0.2).rotated(degrees).rotated(-degrees)
+        assert (region.x, region.y, region.width, region.height) == pytest.approx(
+            (0.1, 0.05, 0.4, 0.2)
+        )
+
+
+class TestQuadrilateral:
+    """Testes para o value object Quadrilateral"""
+
+    def test_tilted_quadrilateral_is_valid(self):
+        quad = Quadrilateral(((90, 60), (1200, 130), (1120, 1720), (20, 1640)))
+        assert quad.is_valid() is True
+
+    def test_crossed_corners_are_invalid(self):
+        # Inferior direito e inferior esquerdo trocados
+        quad = Quadrilateral(((0, 0), (100, 0), (0, 100), (100, 100)))
+        assert quad.is_valid() is False
+
+    def test_requires_four_points(self):
+        assert Quadrilateral(((0, 0), (100, 0), (100, 100))).is_valid() is False
+
+    def test_bounding_roi(self):
+        quad = Quadrilateral(((90, 60.5), (1200, 130), (1120.2, 1720), (20, 1640)))
+        assert quad.bounding_roi() == ROI(x=20, y=60, width=1180, height=1660)
+
+
 class TestOMROptions:
     """Testes para o value object OMROptions"""
 
@@ -150,12 +257,37 @@ class TestOMROptions:
             OMROptions(num_questions=0, choices=["A", "B"])
 
         with pytest.raises(ValueError):
-            OMROptions(num_questions=101, choices=["A", "B"])
+            OMROptions(num_questions=MAX_QUESTIONS + 1, choices=["A", "B"])
+
+    def test_more_than_100_questions_allowed(self):
+        options = OMROptions(
+            num_questions=200,
+            choices=["A", "B", "C", "D"],
+            layout=SheetLayout.columns(200, 4)
+        )
+        assert options.sheet_layout.total_questions == 200
+
+    def test_layout_must_cover_all_questions(self):
+        with pytest.raises(ValueError):
+            OMROptions(
+                num_questions=50,
+                choices=["A", "B"],
+                layout=SheetLayout.columns(40, 2)
+            )
 
     def test_invalid_choices(self):
         with pytest.raises(ValueError):
             OMROptions(num_questions=10, choices=["A"])  # Menos de 2
 
+    def test_manual_roi_accepts_corners(self):
+        options = OMROptions(
+            num_questions=10,
+            choices=["A", "B"],
+            template="MANUAL_ROI",
+            corners=Quadrilateral(((0, 0), (100, 0), (100, 100), (0, 100)))
+        )
+        assert options.roi is None
+
     def test_manual_roi_requires_roi(self):
         with pytest.raises(ValueError):
             OMROptions(
@@ -166,6 +298,70 @@ class TestOMROptions:
             )
 
 
+class TestSheetLayout:
+    """Testes para o value object SheetLayout"""
+
+    def test_single_block_covers_roi(self):
+        layout = SheetLayout.single(10)
+        assert len(layout.blocks) == 1
+        assert layout.blocks[0].region == RelativeRegion(0.0, 0.0, 1.0, 1.0)
+
+    def test_columns_split_questions(self):
+        layout = SheetLayout.columns(25, 3)
+        assert [b.first_question for b in layout.blocks] == [1, 10, 19]
+        assert [b.num_questions for b in layout.blocks] == [9, 9, 7]
+        assert layout.total_questions == 25
+
+    def test_overlapping_blocks_rejected(self):
+        region = RelativeRegion(0.0, 0.0, 0.5, 1.0)
+        with pytest.raises(ValueError):
+            SheetLayout(blocks=(
+                GridBlock(region, 1, 10),
+                GridBlock(region, 5, 10)
+            ))
+
+    def test_region_outside_reference_rejected(self):
+        with pytest.raises(ValueError):
+            SheetLayout(blocks=(
+                GridBlock(RelativeRegion(0.6, 0.0, 0.5, 1.0), 1, 10),
+            ))
+
+
+class TestStudentIdField:
+    """Testes para o value object StudentIdField"""
+
+    def test_valid_field(self):
+        field = StudentIdField(RelativeRegion(0.1, 0.05, 0.4, 0.2), digits=8)
+        assert field.digits == 8
+
+    def test_invalid_digits(self):
+        with pytest.raises(ValueError):
+            StudentIdField(RelativeRegion(0.1, 0.05, 0.4, 0.2), digits=0)
+
+
+class TestExamCorrection:
+    """Testes para a entidade ExamCorrection"""
+
+    def test_to_dict_includes_student_id(self):
+        correction = ExamCorrection(
+            answer_key_id="key1",
+            detected_answers={"1": "A"},
+            correct_count=1,
+            errors=[],
+            invalid_questions=[],
+            blank_questions=[],
+            score=10,
+            percentage=100.0,
+            passed=True,
+            review_needed=[],
+            student_id="20231587",
+            student_id_confidence=0.9
+        )
+        data = correction.to_dict()
+        assert data["alunoId"] == "20231587"
+        assert data["alunoIdConfianca"] == 0.9
+
+
 class TestImageMetadata:
     """Testes para o value object ImageMetadata"""
 
@@ -182,3 +378,27 @@ class TestImageMetadata:
 
         metadata = ImageMetadata(640, 480, "JPEG", 1024)
         assert metadata.is_valid_dimensions(min_width=800, min_height=600) is False
+
+
+class TestUploadFormat:
+    """Testes para o value object UploadFormat"""
+
+    def test_matches_compact_upload(self):
+        upload_format = UploadFormat(max_side=2000)
+        assert upload_format.media_type == "image/jpeg"
+        name = upload_format.filename
+        # Canvas do navegador: JPEG de três canais, mesmo com conteúdo cinza
+        assert upload_format.matches(ImageMetadata(1414, 2000, "JPEG", 300 * 1024, 3), name)
+        assert upload_format.matches(ImageMetadata(1414, 2000, "JPEG", 300 * 1024, 1), name)
+
+    def test_rejects_other_uploads(self):
+        upload_format = UploadFormat(max_side=2000)
+        name = upload_format.filename
+        # Sem a marca: não foi reduzida pelo cliente
+        assert not upload_format.matches(ImageMetadata(1414, 2000, "JPEG", 1024, 3), "foto.jpg")
+        assert not upload_format.matches(ImageMetadata(3024, 4032, "JPEG", 1024, 3), name)
+        assert not upload_format.matches(ImageMetadata(1414, 2000, "PNG", 1024), name)
+        assert not upload_format.matches(ImageMetadata(480, 640, "JPEG", 1024), name)
+        assert not upload_format.matches(
+            ImageMetadata(1414, 2000, "JPEG", 6 * 1024 * 1024), name
+        )
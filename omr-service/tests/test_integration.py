@@ -5,9 +5,49 @@ Testa os endpoints FastAPI com requests HTTP reais.
 Requer que o servidor esteja rodando.
 """
 
+import asyncio
+import io
+import json
+import logging
+import zipfile
+
+import cv2
+import numpy as np
 import pytest
+from PIL import Image
+from fastapi.testclient import TestClient
 from httpx import AsyncClient
-from app.main import app
+from app import main
+from app.main import app, report_warm_up
+from app.presentation.dtos import OMRResultDto
+from app.presentation.routes import (
+    get_answer_key_repository, get_result_repository, get_read_answers_use_case,
+    get_readiness, zip_entry_item
+)
+from app.application.use_cases import CorrectExamBatchUseCase, ReadAnswersUseCase
+from app.infrastructure.admission import MemoryAdmissionController
+from app.infrastructure.image_validator import ImageValidator
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.warmup import Readiness
+from app.infrastructure.answer_key_store import SqliteAnswerKeyRepository
+from app.infrastructure.result_store import SqliteResultRepository
+from app.domain.value_objects import VersionField, RelativeRegion, ImageMetadata
+from app.infrastructure.synthetic_sheet import (
+    render_answer_sheet, render_camera_frame, encode_image
+)
+
+
+@pytest.fixture(autouse=True)
+def answer_key_repository(tmp_path):
+    """Gabaritos e histórico isolados em um banco temporário"""
+    path = str(tmp_path / "omr.sqlite3")
+    repository = SqliteAnswerKeyRepository(path)
+    results = SqliteResultRepository(path)
+    app.dependency_overrides[get_answer_key_repository] = lambda: repository
+    app.dependency_overrides[get_result_repository] = lambda: results
+    yield repository
+    app.dependency_overrides.pop(get_answer_key_repository, None)
+    app.dependency_overrides.pop(get_result_repository, None)
 
 
 @pytest.mark.asyncio
@@ -22,6 +62,54 @@ async def test_health_endpoint():
     assert data["service"] == "omr-service"
 
 
+@pytest.mark.asyncio
+async def test_ready_only_after_warm_up():
+    """Testa a prontidão separada da vivacidade"""
+    readiness = Readiness()
+    app.dependency_overrides[get_readiness] = lambda: readiness
+
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            warming = await client.get("/api/ready")
+            alive = await client.get("/api/health")
+            readiness.mark_ready({"sheet_1": 812.34, "sheet_2": 95.0})
+            ready = await client.get("/api/ready")
+    finally:
+        app.dependency_overrides.pop(get_readiness, None)
+
+    assert warming.status_code == 503
+    assert warming.json()["status"] == "warming_up"
+    assert alive.status_code == 200
+    assert ready.status_code == 200
+    assert ready.json()["warmupMs"] == {"sheet_1": 812.3, "sheet_2": 95.0}
+
+
+@pytest.mark.asyncio
+async def test_failed_warm_up_is_reported(monkeypatch, caplog):
+    """Testa a falha do aquecimento no log e em /ready"""
+    readiness = Readiness()
+    monkeypatch.setattr(main, "get_readiness", lambda: readiness)
+    app.dependency_overrides[get_readiness] = lambda: readiness
+
+    async def failing_warm_up():
+        raise MemoryError()
+
+    try:
+        task = asyncio.ensure_future(failing_warm_up())
+        await asyncio.wait([task])
+        with caplog.at_level(logging.ERROR, logger="app.main"):
+            report_warm_up(task)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/api/ready")
+    finally:
+        app.dependency_overrides.pop(get_readiness, None)
+
+    assert "Falha no aquecimento" in caplog.text
+    assert response.status_code == 503
+    assert response.json()["status"] == "error"
+    assert response.json()["error"] == "MemoryError"
+
+
 @pytest.mark.asyncio
 async def test_root_endpoint():
     """Testa o endpoint raiz"""
@@ -34,6 +122,438 @@ async def test_root_endpoint():
     assert "version" in data
 
 
+@pytest.mark.asyncio
+async def test_batch_correction_routes_versions():
+    """Testa a correção em lote com duas versões de prova"""
+    field = VersionField(RelativeRegion(0.62, 0.03, 0.28, 0.05))
+    answers = ["A", "B", "C", "D", "E"] * 2
+
+    def sheet(version, ext=".jpg"):
+        return encode_image(render_answer_sheet(
+            answers, answer_area=(0.1, 0.3, 0.8, 0.65),
+            exam_version=version, version_field=field
+        ), ext)
+
+    files = [
+        ("images", ("A.jpg", sheet("A"), "image/jpeg")),
+        ("images", ("B.jpg", sheet("B"), "image/jpeg")),
+        # A mesma folha da versão A enviada de novo
+        ("images", ("A-de-novo.png", sheet("A", ".png"), "image/png")),
+    ]
+
+    def key(key_id, correct):
+        return {
+            "id": key_id, "name": key_id, "passingScore": 60,
+            "questions": [
+                {"number": i + 1, "correctAnswer": c, "points": 1}
+                for i, c in enumerate(correct)
+            ]
+        }
+
+    data = {
+        "gabaritos": json.dumps({
+            "A": key("prova-A", answers),
+            "B": key("prova-B", list(reversed(answers)))
+        }),
+        "versao": json.dumps({"x": 0.62, "y": 0.03, "w": 0.28, "h": 0.05})
+    }
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/corrigir/lote", files=files, data=data)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["corrigidas"] == 3
+    assert result["porTipo"] == {"A": 2, "B": 1}
+    assert 0 < result["limiarMarcacao"] < 0.045  # Ajustado às folhas do lote
+    assert (result["duplicatas"], result["falhas"]) == (1, 0)
+    first, second, again = result["itens"]
+    # Sem matrícula, a cópia pode ser de outro aluno: corrigida e apontada
+    assert again["duplicataDe"] == "A.jpg"
+    assert again["correcao"]["acertos"] == 10
+    assert first["correcao"]["provaId"] == "prova-A"
+    assert first["correcao"]["acertos"] == 10
+    assert second["correcao"]["provaId"] == "prova-B"
+    assert second["correcao"]["tipoProva"] == "B"
+
+
+@pytest.mark.asyncio
+async def test_zip_correction_streams_each_sheet():
+    """Testa a correção em fluxo das imagens de um .zip"""
+    answers = ["A", "B", "C", "D", "E"] * 2
+    sheet = render_answer_sheet(answers, answer_area=(0.1, 0.3, 0.8, 0.65))
+    other = render_answer_sheet(answers[::-1], answer_area=(0.1, 0.3, 0.8, 0.65))
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("turma/1.jpg", encode_image(sheet))
+        archive.writestr("turma/2.png", encode_image(other, ".png"))
+        archive.writestr("__MACOSX/turma/._1.jpg", b"metadados")  # Ignorada
+        archive.writestr("turma/notas.txt", b"ignorada")
+        archive.writestr("turma/falsa.jpg", b"nao sou uma imagem")
+        archive.writestr("turma/1-de-novo.jpg", encode_image(sheet))
+
+    data = {"gabaritos": json.dumps({"A": {
+        "id": "prova", "name": "Prova", "passingScore": 60,
+        "questions": [
+            {"number": i + 1, "correctAnswer": c, "points": 1}
+            for i, c in enumerate(answers)
+        ]
+    }})}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post(
+            "/api/corrigir/zip", data=data,
+            files={"arquivo": ("turma.zip", buffer.getvalue(), "application/zip")}
+        )
+        broken = await client.post(
+            "/api/corrigir/zip", data=data,
+            files={"arquivo": ("turma.zip", b"PK nada", "application/zip")}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    *items, last = [json.loads(line) for line in response.text.splitlines()]
+    assert [item["arquivo"] for item in items] == [
+        "turma/1.jpg", "turma/2.png", "turma/falsa.jpg", "turma/1-de-novo.jpg"
+    ]
+    first, second, fake, again = items
+    assert second["correcao"]["acertos"] == 2  # Só a questão do meio coincide
+    assert fake["erro"].startswith("Tipo de arquivo inválido")
+    # Leituras simultâneas: qualquer uma das cópias pode chegar primeiro
+    original, copy = (first, again) if again["duplicataDe"] else (again, first)
+    assert original["correcao"]["acertos"] == copy["correcao"]["acertos"] == 10
+    assert copy["duplicataDe"] == original["arquivo"]
+    assert last == {"resumo": {
+        "total": 4, "corrigidas": 3, "falhas": 1, "duplicatas": 1,
+        "porTipo": {}
+    }}
+    assert broken.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_zip_entry_failure_keeps_the_stream(monkeypatch):
+    """Testa que uma entrada que falha vira erro e o resumo ainda sai"""
+    answers = ["A", "B", "C"]
+    sheet = encode_image(render_answer_sheet(answers))
+    correct_one = CorrectExamBatchUseCase.correct_one
+
+    def failing(self, image_file, filename, *args, **kwargs):
+        if filename == "2.jpg":
+            raise MemoryError()
+        return correct_one(self, image_file, filename, *args, **kwargs)
+
+    monkeypatch.setattr(CorrectExamBatchUseCase, "correct_one", failing)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("1.jpg", sheet)
+        archive.writestr("2.jpg", sheet)
+    data = {"gabaritos": json.dumps({"A": {
+        "id": "prova", "name": "Prova", "passingScore": 60,
+        "questions": [
+            {"number": i + 1, "correctAnswer": c, "points": 1}
+            for i, c in enumerate(answers)
+        ]
+    }}), "pularDuplicatas": "false"}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post(
+            "/api/corrigir/zip", data=data,
+            files={"arquivo": ("turma.zip", buffer.getvalue(), "application/zip")}
+        )
+
+    first, second, last = [json.loads(line) for line in response.text.splitlines()]
+    assert first["correcao"]["acertos"] == 3
+    assert second["erro"] == "MemoryError"
+    assert last["resumo"]["corrigidas"] == 1 and last["resumo"]["falhas"] == 1
+
+    # Leitura cancelada fora do fluxo: vira o erro da entrada
+    cancelled = asyncio.get_running_loop().create_future()
+    cancelled.cancel()
+    item = await zip_entry_item(zipfile.ZipInfo("3.jpg"), cancelled)
+    assert item.error == "Leitura cancelada"
+
+
+@pytest.mark.asyncio
+async def test_blurred_image_rejected_with_quality():
+    """Testa a rejeição rápida de foto desfocada"""
+    sheet = cv2.GaussianBlur(render_answer_sheet(["A", "B", "C"] * 3), (0, 0), 9)
+    files = {"image": ("exam.jpg", encode_image(sheet), "image/jpeg")}
+    data = {"options": json.dumps({"numQuestions": 9, "choices": ["A", "B", "C"]})}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/omr/read", files=files, data=data)
+
+    assert response.status_code == 422
+    body = response.json()
+    assert body["error_type"] == "image_quality"
+    assert body["quality"]["reason"] == "imagem desfocada"
+
+
+@pytest.mark.asyncio
+async def test_omr_read_busy_returns_503():
+    """Testa a recusa com Retry-After quando o orçamento de memória acaba"""
+    admission = MemoryAdmissionController(budget_bytes=1, timeout_seconds=0.01)
+    app.dependency_overrides[get_read_answers_use_case] = lambda: ReadAnswersUseCase(
+        OpenCVOMREngine(), ImageValidator(), None, admission=admission
+    )
+    files = {"image": ("exam.jpg", encode_image(render_answer_sheet(["A"] * 5)), "image/jpeg")}
+    data = {"options": json.dumps({"numQuestions": 5, "choices": ["A", "B", "C", "D", "E"]})}
+
+    try:
+        with admission.admit(ImageMetadata(1, 1, "JPEG", 0)):  # Leitura em andamento
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                response = await client.post("/api/omr/read", files=files, data=data)
+    finally:
+        app.dependency_overrides.pop(get_read_answers_use_case, None)
+
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 1
+
+
+@pytest.mark.asyncio
+async def test_omr_read_json_and_msgpack():
+    """Testa a mesma leitura em JSON e em MessagePack (header Accept)"""
+    msgpack = pytest.importorskip("msgpack")
+    answers = ["A", "B", None, "D", "E", "C"]
+    files = {"image": ("exam.jpg", encode_image(render_answer_sheet(answers)), "image/jpeg")}
+    data = {"options": json.dumps({"numQuestions": 6, "choices": ["A", "B", "C", "D", "E"]})}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        as_json = await client.post("/api/omr/read", files=files, data=data)
+        as_msgpack = await client.post(
+            "/api/omr/read", files=files, data=data,
+            headers={"Accept": "application/msgpack"}
+        )
+
+    assert as_json.headers["content-type"] == "application/json"
+    assert as_msgpack.headers["content-type"] == "application/msgpack"
+    result = as_json.json()
+    assert msgpack.unpackb(as_msgpack.content) == result
+    assert OMRResultDto(**result).model_dump() == result
+    assert result["answers"] == {"1": "A", "2": "B", "3": None, "4": "D", "5": "E", "6": "C"}
+    assert result["flags"]["blank"] == [3]
+
+
+@pytest.mark.asyncio
+async def test_compact_upload_format(monkeypatch):
+    """Testa o formato compacto publicado e a leitura de um envio nesse formato"""
+    answers = ["A", "B", None, "D", "E", "C"]
+    type_checks = []
+    validate_file_type = ImageValidator.validate_file_type
+    monkeypatch.setattr(
+        ImageValidator, "validate_file_type",
+        lambda self, *args: type_checks.append(args) or validate_file_type(self, *args)
+    )
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        upload_format = (await client.get("/api/omr/formato")).json()
+        # Como o canvas do navegador: conteúdo cinza em JPEG de três canais
+        gray = cv2.cvtColor(render_answer_sheet(answers), cv2.COLOR_BGR2GRAY)
+        _, compact = cv2.imencode(
+            ".jpg", cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR),
+            [cv2.IMWRITE_JPEG_QUALITY, int(upload_format["quality"] * 100)]
+        )
+        assert Image.open(io.BytesIO(compact.tobytes())).mode == "RGB"
+        response = await client.post(
+            "/api/omr/read",
+            files={"image": (
+                upload_format["filename"], compact.tobytes(), upload_format["mediaType"]
+            )},
+            data={"options": json.dumps({"numQuestions": 6, "choices": ["A", "B", "C", "D", "E"]})}
+        )
+
+    assert upload_format == {
+        "maxSide": 2000, "mediaType": "image/jpeg", "quality": 0.9, "grayscale": True,
+        "filename": "omr-compacto.jpg"
+    }
+    assert type_checks == []  # Aceito pelo cabeçalho, sem a verificação completa
+    assert response.status_code == 200
+    assert response.json()["answers"] == {
+        "1": "A", "2": "B", "3": None, "4": "D", "5": "E", "6": "C"
+    }
+
+
+def test_live_scan_requests_capture_then_reads():
+    """Testa a leitura ao vivo: orientação por quadro, captura e resultado"""
+    answers = ["A", "B", "C", "D", "E", "A"]
+    page = render_answer_sheet(answers, size=(620, 877))
+    frame = encode_image(render_camera_frame(page, (180, 240), 0.45))
+    capture = encode_image(render_answer_sheet(answers))
+
+    # Sem "with": o aquecimento da inicialização não é necessário aqui
+    client = TestClient(app)
+    with client.websocket_connect("/api/omr/live") as websocket:
+        websocket.send_bytes(frame)
+        missing_options = websocket.receive_json()
+
+        websocket.send_text(json.dumps(
+            {"numQuestions": 6, "choices": ["A", "B", "C", "D", "E"]}
+        ))
+        guidance = []
+        while not guidance or not guidance[-1]["capture"]:
+            assert len(guidance) < 10
+            websocket.send_bytes(frame)
+            guidance.append(websocket.receive_json())
+
+        websocket.send_bytes(capture)
+        result = websocket.receive_json()
+
+    assert missing_options["type"] == "error"
+    assert missing_options["error_type"] == "invalid_options"
+    assert guidance[0]["type"] == "guidance"
+    assert len(guidance[0]["corners"]) == 4
+    assert guidance[-1]["status"] == "ready"
+    assert guidance[-1]["message"] == "Pronto: capturando"
+    assert result["type"] == "result"
+    assert result["answers"] == {"1": "A", "2": "B", "3": "C", "4": "D", "5": "E", "6": "A"}
+
+
+def test_live_scan_rejects_oversized_frame():
+    """Testa que um quadro grande demais vira erro, sem encerrar a conexão"""
+    page = render_answer_sheet(["A"] * 6, size=(620, 877))
+    large = encode_image(np.full((3200, 2400), 255, np.uint8), ".png")
+    frame = encode_image(render_camera_frame(page, (180, 240), 0.45))
+
+    client = TestClient(app)
+    with client.websocket_connect("/api/omr/live") as websocket:
+        websocket.send_text(json.dumps(
+            {"numQuestions": 6, "choices": ["A", "B", "C", "D", "E"]}
+        ))
+        websocket.send_bytes(large)
+        rejected = websocket.receive_json()
+        websocket.send_bytes(frame)
+        guidance = websocket.receive_json()
+
+    assert rejected["type"] == "error"
+    assert rejected["error_type"] == "invalid_frame"
+    assert guidance["type"] == "guidance"
+
+
+@pytest.mark.asyncio
+async def test_review_session_adjusts_roi():
+    """Testa a sessão de revisão: envio único e releitura com outro ROI"""
+    answers = ["A", "B", "C", "D", "E", "A"]
+    files = {"image": ("exam.jpg", encode_image(render_answer_sheet(answers)), "image/jpeg")}
+    options = {"numQuestions": 6, "choices": ["A", "B", "C", "D", "E"]}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        started = await client.post(
+            "/api/omr/sessoes", files=files, data={"options": json.dumps(options)}
+        )
+        session = started.json()
+        adjusted = await client.post(
+            f"/api/omr/sessoes/{session['sessionId']}/roi",
+            json={**options, "template": "MANUAL_ROI", "roi": session["roi"]}
+        )
+        closed = await client.delete(f"/api/omr/sessoes/{session['sessionId']}")
+        expired = await client.post(
+            f"/api/omr/sessoes/{session['sessionId']}/roi",
+            json={**options, "template": "MANUAL_ROI", "roi": session["roi"]}
+        )
+
+    assert started.status_code == 201
+    assert session["preview"].startswith("data:image/jpeg;base64,")
+    assert (session["width"], session["height"]) == (1240, 1754)
+    assert session["result"]["answers"] == {str(i + 1): a for i, a in enumerate(answers)}
+    assert adjusted.status_code == 200
+    assert adjusted.json()["answers"] == session["result"]["answers"]
+    assert closed.status_code == 204
+    assert expired.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_answer_key_crud(answer_key_repository):
+    """Testa o cadastro, a consulta, a alteração e a remoção de gabaritos"""
+    key = {
+        "id": "prova-1", "name": "Prova 1", "passingScore": 60,
+        "questions": [{"number": 1, "correctAnswer": "A", "points": 1}]
+    }
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        created = await client.post("/api/gabaritos", json=key)
+        duplicate = await client.post("/api/gabaritos", json=key)
+        key["questions"][0]["correctAnswer"] = "B"
+        updated = await client.put("/api/gabaritos/prova-1", json=key)
+        mismatch = await client.put("/api/gabaritos/outra", json=key)
+        fetched = await client.get("/api/gabaritos/prova-1")
+        listed = await client.get("/api/gabaritos")
+        deleted = await client.delete("/api/gabaritos/prova-1")
+        missing = await client.get("/api/gabaritos/prova-1")
+
+    assert created.status_code == 201
+    assert duplicate.status_code == 409
+    assert updated.status_code == 200
+    assert mismatch.status_code == 400
+    assert fetched.json()["questions"][0]["correctAnswer"] == "B"
+    assert [k["id"] for k in listed.json()] == ["prova-1"]
+    assert deleted.status_code == 204
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_correct_exam_with_answer_key_id(answer_key_repository):
+    """Testa a correção referenciando um gabarito cadastrado"""
+    answers = ["A", "B", "C", "D", "E", "C"]
+    key = {
+        "id": "prova-1", "name": "Prova 1", "passingScore": 60,
+        "questions": [
+            {"number": i + 1, "correctAnswer": c, "points": 1}
+            for i, c in enumerate(answers)
+        ]
+    }
+    files = {"image": ("exam.jpg", encode_image(render_answer_sheet(answers)), "image/jpeg")}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        await client.post("/api/gabaritos", json=key)
+        response = await client.post(
+            "/api/corrigir", files=files, data={"gabaritoId": "prova-1"}
+        )
+        unknown = await client.post(
+            "/api/corrigir", files=files, data={"gabaritoId": "outra"}
+        )
+        neither = await client.post("/api/corrigir", files=files)
+
+    assert response.status_code == 200
+    assert response.json()["acertos"] == 6
+    assert unknown.status_code == 404
+    assert neither.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_class_analytics_from_recorded_corrections():
+    """Testa as estatísticas da turma sobre as correções registradas"""
+    key = {
+        "id": "prova-1", "name": "Prova 1", "passingScore": 60,
+        "questions": [
+            {"number": i + 1, "correctAnswer": c, "points": 1}
+            for i, c in enumerate("ABCD")
+        ]
+    }
+    sheets = [["A", "B", "C", "D"], ["A", "C", "C", None]]
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        for answers in sheets:
+            files = {"image": ("exam.jpg", encode_image(render_answer_sheet(answers)), "image/jpeg")}
+            await client.post("/api/corrigir", files=files, data={"gabarito": json.dumps(key)})
+        summary = await client.get("/api/resultados/prova-1/resumo")
+        questions = await client.get("/api/resultados/prova-1/questoes")
+        distractors = await client.get("/api/resultados/prova-1/distratores")
+        items = await client.get("/api/resultados/prova-1/itens")
+
+    assert summary.json()["provas"] == 2
+    assert summary.json()["mediaPercentual"] == 75.0
+    assert [q["dificuldade"] for q in questions.json()] == [1.0, 0.5, 1.0, 0.5]
+    assert questions.json()[3]["emBranco"] == 1
+    second = distractors.json()[1]
+    assert [(c["alternativa"], c["quantidade"]) for c in second["alternativas"]] == [
+        ("B", 1), ("C", 1)
+    ]
+    assert items.json()["alunos"] == 2
+    assert [i["dificuldade"] for i in items.json()["itens"]] == [1.0, 0.5, 1.0, 0.5]
+    assert items.json()["itens"][1]["alternativas"]["C"] == 0.5
+
+
 # Nota: Testes completos de /omr/read e /corrigir requerem imagens de exemplo
 # e devem ser executados com o servidor rodando e imagens de teste disponíveis.
 # Exemplo de teste completo (comentado):
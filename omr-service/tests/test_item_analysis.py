@@ -0,0 +1,94 @@
+"""
+Testes da Análise de Itens - Domain Layer
+
+Estatísticas por questão sobre a matriz de respostas da turma.
+"""
+
+import numpy as np
+import pytest
+from app.domain.entities import Answer, AnswerKey, MarkQuality, OMRResult, Question
+from app.domain.item_analysis import (
+    ResponseMatrix, analyze_items, BLANK_MARK, VOID_MARK
+)
+from app.application.use_cases import CorrectExamUseCase
+
+A, B, C, D = range(4)
+
+
+def matrix(marks, key):
+    return ResponseMatrix(
+        "prova", np.arange(1, len(key) + 1), "ABCD", key, np.array(marks)
+    )
+
+
+class TestAnalyzeItems:
+    """Testes para as estatísticas calculadas"""
+
+    @pytest.fixture
+    def analysis(self):
+        # 4 alunos × 3 questões; gabarito A, B, C
+        return analyze_items(matrix([
+            [A, B, C],
+            [A, B, D],
+            [A, C, BLANK_MARK],
+            [B, VOID_MARK, D],
+        ], key=[A, B, C]), group_fraction=0.25)
+
+    def test_difficulty(self, analysis):
+        assert [item.difficulty for item in analysis.items] == [0.75, 0.5, 0.25]
+
+    def test_discrimination_uses_extreme_groups(self, analysis):
+        # Grupo superior: aluno 1 (3 acertos); inferior: aluno 4 (0 acertos)
+        assert [item.discrimination for item in analysis.items] == [1.0, 1.0, 1.0]
+
+    def test_point_biserial_matches_corrected_correlation(self, analysis):
+        scores = np.array([[1, 1, 1], [1, 1, 0], [1, 0, 0], [0, 0, 0]], float)
+        rest = scores.sum(axis=1)[:, None] - scores
+        expected = [np.corrcoef(scores[:, j], rest[:, j])[0, 1] for j in range(3)]
+
+        assert [item.point_biserial for item in analysis.items] == \
+            pytest.approx(expected, abs=1e-4)
+
+    def test_choice_rates(self, analysis):
+        second, third = analysis.items[1], analysis.items[2]
+
+        assert second.choice_rates == {"A": 0.0, "B": 0.5, "C": 0.25, "D": 0.0}
+        assert second.void_rate == 0.25
+        assert third.blank_rate == 0.25
+        assert third.choice_rates["D"] == 0.5
+
+    def test_constant_item_has_zero_correlation(self):
+        analysis = analyze_items(matrix([[A, B], [A, C], [A, B]], key=[A, B]))
+        assert analysis.items[0].point_biserial == 0.0
+
+    def test_empty_class(self):
+        analysis = analyze_items(
+            ResponseMatrix("prova", [1, 2], "AB", [0, 1], np.empty((0, 2)))
+        )
+        assert analysis.students == 0
+        assert analysis.items[0].difficulty == 0.0
+
+    def test_shape_mismatch(self):
+        with pytest.raises(ValueError):
+            matrix([[A, B, C]], key=[A, B])
+
+
+class TestResponseMatrix:
+    """Montagem da matriz a partir das correções"""
+
+    def test_from_corrections(self):
+        key = AnswerKey("prova", "Prova", [Question(1, "A", 1), Question(2, "B", 1)], 60)
+        answers = [
+            [Answer(1, "A", 0.9, MarkQuality.CLEAR, {}),
+             Answer(2, "C", 0.9, MarkQuality.MULTIPLE, {})],
+            [Answer(1, None, 0.0, MarkQuality.BLANK, {}),
+             Answer(2, "E", 0.1, MarkQuality.LOW_CONFIDENCE, {})],
+        ]
+        grader = CorrectExamUseCase(read_answers_use_case=None)
+        corrections = [grader.grade(OMRResult(a, 2), key) for a in answers]
+
+        result = ResponseMatrix.from_corrections(corrections, key)
+
+        assert result.choices == ("A", "B", "C", "D", "E")
+        assert result.correct_index.tolist() == [0, 1]
+        assert result.marks.tolist() == [[0, VOID_MARK], [BLANK_MARK, 4]]
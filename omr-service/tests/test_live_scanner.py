@@ -0,0 +1,130 @@
+"""
+Testes do Acompanhamento da Folha na Leitura ao Vivo - Infrastructure Layer
+"""
+
+import cv2
+import numpy as np
+import pytest
+from app.domain.value_objects import FrameStatus
+from app.infrastructure.live_scanner import MAX_FRAME_BYTES, SheetTracker
+from app.infrastructure.synthetic_sheet import (
+    render_answer_sheet, render_camera_frame, encode_image
+)
+
+
+@pytest.fixture(scope="module")
+def page():
+    return render_answer_sheet(["A", "B", "C", "D", "E"] * 4, size=(620, 877))
+
+
+def frame(page, center=(180, 240), scale=0.45, blur=0, **kwargs) -> bytes:
+    img = render_camera_frame(page, center, scale, **kwargs)
+    if blur:
+        img = cv2.GaussianBlur(img, (0, 0), blur)
+    return encode_image(img)
+
+
+class TestSheetTracker:
+    """Testes para o SheetTracker"""
+
+    def test_no_sheet(self):
+        blank = encode_image(np.full((480, 360, 3), 120, np.uint8))
+        assessment = SheetTracker().assess(blank)
+        assert assessment.status == FrameStatus.NO_SHEET
+        assert assessment.corners is None
+        assert assessment.guidance == "Enquadre a folha de respostas"
+
+    def test_steady_sheet_becomes_ready(self, page):
+        tracker = SheetTracker(required_stable_frames=3)
+        data = frame(page)
+        statuses = [tracker.assess(data).status for _ in range(5)]
+
+        # Primeiro quadro: sem quadro anterior, o movimento é desconhecido
+        assert statuses == [
+            FrameStatus.MOVING, FrameStatus.HOLD, FrameStatus.HOLD,
+            FrameStatus.READY, FrameStatus.READY
+        ]
+
+    def test_corners_follow_the_sheet(self, page):
+        tracker = SheetTracker()
+        tracker.assess(frame(page))
+        assessment = tracker.assess(frame(page, center=(186, 244)))
+
+        assert assessment.tracked
+        assert assessment.status == FrameStatus.MOVING
+        # Folha de 279x395 no quadro; a detecção fica a poucos pixels da borda
+        expected = np.float32(
+            [[-139.5, -197.3], [139.5, -197.3], [139.5, 197.3], [-139.5, 197.3]]
+        ) + (186, 244)
+        assert np.abs(np.float32(assessment.corners.points) - expected).max() < 8
+
+    def test_movement_resets_stability(self, page):
+        tracker = SheetTracker(required_stable_frames=2)
+        for _ in range(3):
+            tracker.assess(frame(page))
+        assessment = tracker.assess(frame(page, center=(190, 240)))
+        assert assessment.status == FrameStatus.MOVING
+        assert assessment.stable_frames == 0
+
+    @pytest.mark.parametrize("kwargs, status", [
+        (dict(scale=0.2), FrameStatus.TOO_FAR),
+        (dict(scale=0.9), FrameStatus.CUT_OFF),
+        (dict(tilt=0.3), FrameStatus.TILTED),
+        (dict(angle=20), FrameStatus.ROTATED),
+        (dict(blur=3), FrameStatus.BLURRY),
+    ])
+    def test_guidance(self, page, kwargs, status):
+        tracker = SheetTracker()
+        data = frame(page, **kwargs)
+        tracker.assess(data)
+        assert tracker.assess(data).status == status
+
+    def test_reset_forgets_sheet(self, page):
+        tracker = SheetTracker(required_stable_frames=1)
+        data = frame(page)
+        tracker.assess(data)
+        assert tracker.assess(data).ready
+
+        tracker.reset()
+        assessment = tracker.assess(data)
+        assert not assessment.tracked
+        assert assessment.stable_frames == 0
+
+    def test_corners_in_received_frame_pixels(self, page):
+        large = cv2.resize(render_camera_frame(page, (180, 240), 0.45), (720, 960))
+        assessment = SheetTracker().assess(encode_image(large))
+        assert (assessment.frame_width, assessment.frame_height) == (720, 960)
+        assert assessment.corners.points[0] == pytest.approx((2 * 40.5, 2 * 42.7), abs=16)
+
+    def test_frame_latency(self, page):
+        """Quadros acompanhados bem abaixo de 50 ms"""
+        tracker = SheetTracker()
+        frames = [frame(page, center=(180 + i % 3, 240)) for i in range(30)]
+        elapsed = [tracker.assess(data).elapsed_ms for data in frames]
+        assert sorted(elapsed)[len(elapsed) // 2] < 25
+
+    def test_invalid_bytes(self):
+        with pytest.raises(ValueError):
+            SheetTracker().assess(b"not an image")
+
+    def test_large_png_rejected_before_decoding(self, monkeypatch):
+        """PNG não decodifica reduzido: o cabeçalho barra o quadro grande"""
+        data = encode_image(np.full((3200, 2400), 255, np.uint8), ".png")
+        assert len(data) <= MAX_FRAME_BYTES  # Barrado pelos pixels, não pelos bytes
+
+        def no_decode(*args):
+            raise AssertionError("quadro decodificado")
+
+        monkeypatch.setattr(cv2, "imdecode", no_decode)
+        with pytest.raises(ValueError, match="Quadro muito grande"):
+            SheetTracker().assess(data)
+
+    def test_large_jpeg_decoded_reduced(self, page):
+        """O mesmo tamanho em JPEG decodifica a 1/4 e passa"""
+        large = cv2.resize(render_camera_frame(page, (180, 240), 0.45), (2400, 3200))
+        assessment = SheetTracker().assess(encode_image(large))
+        assert (assessment.frame_width, assessment.frame_height) == (2400, 3200)
+
+    def test_too_many_bytes_rejected(self):
+        with pytest.raises(ValueError, match="Quadro muito grande"):
+            SheetTracker().assess(b"\xff" * (MAX_FRAME_BYTES + 1))
@@ -0,0 +1,124 @@
+"""
+Testes da Calibração das Marcações pelo Lote - Infrastructure Layer
+
+Limiares ajustados às densidades de todas as folhas de uma turma.
+"""
+
+import numpy as np
+import pytest
+from app.domain.entities import AnswerTable, MarkQuality, QUALITY_CODES
+from app.domain.value_objects import MarkThresholds
+from app.infrastructure.mark_calibration import (
+    classify_cells, classify_tables, fit_mark_thresholds
+)
+
+CHOICES = ("A", "B", "C", "D", "E")
+
+# Lote típico: células em branco perto de 0, marcações perto de 0.045
+THRESHOLDS = MarkThresholds(threshold=0.02, blank_level=0.0, mark_level=0.045)
+
+
+def class_densities(num_questions=300, seed=0):
+    """Densidades de uma turma: uma marcação por questão, papel com ruído"""
+    rng = np.random.default_rng(seed)
+    densities = np.abs(rng.normal(0.0, 0.002, (num_questions, len(CHOICES))))
+    marked = rng.integers(0, len(CHOICES), num_questions)
+    densities[np.arange(num_questions), marked] = rng.normal(0.045, 0.003, num_questions)
+    return densities, marked
+
+
+def table(densities):
+    densities = np.asarray(densities, dtype=np.float64)
+    size = len(densities)
+    return AnswerTable(
+        question_numbers=np.arange(1, size + 1),
+        choices=CHOICES,
+        choice_index=np.zeros(size),
+        confidence=np.ones(size),
+        quality_codes=np.zeros(size),
+        densities=densities
+    )
+
+
+class TestFitMarkThresholds:
+    """Testes para a divisão das densidades do lote"""
+
+    def test_separates_blank_and_marked_cells(self):
+        densities, _ = class_densities()
+        thresholds = fit_mark_thresholds(densities)
+
+        assert 0.01 < thresholds.threshold < 0.035
+        assert thresholds.blank_level == pytest.approx(0.0016, abs=0.001)
+        assert thresholds.mark_level == pytest.approx(0.045, abs=0.001)
+
+    def test_ignores_missing_choices(self):
+        densities, _ = class_densities()
+        densities[:, -1] = np.nan
+        assert fit_mark_thresholds(densities) is not None
+
+    @pytest.mark.parametrize("densities", [
+        np.zeros((100, 5)),  # Lote em branco
+        np.full((4, 5), 0.045),  # Poucas células
+        np.random.default_rng(0).uniform(0, 0.05, (100, 5)),  # Sem grupos
+    ])
+    def test_no_reliable_split(self, densities):
+        assert fit_mark_thresholds(densities) is None
+
+
+class TestClassifyCells:
+    """Testes para a decisão das questões com os limiares do lote"""
+
+    @pytest.mark.parametrize("densities, choice, quality", [
+        ([0.0, 0.046, 0.0, 0.001, 0.0], 1, MarkQuality.CLEAR),
+        # Ponto de caneta abaixo do limiar: em branco (não "B")
+        ([0.0, 0.013, 0.0, 0.0, 0.0], -1, MarkQuality.BLANK),
+        # Sujeira acima do limiar ao lado da marcação: não é dupla
+        ([0.045, 0.022, 0.0, 0.0, 0.0], 0, MarkQuality.CLEAR),
+        ([0.045, 0.043, 0.0, 0.0, 0.0], 0, MarkQuality.MULTIPLE),
+        # Única célula com tinta, logo acima do limiar
+        ([0.0, 0.0, 0.022, 0.0, 0.0], 2, MarkQuality.LOW_CONFIDENCE),
+        ([0.0, 0.0, 0.0, 0.046, np.nan], 3, MarkQuality.CLEAR),
+    ])
+    def test_decisions(self, densities, choice, quality):
+        choice_index, _, quality_codes = classify_cells(
+            np.array([densities]), THRESHOLDS
+        )
+        assert choice_index[0] == choice
+        assert QUALITY_CODES[quality_codes[0]] == quality
+
+    def test_confidence_is_margin_of_best_cell(self):
+        _, confidence, _ = classify_cells(
+            np.array([[0.0, 0.045, 0.0, 0.0, 0.0], [0.0, 0.0325, 0.0, 0.0, 0.0]]),
+            THRESHOLDS
+        )
+        assert confidence.tolist() == [1.0, 0.5]
+
+
+class TestClassifyTables:
+    """Testes para a reclassificação de um lote de folhas"""
+
+    def test_one_pass_keeps_sheet_order(self):
+        densities, marked = class_densities()
+        tables, thresholds = classify_tables(
+            [table(densities[:100]), table(densities[100:130]), table(densities[130:])]
+        )
+
+        assert thresholds is not None
+        assert [len(t) for t in tables] == [100, 30, 170]
+        assert np.concatenate([t.choice_index for t in tables]).tolist() == marked.tolist()
+        assert tables[1].question_numbers[0] == 1
+
+    def test_unreliable_split_keeps_tables(self):
+        original = [table(np.zeros((30, 5)))]
+        tables, thresholds = classify_tables(original)
+        assert thresholds is None
+        assert tables[0] is original[0]
+
+    def test_different_choices_keep_tables(self):
+        densities, _ = class_densities()
+        other = AnswerTable(
+            np.arange(1, 3), ("A", "B"), np.zeros(2), np.ones(2), np.zeros(2),
+            np.zeros((2, 2))
+        )
+        _, thresholds = classify_tables([table(densities), other])
+        assert thresholds is None
@@ -0,0 +1,252 @@
+"""
+Testes do Motor OMR - Infrastructure Layer
+
+Processa folhas sintéticas com o OpenCVOMREngine.
+"""
+
+import random
+
+import cv2
+import numpy as np
+import pytest
+from app.domain.value_objects import (
+    OMROptions, Quadrilateral, SheetLayout, StudentIdField, RelativeRegion
+)
+from app.infrastructure.cell_map import build_cell_map, grid_boxes
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.synthetic_sheet import render_answer_sheet, encode_image
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+# Folha com bloco de matrícula acima da tabela de respostas
+ID_FIELD = StudentIdField(RelativeRegion(0.1, 0.03, 0.45, 0.22), digits=8)
+ID_ANSWER_AREA = (0.1, 0.3, 0.8, 0.65)
+
+
+def random_answers(num_questions, seed=42, blank_rate=0.1):
+    rng = random.Random(seed)
+    return [
+        None if rng.random() < blank_rate else rng.choice(CHOICES)
+        for _ in range(num_questions)
+    ]
+
+
+class TestCellMap:
+    """Testes para o mapa de células"""
+
+    def test_grid_boxes_skip_number_column(self):
+        boxes = grid_boxes((0, 0, 600, 100), rows=2, cols=5, skip_first_col=True)
+        assert boxes.shape == (2, 5, 4)
+        # Primeira alternativa começa na segunda coluna (100px + padding)
+        assert boxes[0, 0, 2] == 105
+        assert boxes[1, 4, 3] == 595
+
+    def test_build_cell_map_orders_questions(self):
+        blocks = (
+            ((300, 0, 300, 100), 3, 2, True),
+            ((0, 0, 300, 100), 1, 2, True),
+        )
+        cell_map = build_cell_map(blocks, 4)
+        assert cell_map.question_numbers.tolist() == [1, 2, 3, 4]
+        assert cell_map.num_cells == 16
+
+
+class TestOpenCVOMREngine:
+    """Testes de leitura de folhas sintéticas"""
+
+    def test_reads_single_table(self):
+        answers = random_answers(30)
+        image = encode_image(render_answer_sheet(answers, CHOICES))
+
+        result = OpenCVOMREngine().process_image(
+            image, OMROptions(num_questions=30, choices=CHOICES)
+        )
+
+        assert [a.marked_choice for a in result.answers] == answers
+
+    @pytest.mark.parametrize("num_questions,num_columns", [(60, 2), (200, 4)])
+    def test_reads_multi_column_layout(self, num_questions, num_columns):
+        answers = random_answers(num_questions)
+        layout = SheetLayout.columns(num_questions, num_columns)
+        image = encode_image(render_answer_sheet(
+            answers, CHOICES, layout=layout, size=(2000, 2800)
+        ))
+
+        result = OpenCVOMREngine().process_image(
+            image,
+            OMROptions(num_questions=num_questions, choices=CHOICES, layout=layout)
+        )
+
+        assert result.total_questions == num_questions
+        assert [a.question_number for a in result.answers] == list(
+            range(1, num_questions + 1)
+        )
+        assert [a.marked_choice for a in result.answers] == answers
+
+    def test_reads_student_id(self):
+        answers = random_answers(10)
+        image = encode_image(render_answer_sheet(
+            answers, CHOICES, answer_area=ID_ANSWER_AREA,
+            student_id="20231587", student_id_field=ID_FIELD
+        ))
+
+        result = OpenCVOMREngine().process_image(
+            image,
+            OMROptions(num_questions=10, choices=CHOICES, student_id_field=ID_FIELD)
+        )
+
+        assert result.student_id == "20231587"
+        assert result.student_id_confidence > 0.5
+        assert [a.marked_choice for a in result.answers] == answers
+
+    def test_unreadable_student_id_digit(self):
+        answers = random_answers(10)
+        image = encode_image(render_answer_sheet(
+            answers, CHOICES, answer_area=ID_ANSWER_AREA,
+            student_id="2023158?", student_id_field=ID_FIELD
+        ))
+
+        result = OpenCVOMREngine().process_image(
+            image,
+            OMROptions(num_questions=10, choices=CHOICES, student_id_field=ID_FIELD)
+        )
+
+        assert result.student_id == "2023158?"
+        assert result.student_id_confidence == 0.0
+
+
+class TestOrientation:
+    """Folhas fotografadas de lado ou de cabeça para baixo"""
+
+    ROTATIONS = {
+        90: cv2.ROTATE_90_CLOCKWISE,
+        180: cv2.ROTATE_180,
+        270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+    }
+
+    @pytest.mark.parametrize("degrees", [90, 180, 270])
+    def test_reads_rotated_sheet(self, degrees):
+        answers = random_answers(30)
+        page = cv2.rotate(render_answer_sheet(answers, CHOICES), self.ROTATIONS[degrees])
+
+        result = OpenCVOMREngine().process_image(
+            encode_image(page), OMROptions(num_questions=30, choices=CHOICES)
+        )
+
+        assert result.orientation == degrees
+        assert [a.marked_choice for a in result.answers] == answers
+
+    def test_reads_rotated_student_id(self):
+        answers = random_answers(10)
+        page = cv2.rotate(render_answer_sheet(
+            answers, CHOICES, answer_area=ID_ANSWER_AREA,
+            student_id="20231587", student_id_field=ID_FIELD
+        ), cv2.ROTATE_180)
+
+        result = OpenCVOMREngine().process_image(
+            encode_image(page),
+            OMROptions(num_questions=10, choices=CHOICES, student_id_field=ID_FIELD)
+        )
+
+        assert result.orientation == 180
+        assert result.student_id == "20231587"
+        assert [a.marked_choice for a in result.answers] == answers
+
+    def test_auto_orient_disabled(self):
+        answers = random_answers(30)
+        page = cv2.rotate(render_answer_sheet(answers, CHOICES), cv2.ROTATE_180)
+
+        result = OpenCVOMREngine(auto_orient=False).process_image(
+            encode_image(page), OMROptions(num_questions=30, choices=CHOICES)
+        )
+
+        assert result.orientation == 0
+        assert [a.marked_choice for a in result.answers] != answers
+
+
+class TestClassifyBatch:
+    """Limiares ajustados às densidades de um lote de folhas"""
+
+    def test_stray_dots_are_blank(self):
+        """Pontos de caneta em questões em branco não viram respostas"""
+        answers = (CHOICES + [None]) * 5
+        area_x, area_y, cell_w, cell_h = 124, 175, 992 / 6, 1403 / 30
+        engine = OpenCVOMREngine()
+        options = OMROptions(num_questions=30, choices=CHOICES)
+
+        results = []
+        for sheet in range(3):
+            page = render_answer_sheet(answers, CHOICES)
+            for question in range(5, 30, 6):
+                center = (
+                    int(area_x + (sheet + 1.5) * cell_w),
+                    int(area_y + (question + 0.5) * cell_h)
+                )
+                cv2.circle(page, center, 5, (0, 0, 0), -1)
+            results.append(engine.process_image(encode_image(page), options))
+
+        # Cada folha sozinha lê o ponto como marcação
+        assert results[0].answers[5].marked_choice == "A"
+
+        classified, thresholds = engine.classify_batch(results)
+
+        assert thresholds is not None
+        for result in classified:
+            assert [a.marked_choice for a in result.answers] == answers
+
+    def test_unreliable_batch_keeps_results(self):
+        result = OpenCVOMREngine().process_image(
+            encode_image(render_answer_sheet([None] * 10, CHOICES)),
+            OMROptions(num_questions=10, choices=CHOICES)
+        )
+        classified, thresholds = OpenCVOMREngine().classify_batch([result])
+        assert thresholds is None
+        assert classified == [result]
+
+
+def tilted_photo(answers):
+    """Folha fotografada em ângulo e os cantos da tabela na foto"""
+    page = render_answer_sheet(answers, CHOICES)
+    h, w = page.shape[:2]
+    page_corners = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
+    photo_corners = np.float32([[90, 60], [w - 40, 130], [w - 120, h - 30], [20, h - 110]])
+    transform = cv2.getPerspectiveTransform(page_corners, photo_corners)
+    photo = cv2.warpPerspective(page, transform, (w, h), borderValue=(255, 255, 255))
+
+    # Tabela desenhada em ANSWER_AREA (10% a 90% da página)
+    table = np.float32([[124, 175], [1116, 175], [1116, 1578], [124, 1578]])
+    corners = cv2.perspectiveTransform(table[None], transform)[0]
+    return encode_image(photo), Quadrilateral(tuple(map(tuple, corners.tolist())))
+
+
+class TestManualCorners:
+    """Correção de perspectiva pelos cantos informados"""
+
+    def test_reads_tilted_photo_from_corners(self):
+        answers = random_answers(20, blank_rate=0)
+        image, corners = tilted_photo(answers)
+
+        result = OpenCVOMREngine().process_image(image, OMROptions(
+            num_questions=20, choices=CHOICES, template="MANUAL_ROI",
+            corners=corners
+        ))
+
+        assert [a.marked_choice for a in result.answers] == answers
+        assert result.roi == corners.bounding_roi()
+
+    def test_prepared_image_matches_full_read(self):
+        answers = random_answers(20)
+        image = encode_image(render_answer_sheet(answers, CHOICES))
+        engine = OpenCVOMREngine()
+        options = OMROptions(num_questions=20, choices=CHOICES)
+
+        prepared = engine.prepare_image(image)
+        preview, scale = engine.render_preview(prepared, max_side=400)
+
+        assert set(prepared) == {"blurred"}  # A decodificada não é guardada
+        assert (
+            engine.process_prepared(prepared, options).get_answers_dict()
+            == engine.process_image(image, options).get_answers_dict()
+        )
+        assert max(cv2.imdecode(np.frombuffer(preview, np.uint8), 1).shape) == 400
+        assert scale == pytest.approx(400 / 1754)
@@ -0,0 +1,70 @@
+"""
+Testes da Orientação da Folha - Infrastructure Layer
+
+Decisão entre 0, 90, 180 e 270 graus no ROI binário de folhas sintéticas.
+"""
+
+import random
+
+import cv2
+import pytest
+from app.domain.value_objects import OMROptions, SheetLayout
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.orientation import detect_orientation, rotate_upright
+from app.infrastructure.synthetic_sheet import render_answer_sheet, encode_image
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+# Giro da folha (sentido horário) aplicado ao ROI
+ROTATIONS = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+}
+
+
+def upright_roi(num_questions, layout=None, has_number_column=True):
+    """ROI binário de uma folha na posição normal"""
+    rng = random.Random(num_questions)
+    layout = layout or SheetLayout.columns(num_questions, 1, has_number_column)
+    answers = [rng.choice(CHOICES) for _ in range(num_questions)]
+    image = encode_image(render_answer_sheet(answers, CHOICES, layout=layout))
+    ctx = OpenCVOMREngine(auto_orient=False).run_pipeline(
+        image, OMROptions(num_questions=num_questions, choices=CHOICES, layout=layout)
+    )
+    return ctx.roi_img, layout
+
+
+def turned(roi, degrees):
+    return roi if degrees == 0 else cv2.rotate(roi, ROTATIONS[degrees])
+
+
+class TestDetectOrientation:
+    """Testes para a decisão da orientação"""
+
+    @pytest.mark.parametrize("degrees", [0, 90, 180, 270])
+    @pytest.mark.parametrize("num_questions", [5, 30])
+    def test_single_table(self, degrees, num_questions):
+        roi, layout = upright_roi(num_questions)
+        assert detect_orientation(turned(roi, degrees), layout, len(CHOICES)) == degrees
+
+    @pytest.mark.parametrize("degrees", [0, 90, 180, 270])
+    def test_multi_column_layout(self, degrees):
+        engine = OpenCVOMREngine()
+        roi, layout = upright_roi(120, SheetLayout.columns(120, 4))
+        orientation = detect_orientation(
+            turned(roi, degrees), layout, len(CHOICES),
+            register=engine._register_blocks
+        )
+        assert orientation == degrees
+
+    def test_without_number_column_keeps_direction(self):
+        """Sem coluna de números, só o eixo é decidido"""
+        roi, layout = upright_roi(30, has_number_column=False)
+        assert detect_orientation(turned(roi, 180), layout, len(CHOICES)) == 0
+        assert detect_orientation(turned(roi, 270), layout, len(CHOICES)) == 90
+
+    def test_rotate_upright_undoes_rotation(self):
+        roi, _ = upright_roi(10)
+        for degrees in ROTATIONS:
+            assert (rotate_upright(turned(roi, degrees), degrees) == roi).all()
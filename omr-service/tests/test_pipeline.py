@@ -0,0 +1,187 @@
+"""
+Testes do Pipeline de Estágios - Infrastructure Layer
+
+Validação da ordem dos estágios, variações por template e retomada
+a partir do checkpoint.
+"""
+
+import random
+
+import pytest
+from app.domain.value_objects import (
+    OMROptions, RelativeRegion, SheetLayout, StudentIdField
+)
+from app.infrastructure.omr_engine import OpenCVOMREngine, AnalyzeCellsStage
+from app.infrastructure.pipeline import Pipeline, Stage
+from app.infrastructure.stage_cache import StageCache
+from app.infrastructure.synthetic_sheet import render_answer_sheet, encode_image
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+
+def make_stage(name, requires=(), provides=()):
+    stage = Stage()
+    stage.name, stage.requires, stage.provides = name, requires, provides
+    stage.run = lambda ctx: None
+    return stage
+
+
+@pytest.fixture(scope="module")
+def sheet():
+    rng = random.Random(3)
+    answers = [rng.choice(CHOICES) for _ in range(20)]
+    return answers, encode_image(render_answer_sheet(answers))
+
+
+class TestPipelineValidation:
+    """Testes para a validação na montagem"""
+
+    def test_missing_dependency(self):
+        with pytest.raises(ValueError, match="no_grid"):
+            Pipeline([make_stage("analyze", requires=("no_grid",))])
+
+    def test_unknown_field(self):
+        with pytest.raises(ValueError, match="inexistentes"):
+            Pipeline([make_stage("x", provides=("gridless",))])
+
+    def test_duplicate_name(self):
+        with pytest.raises(ValueError):
+            Pipeline([make_stage("x"), make_stage("x")])
+
+    def test_unknown_checkpoint(self):
+        with pytest.raises(ValueError):
+            Pipeline([make_stage("x")], checkpoint="y")
+
+    def test_removing_required_stage_fails(self):
+        with pytest.raises(ValueError, match="no_grid"):
+            OpenCVOMREngine().default_pipeline().without("remove_grid")
+
+
+class TestEnginePipeline:
+    """Execução do pipeline pelo motor"""
+
+    def test_profiles_each_stage(self, sheet):
+        answers, image = sheet
+        engine = OpenCVOMREngine()
+
+        ctx = engine.run_pipeline(image, OMROptions(num_questions=20, choices=CHOICES))
+
+        assert list(ctx.timings) == [
+            "decode", "preprocess", "detect_roi", "binarize_roi", "warp",
+            "register_blocks", "remove_grid", "orient", "analyze_cells"
+        ]
+        assert [a.marked_choice for a in ctx.answers] == answers
+
+    def test_pipeline_without_grid_removal(self, sheet):
+        answers, image = sheet
+        engine = OpenCVOMREngine()
+        engine.pipelines["AUTO"] = engine.default_pipeline().replacing(
+            "analyze_cells", AnalyzeCellsStage(engine, source="roi_img")
+        ).without("remove_grid")
+
+        ctx = engine.run_pipeline(image, OMROptions(num_questions=20, choices=CHOICES))
+
+        assert "remove_grid" not in ctx.timings
+        assert ctx.no_grid is None
+        assert [a.marked_choice for a in ctx.answers] == answers
+
+    def test_checkpoint_resumes_after_grid_removal(self, sheet):
+        answers, image = sheet
+        engine = OpenCVOMREngine()
+        cache = {}
+        engine.pipelines["AUTO"] = Pipeline(
+            engine.default_pipeline().stages, cache=cache, checkpoint="remove_grid"
+        )
+
+        first = engine.run_pipeline(image, OMROptions(num_questions=20, choices=CHOICES))
+        retry = engine.run_pipeline(image, OMROptions(num_questions=20, choices=CHOICES))
+
+        assert len(cache) == 1
+        assert "cache" not in first.timings
+        assert list(retry.timings) == ["cache", "orient", "analyze_cells"]
+        assert [a.marked_choice for a in retry.answers] == answers
+
+    def test_checkpoint_key_includes_layout(self, sheet):
+        _, image = sheet
+        engine = OpenCVOMREngine()
+        cache = {}
+        engine.pipelines["AUTO"] = Pipeline(
+            engine.default_pipeline().stages, cache=cache, checkpoint="remove_grid"
+        )
+
+        engine.run_pipeline(image, OMROptions(num_questions=20, choices=CHOICES))
+        engine.run_pipeline(image, OMROptions(
+            num_questions=20, choices=CHOICES, layout=SheetLayout.columns(20, 2)
+        ))
+
+        assert len(cache) == 2
+
+    def test_checkpoint_keeps_frames_only_when_read_later(self, sheet):
+        _, image = sheet
+        engine = OpenCVOMREngine()
+        cache = {}
+        engine.pipelines["AUTO"] = Pipeline(
+            engine.default_pipeline().stages, cache=cache, checkpoint="remove_grid"
+        )
+        id_field = StudentIdField(RelativeRegion(0.1, 0.03, 0.45, 0.22), digits=8)
+
+        engine.run_pipeline(image, OMROptions(num_questions=20, choices=CHOICES))
+        engine.run_pipeline(image, OMROptions(
+            num_questions=20, choices=CHOICES, student_id_field=id_field
+        ))
+
+        plain, with_id = cache.values()
+        assert "image" not in plain and "blurred" not in plain
+        # A matrícula é lida na foto inteira: estado próprio, com a suavizada
+        assert "blurred" in with_id and "image" not in with_id
+
+    def test_reanalysis_with_other_cell_options(self, sheet):
+        answers, image = sheet
+        engine = OpenCVOMREngine(stage_cache=StageCache())
+
+        # Primeira tentativa com alternativas e questões erradas
+        engine.run_pipeline(image, OMROptions(num_questions=15, choices=CHOICES[:4]))
+        retry = engine.run_pipeline(image, OMROptions(num_questions=20, choices=CHOICES))
+
+        assert len(engine.stage_cache) == 1
+        assert list(retry.timings) == ["cache", "orient", "analyze_cells"]
+        assert [a.marked_choice for a in retry.answers] == answers
+
+    def test_prepare_and_resume(self, sheet):
+        answers, image = sheet
+        engine = OpenCVOMREngine()
+        pipeline = engine.pipelines["AUTO"]
+
+        state = pipeline.prepare(image, "preprocess")
+        ctx = pipeline.resume(state, OMROptions(num_questions=20, choices=CHOICES), "preprocess")
+
+        assert not state["blurred"].flags.writeable
+        assert list(ctx.timings)[0] == "detect_roi"
+        assert [a.marked_choice for a in ctx.answers] == answers
+
+    def test_repeated_read_returns_cached_result_copy(self, sheet):
+        answers, image = sheet
+        engine = OpenCVOMREngine(stage_cache=StageCache(), result_cache=StageCache())
+        options = OMROptions(num_questions=20, choices=CHOICES)
+
+        assert engine.cached_result(image, options) is None
+        first = engine.process_image(image, options)
+        first.student_id = "alterado"
+        assert engine.cached_result(image, options).student_id is None
+        # Os resultados não ocupam entradas dos checkpoints e contam os bytes
+        assert len(engine.stage_cache) == len(engine.result_cache) == 1
+        assert engine.result_cache.size_bytes > 0
+        engine.run_pipeline = None  # O resultado repetido não roda o pipeline
+        again = engine.process_image(image, options)
+
+        assert again.student_id is None
+        assert [a.marked_choice for a in again.answers] == answers
+
+    def test_cached_arrays_are_read_only(self, sheet):
+        _, image = sheet
+        engine = OpenCVOMREngine(stage_cache=StageCache())
+
+        engine.run_pipeline(image, OMROptions(num_questions=20, choices=CHOICES))
+        retry = engine.run_pipeline(image, OMROptions(num_questions=20, choices=CHOICES))
+
+        assert not retry.no_grid.flags.writeable
@@ -0,0 +1,56 @@
+"""
+Testes da Verificação Rápida de Qualidade - Infrastructure Layer
+"""
+
+import cv2
+import numpy as np
+import pytest
+from app.infrastructure.quality_gate import ImageQualityGate
+from app.infrastructure.synthetic_sheet import render_answer_sheet, encode_image
+
+
+@pytest.fixture(scope="module")
+def sheet():
+    return render_answer_sheet(["A", "B", "C", "D", "E"] * 4)
+
+
+class TestImageQualityGate:
+    """Testes para o ImageQualityGate"""
+
+    def test_accepts_clean_sheet(self, sheet):
+        quality = ImageQualityGate().assess(encode_image(sheet))
+        assert quality.is_acceptable
+        assert quality.grid > 0.05
+
+    def test_rejects_blurred_photo(self, sheet):
+        blurred = cv2.GaussianBlur(sheet, (0, 0), 9)
+        quality = ImageQualityGate().assess(encode_image(blurred))
+        assert quality.rejection_reason == "imagem desfocada"
+
+    def test_rejects_blank_photo(self, sheet):
+        blank = np.full_like(sheet, 230)
+        quality = ImageQualityGate().assess(encode_image(blank))
+        assert not quality.is_acceptable
+
+    def test_rejects_glare(self, sheet):
+        photo = (sheet.astype(np.float32) * 0.8 + 20).astype(np.uint8)
+        cv2.circle(photo, (600, 800), 300, (255, 255, 255), -1)
+        quality = ImageQualityGate().assess(encode_image(photo))
+        assert quality.rejection_reason == "reflexo sobre a folha"
+
+    def test_rejects_cropped_grid(self, sheet):
+        cropped = cv2.resize(sheet[:300], (1240, 900))
+        quality = ImageQualityGate().assess(encode_image(cropped))
+        assert quality.rejection_reason == "gabarito cortado na foto"
+
+    def test_invalid_bytes(self):
+        with pytest.raises(ValueError):
+            ImageQualityGate().assess(b"not an image")
+
+    def test_repeated_image_reuses_assessment(self, sheet):
+        gate = ImageQualityGate()
+        data = encode_image(sheet)
+        first = gate.assess(data)
+
+        # Mesmos bytes em outro objeto (outra requisição)
+        assert gate.assess(bytes(bytearray(data))) is first
@@ -0,0 +1,150 @@
+"""
+Testes do Histórico de Correções - Infrastructure Layer
+
+Registro das correções em SQLite e estatísticas agregadas da turma.
+"""
+
+import sqlite3
+
+import pytest
+from app.application.use_cases import CorrectExamUseCase
+from app.domain.entities import (
+    Answer, AnswerKey, MarkQuality, OMRResult, Question, QuestionOutcome
+)
+from app.domain.item_analysis import ResponseMatrix
+from app.infrastructure.result_store import SqliteResultRepository
+
+KEY = AnswerKey(
+    "prova-1", "Prova 1",
+    [Question(1, "A", 1), Question(2, "B", 1), Question(3, "C", 2)],
+    60
+)
+
+QUALITY = {
+    "*": MarkQuality.MULTIPLE, "?": MarkQuality.LOW_CONFIDENCE,
+    ".": MarkQuality.BLANK
+}
+
+
+def correct(marks, student_id):
+    """Corrige respostas como 'AB.' (. em branco, *X dupla, ?X baixa confiança)"""
+    answers, number = [], 1
+    i = 0
+    while i < len(marks):
+        flag = marks[i] if marks[i] in QUALITY else None
+        if flag == ".":
+            answers.append(Answer(number, None, 0.0, MarkQuality.BLANK, {}))
+            i += 1
+        elif flag:
+            answers.append(Answer(number, marks[i + 1], 0.1, QUALITY[flag], {}))
+            i += 2
+        else:
+            answers.append(Answer(number, marks[i], 0.9, MarkQuality.CLEAR, {}))
+            i += 1
+        number += 1
+    result = OMRResult(answers, len(answers), student_id=student_id)
+    return CorrectExamUseCase(read_answers_use_case=None).grade(result, KEY)
+
+
+@pytest.fixture
+def repository(tmp_path):
+    return SqliteResultRepository(str(tmp_path / "omr.sqlite3"))
+
+
+class TestQuestionOutcomes:
+    """Resultado por questão derivado da correção"""
+
+    def test_outcomes_follow_grading_rules(self):
+        outcomes = correct("?A*B.", "1").question_outcomes(KEY)
+
+        assert outcomes == [
+            (1, "A", QuestionOutcome.CORRECT),
+            (2, "B", QuestionOutcome.VOID),
+            (3, None, QuestionOutcome.BLANK),
+        ]
+
+
+class TestSqliteResultRepository:
+    """Testes para o registro e as consultas agregadas"""
+
+    @pytest.fixture
+    def filled(self, repository):
+        repository.save_many([
+            (correct("ABC", "1"), KEY),   # 100%
+            (correct("ABD", "2"), KEY),   # 50%
+            (correct("BB.", "3"), KEY),   # 25%
+            (correct("C*BC", "3"), KEY),  # 50% (mesmo aluno, segunda prova)
+        ])
+        return repository
+
+    def test_save_returns_ids(self, repository):
+        assert repository.save(correct("ABC", "1"), KEY) == 1
+        assert repository.save_many([(correct("ABC", "2"), KEY)] * 2) == [2, 3]
+
+    def test_class_summary(self, filled):
+        summary = filled.class_summary("prova-1")
+
+        assert summary.exam_count == 4
+        assert summary.student_count == 3
+        assert summary.average_percentage == 56.25
+        assert summary.pass_rate == 0.25
+        assert (summary.min_percentage, summary.max_percentage) == (25.0, 100.0)
+
+    def test_empty_summary(self, repository):
+        summary = repository.class_summary("outra")
+
+        assert summary.exam_count == 0
+        assert summary.average_percentage is None
+
+    def test_question_statistics(self, filled):
+        first, second, third = filled.question_statistics("prova-1")
+
+        assert (first.correct, first.wrong, first.total) == (2, 2, 4)
+        assert first.difficulty == 0.5
+        assert (second.correct, second.void) == (3, 1)
+        assert (third.correct_answer, third.correct, third.wrong, third.blank) == \
+            ("C", 2, 1, 1)
+
+    def test_distractor_analysis(self, filled):
+        first = filled.distractor_analysis("prova-1")[0]
+
+        assert first.correct_answer == "A"
+        assert [(c.choice, c.count, c.rate) for c in first.choices] == [
+            ("A", 2, 0.5), ("B", 1, 0.25), ("C", 1, 0.25)
+        ]
+        # Quem acertou a questão 1 teve média 75%; quem marcou B, 25%
+        assert [c.average_percentage for c in first.choices] == [75.0, 25.0, 50.0]
+
+    def test_response_matrix_matches_corrections(self, repository):
+        corrections = [
+            correct("ABC", "1"), correct("?A*B.", "2"), correct("C.D", "3")
+        ]
+        repository.save_many([(c, KEY) for c in corrections])
+
+        stored = repository.response_matrix("prova-1")
+        expected = ResponseMatrix.from_corrections(corrections, KEY)
+
+        assert stored.choices == expected.choices
+        assert stored.question_numbers.tolist() == [1, 2, 3]
+        assert stored.correct_index.tolist() == expected.correct_index.tolist()
+        assert stored.marks.tolist() == expected.marks.tolist()
+
+    def test_empty_response_matrix(self, repository):
+        assert repository.response_matrix("outra").students == 0
+
+    def test_adds_columns_to_existing_database(self, tmp_path):
+        path = tmp_path / "omr.sqlite3"
+        with sqlite3.connect(path) as conn:
+            conn.execute(
+                "CREATE TABLE corrections (id INTEGER PRIMARY KEY, "
+                "answer_key_id TEXT NOT NULL, student_id TEXT, exam_version TEXT, "
+                "correct_count INTEGER NOT NULL, score REAL NOT NULL, "
+                "percentage REAL NOT NULL, passed INTEGER NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+        conn.close()
+
+        repository = SqliteResultRepository(str(path))
+        repository.save(correct("ABC", "1"), KEY)
+
+        assert repository.response_matrix("prova-1").students == 1
@@ -0,0 +1,91 @@
+"""
+Testes dos Buffers de Trabalho - Infrastructure Layer
+
+Reuso por thread e isolamento dos resultados do pipeline.
+"""
+
+import threading
+
+import numpy as np
+from app.domain.value_objects import OMROptions
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.scratch import ScratchBuffers
+from app.infrastructure.stage_cache import StageCache
+from app.infrastructure.synthetic_sheet import render_answer_sheet, encode_image
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+
+class TestScratchBuffers:
+    """Testes para o reuso e os limites dos buffers"""
+
+    def test_same_name_reuses_memory(self):
+        scratch = ScratchBuffers()
+        first = scratch.get("gray", (100, 200))
+        second = scratch.get("gray", (50, 80))
+
+        assert np.shares_memory(first, second)
+        assert second.shape == (50, 80)
+        assert second.flags.c_contiguous
+        assert scratch.size_bytes == 100 * 200
+
+    def test_grows_to_larger_request(self):
+        scratch = ScratchBuffers()
+        scratch.get("integral", (10, 10), np.int32)
+        larger = scratch.get("integral", (20, 20), np.int32)
+
+        assert larger.dtype == np.int32
+        assert scratch.size_bytes == 20 * 20 * 4
+
+    def test_over_limit_is_not_retained(self):
+        scratch = ScratchBuffers(max_bytes=1000)
+        scratch.get("a", (10, 50))
+        big = scratch.get("b", (10, 60))
+
+        assert not np.shares_memory(big, scratch.get("b", (10, 60)))
+        assert scratch.size_bytes == 500
+
+    def test_buffers_are_per_thread(self):
+        scratch = ScratchBuffers()
+        mine = scratch.get("gray", (10, 10))
+        other = []
+        thread = threading.Thread(target=lambda: other.append(scratch.get("gray", (10, 10))))
+        thread.start()
+        thread.join()
+
+        assert not np.shares_memory(mine, other[0])
+
+
+class TestEngineScratch:
+    """O reuso não altera resultados nem vaza para o contexto"""
+
+    def test_results_match_without_reuse(self):
+        sheets = [
+            (answers, encode_image(render_answer_sheet(answers, size=size)))
+            for answers, size in [
+                (["A", "B", None, "D", "E"] * 4, (1240, 1754)),
+                (["E", "D", "C", "B", "A"] * 4, (900, 1270)),
+            ]
+        ]
+        reused = OpenCVOMREngine()
+        fresh = OpenCVOMREngine(scratch=ScratchBuffers(max_bytes=0))
+        options = OMROptions(num_questions=20, choices=CHOICES)
+
+        for answers, image in sheets * 2:
+            a = reused.process_image(image, options).answers
+            b = fresh.process_image(image, options).answers
+            assert [x.marked_choice for x in a] == answers
+            assert np.array_equal(a.densities, b.densities)
+
+    def test_cached_state_is_not_overwritten(self):
+        engine = OpenCVOMREngine(stage_cache=StageCache())
+        options = OMROptions(num_questions=20, choices=CHOICES)
+        first = engine.run_pipeline(
+            encode_image(render_answer_sheet(["A"] * 20)), options
+        )
+        saved = first.no_grid.copy()
+
+        engine.run_pipeline(encode_image(render_answer_sheet(["E"] * 20)), options)
+
+        assert np.array_equal(first.no_grid, saved)
+        assert engine.scratch.size_bytes > 0
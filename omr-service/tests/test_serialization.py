@@ -0,0 +1,69 @@
+"""
+Testes da Serialização - Presentation Layer
+
+Payloads montados direto do domínio e negociação do formato.
+"""
+
+import json
+
+import pytest
+from app.domain.entities import Answer, MarkQuality, OMRResult
+from app.domain.value_objects import ImageQuality
+from app.presentation import serialization
+from app.presentation.dtos import OMRResultDto
+from app.presentation.serialization import (
+    encode_json, encoded_response, omr_result_payload, wants_msgpack
+)
+
+
+def sample_result():
+    return OMRResult(
+        answers=[
+            Answer(1, "B", 0.8, MarkQuality.CLEAR, {"A": 0.01, "B": 0.3}),
+            Answer(2, None, 0.0, MarkQuality.BLANK, {"A": 0.0, "B": 0.0}),
+        ],
+        total_questions=2,
+        student_id="2023",
+        student_id_confidence=0.9,
+        quality=ImageQuality(
+            sharpness=800.0, brightness=0.8, contrast=0.6,
+            glare=0.0, grid=0.1, border=0.0
+        )
+    )
+
+
+class TestPayload:
+    """Testes para o payload direto do domínio"""
+
+    def test_matches_dto_dump(self):
+        payload = omr_result_payload(sample_result())
+        assert OMRResultDto(**payload).model_dump() == payload
+        assert list(payload) == list(OMRResultDto.model_fields)
+
+    def test_encode_json(self):
+        payload = omr_result_payload(sample_result())
+        assert json.loads(encode_json(payload)) == payload
+
+
+class TestNegotiation:
+    """Testes para a escolha do formato via header Accept"""
+
+    @pytest.mark.parametrize("accept,expected", [
+        (None, False),
+        ("application/json", False),
+        ("*/*", False),
+        ("application/msgpack", True),
+        ("application/x-msgpack", True),
+        ("application/msgpack, application/json;q=0.5", True),
+        ("application/json, application/msgpack;q=0.5", False),
+        ("application/msgpack;q=0", False),
+    ])
+    def test_wants_msgpack(self, accept, expected):
+        pytest.importorskip("msgpack")
+        assert wants_msgpack(accept) is expected
+
+    def test_json_when_msgpack_missing(self, monkeypatch):
+        monkeypatch.setattr(serialization, "msgpack", None)
+        response = encoded_response({"a": 1}, "application/msgpack")
+        assert response.media_type == "application/json"
+        assert response.body == b'{"a":1}'
@@ -0,0 +1,161 @@
+"""
+Testes do Cache Compartilhado entre Workers - Infrastructure Layer
+"""
+
+import errno
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+import pytest
+from app.domain.value_objects import OMROptions, ROI
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.shared_cache import SharedStageCache
+from app.infrastructure.synthetic_sheet import render_answer_sheet, encode_image
+
+CHOICES = ["A", "B", "C", "D", "E"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def snapshot(size, fill=0):
+    return {"no_grid": np.full(size, fill, np.uint8), "roi": ROI(1, 2, 3, 4)}
+
+
+def store_in_other_process(directory):
+    SharedStageCache(directory)["outro"] = snapshot(10, fill=7)
+
+
+class TestSharedStageCache:
+    """Testes para o armazenamento em arquivos mapeados"""
+
+    def test_round_trip_is_read_only_map(self, tmp_path):
+        cache = SharedStageCache(tmp_path)
+        cache["a"] = snapshot(100, fill=3)
+
+        entry = cache["a"]
+        assert entry["roi"] == ROI(1, 2, 3, 4)
+        assert np.array_equal(entry["no_grid"], np.full(100, 3, np.uint8))
+        assert not entry["no_grid"].flags.writeable
+        assert cache.size_bytes == 100
+
+    def test_entries_visible_to_other_workers(self, tmp_path):
+        process = mp.get_context("spawn").Process(
+            target=store_in_other_process, args=(tmp_path,)
+        )
+        process.start()
+        process.join(timeout=60)
+
+        assert SharedStageCache(tmp_path)["outro"]["no_grid"][0] == 7
+
+    def test_entry_expires_after_ttl(self, tmp_path):
+        clock = FakeClock()
+        cache = SharedStageCache(tmp_path, ttl_seconds=10, clock=clock)
+        cache["a"] = snapshot(100)
+
+        clock.now += 10
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert list(tmp_path.glob("*.npy")) == []
+
+    def test_evicts_least_recently_used_over_byte_budget(self, tmp_path):
+        clock = FakeClock()
+        cache = SharedStageCache(tmp_path, max_bytes=250, clock=clock)
+        cache["a"] = snapshot(100)
+        clock.now += 1
+        cache["b"] = snapshot(100)
+        clock.now += 1
+        cache.get("a")  # "a" passa a ser a mais recente
+        clock.now += 1
+        cache["c"] = snapshot(100)
+
+        assert sorted(cache) == ["a", "c"]
+        assert cache.size_bytes == 200
+        assert len(list(tmp_path.glob("*.npy"))) == 2
+
+    def test_replacing_and_deleting_remove_files(self, tmp_path):
+        cache = SharedStageCache(tmp_path)
+        cache["a"] = snapshot(100)
+        cache["a"] = snapshot(50)
+        assert cache.size_bytes == 50
+
+        del cache["a"]
+        assert list(tmp_path.glob("*.npy")) == []
+        with pytest.raises(KeyError):
+            del cache["a"]
+
+    def test_refuses_directory_others_can_change(self, tmp_path):
+        shared = tmp_path / "aberto"
+        shared.mkdir(mode=0o755)
+        shared.chmod(0o755)
+        with pytest.raises(PermissionError):
+            SharedStageCache(shared)
+
+        # Diretório próprio sob um diretório que qualquer um altera
+        public = tmp_path / "publico"
+        public.mkdir()
+        public.chmod(0o777)
+        with pytest.raises(PermissionError):
+            SharedStageCache(public / "cache")
+
+    def test_full_directory_is_a_cache_miss(self, tmp_path, monkeypatch):
+        cache = SharedStageCache(tmp_path)
+        save = np.save
+        calls = []
+
+        def save_until_full(file, value, **kwargs):
+            calls.append(value)
+            if len(calls) == 2:
+                raise OSError(errno.ENOSPC, "No space left on device")
+            save(file, value, **kwargs)
+
+        monkeypatch.setattr(np, "save", save_until_full)
+        cache["a"] = {"no_grid": np.zeros(10, np.uint8), "roi_img": np.ones(10, np.uint8)}
+
+        assert cache.get("a") is None
+        assert list(tmp_path.glob("*.npy")) == list(tmp_path.glob("*.tmp")) == []
+
+    def test_orphaned_files_removed_on_open(self, tmp_path):
+        cache = SharedStageCache(tmp_path)
+        cache["a"] = snapshot(100)
+        old, fresh = tmp_path / "morto.no_grid.npy", tmp_path / "novo.no_grid.npy"
+        old.write_bytes(b"x")
+        fresh.write_bytes(b"x")  # Pode ser de outro worker escrevendo agora
+        stale = time.time() - 3600
+        os.utime(old, (stale, stale))
+
+        reopened = SharedStageCache(tmp_path)
+
+        assert not old.exists() and fresh.exists()
+        assert reopened["a"]["no_grid"].size == 100
+
+
+class TestEngineSharedCache:
+    """Leituras repetidas acertam o cache em qualquer worker"""
+
+    def test_result_and_checkpoint_shared_between_engines(self, tmp_path):
+        answers = ["A", "B", "C", "D", "E"] * 4
+        image = encode_image(render_answer_sheet(answers))
+        options = OMROptions(num_questions=20, choices=CHOICES)
+        def engine():
+            return OpenCVOMREngine(
+                stage_cache=SharedStageCache(tmp_path / "stages"),
+                result_cache=SharedStageCache(tmp_path / "results")
+            )
+
+        engine().process_image(image, options)
+
+        other = engine()
+        retry = other.run_pipeline(image, OMROptions(num_questions=15, choices=CHOICES))
+        other.run_pipeline = None  # O resultado repetido não roda o pipeline
+        result = other.process_image(image, options)
+
+        assert list(retry.timings) == ["cache", "orient", "analyze_cells"]
+        assert [a.marked_choice for a in result.answers] == answers
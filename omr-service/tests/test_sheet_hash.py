@@ -0,0 +1,195 @@
+"""
+Testes do Hash Perceptual das Folhas - Infrastructure Layer
+
+Duplicatas de folhas sintéticas fotografadas de novo dentro de um lote.
+"""
+
+import random
+from dataclasses import replace
+
+import cv2
+import numpy as np
+import pytest
+from app.domain.exceptions import DuplicateSheetError
+from app.domain.value_objects import OMROptions, RelativeRegion, StudentIdField
+from app.infrastructure.omr_engine import HASH_STAGE, OpenCVOMREngine, RemoveGridStage
+from app.infrastructure.sheet_hash import SheetHashIndex
+from app.infrastructure.synthetic_sheet import (
+    encode_image, render_answer_sheet, render_camera_frame
+)
+
+CHOICES = ["A", "B", "C", "D", "E"]
+ANSWERS = [random.Random(7).choice(CHOICES) for _ in range(30)]
+OPTIONS = OMROptions(num_questions=30, choices=CHOICES)
+
+# Giro da foto no sentido horário (a folha aparece deitada)
+ROTATIONS = {90: cv2.ROTATE_90_CLOCKWISE, 180: cv2.ROTATE_180}
+
+ID_FIELD = StudentIdField(RelativeRegion(0.1, 0.03, 0.45, 0.22), digits=4)
+ID_OPTIONS = OMROptions(num_questions=30, choices=CHOICES, student_id_field=ID_FIELD)
+
+
+def photo(answers, shot=0, name="Maria Silva", orientation=0, student_id=None,
+          framed=True):
+    """
+    Foto da folha: enquadramento, brilho e ruído mudam a cada tomada
+    (framed=False: digitalizada de novo, só brilho e ruído)
+    """
+    if student_id is None:
+        page = render_answer_sheet(answers, CHOICES)
+        top = 140  # Tabela a partir de 10% da página
+    else:
+        page = render_answer_sheet(
+            answers, CHOICES, answer_area=(0.1, 0.3, 0.8, 0.65),
+            student_id=student_id, student_id_field=ID_FIELD
+        )
+        top = 500
+    # Cabeçalho escrito à mão logo acima da tabela
+    cv2.putText(page, "Nome:", (130, top), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 0), 2)
+    cv2.putText(
+        page, name, (240, top), cv2.FONT_HERSHEY_SCRIPT_SIMPLEX, 1.3, (40, 40, 120), 2
+    )
+    rng = np.random.default_rng(shot)
+    if shot and framed:
+        h, w = page.shape[:2]
+        page = render_camera_frame(
+            page, (w * 0.55 + rng.uniform(-20, 20), h * 0.55),
+            scale=rng.uniform(0.85, 1.0), size=(int(w * 1.1), int(h * 1.1)),
+            background=(200, 200, 200)
+        )
+    if orientation:
+        page = cv2.rotate(page, ROTATIONS[orientation])
+    noisy = page + rng.normal(0, 6, page.shape) + rng.uniform(-20, 10)
+    return encode_image(np.clip(noisy, 0, 255).astype(np.uint8))
+
+
+def hash_of(image, num_questions=30):
+    options = OMROptions(num_questions=num_questions, choices=CHOICES)
+    engine = OpenCVOMREngine()
+    state = engine.pipelines["AUTO"].prepare(image, HASH_STAGE, options)
+    return engine.hash_sheet(state, options)
+
+
+@pytest.fixture(scope="module")
+def index():
+    index = SheetHashIndex()
+    index.add(hash_of(photo(ANSWERS)), "original.jpg")
+    return index
+
+
+class TestSheetHashIndex:
+    """Testes para a busca de folhas quase idênticas"""
+
+    @pytest.mark.parametrize("shot", [1, 2, 3])
+    def test_finds_same_sheet_photographed_again(self, index, shot):
+        assert index.find(hash_of(photo(ANSWERS, shot))) == "original.jpg"
+
+    @pytest.mark.parametrize("orientation", [90, 180])
+    def test_finds_same_sheet_in_other_orientation(self, index, orientation):
+        rotated = photo(ANSWERS, 1, orientation=orientation)
+        assert index.find(hash_of(rotated)) == "original.jpg"
+
+    def test_one_different_answer_is_another_sheet(self, index):
+        changed = list(ANSWERS)
+        changed[4] = "A" if changed[4] != "A" else "B"
+        assert index.find(hash_of(photo(changed, 1))) is None
+
+    def test_one_blank_answer_is_another_sheet(self, index):
+        blank = list(ANSWERS)
+        blank[12] = None
+        assert index.find(hash_of(photo(blank, 1))) is None
+
+    @pytest.mark.parametrize("name", ["Bruno Lima", "Ana Souza", ""])
+    def test_header_distinguishes_equal_answers(self, index, name):
+        assert index.find(hash_of(photo(ANSWERS, 1, name=name))) is None
+
+    def test_identity_distinguishes_equal_answers(self):
+        index = SheetHashIndex()
+        sheet = hash_of(photo(ANSWERS))
+        index.add(replace(sheet, identity=("123", "A")), "1.jpg")
+        again = hash_of(photo(ANSWERS, 1))
+        assert index.find(replace(again, identity=("456", "A"))) is None
+        assert index.find(replace(again, identity=("123", "A"))) == "1.jpg"
+
+    def test_header_outside_photo_falls_back_to_cells(self):
+        index = SheetHashIndex()
+        sheet = hash_of(photo(ANSWERS))
+        index.add(replace(sheet, header=None), "1.jpg")
+        other = hash_of(photo(ANSWERS, 1, name="Bruno Lima"))
+        assert index.find(other) == "1.jpg"
+
+    def test_other_question_count_is_ignored(self, index):
+        short = hash_of(photo(ANSWERS[:20]), num_questions=20)
+        assert index.find(short) is None
+        index.add(short, "curta.jpg")
+        assert len(index) == 1
+
+    def test_release_and_clear(self):
+        index = SheetHashIndex()
+        sheet = hash_of(photo(ANSWERS))
+        index.add(sheet, "1.jpg")
+        index.release("1.jpg")
+        assert len(index) == 0
+        assert index.claim(sheet, "2.jpg") is None
+        index.clear()
+        assert len(index) == 0
+        assert index.find(sheet) is None
+
+
+class TestProcessUnique:
+    """Leitura do lote com as cópias puladas ou apontadas"""
+
+    def test_copy_with_student_id_skips_grid_removal(self, monkeypatch):
+        engine = OpenCVOMREngine()
+        index = SheetHashIndex()
+
+        result = engine.process_unique(
+            photo(ANSWERS, student_id="1234"), ID_OPTIONS, index, "1.jpg"
+        )
+        assert [a.marked_choice for a in result.answers] == ANSWERS
+        assert result.student_id == "1234"
+
+        # Remoção da grade da tabela (a matrícula tem a sua, antes do hash)
+        calls = []
+        run = RemoveGridStage.run
+        monkeypatch.setattr(
+            RemoveGridStage, "run", lambda stage, ctx: calls.append(ctx) or run(stage, ctx)
+        )
+        with pytest.raises(DuplicateSheetError) as error:
+            engine.process_unique(
+                photo(ANSWERS, 2, student_id="1234", framed=False),
+                ID_OPTIONS, index, "2.jpg"
+            )
+
+        assert error.value.original == "1.jpg"
+        assert calls == []
+        assert len(index) == 1
+
+    def test_copy_without_student_id_is_read_and_flagged(self):
+        engine = OpenCVOMREngine()
+        index = SheetHashIndex()
+
+        first = engine.process_unique(photo(ANSWERS), OPTIONS, index, "1.jpg")
+        again = engine.process_unique(photo(ANSWERS, 2), OPTIONS, index, "2.jpg")
+
+        assert first.duplicate_of is None
+        assert again.duplicate_of == "1.jpg"
+        assert [a.marked_choice for a in again.answers] == ANSWERS
+        assert len(index) == 1
+
+    def test_failed_read_leaves_the_index(self, monkeypatch):
+        engine = OpenCVOMREngine()
+        index = SheetHashIndex()
+
+        def failing_remove_grid(*args, **kwargs):
+            raise RuntimeError("falha na grade")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(engine, "_remove_grid", failing_remove_grid)
+            with pytest.raises(RuntimeError):
+                engine.process_unique(photo(ANSWERS), OPTIONS, index, "1.jpg")
+
+        assert len(index) == 0
+        # A nova foto da mesma folha é lida normalmente
+        result = engine.process_unique(photo(ANSWERS, 1), OPTIONS, index, "1-de-novo.jpg")
+        assert result.duplicate_of is None
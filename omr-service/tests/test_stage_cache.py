@@ -0,0 +1,65 @@
+"""
+Testes do Cache de Estágios - Infrastructure Layer
+"""
+
+import numpy as np
+from app.infrastructure.stage_cache import StageCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def snapshot(size):
+    return {"no_grid": np.zeros(size, np.uint8), "method": "otsu"}
+
+
+class TestStageCache:
+    """Testes para expiração e limites do cache"""
+
+    def test_entry_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = StageCache(ttl_seconds=10, clock=clock)
+        cache["a"] = snapshot(100)
+
+        clock.now = 9
+        assert cache.get("a") is not None
+        clock.now = 10
+        assert cache.get("a") is None
+        assert len(cache) == 0
+        assert cache.size_bytes == 0
+
+    def test_evicts_least_recently_used_over_byte_budget(self):
+        cache = StageCache(max_bytes=250)
+        cache["a"] = snapshot(100)
+        cache["b"] = snapshot(100)
+        cache.get("a")  # "a" passa a ser a mais recente
+        cache["c"] = snapshot(100)
+
+        assert set(cache) == {"a", "c"}
+        assert cache.size_bytes == 200
+
+    def test_entry_limit(self):
+        cache = StageCache(max_entries=2)
+        for key in "abc":
+            cache[key] = snapshot(10)
+
+        assert set(cache) == {"b", "c"}
+
+    def test_oversized_snapshot_is_not_stored(self):
+        cache = StageCache(max_bytes=50)
+        cache["a"] = snapshot(100)
+
+        assert "a" not in cache
+        assert cache.size_bytes == 0
+
+    def test_replacing_entry_updates_size(self):
+        cache = StageCache()
+        cache["a"] = snapshot(100)
+        cache["a"] = snapshot(30)
+
+        assert cache.size_bytes == 30
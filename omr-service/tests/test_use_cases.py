@@ -0,0 +1,587 @@
+"""
+Testes Unitários - Application Layer
+
+Testa os use cases com implementações falsas das interfaces.
+"""
+
+import io
+from contextlib import contextmanager
+
+import pytest
+from app.application.interfaces import (
+    IOMREngine, IImageValidator, IDebugStorage, IImageQualityGate,
+    IResultRepository, IAdmissionControl, ISheetTracker, ISheetIndex
+)
+from app.application.use_cases import (
+    ReadAnswersUseCase, CorrectExamUseCase, CorrectExamBatchUseCase,
+    ReviewSessionUseCase, LiveScanUseCase
+)
+from app.domain.entities import (
+    Answer, MarkQuality, OMRResult, Question, AnswerKey
+)
+from app.domain.exceptions import (
+    ImageQualityError, ReviewSessionNotFoundError, CapacityExceededError,
+    DuplicateSheetError
+)
+from app.domain.value_objects import (
+    OMROptions, ROI, ImageMetadata, ImageQuality, VersionField, RelativeRegion,
+    FrameAssessment, FrameStatus, UploadFormat, MarkThresholds
+)
+
+VERSION_FIELD = VersionField(RelativeRegion(0.6, 0.03, 0.3, 0.05))
+
+
+class FakeEngine(IOMREngine):
+    """Motor falso: o conteúdo da imagem é 'versão:respostas' (ex: b'A:BC')"""
+
+    def process_image(self, image_data: bytes, options: OMROptions, digest=None) -> OMRResult:
+        version, marks = image_data.decode().split(":")
+        answers = [
+            Answer(i + 1, m, 0.9, MarkQuality.CLEAR, {})
+            for i, m in enumerate(marks)
+        ]
+        return OMRResult(
+            answers=answers,
+            total_questions=len(answers),
+            exam_version=version or None
+        )
+
+    def prepare_image(self, image_data):
+        return {"image_data": image_data}
+
+    def process_prepared(self, prepared, options):
+        if options.template == "AUTO" and b"?" in prepared["image_data"]:
+            raise RuntimeError("ROI não detectado")
+        return self.process_image(prepared["image_data"].replace(b"?", b""), options)
+
+    def render_preview(self, prepared, max_side):
+        return b"jpeg", 0.5
+
+
+class FakeValidator(IImageValidator):
+    def validate_file_type(self, file, filename):
+        return True
+
+    def validate_file_size(self, file, max_mb=5):
+        return True
+
+    def get_metadata(self, image_data):
+        return ImageMetadata(1024, 768, "JPEG", len(image_data))
+
+
+class FakeStorage(IDebugStorage):
+    def save_debug_image(self, image_data, prefix, format="jpg"):
+        return ""
+
+    def cleanup_old_files(self, max_age_hours=24):
+        pass
+
+
+class FakeQualityGate(IImageQualityGate):
+    def __init__(self, reason=None):
+        self.reason = reason
+        self.digests = []
+
+    def assess(self, image_data, digest=None):
+        self.digests.append(digest)
+        return ImageQuality(100.0, 0.9, 0.7, 0.0, 0.1, 0.0, self.reason)
+
+
+class FakeAdmission(IAdmissionControl):
+    """Admissão falsa: registra as imagens admitidas ou recusa todas"""
+
+    def __init__(self, full=False):
+        self.full = full
+        self.admitted = []
+
+    @contextmanager
+    def admit(self, metadata):
+        if self.full:
+            raise CapacityExceededError(retry_after=5)
+        self.admitted.append(metadata)
+        yield
+
+
+class FakeTracker(ISheetTracker):
+    """Acompanhamento falso: o conteúdo do quadro é o nome da situação"""
+
+    def __init__(self):
+        self.resets = 0
+
+    def assess(self, frame_data):
+        return FrameAssessment(FrameStatus(frame_data.decode()), 360, 480)
+
+    def reset(self):
+        self.resets += 1
+
+
+class FakeSheetIndex(ISheetIndex):
+    """Índice falso: o hash é o próprio conteúdo da imagem"""
+
+    def __init__(self):
+        self.sheets = {}
+
+    def find(self, sheet_hash):
+        return self.sheets.get(sheet_hash)
+
+    def add(self, sheet_hash, label):
+        self.sheets[sheet_hash] = label
+
+    def release(self, label):
+        self.sheets = {h: l for h, l in self.sheets.items() if l != label}
+
+    def clear(self):
+        self.sheets = {}
+
+
+class DedupingEngine(FakeEngine):
+    """
+    Motor falso que recusa imagens repetidas no índice; com confirmed=False
+    (sem matrícula que confirme a cópia), lê e aponta a original
+    """
+
+    def __init__(self, confirmed=True):
+        self.confirmed = confirmed
+
+    def process_unique(self, image_data, options, sheet_index, label):
+        original = sheet_index.claim(image_data, label)
+        if original is not None and self.confirmed:
+            raise DuplicateSheetError(original)
+        result = self.process_image(image_data, options)
+        result.duplicate_of = original
+        return result
+
+
+class FakeResultRepository(IResultRepository):
+    """Histórico em memória: guarda cada chamada de save_many"""
+
+    def __init__(self):
+        self.calls = []
+
+    def save_many(self, corrections):
+        self.calls.append(list(corrections))
+        return list(range(len(corrections)))
+
+    def class_summary(self, answer_key_id):
+        raise NotImplementedError
+
+    def question_statistics(self, answer_key_id):
+        raise NotImplementedError
+
+    def distractor_analysis(self, answer_key_id):
+        raise NotImplementedError
+
+    def response_matrix(self, answer_key_id):
+        raise NotImplementedError
+
+
+def make_key(key_id, answers):
+    return AnswerKey(
+        key_id, key_id,
+        [Question(i + 1, a, 10) for i, a in enumerate(answers)],
+        60
+    )
+
+
+@pytest.fixture
+def batch_use_case():
+    read = ReadAnswersUseCase(FakeEngine(), FakeValidator(), FakeStorage())
+    return CorrectExamBatchUseCase(CorrectExamUseCase(read))
+
+
+class TestReadAnswersUseCase:
+    """Testes para a leitura com verificação rápida de qualidade"""
+
+    def test_rejected_image_skips_engine(self):
+        class FailingEngine(FakeEngine):
+            def process_image(self, image_data, options, digest=None):
+                raise AssertionError("pipeline não deveria rodar")
+
+        use_case = ReadAnswersUseCase(
+            FailingEngine(), FakeValidator(), FakeStorage(),
+            quality_gate=FakeQualityGate("imagem desfocada")
+        )
+
+        with pytest.raises(ImageQualityError) as exc_info:
+            use_case.execute(
+                io.BytesIO(b"A:BC"), "1.jpg",
+                OMROptions(num_questions=2, choices=["A", "B", "C"])
+            )
+        assert exc_info.value.quality.rejection_reason == "imagem desfocada"
+
+    def test_accepted_image_reports_quality(self):
+        use_case = ReadAnswersUseCase(
+            FakeEngine(), FakeValidator(), FakeStorage(),
+            quality_gate=FakeQualityGate()
+        )
+
+        result = use_case.execute(
+            io.BytesIO(b"A:BC"), "1.jpg",
+            OMROptions(num_questions=2, choices=["A", "B", "C"])
+        )
+        assert result.quality.is_acceptable
+
+    def test_digest_is_computed_once_per_read(self):
+        class RecordingEngine(FakeEngine):
+            digests = []
+
+            def process_image(self, image_data, options, digest=None):
+                self.digests.append(digest)
+                return super().process_image(image_data, options)
+
+        class DigestValidator(FakeValidator):
+            def get_metadata(self, image_data):
+                return ImageMetadata(1024, 768, "JPEG", len(image_data), digest="resumo")
+
+        engine, gate = RecordingEngine(), FakeQualityGate()
+        use_case = ReadAnswersUseCase(
+            engine, DigestValidator(), FakeStorage(), quality_gate=gate
+        )
+
+        use_case.execute(
+            io.BytesIO(b"A:BC"), "1.jpg",
+            OMROptions(num_questions=2, choices=["A", "B", "C"])
+        )
+        # O resumo dos metadados chega à verificação e ao motor
+        assert gate.digests == engine.digests == ["resumo"]
+
+    def test_cached_result_is_not_admitted(self):
+        class CachedEngine(FakeEngine):
+            def cached_result(self, image_data, options, digest=None):
+                return self.process_image(image_data, options)
+
+        admission = FakeAdmission(full=True)  # Recusaria qualquer leitura
+        use_case = ReadAnswersUseCase(
+            CachedEngine(), FakeValidator(), FakeStorage(), admission=admission
+        )
+
+        result = use_case.execute(
+            io.BytesIO(b"A:BC"), "1.jpg",
+            OMROptions(num_questions=2, choices=["A", "B", "C"])
+        )
+        assert [a.marked_choice for a in result.answers] == ["B", "C"]
+
+    def test_admits_by_header_dimensions(self):
+        admission = FakeAdmission()
+        use_case = ReadAnswersUseCase(
+            FakeEngine(), FakeValidator(), FakeStorage(), admission=admission
+        )
+
+        use_case.execute(
+            io.BytesIO(b"A:BC"), "1.jpg",
+            OMROptions(num_questions=2, choices=["A", "B", "C"])
+        )
+        assert [(m.width, m.height) for m in admission.admitted] == [(1024, 768)]
+
+    def test_full_budget_skips_engine(self):
+        class FailingEngine(FakeEngine):
+            def process_image(self, image_data, options, digest=None):
+                raise AssertionError("pipeline não deveria rodar")
+
+        use_case = ReadAnswersUseCase(
+            FailingEngine(), FakeValidator(), FakeStorage(),
+            admission=FakeAdmission(full=True)
+        )
+
+        with pytest.raises(CapacityExceededError):
+            use_case.execute(
+                io.BytesIO(b"A:BC"), "1.jpg",
+                OMROptions(num_questions=2, choices=["A", "B", "C"])
+            )
+
+    @pytest.mark.parametrize("width, format, filename, checked", [
+        (1024, "JPEG", UploadFormat.filename, 0),  # Formato compacto: só o cabeçalho
+        (4000, "JPEG", UploadFormat.filename, 1),  # Maior que o lado publicado
+        (1024, "PNG", UploadFormat.filename, 1),
+        (1024, "JPEG", "1.jpg", 1),  # Sem a marca do cliente
+    ])
+    def test_compact_upload_skips_type_check(self, width, format, filename, checked):
+        class CountingValidator(FakeValidator):
+            type_checks = 0
+            metadata_reads = 0
+
+            def validate_file_type(self, file, filename):
+                self.type_checks += 1
+                return True
+
+            def get_metadata(self, image_data):
+                self.metadata_reads += 1
+                return ImageMetadata(width, 768, format, len(image_data), 3)
+
+        validator = CountingValidator()
+        use_case = ReadAnswersUseCase(
+            FakeEngine(), validator, FakeStorage(),
+            upload_format=UploadFormat(max_side=2000)
+        )
+
+        result = use_case.execute(
+            io.BytesIO(b"A:BC"), filename,
+            OMROptions(num_questions=2, choices=["A", "B", "C"])
+        )
+        assert validator.type_checks == checked
+        assert validator.metadata_reads == 1  # Cabeçalho lido uma vez
+        assert result.total_questions == 2
+
+
+class TestCorrectExamBatchUseCase:
+    """Testes para a correção em lote com várias versões"""
+
+    def test_routes_each_sheet_to_its_version(self, batch_use_case):
+        keys = {"A": make_key("prova-A", "BC"), "B": make_key("prova-B", "CB")}
+        images = [
+            (io.BytesIO(b"A:BC"), "1.jpg"),
+            (io.BytesIO(b"B:BC"), "2.jpg"),
+        ]
+
+        batch = batch_use_case.execute(images, keys, version_field=VERSION_FIELD)
+
+        first, second = batch.items
+        assert first.correction.answer_key_id == "prova-A"
+        assert first.correction.correct_count == 2
+        assert second.correction.answer_key_id == "prova-B"
+        assert second.correction.correct_count == 0
+        assert batch.count_by_version() == {"A": 1, "B": 1}
+
+    def test_unreadable_version_is_reported(self, batch_use_case):
+        keys = {"A": make_key("prova-A", "BC"), "B": make_key("prova-B", "CB")}
+        images = [(io.BytesIO(b":BC"), "1.jpg"), (io.BytesIO(b"C:BC"), "2.jpg")]
+
+        batch = batch_use_case.execute(images, keys, version_field=VERSION_FIELD)
+
+        assert batch.corrected_count == 0
+        assert batch.items[0].error == "Tipo de prova ilegível"
+        assert "'C'" in batch.items[1].error
+        assert batch.to_dict()["falhas"] == 2
+
+    def test_single_key_ignores_version(self, batch_use_case):
+        keys = {"A": make_key("prova-A", "BC")}
+        batch = batch_use_case.execute([(io.BytesIO(b":BC"), "1.jpg")], keys)
+        assert batch.items[0].correction.correct_count == 2
+
+    def test_multiple_keys_require_version_field(self, batch_use_case):
+        keys = {"A": make_key("prova-A", "BC"), "B": make_key("prova-B", "CB")}
+        with pytest.raises(ValueError):
+            batch_use_case.execute([], keys)
+
+    def test_records_corrections_in_one_call(self):
+        results = FakeResultRepository()
+        read = ReadAnswersUseCase(FakeEngine(), FakeValidator(), FakeStorage())
+        use_case = CorrectExamBatchUseCase(CorrectExamUseCase(read, results))
+        keys = {"A": make_key("prova-A", "BC"), "B": make_key("prova-B", "CB")}
+        images = [
+            (io.BytesIO(b"A:BC"), "1.jpg"),
+            (io.BytesIO(b":BC"), "2.jpg"),
+            (io.BytesIO(b"B:BC"), "3.jpg"),
+        ]
+
+        use_case.execute(images, keys, version_field=VERSION_FIELD)
+
+        (records,) = results.calls
+        assert [(c.answer_key_id, k.id) for c, k in records] == [
+            ("prova-A", "prova-A"), ("prova-B", "prova-B")
+        ]
+
+    @pytest.mark.parametrize("adaptive", [True, False])
+    def test_adaptive_thresholds_reclassify_read_sheets(self, adaptive):
+        thresholds = MarkThresholds(0.02, 0.0, 0.045)
+
+        class CalibratingEngine(FakeEngine):
+            def __init__(self):
+                self.calls = []
+
+            def classify_batch(self, results):
+                self.calls.append(len(results))
+                # Limiares do lote: a primeira questão passa a ser "C"
+                return [
+                    self.process_image(b":C" + r.get_answers_dict()["2"].encode(), None)
+                    for r in results
+                ], thresholds
+
+        engine = CalibratingEngine()
+        read = ReadAnswersUseCase(engine, FakeValidator(), FakeStorage())
+        use_case = CorrectExamBatchUseCase(CorrectExamUseCase(read))
+        images = [
+            (io.BytesIO(b":BC"), "1.jpg"),
+            (io.BytesIO(b"\xff"), "2.jpg"),  # Falha na leitura
+            (io.BytesIO(b":BC"), "3.jpg"),
+        ]
+
+        batch = use_case.execute(
+            images, {"A": make_key("prova-A", "CC")}, adaptive_thresholds=adaptive
+        )
+
+        assert engine.calls == ([2] if adaptive else [])
+        assert batch.mark_thresholds == (thresholds if adaptive else None)
+        assert [item.error is None for item in batch.items] == [True, False, True]
+        assert batch.items[2].correction.correct_count == (2 if adaptive else 1)
+        assert batch.to_dict()["limiarMarcacao"] == (0.02 if adaptive else None)
+
+    @pytest.mark.parametrize("skip", [True, False])
+    def test_duplicate_sheets_are_skipped(self, skip):
+        results = FakeResultRepository()
+        read = ReadAnswersUseCase(DedupingEngine(), FakeValidator(), FakeStorage())
+        use_case = CorrectExamBatchUseCase(
+            CorrectExamUseCase(read, results), FakeSheetIndex()
+        )
+        keys = {"A": make_key("prova-A", "BC")}
+
+        for _ in range(2):  # O índice recomeça a cada lote
+            batch = use_case.execute(
+                [
+                    (io.BytesIO(b":BC"), "1.jpg"),
+                    (io.BytesIO(b":BC"), "2.jpg"),  # Mesma folha de novo
+                    (io.BytesIO(b":CB"), "3.jpg"),
+                ],
+                keys, skip_duplicates=skip
+            )
+
+            assert [item.duplicate_of for item in batch.items] == (
+                [None, "1.jpg", None] if skip else [None, None, None]
+            )
+            assert batch.corrected_count == (2 if skip else 3)
+            summary = batch.to_dict()
+            assert (summary["duplicatas"], summary["falhas"]) == ((1 if skip else 0), 0)
+
+        assert [len(records) for records in results.calls] == [2 if skip else 3] * 2
+
+    def test_unconfirmed_duplicates_are_graded(self):
+        results = FakeResultRepository()
+        read = ReadAnswersUseCase(
+            DedupingEngine(confirmed=False), FakeValidator(), FakeStorage()
+        )
+        use_case = CorrectExamBatchUseCase(
+            CorrectExamUseCase(read, results), FakeSheetIndex()
+        )
+
+        batch = use_case.execute(
+            [(io.BytesIO(b":BC"), "1.jpg"), (io.BytesIO(b":BC"), "2.jpg")],
+            {"A": make_key("prova-A", "BC")}
+        )
+
+        # Podem ser dois alunos: corrigida, registrada e apontada
+        assert batch.items[1].duplicate_of == "1.jpg"
+        assert batch.items[1].correction.correct_count == 2
+        summary = batch.to_dict()
+        assert (summary["corrigidas"], summary["duplicatas"], summary["falhas"]) == (2, 1, 0)
+        assert [len(records) for records in results.calls] == [2]
+
+    def test_correct_one_records_each_sheet(self):
+        results = FakeResultRepository()
+        read = ReadAnswersUseCase(DedupingEngine(), FakeValidator(), FakeStorage())
+        use_case = CorrectExamBatchUseCase(
+            CorrectExamUseCase(read, results), FakeSheetIndex()
+        )
+        keys = {"A": make_key("prova-A", "BC")}
+        options = use_case.begin(keys)
+
+        items = [
+            use_case.correct_one(io.BytesIO(data), name, options, keys)
+            for data, name in [(b":BC", "1.jpg"), (b":BC", "2.jpg"), (b"", "3.jpg")]
+        ]
+
+        assert items[0].correction.correct_count == 2
+        assert items[1].duplicate_of == "1.jpg"
+        assert items[2].error is not None
+        # Cada correção vai para o histórico assim que sai
+        assert [len(records) for records in results.calls] == [1]
+
+        with pytest.raises(ValueError, match="obrigatória"):
+            use_case.begin({"A": keys["A"], "B": keys["A"]})
+
+
+class TestReviewSessionUseCase:
+    """Testes para a sessão de revisão com ajuste de ROI"""
+
+    OPTIONS = OMROptions(num_questions=2, choices=["A", "B", "C"])
+
+    def test_engine_without_review_methods_is_rejected(self):
+        class ReadOnlyEngine(IOMREngine):
+            def process_image(self, image_data, options, digest=None):
+                return FakeEngine().process_image(image_data, options)
+
+        # Falha ao instanciar o motor, não na primeira sessão de revisão
+        with pytest.raises(TypeError, match="prepare_image"):
+            ReadOnlyEngine()
+    MANUAL = OMROptions(
+        num_questions=2, choices=["A", "B", "C"], template="MANUAL_ROI",
+        roi=ROI(0, 0, 100, 100)
+    )
+
+    def make_use_case(self, admission=None):
+        read = ReadAnswersUseCase(
+            FakeEngine(), FakeValidator(), FakeStorage(), admission=admission
+        )
+        return ReviewSessionUseCase(read, {})
+
+    def test_start_keeps_prepared_image(self):
+        use_case = self.make_use_case()
+
+        session = use_case.start(io.BytesIO(b"A:BC"), "1.jpg", self.OPTIONS)
+
+        assert session.result.get_answers_dict() == {"1": "B", "2": "C"}
+        assert (session.image_width, session.preview_scale) == (1024, 0.5)
+        assert use_case.sessions[session.id] == {
+            "image_data": b"A:BC", "metadata": ImageMetadata(1024, 768, "JPEG", 4)
+        }
+
+    def test_failed_initial_read_keeps_session(self):
+        use_case = self.make_use_case()
+
+        session = use_case.start(io.BytesIO(b"A:B?C"), "1.jpg", self.OPTIONS)
+        result = use_case.adjust(session.id, self.MANUAL)
+
+        assert session.result is None
+        assert session.error == "ROI não detectado"
+        assert result.get_answers_dict() == {"1": "B", "2": "C"}
+
+    def test_adjust_is_admitted_like_a_read(self):
+        admission = FakeAdmission()
+        use_case = self.make_use_case(admission)
+        session = use_case.start(io.BytesIO(b"A:BC"), "1.jpg", self.OPTIONS)
+
+        use_case.adjust(session.id, self.MANUAL)
+        assert [(m.width, m.height) for m in admission.admitted] == [(1024, 768)] * 2
+
+        admission.full = True
+        with pytest.raises(CapacityExceededError):
+            use_case.adjust(session.id, self.MANUAL)
+
+    def test_unknown_session(self):
+        use_case = self.make_use_case()
+        with pytest.raises(ReviewSessionNotFoundError):
+            use_case.adjust("nope", self.MANUAL)
+
+    def test_close(self):
+        use_case = self.make_use_case()
+        session = use_case.start(io.BytesIO(b"A:BC"), "1.jpg", self.OPTIONS)
+
+        assert use_case.close(session.id) is True
+        assert use_case.close(session.id) is False
+
+
+class TestLiveScanUseCase:
+    """Testes para a leitura ao vivo"""
+
+    OPTIONS = OMROptions(num_questions=2, choices=["A", "B", "C"])
+
+    def make_use_case(self):
+        read = ReadAnswersUseCase(FakeEngine(), FakeValidator(), FakeStorage())
+        return LiveScanUseCase(read, FakeTracker())
+
+    def test_ready_frame_awaits_capture(self):
+        use_case = self.make_use_case()
+
+        assert not use_case.frame(b"hold").ready
+        assert not use_case.awaiting_capture
+        assert use_case.frame(b"ready").ready
+        assert use_case.awaiting_capture
+
+    def test_capture_is_read_and_tracking_restarts(self):
+        use_case = self.make_use_case()
+        use_case.frame(b"ready")
+
+        result = use_case.read(b"A:BC", "captura.jpg", self.OPTIONS)
+
+        assert result.get_answers_dict() == {"1": "B", "2": "C"}
+        assert not use_case.awaiting_capture
+        assert use_case.tracker.resets == 1
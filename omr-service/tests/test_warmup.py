@@ -0,0 +1,37 @@
+"""
+Testes do Aquecimento - Infrastructure Layer
+"""
+
+import pytest
+from app.infrastructure.omr_engine import OpenCVOMREngine
+from app.infrastructure.warmup import Readiness, warm_up
+
+
+class TestWarmUp:
+    """Testes para o aquecimento do motor e o estado de prontidão"""
+
+    def test_reads_synthetic_sheets(self):
+        timings = warm_up(OpenCVOMREngine(), sheets=2, size=(1240, 1754))
+
+        assert list(timings) == ["sheet_1", "sheet_2"]
+
+    def test_misread_sheet_fails(self):
+        class BlindEngine(OpenCVOMREngine):
+            def process_image(self, image_data, options, digest=None):
+                result = super().process_image(image_data, options)
+                result.answers = list(result.answers)[:1]
+                return result
+
+        with pytest.raises(RuntimeError, match="Aquecimento"):
+            warm_up(BlindEngine(), sheets=1, size=(1240, 1754))
+
+    def test_readiness_transitions(self):
+        readiness = Readiness()
+        assert not readiness.ready
+
+        readiness.mark_failed("erro")
+        assert not readiness.wait(0)
+        assert readiness.error == "erro"
+
+        readiness.mark_ready({"sheet_1": 10.0})
+        assert readiness.wait(0)
@@ -0,0 +1,83 @@
+"""
+Testes do Envio em .zip - Infrastructure Layer
+
+Entradas de imagem de um .zip lidas uma a uma, sem extrair para o disco.
+"""
+
+import io
+import zipfile
+
+import numpy as np
+import pytest
+from app.infrastructure.synthetic_sheet import encode_image
+from app.infrastructure.zip_archive import ZipImageArchive, sniff_image_format
+
+IMAGE = np.full((40, 60), 255, dtype=np.uint8)
+
+
+def make_zip(entries, compression=zipfile.ZIP_DEFLATED) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=compression) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+class TestZipImageArchive:
+    """Testes para a leitura das entradas do .zip"""
+
+    def test_lists_only_images_in_zip_order(self):
+        archive = ZipImageArchive(make_zip([
+            ("turma/b.png", encode_image(IMAGE, ".png")),
+            ("turma/", b""),
+            ("__MACOSX/turma/._b.png", b"metadados"),
+            ("turma/.oculta.jpg", encode_image(IMAGE)),
+            ("turma/notas.txt", b"texto"),
+            ("turma/a.JPG", encode_image(IMAGE)),
+        ]))
+
+        assert [entry.filename for entry in archive.entries] == ["turma/b.png", "turma/a.JPG"]
+        assert archive.read(archive.entries[1]) == encode_image(IMAGE)
+
+    def test_rejects_entries_that_are_not_images(self):
+        archive = ZipImageArchive(make_zip([("falsa.jpg", b"nao sou uma imagem")]))
+
+        with pytest.raises(ValueError, match="Tipo de arquivo"):
+            archive.read(archive.entries[0])
+
+    def test_rejects_large_entries_before_decompressing(self):
+        data = encode_image(IMAGE)
+        archive = ZipImageArchive(make_zip([("grande.jpg", data)]), max_entry_bytes=len(data) - 1)
+
+        with pytest.raises(ValueError, match="muito grande"):
+            archive.read(archive.entries[0])
+
+        # Tamanho declarado menor que o real (cabeçalho adulterado): a
+        # descompressão para no tamanho declarado
+        archive.entries[0].file_size = 10
+        with pytest.raises(ValueError, match="corrompida"):
+            archive.read(archive.entries[0])
+
+    def test_invalid_zip(self):
+        with pytest.raises(ValueError, match="zip inválido"):
+            ZipImageArchive(io.BytesIO(b"PK nada"))
+        with pytest.raises(ValueError, match="zip inválido"):
+            ZipImageArchive.copy_of(io.BytesIO(b"PK nada"))
+
+    def test_copy_outlives_the_upload(self):
+        upload = make_zip([("a.jpg", encode_image(IMAGE))])
+        upload.read()  # Posição no fim, como depois do parse do formulário
+        archive = ZipImageArchive.copy_of(upload)
+        upload.close()
+
+        assert archive.read(archive.entries[0]) == encode_image(IMAGE)
+        archive.close()
+        assert archive._copy.closed
+
+
+def test_sniff_image_format():
+    assert sniff_image_format(encode_image(IMAGE)[:12]) == "JPEG"
+    assert sniff_image_format(encode_image(IMAGE, ".png")[:12]) == "PNG"
+    assert sniff_image_format(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "WEBP"
+    assert sniff_image_format(b"GIF89a") is None
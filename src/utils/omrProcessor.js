@@ -6,6 +6,77 @@
 
 const OMR_SERVICE_URL = import.meta.env.VITE_OMR_SERVICE_URL || 'http://localhost:8000';
 
+let uploadFormatRequest = null;
+
+/**
+ * Formato compacto de envio publicado pelo serviço (GET /api/omr/formato)
+ *
+ * Consultado uma vez; sem o serviço (ou versão antiga), retorna null e as
+ * fotos seguem como estão.
+ * @returns {Promise<Object|null>} {maxSide, mediaType, quality, grayscale, filename}
+ */
+export const getUploadFormat = () => {
+    if (!uploadFormatRequest) {
+        uploadFormatRequest = fetch(`${OMR_SERVICE_URL}/api/omr/formato`)
+            .then(response => (response.ok ? response.json() : null))
+            .catch(() => null)
+            .then(format => {
+                if (!format) uploadFormatRequest = null;  // Tentar de novo depois
+                return format;
+            });
+    }
+    return uploadFormatRequest;
+};
+
+/**
+ * Desenha a imagem no canvas já no formato compacto e a codifica
+ * @param {HTMLCanvasElement} canvas - Canvas de trabalho
+ * @param {CanvasImageSource} source - Foto, bitmap ou vídeo
+ * @param {number} width - Largura da origem
+ * @param {number} height - Altura da origem
+ * @param {Object} format - Formato compacto ({maxSide, mediaType, quality, grayscale})
+ * @returns {Promise<Blob|null>}
+ */
+const encodeCompact = (canvas, source, width, height, format) => {
+    const scale = Math.min(1, format.maxSide / Math.max(width, height));
+    canvas.width = Math.round(width * scale);
+    canvas.height = Math.round(height * scale);
+    const ctx = canvas.getContext('2d');
+    ctx.imageSmoothingQuality = 'high';
+    if (format.grayscale) ctx.filter = 'grayscale(1)';
+    ctx.drawImage(source, 0, 0, canvas.width, canvas.height);
+    return new Promise(resolve => canvas.toBlob(resolve, format.mediaType, format.quality));
+};
+
+/**
+ * Prepara a foto para envio no formato compacto do serviço
+ *
+ * Reduz ao lado maior publicado (respeitando a orientação EXIF), converte
+ * para tons de cinza e codifica: a foto do celular cai de vários MB para
+ * poucas centenas de KB e o serviço a aceita sem redimensionar. O nome do
+ * arquivo publicado marca o envio como compacto (o canvas sempre codifica o
+ * JPEG em três canais). Sem o formato, ou se o resultado não ficar menor,
+ * envia o arquivo original.
+ * @param {File} imageFile - Arquivo de imagem
+ * @returns {Promise<File>}
+ */
+export const compactImage = async (imageFile) => {
+    const format = await getUploadFormat();
+    if (!format || typeof createImageBitmap !== 'function') return imageFile;
+    try {
+        const bitmap = await createImageBitmap(imageFile, { imageOrientation: 'from-image' });
+        const blob = await encodeCompact(
+            document.createElement('canvas'), bitmap, bitmap.width, bitmap.height, format
+        );
+        bitmap.close();
+        if (!blob || blob.size >= imageFile.size) return imageFile;
+        return new File([blob], format.filename || 'foto.jpg', { type: format.mediaType });
+    } catch (error) {
+        console.warn('Foto enviada sem compactar:', error);
+        return imageFile;
+    }
+};
+
 /**
  * Lê respostas de uma imagem usando OMR
  * @param {File} imageFile - Arquivo de imagem
@@ -17,7 +88,7 @@ const OMR_SERVICE_URL = import.meta.env.VITE_OMR_SERVICE_URL || 'http://localhos
 export const readAnswersWithOMR = async (imageFile, numQuestions, choices = ["A", "B", "C", "D", "E"], debug = false) => {
     try {
         const formData = new FormData();
-        formData.append('image', imageFile);
+        formData.append('image', await compactImage(imageFile));
         formData.append('options', JSON.stringify({
             numQuestions,
             choices,
@@ -67,7 +138,7 @@ export const readAnswersWithOMR = async (imageFile, numQuestions, choices = ["A"
 export const correctExamWithOMR = async (imageFile, answerKey) => {
     try {
         const formData = new FormData();
-        formData.append('image', imageFile);
+        formData.append('image', await compactImage(imageFile));
         formData.append('gabarito', JSON.stringify({
             id: answerKey.id,
             name: answerKey.name,
@@ -114,3 +185,85 @@ export const isOMRServiceAvailable = async () => {
         return false;
     }
 };
+
+/**
+ * Leitura ao vivo pela câmera (WebSocket /api/omr/live)
+ *
+ * Envia quadros reduzidos do vídeo, um por vez (o próximo só após a
+ * orientação do anterior), e a foto no formato compacto do serviço (ou em
+ * resolução total, sem ele) quando o serviço pede a captura (folha
+ * parada, nítida e alinhada).
+ * @param {HTMLVideoElement} video - Vídeo da câmera em reprodução
+ * @param {Object} params
+ * @param {number} params.numQuestions - Número de questões
+ * @param {string[]} params.choices - Alternativas (ex: ["A", "B", "C", "D", "E"])
+ * @param {Function} params.onGuidance - Recebe a orientação de cada quadro ({status, message, corners, ...})
+ * @param {Function} params.onResult - Recebe o resultado da leitura (mesmo formato de /api/omr/read)
+ * @param {Function} params.onError - Recebe erros da leitura ({detail, error_type})
+ * @param {number} params.frameSize - Lado maior dos quadros enviados
+ * @param {boolean} params.continuous - Após um resultado, seguir para a próxima folha
+ * @returns {Function} Encerra a leitura ao vivo
+ */
+export const startLiveScan = (video, {
+    numQuestions,
+    choices = ["A", "B", "C", "D", "E"],
+    onGuidance = () => {},
+    onResult = () => {},
+    onError = () => {},
+    frameSize = 480,
+    continuous = false
+}) => {
+    const socket = new WebSocket(`${OMR_SERVICE_URL.replace(/^http/, 'ws')}/api/omr/live`);
+    const canvas = document.createElement('canvas');
+    let stopped = false;
+    let captureFormat = { maxSide: Infinity, mediaType: 'image/jpeg', quality: 0.92, grayscale: false };
+    getUploadFormat().then(format => {
+        if (format) captureFormat = format;
+    });
+
+    const sendImage = (maxSide, quality) => {
+        const scale = Math.min(1, maxSide / Math.max(video.videoWidth, video.videoHeight));
+        canvas.width = Math.round(video.videoWidth * scale);
+        canvas.height = Math.round(video.videoHeight * scale);
+        canvas.getContext('2d').drawImage(video, 0, 0, canvas.width, canvas.height);
+        canvas.toBlob(blob => {
+            if (!stopped && blob) socket.send(blob);
+        }, 'image/jpeg', quality);
+    };
+    const sendFrame = () => {
+        if (!stopped) requestAnimationFrame(() => sendImage(frameSize, 0.7));
+    };
+
+    socket.onopen = () => {
+        socket.send(JSON.stringify({ numQuestions, choices, template: "AUTO" }));
+        sendFrame();
+    };
+
+    socket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.type === 'guidance') {
+            onGuidance(message);
+            if (message.capture) {
+                encodeCompact(canvas, video, video.videoWidth, video.videoHeight, captureFormat)
+                    .then(blob => {
+                        if (!stopped && blob) socket.send(blob);
+                    });
+            } else {
+                sendFrame();
+            }
+        } else if (message.type === 'result') {
+            onResult(message);
+            if (continuous) sendFrame();
+        } else {
+            onError(message);
+            sendFrame();
+        }
+    };
+
+    socket.onerror = () => onError({ detail: 'Erro na conexão com o serviço OMR' });
+
+    return () => {
+        stopped = true;
+        socket.close();
+    };
+};